@@ -243,6 +243,38 @@ SITE_DOMAIN = 'crowdvote.com' if not DEBUG else 'localhost:8000'
 TURNSTILE_SITE_KEY = env('TURNSTILE_SITE_KEY', default='')
 TURNSTILE_SECRET_KEY = env('TURNSTILE_SECRET_KEY', default='')
 
+# Star arithmetic backend for delegation averaging and STAR tallying
+# 'decimal' (reference) or 'fixed' (scaled-int, Decimal-identical results)
+STAR_ARITHMETIC = env('STAR_ARITHMETIC', default='decimal')
+
+# Average calculated ballots with NumPy (optional dependency; falls back to Decimal)
+DELEGATION_VECTORIZED = env.bool('DELEGATION_VECTORIZED', default=False)
+
+# Tally STAR elections on a NumPy ballot matrix (optional dependency). Scores of
+# delegated 12-digit ballots are correctly rounded means and may differ from the
+# Decimal path in the last places (see democracy.star_matrix)
+STAR_TALLY_VECTORIZED = env.bool('STAR_TALLY_VECTORIZED', default=False)
+
+# Ballot tree and tally trace detail: 'full', 'summary' or 'off' (see democracy.trace).
+# Full detail formats a line per tag and choice; commands ask for it explicitly
+TALLY_TRACE_LEVEL = env('TALLY_TRACE_LEVEL', default='summary')
+
+# Skip staging and tallying when a recalculation's inputs hash matches the
+# decision's latest completed snapshot (see democracy.delegation.inputs_hash).
+# Opt-in: off by default, every recalculation stages and tallies.
+SNAPSHOT_REUSE_UNCHANGED = env.bool('SNAPSHOT_REUSE_UNCHANGED', default=False)
+
+# Store every Nth snapshot of a decision in full and the others as deltas of
+# the previous completed snapshot (1 = always full; see democracy.snapshot_store)
+SNAPSHOT_KEYFRAME_INTERVAL = env.int('SNAPSHOT_KEYFRAME_INTERVAL', default=10)
+
+# Snapshot retention for `manage.py prune_snapshots` (see democracy.snapshot_retention):
+# final and active snapshots are always kept, plus the last N completed ones,
+# one completed snapshot per hour for the last H hours, and failed ones for D days
+SNAPSHOT_RETENTION_KEEP_LAST = env.int('SNAPSHOT_RETENTION_KEEP_LAST', default=10)
+SNAPSHOT_RETENTION_HOURLY_HOURS = env.int('SNAPSHOT_RETENTION_HOURLY_HOURS', default=168)
+SNAPSHOT_RETENTION_FAILED_DAYS = env.int('SNAPSHOT_RETENTION_FAILED_DAYS', default=7)
+
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
@@ -0,0 +1,83 @@
+"""
+Per-decision choice index: choice ids to titles (and Choice objects).
+
+Tally reports, snapshot trees and ballot staging all need to turn choice ids
+into display titles. Doing that through `vote.choice` or `Choice.objects.get`
+costs a query per vote or per choice. A ChoiceIndex loads a decision's choices
+once (`Decision.choice_index`, one query) or from a snapshot's frozen
+`choices_data` (no query), and answers every lookup from memory.
+
+Ids are stored as strings, the form used by ballots, snapshot data and tally
+results.
+"""
+
+
+class ChoiceIndex:
+    """
+    Choice ids <-> titles for one decision, in the decision's choice order.
+
+    Example:
+        >>> index = ChoiceIndex.from_data(snapshot_data['choices_data'])
+        >>> index.label(result['winner'])
+        'Banana Budget'
+    """
+
+    def __init__(self, choices=(), objects=()):
+        """
+        Build an index.
+
+        Args:
+            choices (iterable): Dicts with 'id', 'title' and optionally
+                'description' (the snapshot `choices_data` format)
+            objects (iterable): Choice instances, when loaded from the database
+        """
+        self.data = [
+            {'id': str(choice['id']), 'title': choice['title'], 'description': choice.get('description', '')}
+            for choice in choices
+        ]
+        self.ids = [choice['id'] for choice in self.data]
+        self.titles = {choice['id']: choice['title'] for choice in self.data}
+        self.objects = {str(choice.id): choice for choice in objects}
+
+    @classmethod
+    def for_decision(cls, decision):
+        """Load a decision's choices with one query."""
+        objects = list(decision.choices.all())
+        return cls(
+            ({'id': choice.id, 'title': choice.title, 'description': choice.description} for choice in objects),
+            objects,
+        )
+
+    @classmethod
+    def from_data(cls, choices_data):
+        """Index a snapshot's frozen `choices_data` (no queries)."""
+        return cls(choices_data)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, choice_id):
+        return str(choice_id) in self.titles
+
+    def title(self, choice_id, default=None):
+        """Title of a choice (falls back to `default`)."""
+        return self.titles.get(str(choice_id), default)
+
+    def label(self, choice_id):
+        """Display label: the title, or the id for choices not in the index."""
+        return self.titles.get(str(choice_id), str(choice_id))
+
+    def labels(self, choice_ids):
+        """Display labels for several choices."""
+        return [self.label(choice_id) for choice_id in choice_ids]
+
+    def choice(self, choice_id):
+        """Choice instance (only for indexes loaded with for_decision())."""
+        return self.objects.get(str(choice_id))
+
+    def as_data(self):
+        """Snapshot `choices_data`: list of {'id', 'title', 'description'}."""
+        return [dict(choice) for choice in self.data]
@@ -0,0 +1,774 @@
+"""
+Iterative delegation engine for snapshot-based ballot calculation.
+
+This module resolves every member's ballot from frozen snapshot data without
+recursion. The snapshot's `followings` are compiled into an integer-indexed CSR
+FollowGraph, cycles are collapsed with strongly-connected-component (SCC)
+condensation, and ballots are resolved in a single reverse-topological pass over
+the condensed graph. All per-member state is held in arrays indexed by dense
+member id; the per-voter resolution dicts are only built when accessed.
+
+Resolution rules:
+- A member with a manual ballot keeps it. Manual voters never inherit, so their
+  own followings are ignored (they can never be part of a delegation cycle).
+- Any other member averages the ballots of every followee whose ballot tags
+  match the following's tags (empty following tags = follow on all tags).
+- Members inside a delegation cycle are resolved in levels: level 0 uses only
+  followees outside the cycle, and each following level may additionally use
+  cycle members resolved at an earlier level. Members resolved at the same
+  level never inherit from each other, so the outcome does not depend on which
+  member happens to be visited first.
+
+For acyclic follow graphs the ballots and tags are identical to the previous
+recursive implementation.
+
+Incremental mode: a member's result only depends on the members it follows
+(transitively). Given the exported results of a previous snapshot and the set
+of members whose own inputs changed, only the reverse-reachable closure of the
+changed members (everyone who transitively follows them) is re-evaluated; all
+other members are restored from the previous results, which is exactly what a
+full recomputation would produce for them.
+
+Community batches: all open decisions of a community share memberships and
+followings. A SharedCondensation compiles and condenses that graph once; each
+decision only re-runs Tarjan inside the components that contain its manual
+voters (see SharedCondensation.components_for).
+"""
+
+import hashlib
+import json
+from array import array
+from collections.abc import Mapping
+
+from .follow_graph import FollowGraph, snapshot_members
+from .star_arithmetic import DecimalStars
+from .vectorized import average_by_level, numpy_available
+
+
+# Per-member resolution kinds (PENDING = not evaluated yet)
+PENDING, MANUAL, CALCULATED, NO_BALLOT = 0, 1, 2, 3
+KIND_NAMES = {MANUAL: 'manual', CALCULATED: 'calculated', NO_BALLOT: 'no_ballot'}
+
+# Reasons a member ends up without a ballot
+NO_REASON, NOT_FOLLOWING, NO_TAG_MATCH, CIRCULAR = 0, 1, 2, 3
+REASONS = {
+    NO_REASON: None,
+    NOT_FOLLOWING: "Not following anyone",
+    NO_TAG_MATCH: "Following others but no tag matches",
+    CIRCULAR: "Circular delegation",
+}
+REASON_CODES = {reason: code for code, reason in REASONS.items()}
+
+
+def changed_voters(previous_data, snapshot_data):
+    """
+    Find voters whose own delegation inputs differ between two snapshots.
+
+    A voter's inputs are: membership (voting or not), their followings
+    (followee, tags and order) and their manual ballot (tags and votes).
+    Calculated ballots captured in a snapshot are ignored, since the engine
+    recomputes them anyway.
+
+    Args:
+        previous_data (dict): snapshot_data of the previous snapshot
+        snapshot_data (dict): snapshot_data of the new snapshot
+
+    Returns:
+        set: Voter IDs whose inputs changed (the change set)
+    """
+    def manual(ballots, voter_id):
+        ballot_data = ballots.get(voter_id)
+        if not ballot_data or ballot_data['is_calculated']:
+            return None
+        return ballot_data['tags'], ballot_data['votes']
+
+    changed = set()
+    for key in ('community_memberships', 'non_voting_memberships'):
+        previous_members = {str(member_id) for member_id in previous_data.get(key, ())}
+        members = {str(member_id) for member_id in snapshot_data.get(key, ())}
+        changed |= previous_members ^ members
+
+    previous_followings = previous_data['followings']
+    followings = snapshot_data['followings']
+    for voter_id in set(previous_followings) | set(followings):
+        if previous_followings.get(voter_id, []) != followings.get(voter_id, []):
+            changed.add(voter_id)
+
+    previous_ballots = previous_data['existing_ballots']
+    ballots = snapshot_data['existing_ballots']
+    for voter_id in set(previous_ballots) | set(ballots):
+        if manual(previous_ballots, voter_id) != manual(ballots, voter_id):
+            changed.add(voter_id)
+
+    return changed
+
+
+# Bump when the canonical inputs change, so older hashes never match
+INPUTS_HASH_VERSION = 2
+
+
+def inputs_hash(snapshot_data):
+    """
+    Content hash of everything a snapshot's calculation depends on.
+
+    Covers voting and non-voting memberships, followings (followee, tags and
+    order), manual ballots (tags and votes), the anonymity flags recorded on
+    existing ballots and the decision's choices. Two snapshots with the same hash
+    stage and tally to the same results.
+
+    Args:
+        snapshot_data (dict): snapshot_data from CreateCalculationSnapshot
+
+    Returns:
+        str: SHA-256 hex digest of the canonical JSON inputs
+    """
+    ballots = snapshot_data['existing_ballots']
+    canonical = {
+        'version': INPUTS_HASH_VERSION,
+        'memberships': sorted(str(member_id) for member_id in snapshot_data['community_memberships']),
+        'non_voting_memberships': sorted(
+            str(member_id) for member_id in snapshot_data.get('non_voting_memberships', ())
+        ),
+        'followings': snapshot_data['followings'],
+        'manual_ballots': {
+            voter_id: [ballot_data['tags'], ballot_data['votes']]
+            for voter_id, ballot_data in ballots.items() if not ballot_data['is_calculated']
+        },
+        'anonymous': sorted(voter_id for voter_id, ballot_data in ballots.items() if ballot_data['is_anonymous']),
+        'choices': snapshot_data['choices_data'],
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResolutionView(Mapping):
+    """
+    Read-only voter_id -> resolution dict mapping over the engine's arrays.
+
+    Resolution dicts are built on first access and cached, so callers that
+    only need a few members (or only the arrays) never pay for the rest.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._cache = {}
+
+    def __getitem__(self, voter_id):
+        result = self._cache.get(voter_id)
+        if result is None:
+            index = self._engine.graph.index_of.get(voter_id)
+            if index is None or self._engine.kind[index] == PENDING:
+                raise KeyError(voter_id)
+            result = self._cache[voter_id] = self._engine.resolution(index)
+        return result
+
+    def __iter__(self):
+        return iter(self._engine.nodes)
+
+    def __len__(self):
+        return len(self._engine.nodes)
+
+
+def tarjan_components(graph, roots, is_manual, within=None):
+    """
+    Iterative Tarjan SCC algorithm over a FollowGraph.
+
+    Manual voters never inherit, so their followings are ignored.
+
+    Args:
+        graph (FollowGraph): Compiled follow graph
+        roots (iterable): Dense ids to start from
+        is_manual (bytearray): 1 for members with a manual ballot
+        within (set, optional): Only follow edges to these dense ids
+
+    Returns:
+        list: Lists of dense ids, one per component, in reverse topological
+              order (every component after all components it follows)
+    """
+    size = len(graph)
+    offsets = graph.offsets
+    targets = graph.targets
+    index_of = array('i', [-1]) * size
+    lowlink = array('i', [0]) * size
+    on_stack = bytearray(size)
+    stack = []
+    components = []
+    next_index = 0
+
+    for root in roots:
+        if index_of[root] != -1:
+            continue
+
+        index_of[root] = lowlink[root] = next_index
+        next_index += 1
+        stack.append(root)
+        on_stack[root] = 1
+        # Work items: [node, next edge position, end edge position]
+        work = [[root, offsets[root], offsets[root] if is_manual[root] else offsets[root + 1]]]
+
+        while work:
+            item = work[-1]
+            node = item[0]
+            descended = False
+            while item[1] < item[2]:
+                followee = targets[item[1]]
+                item[1] += 1
+                if within is not None and followee not in within:
+                    continue
+                if index_of[followee] == -1:
+                    index_of[followee] = lowlink[followee] = next_index
+                    next_index += 1
+                    stack.append(followee)
+                    on_stack[followee] = 1
+                    end = offsets[followee] if is_manual[followee] else offsets[followee + 1]
+                    work.append([followee, offsets[followee], end])
+                    descended = True
+                    break
+                if on_stack[followee]:
+                    lowlink[node] = min(lowlink[node], index_of[followee])
+
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+class SharedCondensation:
+    """
+    SCC condensation of a community's follow graph, shared across decisions.
+
+    Memberships and followings are the same for every open decision of a
+    community; only the ballots differ. The graph is compiled and condensed
+    once, ignoring ballots. For each decision, only components that contain
+    manual voters need refining: a manual voter's followings are ignored, which
+    can only split its component. Tarjan is re-run inside those components,
+    and the refined pieces take the component's place in the shared reverse
+    topological order.
+
+    Args:
+        graph (FollowGraph): Compiled community follow graph
+        members (list): Community member ids, voting and non-voting (graph roots)
+
+    Example:
+        >>> condensation = SharedCondensation.from_snapshot(snapshot.snapshot_data)
+        >>> engine = DelegationEngine(other_snapshot.snapshot_data, condensation=condensation)
+    """
+
+    def __init__(self, graph, members, followings=None):
+        """Condense the graph once, ignoring ballots."""
+        self.graph = graph
+        self.members = [str(member_id) for member_id in members]
+        self.followings = followings
+        roots = [graph.index_of[member_id] for member_id in self.members]
+        self.components = tarjan_components(graph, roots, bytearray(len(graph)))
+
+    @classmethod
+    def from_snapshot(cls, snapshot_data):
+        """Build the shared condensation from a snapshot's memberships and followings."""
+        return cls(
+            FollowGraph.from_snapshot(snapshot_data),
+            snapshot_members(snapshot_data),
+            snapshot_data['followings'],
+        )
+
+    def matches(self, snapshot_data):
+        """True if a snapshot captured the same memberships and followings."""
+        return (
+            snapshot_members(snapshot_data) == self.members
+            and snapshot_data['followings'] == self.followings
+        )
+
+    def components_for(self, engine):
+        """
+        Components for one decision's engine, in reverse topological order.
+
+        Args:
+            engine (DelegationEngine): Engine built on this condensation's graph
+
+        Returns:
+            list: Lists of dense ids covering exactly the engine's nodes
+        """
+        is_manual = engine.is_manual
+        node_mask = engine.node_mask
+        components = []
+        for component in self.components:
+            if len(component) > 1 and any(is_manual[index] for index in component):
+                pieces = tarjan_components(self.graph, component, is_manual, within=set(component))
+            else:
+                pieces = (component,)
+            # A piece is reachable from the decision's members entirely or not at all
+            components.extend(piece for piece in pieces if node_mask[piece[0]])
+        return components
+
+
+class DelegationEngine:
+    """
+    Resolve ballots for all members captured in a calculation snapshot.
+
+    Args:
+        snapshot_data (dict): Frozen system state from CreateCalculationSnapshot
+        graph (FollowGraph, optional): Pre-compiled follow graph for this snapshot
+        arithmetic (optional): Star arithmetic backend from democracy.star_arithmetic
+            (default DecimalStars); ballots in results are always Decimal
+        condensation (SharedCondensation, optional): Follow graph and SCCs shared
+            with other decisions of the same community (same memberships/followings)
+        vectorized (bool): Average calculated ballots with NumPy, level by level
+            (see democracy.vectorized); ignored when NumPy is not installed
+
+    Example:
+        >>> engine = DelegationEngine(snapshot.snapshot_data)
+        >>> results = engine.resolve()
+        >>> results[voter_id]['type']
+        'calculated'
+    """
+
+    def __init__(self, snapshot_data, graph=None, arithmetic=None, condensation=None, vectorized=False):
+        """Compile the snapshot's followings into a follow graph."""
+        self.snapshot_data = snapshot_data
+        self.arithmetic = arithmetic or DecimalStars()
+        # Vectorized averaging needs NumPy and works on Decimal ballots
+        self.vectorized = bool(
+            vectorized and numpy_available() and isinstance(self.arithmetic, DecimalStars)
+        )
+        self.condensation = condensation
+        if condensation is not None:
+            graph = condensation.graph
+        self.graph = graph if graph is not None else FollowGraph.from_snapshot(snapshot_data)
+        # Every member gets a result (non-voting members' ballots are not counted)
+        self.members = snapshot_members(snapshot_data)
+        self.manual_ballots = {
+            voter_id: ballot_data
+            for voter_id, ballot_data in snapshot_data['existing_ballots'].items()
+            if not ballot_data['is_calculated']
+        }
+
+        size = len(self.graph)
+        self.is_manual = bytearray(size)
+        for voter_id in self.manual_ballots:
+            index = self.graph.index_of.get(voter_id)
+            if index is not None:
+                self.is_manual[index] = 1
+
+        self.node_indexes = self._collect_nodes()
+        self.nodes = [self.graph.voter_ids[index] for index in self.node_indexes]
+        self._reset()
+
+    def _reset(self):
+        """Allocate empty per-member and per-edge resolution state."""
+        size = len(self.graph)
+        self.kind = bytearray(size)
+        self.reason = bytearray(size)
+        self.depth = array('i', [0]) * size
+        self.ballots = [None] * size
+        self.tag_masks = [0] * size
+        self.evaluated_edges = [()] * size
+        self.edge_active = bytearray(self.graph.edge_count)
+        self.edge_match = [0] * self.graph.edge_count
+        self.results = ResolutionView(self)
+        self.circular_prevented = []
+        self.circular_followees = {}
+        self.reevaluated = []
+        self._pending_sources = {}
+
+    def _collect_nodes(self):
+        """
+        Collect community members plus every member reachable through followings.
+
+        Also sets `node_mask` (1 for every collected dense id).
+
+        Returns:
+            list: Dense ids in deterministic discovery order (members first)
+        """
+        nodes = []
+        seen = self.node_mask = bytearray(len(self.graph))
+        stack = []
+        for member_id in self.members:
+            index = self.graph.index_of[member_id]
+            if not seen[index]:
+                seen[index] = 1
+                nodes.append(index)
+                stack.append(index)
+
+        while stack:
+            index = stack.pop()
+            for followee in self._followees(index):
+                if not seen[followee]:
+                    seen[followee] = 1
+                    nodes.append(followee)
+                    stack.append(followee)
+
+        return nodes
+
+    def _followees(self, index):
+        """Return the dense ids a member can inherit from (none for manual voters)."""
+        if self.is_manual[index]:
+            return ()
+        return self.graph.followees(index)
+
+    def strongly_connected_components(self):
+        """
+        Compute SCCs of the follow graph with an iterative Tarjan algorithm.
+
+        Tarjan's algorithm emits components in reverse topological order: every
+        component is emitted after all components it follows. This is exactly
+        the order in which ballots must be resolved.
+
+        Returns:
+            list: Lists of dense ids, one per component, followees first
+        """
+        if self.condensation is not None:
+            return self.condensation.components_for(self)
+        return tarjan_components(self.graph, self.node_indexes, self.is_manual)
+
+    def resolve(self, previous=None, changed=None):
+        """
+        Resolve every member's ballot in one reverse-topological pass.
+
+        Args:
+            previous (dict, optional): Results exported by export_resolutions()
+                for an earlier snapshot of the same decision
+            changed (iterable, optional): Voter IDs whose inputs changed since
+                `previous` (see changed_voters). Required with `previous`.
+
+        Returns:
+            ResolutionView: voter_id -> resolution dict with keys 'type'
+                  ('manual', 'calculated' or 'no_ballot'), 'ballot', 'tags',
+                  'is_anonymous', 'sources', 'edges', 'reason' and
+                  'delegation_depth'
+        """
+        self._reset()
+        no_blocked = frozenset()
+        dirty = None
+        if previous is not None:
+            index_of = self.graph.index_of
+            dirty = self.graph.reverse_closure(
+                index_of[voter_id] for voter_id in changed if voter_id in index_of
+            )
+
+        for component in self.strongly_connected_components():
+            if dirty is not None and self._restore_component(component, previous, dirty):
+                continue
+            self.reevaluated.extend(component)
+            if len(component) == 1 and component[0] not in self._followees(component[0]):
+                self._evaluate(component[0], no_blocked)
+            else:
+                self._resolve_cycle(component)
+
+        if self._pending_sources:
+            calculated = average_by_level(self.ballots, self._pending_sources, self.depth)
+            for index, ballot in calculated.items():
+                self.ballots[index] = ballot
+
+        return self.results
+
+    def _restore_component(self, component, previous, dirty):
+        """
+        Restore a clean component from previous results.
+
+        A component is clean when none of its members is dirty and all of them
+        have previous calculated/no-ballot results (manual ballots are cheap to
+        re-read, so they are always evaluated).
+
+        Returns:
+            bool: True if the component was restored
+        """
+        voter_ids = self.graph.voter_ids
+        states = []
+        for index in component:
+            state = previous.get(voter_ids[index])
+            if index in dirty or self.is_manual[index] or state is None or state['type'] == 'manual':
+                return False
+            states.append(state)
+
+        for index, state in zip(component, states):
+            self._restore(index, state)
+        for index in sorted(component, key=voter_ids.__getitem__):
+            for followee_id in self.circular_followees.get(index, ()):
+                self.circular_prevented.append((voter_ids[index], followee_id))
+        return True
+
+    def _restore(self, index, state):
+        """Load one member's exported result into the engine's arrays."""
+        graph = self.graph
+        self.kind[index] = CALCULATED if state['type'] == 'calculated' else NO_BALLOT
+        self.reason[index] = REASON_CODES[state['reason']]
+        self.depth[index] = state['depth']
+        if state['ballot'] is not None:
+            parse = self.arithmetic.parse
+            self.ballots[index] = {choice_id: parse(stars) for choice_id, stars in state['ballot'].items()}
+        self.tag_masks[index] = graph.tags.mask(state['tags'])
+
+        edge_of = {graph.targets[edge]: edge for edge in graph.edge_range(index)}
+        evaluated = []
+        for followee_id, active, matching_tags in state['edges']:
+            edge = edge_of[graph.index_of[followee_id]]
+            evaluated.append(edge)
+            self.edge_active[edge] = active
+            self.edge_match[edge] = graph.tags.mask(matching_tags)
+        self.evaluated_edges[index] = tuple(evaluated)
+        if state['circular']:
+            self.circular_followees[index] = state['circular']
+
+    def export_resolutions(self):
+        """
+        Export exact per-member results for incremental recomputation.
+
+        Ballots keep full Decimal precision (as strings) so restored members
+        produce exactly the same values as a full recomputation.
+
+        Returns:
+            dict: voter_id -> JSON-serializable result state
+        """
+        graph = self.graph
+        exported = {}
+        for index in self.node_indexes:
+            voter_id = graph.voter_ids[index]
+            kind = self.kind[index]
+            if kind == MANUAL:
+                exported[voter_id] = {'type': 'manual'}
+                continue
+            ballot = self._decimal_ballot(index) if kind == CALCULATED else None
+            exported[voter_id] = {
+                'type': KIND_NAMES[kind],
+                'ballot': {choice_id: str(stars) for choice_id, stars in ballot.items()} if ballot else None,
+                'tags': graph.tags.tags(self.tag_masks[index]) if kind == CALCULATED else [],
+                'reason': REASONS[self.reason[index]],
+                'depth': self.depth[index],
+                'edges': [
+                    [graph.voter_ids[graph.targets[edge]], bool(self.edge_active[edge]),
+                     graph.tags.tags(self.edge_match[edge])]
+                    for edge in self.evaluated_edges[index]
+                ],
+                'circular': self.circular_followees.get(index, []),
+            }
+        return exported
+
+    def _resolve_cycle(self, component):
+        """
+        Resolve a delegation cycle level by level.
+
+        Members of the cycle start out blocked. Each level evaluates the pending
+        members that could gain a source, using only followees resolved at an
+        earlier level; members that obtain a ballot become usable for the next
+        level. Members still blocked at the end have no ballot.
+
+        Args:
+            component (list): Dense ids forming one strongly connected component
+        """
+        voter_ids = self.graph.voter_ids
+        # Sort by external id so the outcome does not depend on dense id assignment
+        members = sorted(component, key=voter_ids.__getitem__)
+        blocked = set(members)
+        followers_in_cycle = {index: [] for index in members}
+        for index in members:
+            for followee in self._followees(index):
+                if followee in blocked:
+                    followers_in_cycle[followee].append(index)
+
+        pending = set(members)
+        candidates = members
+        while candidates:
+            level_blocked = frozenset(blocked)
+            for index in candidates:
+                self._evaluate(index, level_blocked)
+            resolved = [index for index in candidates if self.kind[index] == CALCULATED]
+
+            next_candidates = set()
+            for index in resolved:
+                pending.discard(index)
+                blocked.discard(index)
+            for index in resolved:
+                next_candidates.update(f for f in followers_in_cycle[index] if f in pending)
+            candidates = sorted(next_candidates, key=voter_ids.__getitem__)
+
+        for index in sorted(pending, key=voter_ids.__getitem__):
+            for followee in self._followees(index):
+                if followee in blocked:
+                    self.circular_prevented.append((voter_ids[index], voter_ids[followee]))
+                    self.circular_followees.setdefault(index, []).append(voter_ids[followee])
+            if not self.evaluated_edges[index]:
+                self.reason[index] = CIRCULAR
+
+    def _evaluate(self, index, blocked):
+        """
+        Calculate one member's ballot from already-resolved followees.
+
+        The outcome is written into the engine's per-member arrays.
+
+        Args:
+            index (int): Dense id of the voter to evaluate
+            blocked (frozenset): Followees that are not resolved yet (cycle members)
+        """
+        graph = self.graph
+
+        # Manual ballot wins
+        if self.is_manual[index]:
+            ballot_data = self.manual_ballots[graph.voter_ids[index]]
+            self.kind[index] = MANUAL
+            parse = self.arithmetic.parse
+            self.ballots[index] = {
+                choice_id: parse(stars) for choice_id, stars in ballot_data['votes'].items()
+            }
+            self.tag_masks[index] = graph.tags.mask(ballot_data['tags'])
+            return
+
+        start, end = graph.offsets[index], graph.offsets[index + 1]
+        if start == end:
+            self.kind[index] = NO_BALLOT
+            self.reason[index] = NOT_FOLLOWING
+            return
+
+        inherited_from = []
+        inherited_mask = 0
+        evaluated = []
+        depth = 0
+        kind = self.kind
+
+        for edge in range(start, end):
+            followee = graph.targets[edge]
+            if followee in blocked or kind[followee] not in (MANUAL, CALCULATED):
+                continue
+
+            # Tag matching (follow mask 0 = following on ALL tags)
+            follow_mask = graph.tag_masks[edge]
+            followee_mask = self.tag_masks[followee]
+            matching_mask = followee_mask if not follow_mask else follow_mask & followee_mask
+            should_inherit = not follow_mask or bool(matching_mask)
+
+            evaluated.append(edge)
+            self.edge_active[edge] = should_inherit
+            self.edge_match[edge] = matching_mask
+
+            if should_inherit:
+                inherited_from.append(followee)
+                inherited_mask |= matching_mask
+                depth = max(depth, self.depth[followee] + 1)
+
+        self.evaluated_edges[index] = tuple(evaluated)
+        if not inherited_from:
+            self.kind[index] = NO_BALLOT
+            self.reason[index] = NO_TAG_MATCH
+            return
+
+        self.kind[index] = CALCULATED
+        self.reason[index] = NO_REASON
+        self.tag_masks[index] = inherited_mask
+        self.depth[index] = depth
+        if self.vectorized:
+            # Averaged for all members at once after the structural pass
+            self._pending_sources[index] = inherited_from
+            return
+
+        # Average all inherited ballots (simple averaging, not STAR voting)
+        ballots_to_average = [self.ballots[followee] for followee in inherited_from]
+        all_choice_ids = set()
+        for ballot in ballots_to_average:
+            all_choice_ids.update(ballot.keys())
+
+        # Missing choices count as 0 stars
+        average = self.arithmetic.average
+        count = len(ballots_to_average)
+        calculated_ballot = {}
+        for choice_id in all_choice_ids:
+            calculated_ballot[choice_id] = average(
+                (ballot[choice_id] for ballot in ballots_to_average if choice_id in ballot), count
+            )
+        self.ballots[index] = calculated_ballot
+
+    def _decimal_ballot(self, index):
+        """A member's ballot with Decimal star values."""
+        ballot = self.ballots[index]
+        if ballot is None or isinstance(self.arithmetic, DecimalStars):
+            return ballot
+        to_decimal = self.arithmetic.to_decimal
+        return {choice_id: to_decimal(stars) for choice_id, stars in ballot.items()}
+
+    @staticmethod
+    def _manual_tags(ballot_data):
+        """Tags exactly as the voter entered them on a manual ballot."""
+        return ballot_data['tags'].split(',') if ballot_data['tags'] else []
+
+    def _output_tags(self, index):
+        """Tags reported for a resolved member (manual tags keep their entered order)."""
+        if self.kind[index] == MANUAL:
+            return self._manual_tags(self.manual_ballots[self.graph.voter_ids[index]])
+        if self.kind[index] == CALCULATED:
+            return self.graph.tags.tags(self.tag_masks[index])
+        return []
+
+    def _is_anonymous(self, index):
+        """Anonymity flag recorded on the member's existing ballot."""
+        existing = self.snapshot_data['existing_ballots'].get(self.graph.voter_ids[index], {})
+        return existing.get('is_anonymous', False)
+
+    def resolution(self, index):
+        """
+        Build the resolution dict for one member from the engine's arrays.
+
+        Args:
+            index (int): Dense id of a resolved member
+
+        Returns:
+            dict: Resolution with 'type', 'ballot', 'tags', 'is_anonymous',
+                  'sources', 'edges', 'reason' and 'delegation_depth'
+        """
+        graph = self.graph
+        kind = self.kind[index]
+        edges = []
+        sources = []
+        for edge in self.evaluated_edges[index]:
+            followee = graph.targets[edge]
+            followee_id = graph.voter_ids[followee]
+            follow_mask = graph.tag_masks[edge]
+            active = bool(self.edge_active[edge])
+            edges.append({
+                'followee_id': followee_id,
+                'tags': graph.tags.tags(follow_mask),
+                'order': graph.orders[edge],
+                'active_for_decision': active,
+            })
+            if active and kind == CALCULATED:
+                sources.append({
+                    'followee_id': followee_id,
+                    'tags': self._output_tags(followee) if not follow_mask else graph.tags.tags(self.edge_match[edge]),
+                    'order': graph.orders[edge],
+                    'is_anonymous': self._is_anonymous(followee),
+                })
+
+        if kind == MANUAL:
+            return {
+                'type': 'manual',
+                'ballot': self._decimal_ballot(index),
+                'tags': self._output_tags(index),
+                'is_anonymous': self._is_anonymous(index),
+                'sources': [],
+                'edges': [],
+                'reason': None,
+                'delegation_depth': 0,
+            }
+
+        return {
+            'type': KIND_NAMES[kind],
+            'ballot': self._decimal_ballot(index) if kind == CALCULATED else None,
+            'tags': self._output_tags(index),
+            'is_anonymous': self._is_anonymous(index),
+            'sources': sources,
+            'edges': edges,
+            'reason': REASONS[self.reason[index]],
+            'delegation_depth': self.depth[index] if kind == CALCULATED else 0,
+        }
@@ -0,0 +1,213 @@
+"""
+Compact, integer-indexed follow graph for delegation processing.
+
+Snapshots key everything by 36-character UUID strings (`followings[voter_id]`
+lists of small dicts). Processing a large community from that shape hashes a
+UUID string on every lookup and keeps one dict per following alive. This module
+compiles the followings once into a CSR (compressed sparse row) structure:
+
+- members are mapped to dense integer ids (0..n-1)
+- `offsets[i]:offsets[i + 1]` is the slice of edges followed by member i
+- `targets`, `orders` and `tag_masks` are parallel per-edge arrays
+
+Tags are interned to bit positions by a per-graph TagInterner, so tag sets
+become integer bitmasks (0 means "follow on all tags"). With more than 64
+distinct tags the masks no longer fit an unsigned 64-bit array, so `tag_masks`
+falls back to a plain list of Python ints.
+"""
+
+from array import array
+
+from .tag_interner import TagInterner
+
+
+def snapshot_members(snapshot_data):
+    """
+    Every community member captured in a snapshot, as strings.
+
+    Voting members come first (in snapshot order), then non-voting members
+    (e.g. lobbyists). Snapshots captured before non-voting members were
+    recorded only list voting members.
+
+    Args:
+        snapshot_data (dict): Frozen system state from CreateCalculationSnapshot
+
+    Returns:
+        list: Member ids
+    """
+    return [
+        str(member_id)
+        for member_id in [*snapshot_data['community_memberships'], *snapshot_data.get('non_voting_memberships', ())]
+    ]
+
+
+class FollowGraph:
+    """
+    CSR follow graph with dense integer member ids.
+
+    Attributes:
+        voter_ids (list): Dense id -> external id (UUID string)
+        index_of (dict): External id -> dense id
+        offsets (array): Edge slice boundaries per member, length n + 1
+        targets (array): Followee dense id per edge
+        orders (array): Following priority order per edge
+        tag_masks (array or list): Following tag bitmask per edge (0 = all tags)
+        tags (TagInterner): Tag <-> bit position mapping shared by all masks
+
+    Example:
+        >>> graph = FollowGraph.from_snapshot(snapshot.snapshot_data)
+        >>> for edge in graph.edge_range(graph.index_of[voter_id]):
+        ...     followee_id = graph.voter_ids[graph.targets[edge]]
+    """
+
+    def __init__(self):
+        """Create an empty graph; use the from_* constructors to populate it."""
+        self.voter_ids = []
+        self.index_of = {}
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        self.orders = array('i')
+        self.tag_masks = array('Q')
+        self.tags = TagInterner()
+        self._reverse = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot_data):
+        """
+        Compile a snapshot's memberships and followings.
+
+        Community members get the first dense ids (voting members first, see
+        snapshot_members), then every followee that is not a captured member.
+
+        Args:
+            snapshot_data (dict): Frozen system state from CreateCalculationSnapshot
+
+        Returns:
+            FollowGraph: Compiled graph
+        """
+        return cls.from_adjacency(snapshot_members(snapshot_data), snapshot_data['followings'])
+
+    @classmethod
+    def from_adjacency(cls, members, followings):
+        """
+        Compile follower -> followings adjacency into CSR form.
+
+        Args:
+            members (list): External ids that must receive dense ids first
+            followings (dict): follower id -> list of {'followee_id', 'tags', 'order'}
+
+        Returns:
+            FollowGraph: Compiled graph
+        """
+        graph = cls()
+        for voter_id in members:
+            graph._add_node(voter_id)
+        for follower_id, follower_followings in followings.items():
+            graph._add_node(follower_id)
+            for following in follower_followings:
+                graph._add_node(following['followee_id'])
+
+        edges_by_node = [None] * len(graph.voter_ids)
+        for follower_id, follower_followings in followings.items():
+            edges_by_node[graph.index_of[follower_id]] = follower_followings
+
+        masks = []
+        for node_followings in edges_by_node:
+            for following in node_followings or ():
+                graph.targets.append(graph.index_of[following['followee_id']])
+                graph.orders.append(following['order'])
+                masks.append(graph.tags.mask(following['tags']))
+            graph.offsets.append(len(graph.targets))
+
+        graph.tag_masks = graph.tags.mask_array(masks)
+        return graph
+
+    def _add_node(self, voter_id):
+        """Assign a dense id to an external id (idempotent)."""
+        index = self.index_of.get(voter_id)
+        if index is None:
+            index = len(self.voter_ids)
+            self.index_of[voter_id] = index
+            self.voter_ids.append(voter_id)
+        return index
+
+    def __len__(self):
+        """Number of members in the graph."""
+        return len(self.voter_ids)
+
+    @property
+    def edge_count(self):
+        """Number of following edges in the graph."""
+        return len(self.targets)
+
+    def edge_range(self, index):
+        """Edge indexes followed by the member with dense id `index`."""
+        return range(self.offsets[index], self.offsets[index + 1])
+
+    def followees(self, index):
+        """Dense ids followed by the member with dense id `index`, in priority order."""
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def reverse(self):
+        """
+        Build (and cache) the reverse CSR structure: followee -> followers.
+
+        Returns:
+            tuple: (offsets, sources) arrays where sources[offsets[i]:offsets[i + 1]]
+                   are the dense ids of members following member i
+        """
+        if self._reverse is None:
+            counts = [0] * (len(self.voter_ids) + 1)
+            for target in self.targets:
+                counts[target + 1] += 1
+            for index in range(len(self.voter_ids)):
+                counts[index + 1] += counts[index]
+            reverse_offsets = array('i', counts)
+            sources = array('i', [0]) * len(self.targets)
+            cursor = list(counts[:-1])
+            for follower in range(len(self.voter_ids)):
+                for edge in self.edge_range(follower):
+                    target = self.targets[edge]
+                    sources[cursor[target]] = follower
+                    cursor[target] += 1
+            self._reverse = (reverse_offsets, sources)
+        return self._reverse
+
+    def followers(self, index):
+        """Dense ids of members following the member with dense id `index`."""
+        reverse_offsets, sources = self.reverse()
+        return sources[reverse_offsets[index]:reverse_offsets[index + 1]]
+
+    def reverse_closure(self, indexes):
+        """
+        Collect members that reach any of `indexes` through follow chains.
+
+        Args:
+            indexes (iterable): Dense ids to start from
+
+        Returns:
+            set: The starting ids plus all their direct and transitive followers
+        """
+        reverse_offsets, sources = self.reverse()
+        seen = set(indexes)
+        stack = list(seen)
+        while stack:
+            current = stack.pop()
+            for position in range(reverse_offsets[current], reverse_offsets[current + 1]):
+                follower = sources[position]
+                if follower not in seen:
+                    seen.add(follower)
+                    stack.append(follower)
+        return seen
+
+    def reverse_reachable_count(self, index):
+        """
+        Count members that reach `index` through follow chains (excluding itself).
+
+        Args:
+            index (int): Dense id of the member being influenced
+
+        Returns:
+            int: Number of direct and transitive followers
+        """
+        return len(self.reverse_closure((index,))) - 1
@@ -0,0 +1,161 @@
+"""
+Management command to benchmark the STAR tally on synthetic elections.
+
+Times STARVotingTally.run() per phase (setup, scores, top two, runoff,
+tiebreakers) on random elections and on engineered tie scenarios that force
+every step of the Official Tiebreaker Protocol, and records throughput and
+peak memory as JSON (see democracy/star_benchmark.py).
+
+Usage:
+    # Default sizes (1,000 and 10,000 ballots, 5 choices), JSON to stdout:
+    python manage.py benchmark_star_tally
+
+    # Save results to compare across commits:
+    python manage.py benchmark_star_tally --output benchmarks/star.json
+
+    # Larger elections, one distribution, NumPy backend, tracing off:
+    python manage.py benchmark_star_tally --ballots 100000 --choices 12 \\
+        --distribution fractional --vectorized --trace-level off
+
+    # Random elections only, more repetitions:
+    python manage.py benchmark_star_tally --no-ties --repeat 20
+"""
+
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from democracy.star_arithmetic import BACKENDS, get_star_arithmetic
+from democracy.star_benchmark import DISTRIBUTIONS, run_benchmarks
+from democracy.trace import LEVELS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark STARVotingTally phases on synthetic elections and record JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ballots',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='Ballot counts to benchmark (default: 1000 10000)',
+        )
+        parser.add_argument(
+            '--choices',
+            type=int,
+            default=5,
+            help='Choices per random election (default: 5)',
+        )
+        parser.add_argument(
+            '--distribution',
+            choices=DISTRIBUTIONS,
+            action='append',
+            help='Score distribution for random elections (repeatable; default: all)',
+        )
+        parser.add_argument(
+            '--coverage',
+            type=float,
+            default=1.0,
+            help='Probability that a random ballot lists each choice (default: 1.0)',
+        )
+        parser.add_argument(
+            '--no-ties',
+            action='store_true',
+            help='Skip the engineered tie scenarios',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per election; medians are reported (default: 5)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for generated elections (default: 0)',
+        )
+        parser.add_argument(
+            '--arithmetic',
+            choices=sorted(BACKENDS),
+            default='decimal',
+            help='Star arithmetic backend (default: decimal)',
+        )
+        parser.add_argument(
+            '--vectorized',
+            action='store_true',
+            help='Tally on the NumPy ballot matrix',
+        )
+        parser.add_argument(
+            '--trace-level',
+            choices=sorted(LEVELS),
+            default='full',
+            help='Tally log detail (default: full)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write JSON results to this file instead of stdout',
+        )
+
+    def handle(self, *args, **options):
+        if min(options['ballots']) < 1 or options['choices'] < 1:
+            raise CommandError('--ballots and --choices must be positive')
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': self.git_commit(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__ if numpy is not None else None,
+            'options': {
+                name: options[name]
+                for name in ('choices', 'coverage', 'repeat', 'seed', 'arithmetic', 'vectorized', 'trace_level')
+            },
+            'results': run_benchmarks(
+                options['ballots'],
+                choices=options['choices'],
+                distributions=options['distribution'] or DISTRIBUTIONS,
+                ties=not options['no_ties'],
+                repeat=options['repeat'],
+                seed=options['seed'],
+                coverage=options['coverage'],
+                arithmetic=get_star_arithmetic(options['arithmetic']),
+                vectorized=options['vectorized'],
+                trace_level=options['trace_level'],
+            ),
+        }
+        output = json.dumps(report, indent=2, default=str)
+
+        if not options['output']:
+            self.stdout.write(output)
+            return
+
+        Path(options['output']).write_text(output + '\n')
+        for result in report['results']:
+            seconds = result['seconds']
+            self.stdout.write(
+                f"{result['name']:28s} {seconds['total'] * 1000:10.2f} ms"
+                f"  {result['ballots_per_second'] or 0:12,.0f} ballots/s"
+                f"  {result['peak_memory_bytes'] / 1024:10,.0f} KiB  {result['outcome']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ Wrote {len(report['results'])} results to {options['output']}"))
+
+    def git_commit(self):
+        """Current git commit of the checkout, or None outside a git repository."""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -218,8 +218,8 @@ class Command(BaseCommand):
             snapshot_service = CreateCalculationSnapshot(decision.id)
             snapshot = snapshot_service.process()
             
-            # Step 3: Process snapshot (builds delegation tree)
-            snapshot_stage_service = SnapshotBasedStageBallots(snapshot.id)
+            # Step 3: Process snapshot (builds delegation tree, persists calculated ballots)
+            snapshot_stage_service = SnapshotBasedStageBallots(snapshot.id, persist_ballots=True)
             snapshot_stage_service.process()
             
             # Step 4: Tally snapshot (STAR voting) - BEFORE signals reconnect
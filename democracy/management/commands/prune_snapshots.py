@@ -0,0 +1,140 @@
+"""
+Management command to apply the snapshot retention policy.
+
+Every recalculation stores a new DecisionSnapshot, so on a long-running
+deployment the table (and its indexes) grows without bound. This command
+keeps, per decision:
+1. The final snapshot and any snapshot still being calculated
+2. The latest snapshot and the last N completed snapshots
+3. One completed snapshot per hour for a window of history
+4. Failed snapshots for a bounded number of days
+
+and deletes the rest (or, with --compact, drops their captured inputs,
+ballots and delegation tree while keeping the rows and their results).
+Deletes run in small batches, each in its own short transaction.
+
+Defaults come from the SNAPSHOT_RETENTION_* settings.
+
+Usage:
+    # Show what would be pruned (no changes):
+    python manage.py prune_snapshots --dry-run
+
+    # Prune all decisions:
+    python manage.py prune_snapshots
+
+    # One decision, custom policy:
+    python manage.py prune_snapshots --decision <uuid> --keep-last 5 --hourly-hours 48 --failed-days 3
+
+    # Keep the rows but compact their data:
+    python manage.py prune_snapshots --compact
+
+Example output:
+    🧹 Pruning snapshots (keep last 10, hourly for 168 hours, failed for 7 days)...
+
+    Decisions: 3
+    Snapshots examined: 412
+    Kept: 61
+    Deleted: 351
+    Reclaimed: 18.4 MB
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from democracy.models import Decision
+from democracy.services import PruneSnapshots
+from democracy.snapshot_retention import RetentionPolicy
+
+
+class Command(BaseCommand):
+    help = 'Delete or compact decision snapshots outside the retention policy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be pruned without changing anything',
+        )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Compact pruned snapshots to their results instead of deleting them',
+        )
+        parser.add_argument(
+            '--decision',
+            type=str,
+            help='Prune only this decision (UUID)',
+        )
+        parser.add_argument(
+            '--keep-last',
+            type=int,
+            help='Completed snapshots always kept per decision (default: SNAPSHOT_RETENTION_KEEP_LAST)',
+        )
+        parser.add_argument(
+            '--hourly-hours',
+            type=int,
+            help='Hours of history keeping one snapshot per hour, 0 to disable (default: SNAPSHOT_RETENTION_HOURLY_HOURS)',
+        )
+        parser.add_argument(
+            '--failed-days',
+            type=int,
+            help='Days failed snapshots are kept (default: SNAPSHOT_RETENTION_FAILED_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Snapshots deleted per transaction (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        decision_id = options['decision']
+        if decision_id and not Decision.objects.filter(id=decision_id).exists():
+            raise CommandError(f'Decision {decision_id} not found')
+
+        policy = RetentionPolicy.from_settings(
+            keep_last=options['keep_last'],
+            hourly_hours=options['hourly_hours'],
+            failed_days=options['failed_days'],
+        )
+        action = 'Compacting' if options['compact'] else 'Pruning'
+
+        self.stdout.write('')
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN - no changes will be made'))
+        self.stdout.write(
+            f'🧹 {action} snapshots (keep last {policy.keep_last}, '
+            f'hourly for {policy.hourly_hours} hours, failed for {policy.failed_days} days)...'
+        )
+        self.stdout.write('')
+
+        stats = PruneSnapshots(
+            decision_id=decision_id,
+            policy=policy,
+            compact=options['compact'],
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        ).process()
+
+        if options['dry_run']:
+            pruned_label = 'Would compact' if options['compact'] else 'Would delete'
+            verb = 'Would reclaim'
+        else:
+            pruned_label = 'Compacted' if options['compact'] else 'Deleted'
+            verb = 'Reclaimed'
+        pruned = stats['compacted'] if options['compact'] else stats['deleted']
+        self.stdout.write(f'Decisions: {stats["decisions"]}')
+        self.stdout.write(f'Snapshots examined: {stats["examined"]}')
+        self.stdout.write(f'Kept: {stats["kept"]}')
+        self.stdout.write(f'{pruned_label}: {pruned}')
+        if stats['skipped']:
+            self.stdout.write(self.style.WARNING(f'Skipped: {stats["skipped"]}'))
+        self.stdout.write(self.style.SUCCESS(f'{verb}: {self._format_bytes(stats["reclaimed_bytes"])}'))
+        self.stdout.write('')
+
+    def _format_bytes(self, size):
+        """Format a byte count in human-readable units."""
+        for unit in ('bytes', 'KB', 'MB'):
+            if abs(size) < 1024:
+                return f'{size} {unit}' if unit == 'bytes' else f'{size:.1f} {unit}'
+            size /= 1024
+        return f'{size:.1f} GB'
@@ -10,23 +10,25 @@ change memberships. This command is for:
 
 This management command executes the two-phase democratic process:
 
-STAGE PHASE:
-1. Collect manually-cast ballots from direct voters
+STAGE PHASE (same single-pass pipeline as the background recalculation):
+1. Capture a snapshot of memberships, followings and manually-cast ballots
 2. Calculate inherited ballots through delegation (tag-based following)
-3. Prepare the complete ballot set for tallying
+3. Persist calculated ballots and prepare the complete ballot set for tallying
 
-TALLY PHASE:
+TALLY PHASE (from the snapshot):
 1. Score all ballots (the 'S' in STAR voting)
 2. Run automatic runoff between top 2 choices (the 'AR' in STAR voting)
 3. Determine the winner with complete transparency
 
 Run with: python manage.py stage_snapshot_and_tally_ballots
+Full tally detail (per-tag and per-choice lines): add --trace-level full
 """
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from democracy.services import StageBallots, Tally
+from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots, Tally
+from democracy.trace import LEVELS
 from democracy.models import Decision, Community
 
 
@@ -44,6 +46,11 @@ class Command(BaseCommand):
             type=str,
             help='Focus on specific decision title (partial match)'
         )
+        parser.add_argument(
+            '--trace-level',
+            choices=sorted(LEVELS),
+            help='Tally log detail (default: TALLY_TRACE_LEVEL setting)'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -107,10 +114,10 @@ class Command(BaseCommand):
                 self.stdout.write(f'  {i}. {choice.title}')
             self.stdout.write('')
 
-            # Run ballot calculation (delegation)
+            # Run ballot calculation (delegation) from a snapshot, persisting calculated ballots
             self.stdout.write('🔄 RUNNING BALLOT CALCULATION (Tag-Based Delegation)...')
-            stage_service = StageBallots()
-            stage_service.execute({})
+            snapshot = CreateCalculationSnapshot(decision.id).process()
+            SnapshotBasedStageBallots(snapshot.id, persist_ballots=True).process()
             
             if options['show_delegation']:
                 self.show_delegation_sample(decision)
@@ -120,8 +127,8 @@ class Command(BaseCommand):
             # Run STAR voting tally
             self.stdout.write('')
             self.stdout.write('🎯 RUNNING STAR VOTING TALLY...')
-            tally_service = Tally()
-            tally_service.execute({})
+            tally_service = Tally(snapshot_id=snapshot.id, trace_level=options['trace_level'])
+            tally_service.process()
             
             self.show_star_results(decision)
 
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-16 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('democracy', '0004_add_winner_and_tally_log_to_snapshot'),
+    ]
+
+    operations = [
+        # snapshot_data becomes a property over data_blob; existing JSON stays
+        # in the snapshot_data column as legacy_data (no database change)
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='decisionsnapshot',
+                    old_name='snapshot_data',
+                    new_name='legacy_data',
+                ),
+                migrations.AlterField(
+                    model_name='decisionsnapshot',
+                    name='legacy_data',
+                    field=models.JSONField(blank=True, db_column='snapshot_data', default=dict, help_text='Snapshot data in the original JSON format (snapshots saved before the binary container)'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='decisionsnapshot',
+            name='data_blob',
+            field=models.BinaryField(blank=True, editable=False, help_text='Complete system state and calculation results as a compressed section container', null=True),
+        ),
+        migrations.AlterField(
+            model_name='decisionsnapshot',
+            name='calculation_status',
+            field=models.CharField(choices=[('creating', 'Creating Snapshot'), ('ready', 'Ready for Calculation'), ('staging', 'Stage Ballots in Progress'), ('tallying', 'Tally in Progress'), ('completed', 'Calculation Completed'), ('failed_snapshot', 'Snapshot Creation Failed'), ('failed_staging', 'Stage Ballots Failed'), ('failed_tallying', 'Tally Failed'), ('failed_timeout', 'Calculation Timed Out'), ('corrupted', 'Snapshot Corrupted')], default='ready', help_text='Current status of the calculation process', max_length=20),
+        ),
+    ]
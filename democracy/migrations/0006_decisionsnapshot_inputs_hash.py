@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('democracy', '0005_snapshot_data_container'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='decisionsnapshot',
+            name='inputs_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the captured calculation inputs (memberships, followings, manual ballots, choices)', max_length=64),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-16 20:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('democracy', '0006_decisionsnapshot_inputs_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='decisionsnapshot',
+            name='delta_depth',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of deltas between this snapshot and its keyframe (0 = keyframe)'),
+        ),
+        migrations.AddField(
+            model_name='decisionsnapshot',
+            name='parent',
+            field=models.ForeignKey(blank=True, editable=False, help_text="Snapshot this snapshot's data is stored as a delta of (empty for keyframes)", null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='deltas', to='democracy.decisionsnapshot'),
+        ),
+    ]
@@ -14,6 +14,8 @@ Key concepts:
 """
 
 import uuid
+from functools import cached_property
+
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
@@ -21,6 +23,8 @@ from django.utils import timezone
 from taggit.managers import TaggableManager
 
 from crowdvote.models import BaseModel
+from .choice_index import ChoiceIndex
+from .snapshot_store import SnapshotData
 
 User = get_user_model()
 
@@ -394,6 +398,11 @@ class Decision(BaseModel):
         """Return the number of choices for this decision."""
         return self.choices.count()
     
+    @cached_property
+    def choice_index(self):
+        """ChoiceIndex of this decision's choices, loaded once per instance (one query)."""
+        return ChoiceIndex.for_decision(self)
+    
     def get_participation_stats(self):
         """Return participation statistics for this decision.
         
@@ -1016,7 +1025,15 @@ class DecisionSnapshot(BaseModel):
     Attributes:
         decision (ForeignKey): The decision this snapshot represents
         created_at (DateTimeField): When this snapshot was calculated
-        snapshot_data (JSONField): Complete system state and calculation results
+        snapshot_data (SnapshotData): Complete system state and calculation results,
+            stored in data_blob and decoded one section at a time
+        data_blob (BinaryField): Compressed snapshot container (see snapshot_store.py)
+        legacy_data (JSONField): snapshot_data of snapshots saved before the
+            binary container (read-only; converted on their next data change)
+        inputs_hash (CharField): Content hash of the captured calculation inputs
+        parent (ForeignKey): Snapshot a delta's data_blob is encoded against
+            (None for keyframes, which store full data)
+        delta_depth (PositiveIntegerField): Deltas between this snapshot and its keyframe
         calculation_duration (DurationField): How long the calculation took
         total_eligible_voters (IntegerField): Number of voting community members
         total_votes_cast (IntegerField): Number of direct votes submitted
@@ -1068,10 +1085,40 @@ class DecisionSnapshot(BaseModel):
         help_text="When this snapshot was calculated"
     )
     
-    snapshot_data = models.JSONField(
+    legacy_data = models.JSONField(
         default=dict,
         blank=True,
-        help_text="Complete system state and calculation results at snapshot time"
+        db_column='snapshot_data',
+        help_text="Snapshot data in the original JSON format (snapshots saved before the binary container)"
+    )
+    
+    data_blob = models.BinaryField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Complete system state and calculation results as a compressed section container"
+    )
+    
+    inputs_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="SHA-256 of the captured calculation inputs (memberships, followings, manual ballots, choices)"
+    )
+    
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='deltas',
+        help_text="Snapshot this snapshot's data is stored as a delta of (empty for keyframes)"
+    )
+    
+    delta_depth = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of deltas between this snapshot and its keyframe (0 = keyframe)"
     )
     
     calculation_duration = models.DurationField(
@@ -1197,9 +1244,62 @@ class DecisionSnapshot(BaseModel):
         # If this is being marked as final, ensure decision is actually closed
         if self.is_final and self.decision.is_open:
             raise ValidationError("Cannot create final snapshot for open decision")
+        
+        # Recompress changed snapshot_data sections (legacy JSON is converted on its first change)
+        data = self.__dict__.get('_snapshot_data')
+        if data is not None and data.changed:
+            if self.pk is not None:
+                # Deltas are encoded against this snapshot's stored data
+                for delta in DecisionSnapshot.objects.filter(parent_id=self.pk):
+                    delta.make_keyframe()
+            self.data_blob = data.encode(parent=self.parent.snapshot_data if self.parent_id else None)
+            self.legacy_data = {}
             
         super().save(*args, **kwargs)
     
+    def refresh_from_db(self, *args, **kwargs):
+        """Reload from the database, dropping decoded snapshot_data."""
+        self.__dict__.pop('_snapshot_data', None)
+        super().refresh_from_db(*args, **kwargs)
+    
+    def make_keyframe(self):
+        """
+        Store this snapshot's data in full, detaching it from its parent.
+        
+        Deltas of this snapshot stay valid: its materialized data is unchanged.
+        Used before a parent's data changes or the parent is deleted.
+        """
+        if self.parent_id is None:
+            return
+        data = self.snapshot_data
+        blob = data.encode()
+        DecisionSnapshot.objects.filter(pk=self.pk).update(data_blob=blob, legacy_data={}, parent=None, delta_depth=0)
+        self.data_blob = blob
+        self.legacy_data = {}
+        self.parent = None
+        self.delta_depth = 0
+    
+    @property
+    def snapshot_data(self):
+        """
+        Snapshot data as a lazy mapping (see democracy/snapshot_store.py).
+        
+        Reading a key decodes only the section it is stored in; a delta's
+        sections are materialized from its parent's. Snapshots saved before
+        the binary container are read from legacy_data.
+        """
+        if '_snapshot_data' not in self.__dict__:
+            if self.data_blob:
+                parent = (lambda: self.parent.snapshot_data) if self.parent_id else None
+                self._snapshot_data = SnapshotData.from_container(self.data_blob, parent=parent)
+            else:
+                self._snapshot_data = SnapshotData.from_json(self.legacy_data or {})
+        return self._snapshot_data
+    
+    @snapshot_data.setter
+    def snapshot_data(self, value):
+        self._snapshot_data = SnapshotData(value)
+    
     @classmethod
     def mark_stuck_snapshots_as_failed(cls, timeout_minutes=10):
         """
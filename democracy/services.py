@@ -1,30 +1,63 @@
 from collections import defaultdict
 from decimal import Decimal, getcontext
 import logging
+import uuid
 
+from django.conf import settings
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, RestrictedError, Sum
 from service_objects.services import Service
 
-from .models import Ballot, Community, Decision, DecisionSnapshot, Following
+from .models import Ballot, Choice, Community, Decision, DecisionSnapshot, Following, Membership, Result, Vote
 from crowdvote.utilities import get_object_or_None
 from .utils import generate_username_hash
 from .star_voting import STARVotingTally
+from .star_incremental import IncrementalSTARTally
+from .snapshot_ballots import decode_ballots, encode_ballots
+from .snapshot_retention import RetentionPolicy, compact_snapshot, stored_bytes
+from .star_arithmetic import get_star_arithmetic, star_context
 from .exceptions import UnresolvedTieError
+from .delegation import DelegationEngine, changed_voters, inputs_hash
+from .tag_interner import TagInterner
+from .tree_builder import DelegationTreeBuilder
+from .trace import FULL, Trace
 
 # Set Decimal precision for calculations (Plan #8)
 getcontext().prec = 12
 
 
+def tally_ballot(node):
+    """
+    A delegation tree node's ballot as counted by the STAR tally.
+
+    Args:
+        node (dict or None): Node from snapshot_data['delegation_tree']['nodes']
+
+    Returns:
+        dict or None: str(choice_id) -> Decimal stars, or None if the node has no
+            manual or calculated votes
+    """
+    if node is None or node.get('vote_type') not in ('manual', 'calculated') or not node.get('votes'):
+        return None
+    return {
+        str(choice_id): Decimal(str(vote_data.get('stars', 0)))
+        for choice_id, vote_data in node['votes'].items()
+    }
+
+
 class StageBallots(Service):
     def __init__(self, *args, **kwargs):
         """Initialize the service with delegation tree tracking."""
         super().__init__(*args, **kwargs)
-        self.delegation_tree_data = {
-            'nodes': [],
-            'edges': [],
-            'inheritance_chains': []
-        }
+        self.tree = DelegationTreeBuilder()
+        self.tag_interner = TagInterner()
+
+    @property
+    def delegation_tree_data(self):
+        """Delegation tree data ({'nodes', 'edges', 'inheritance_chains'}) for visualization."""
+        return self.tree.data
 
     def get_or_calculate_ballot(self, decision, voter, follow_path=None, delegation_depth=0):
         """
@@ -41,19 +74,15 @@ class StageBallots(Service):
         if follow_path is None:
             follow_path = []
             
-        # Initialize logging attributes if they don't exist
+        # Initialize trace attributes if they don't exist
         if not hasattr(decision, 'ballot_tree_log_indent'):
             decision.ballot_tree_log_indent = 0
         if not hasattr(decision, 'ballot_tree_log'):
-            decision.ballot_tree_log = []
+            decision.ballot_tree_log = Trace(settings.TALLY_TRACE_LEVEL)
+        trace = decision.ballot_tree_log
             
         decision.ballot_tree_log_indent += 1
-        decision.ballot_tree_log.append(
-            {
-                "indent": decision.ballot_tree_log_indent,
-                "log": f"Getting or Creating ballot for voter {voter}",
-            }
-        )
+        trace.full("Getting or Creating ballot for voter {}", voter, indent=decision.ballot_tree_log_indent)
 
         # this is the recursive function
         ballot, created = Ballot.objects.get_or_create(
@@ -83,21 +112,15 @@ class StageBallots(Service):
         }
         
         # Add or update node in delegation tree data
-        existing_node = next((n for n in self.delegation_tree_data['nodes'] if n['voter_id'] == str(voter.id)), None)
-        if existing_node:
-            existing_node.update(node_data)
-        else:
-            self.delegation_tree_data['nodes'].append(node_data)
+        self.tree.set_node(node_data)
 
         # If ballot had to be created or was already calculated, continue calculating
         # b/c If they manually cast their own ballot, calculated will be set to False
         if created or ballot.is_calculated:
 
-            decision.ballot_tree_log.append(
-                {
-                    "indent": decision.ballot_tree_log_indent + 1,
-                    "log": f"Ballot {'Created' if created else 'Retrieved and already set to calculated'} for {ballot.voter}",
-                }
+            trace.full(
+                "Ballot {} for {}", 'Created' if created else 'Retrieved and already set to calculated',
+                ballot.voter, indent=decision.ballot_tree_log_indent + 1,
             )
 
             # Get voter's membership in this community to access following relationships (Plan #6)
@@ -105,19 +128,14 @@ class StageBallots(Service):
                 voter_membership = voter.memberships.get(community=decision.community)
             except:
                 # If no membership, can't calculate ballot
-                decision.ballot_tree_log.append({
-                    "indent": decision.ballot_tree_log_indent + 1,
-                    "log": f"{voter} has no membership in {decision.community.name}",
-                })
+                trace.full(
+                    "{} has no membership in {}", voter, decision.community.name,
+                    indent=decision.ballot_tree_log_indent + 1,
+                )
                 return ballot
             
             if not voter_membership.following.exists():
-                decision.ballot_tree_log.append(
-                    {
-                        "indent": decision.ballot_tree_log_indent + 1,
-                        "log": f"{ballot.voter} is not following anyone.",
-                    }
-                )
+                trace.full("{} is not following anyone.", ballot.voter, indent=decision.ballot_tree_log_indent + 1)
 
             ballots_to_compete = []
 
@@ -137,11 +155,9 @@ class StageBallots(Service):
                 if followee_user not in follow_path:
                     follow_path.append(ballot.voter)
 
-                    decision.ballot_tree_log.append(
-                        {
-                            "indent": decision.ballot_tree_log_indent + 1,
-                            "log": f"{ballot.voter} is following {followee_user} (order: {following.order})",
-                        }
+                    trace.full(
+                        "{} is following {} (order: {})", ballot.voter, followee_user, following.order,
+                        indent=decision.ballot_tree_log_indent + 1,
                     )
 
                     # Capture edge data for delegation tree
@@ -154,10 +170,9 @@ class StageBallots(Service):
                     }
                     
                     # Add edge if not already present
-                    existing_edge = next((e for e in self.delegation_tree_data['edges'] 
-                                        if e['follower'] == edge_data['follower'] and e['followee'] == edge_data['followee']), None)
+                    existing_edge = self.tree.edge(edge_data['follower'], edge_data['followee'])
                     if not existing_edge:
-                        self.delegation_tree_data['edges'].append(edge_data)
+                        self.tree.add_edge(edge_data)
 
                     # Get or calculate the followee's ballot first
                     followee_ballot = self.get_or_calculate_ballot(
@@ -171,11 +186,9 @@ class StageBallots(Service):
                     )
                     
                     if should_inherit:
-                        decision.ballot_tree_log.append(
-                            {
-                                "indent": decision.ballot_tree_log_indent + 2,
-                                "log": f"✓ Tag match found: {matching_tags} - inheriting from {followee_user}",
-                            }
+                        trace.full(
+                            "✓ Tag match found: {} - inheriting from {}", matching_tags, followee_user,
+                            indent=decision.ballot_tree_log_indent + 2,
                         )
                         
                         # Mark edge as active for this decision
@@ -190,11 +203,10 @@ class StageBallots(Service):
                             'inherited_tags': matching_tags
                         })
                     else:
-                        decision.ballot_tree_log.append(
-                            {
-                                "indent": decision.ballot_tree_log_indent + 2,
-                                "log": f"✗ No tag match - following {followee_user} on '{following.tags}' but ballot tagged '{followee_ballot.tags}'",
-                            }
+                        trace.full(
+                            "✗ No tag match - following {} on '{}' but ballot tagged '{}'",
+                            followee_user, following.tags, followee_ballot.tags,
+                            indent=decision.ballot_tree_log_indent + 2,
                         )
 
             # Now compete ballots to calculate this one
@@ -205,7 +217,7 @@ class StageBallots(Service):
             
             
             # Calculate votes with enhanced logging and tag inheritance
-            for choice in ballot.decision.choices.all():
+            for choice in decision.choice_index.objects.values():
                 stars_with_sources = []
                 calculation_path = []
 
@@ -262,10 +274,10 @@ class StageBallots(Service):
                         'final_stars': float(star_score),  # Convert Decimal to float for JSON serialization
                         'calculation_path': calculation_path
                     }
-                    self.delegation_tree_data['inheritance_chains'].append(inheritance_chain)
+                    self.tree.add('inheritance_chains', inheritance_chain)
                     
                     # Update node vote data
-                    current_node = next((n for n in self.delegation_tree_data['nodes'] if n['voter_id'] == str(voter.id)), None)
+                    current_node = self.tree.node(str(voter.id))
                     if current_node:
                         current_node['votes'][str(choice.id)] = {
                             'stars': float(star_score),  # Convert Decimal to float for JSON serialization
@@ -282,11 +294,10 @@ class StageBallots(Service):
                             ]
                         }
                     
-                    decision.ballot_tree_log.append(
-                        {
-                            "indent": decision.ballot_tree_log_indent + 1,
-                            "log": f"Creating vote for {ballot.voter} on {choice}: {star_score:.2f} stars (avg from {len(stars_with_sources)} sources)",
-                        }
+                    trace.full(
+                        "Creating vote for {} on {}: {:.2f} stars (avg from {} sources)",
+                        ballot.voter, choice, star_score, len(stars_with_sources),
+                        indent=decision.ballot_tree_log_indent + 1,
                     )
                     # Store fractional star score for accurate delegation averaging
                     ballot.votes.create(choice=choice, stars=star_score)
@@ -294,15 +305,13 @@ class StageBallots(Service):
             # Set inherited tags on the ballot
             if inherited_tags:
                 ballot.tags = ','.join(sorted(inherited_tags))
-                decision.ballot_tree_log.append(
-                    {
-                        "indent": decision.ballot_tree_log_indent + 1,
-                        "log": f"Inherited tags for {ballot.voter}: {ballot.tags}",
-                    }
+                trace.full(
+                    "Inherited tags for {}: {}", ballot.voter, ballot.tags,
+                    indent=decision.ballot_tree_log_indent + 1,
                 )
                 
                 # Update node with inherited tags
-                current_node = next((n for n in self.delegation_tree_data['nodes'] if n['voter_id'] == str(voter.id)), None)
+                current_node = self.tree.node(str(voter.id))
                 if current_node:
                     current_node['inherited_tags'] = list(inherited_tags)
                     current_node['tags'] = ballot.tags.split(',') if ballot.tags else []
@@ -311,21 +320,21 @@ class StageBallots(Service):
             ballot.save()
             
             # Update delegation tree node data after calculation is complete
-            existing_node = next((n for n in self.delegation_tree_data['nodes'] if n['voter_id'] == str(voter.id)), None)
+            existing_node = self.tree.node(str(voter.id))
             if existing_node:
                 existing_node['vote_type'] = 'calculated'
         else:
             # Handle manual votes - capture vote data for delegation tree
-            current_node = next((n for n in self.delegation_tree_data['nodes'] if n['voter_id'] == str(voter.id)), None)
+            current_node = self.tree.node(str(voter.id))
             if current_node and ballot.votes.exists():
                 current_node['vote_type'] = 'manual'
                 current_node['tags'] = ballot.tags.split(',') if ballot.tags else []
                 
                 # Capture manual vote data
                 for vote in ballot.votes.all():
-                    current_node['votes'][str(vote.choice.id)] = {
+                    current_node['votes'][str(vote.choice_id)] = {
                         'stars': float(vote.stars),  # Convert Decimal to float for JSON serialization
-                        'choice_name': vote.choice.title,
+                        'choice_name': decision.choice_index.label(vote.choice_id),
                         'sources': []  # Manual votes have no sources
                     }
 
@@ -336,6 +345,9 @@ class StageBallots(Service):
         """
         Determine if a ballot should be inherited based on tag matching.
         
+        Tag strings are interned once into bitmasks (see TagInterner), so the
+        check itself is a single bitwise AND.
+        
         Args:
             following: Following relationship with tags specified
             followee_ballot: The ballot to potentially inherit from
@@ -343,25 +355,202 @@ class StageBallots(Service):
         Returns:
             tuple: (should_inherit: bool, matching_tags: list)
         """
-        # If following has no tags specified, inherit from all ballots
-        if not following.tags or not following.tags.strip():
-            followee_tags = []
-            if followee_ballot.tags:
-                followee_tags = [tag.strip() for tag in followee_ballot.tags.split(',') if tag.strip()]
-            return True, followee_tags
-        
-        # Get tags we're following this person on
-        following_tags = set(tag.strip() for tag in following.tags.split(',') if tag.strip())
+        following_mask = self.tag_interner.mask(following.tags)
+        followee_mask = self.tag_interner.mask(followee_ballot.tags)
         
-        # Get tags the followee applied to their ballot
-        followee_tags = set()
-        if followee_ballot.tags:
-            followee_tags = set(tag.strip() for tag in followee_ballot.tags.split(',') if tag.strip())
-        
-        # Find intersection - we inherit if there's any overlap
-        matching_tags = following_tags.intersection(followee_tags)
+        # If following has no tags specified, inherit from all ballots
+        if not following_mask:
+            return True, self.tag_interner.tags(followee_mask)
         
-        return len(matching_tags) > 0, list(matching_tags)
+        # Inherit if there's any overlap between followed and ballot tags
+        matching_mask = following_mask & followee_mask
+        return matching_mask != 0, self.tag_interner.tags(matching_mask)
+
+    def stage_decision(self, decision):
+        """
+        Batched staging mode: calculate every member's ballot for one decision
+        with a constant number of queries.
+
+        Unlike get_or_calculate_ballot (several queries per voter and per
+        source vote), this loads memberships, followings, ballots, votes and
+        choices in five queries, resolves all ballots in memory with the
+        DelegationEngine, and writes the results back with
+        write_calculated_ballots. Query count is O(1) in community size.
+
+        Calculated ballots follow the snapshot engine's rules: averages are
+        taken over every inherited ballot (a missing vote counts as 0 stars)
+        and stars are only rounded to the Vote field's 2 decimal places when
+        written.
+
+        Args:
+            decision: Decision to stage ballots for
+
+        Returns:
+            dict: Counts of 'manual_ballots', 'calculated_ballots',
+                  'no_ballot', 'ballots_created' and 'votes_written'
+        """
+        community_id = decision.community_id
+
+        # Query 1: memberships (voters to stage)
+        memberships = list(
+            Membership.objects.filter(community_id=community_id)
+            .values_list('member_id', 'member__username', 'is_anonymous')
+        )
+        anonymity = {str(member_id): is_anonymous for member_id, _, is_anonymous in memberships}
+        usernames = {str(member_id): username for member_id, username, _ in memberships}
+
+        # Query 2: followings, in priority order
+        followings = defaultdict(list)
+        seen_pairs = set()
+        for follower_id, followee_id, tags, order in (
+            Following.objects.filter(follower__community_id=community_id, followee__community_id=community_id)
+            .order_by('follower', 'order', 'followee')
+            .values_list('follower__member_id', 'followee__member_id', 'tags', 'order')
+        ):
+            follower_id, followee_id = str(follower_id), str(followee_id)
+            if (follower_id, followee_id) in seen_pairs:
+                continue
+            seen_pairs.add((follower_id, followee_id))
+            followings[follower_id].append({'followee_id': followee_id, 'tags': tags or '', 'order': order})
+
+        # Query 3: choices
+        choice_ids = {str(choice_id) for choice_id in decision.choices.values_list('id', flat=True)}
+
+        # Query 4: existing ballots (the writer re-reads them under lock)
+        existing_ballots = {}
+        for voter_id, is_calculated, tags in (
+            Ballot.objects.filter(decision=decision).values_list('voter_id', 'is_calculated', 'tags')
+        ):
+            voter_id = str(voter_id)
+            existing_ballots[voter_id] = {
+                'voter_id': voter_id,
+                'is_calculated': is_calculated,
+                'is_anonymous': anonymity.get(voter_id, False),
+                'tags': tags or '',
+                'votes': {},
+            }
+
+        # Query 5: manual votes
+        for voter_id, choice_id, stars in (
+            Vote.objects.filter(ballot__decision=decision, ballot__is_calculated=False)
+            .values_list('ballot__voter_id', 'choice_id', 'stars')
+        ):
+            existing_ballots[str(voter_id)]['votes'][str(choice_id)] = str(stars)
+
+        engine = DelegationEngine({
+            'community_memberships': list(anonymity),
+            'followings': followings,
+            'existing_ballots': existing_ballots,
+        }, arithmetic=get_star_arithmetic(), vectorized=settings.DELEGATION_VECTORIZED)
+        results = engine.resolve()
+
+        stats = {'manual_ballots': 0, 'calculated_ballots': 0, 'no_ballot': 0}
+        stat_keys = {'manual': 'manual_ballots', 'calculated': 'calculated_ballots', 'no_ballot': 'no_ballot'}
+        for voter_id in anonymity:
+            stats[stat_keys[results[voter_id]['type']]] += 1
+
+        stats.update(self.write_calculated_ballots(
+            decision, results, list(anonymity), usernames=usernames, choice_ids=choice_ids,
+        ))
+        return stats
+
+    def write_calculated_ballots(self, decision, results, voter_ids, usernames=None, choice_ids=None,
+                                 partial=False):
+        """
+        Persist calculated ballots and votes from DelegationEngine results.
+
+        All writes happen in one transaction: calculated votes for the
+        decision are replaced with a single delete plus bulk_create, new
+        ballots are bulk created and existing calculated ballots bulk updated.
+        bulk_create does not send post_save, so no recalculation signals fire.
+        The decision's ballots are always read with select_for_update() inside
+        that transaction (never taken from the caller), so voters whose current
+        ballot is manual are never overwritten, even if the results were
+        computed before it was cast.
+
+        Args:
+            decision: Decision the results belong to
+            results (Mapping): voter_id -> resolution dict from DelegationEngine
+            voter_ids (list): Voters to write (voters without a result are skipped)
+            usernames (dict, optional): voter_id -> username for new ballots, loaded if omitted
+            choice_ids (set, optional): Valid choice IDs for the decision, loaded if omitted
+            partial (bool): Only replace calculated votes of `voter_ids` (incremental
+                recomputation); otherwise all calculated votes of the decision are replaced
+
+        Returns:
+            dict: Counts of 'ballots_created', 'ballots_updated' and 'votes_written'
+        """
+        from security.models import CustomUser
+
+        if choice_ids is None:
+            choice_ids = {str(choice_id) for choice_id in decision.choices.values_list('id', flat=True)}
+
+        ballots_to_create = []
+        ballots_to_update = []
+        votes_to_create = []
+
+        with transaction.atomic():
+            # Read (and lock) the decision's ballots in the write transaction, so a
+            # manual ballot cast after the results were computed is never flipped
+            ballots = {
+                str(voter_id): (ballot_id, is_calculated)
+                for ballot_id, voter_id, is_calculated in (
+                    Ballot.objects.select_for_update().filter(decision=decision)
+                    .values_list('id', 'voter_id', 'is_calculated')
+                )
+            }
+
+            to_write = [
+                voter_id for voter_id in voter_ids
+                if voter_id in results and results[voter_id]['type'] != 'manual'
+                and ballots.get(voter_id, (None, True))[1]
+            ]
+            if usernames is None:
+                missing = [voter_id for voter_id in to_write if voter_id not in ballots]
+                usernames = {
+                    str(user_id): username
+                    for user_id, username in CustomUser.objects.filter(id__in=missing).values_list('id', 'username')
+                } if missing else {}
+
+            now = timezone.now()
+            for voter_id in to_write:
+                result = results[voter_id]
+                ballot = Ballot(
+                    id=ballots[voter_id][0] if voter_id in ballots else uuid.uuid4(),
+                    decision=decision,
+                    voter_id=voter_id,
+                    is_calculated=True,
+                    tags=','.join(result['tags']),
+                    modified=now,
+                )
+                if voter_id in ballots:
+                    ballots_to_update.append(ballot)
+                else:
+                    ballot.hashed_username = generate_username_hash(usernames[voter_id])
+                    ballots_to_create.append(ballot)
+
+                for choice_id, stars in (result['ballot'] or {}).items():
+                    if choice_id in choice_ids:
+                        votes_to_create.append(Vote(
+                            ballot_id=ballot.id,
+                            choice_id=choice_id,
+                            stars=stars.quantize(Decimal('0.01')),
+                        ))
+
+            stale_votes = Vote.objects.filter(ballot__decision=decision, ballot__is_calculated=True)
+            if partial:
+                stale_votes = stale_votes.filter(ballot__voter_id__in=voter_ids)
+
+            stale_votes.delete()
+            Ballot.objects.bulk_create(ballots_to_create)
+            Ballot.objects.bulk_update(ballots_to_update, ['is_calculated', 'tags', 'modified'])
+            Vote.objects.bulk_create(votes_to_create)
+
+        return {
+            'ballots_created': len(ballots_to_create),
+            'ballots_updated': len(ballots_to_update),
+            'votes_written': len(votes_to_create),
+        }
 
     def calculate_star_score_with_tiebreaking(self, stars_with_sources, choice, decision):
         """
@@ -378,21 +567,23 @@ class StageBallots(Service):
         if not stars_with_sources:
             return Decimal('0')
         
-        # Calculate average using Decimal for precision (Plan #8)
-        total_stars = sum(Decimal(str(item['stars'])) for item in stars_with_sources)
-        average = total_stars / Decimal(len(stars_with_sources))
+        # Calculate average using Decimal for precision (Plan #8), at 12 digits in any thread
+        with star_context():
+            total_stars = sum(Decimal(str(item['stars'])) for item in stars_with_sources)
+            average = total_stars / Decimal(len(stars_with_sources))
         star_score = average  # Keep full Decimal precision, no rounding
         
-        # Log the calculation details
-        sources_str = ", ".join([
-            f"{item['source']}({item['stars']}⭐,order:{item['order']})" 
-            for item in stars_with_sources
-        ])
-        
-        decision.ballot_tree_log.append({
-            "indent": decision.ballot_tree_log_indent + 2,
-            "log": f"Choice '{choice.title}': {sources_str} → avg={average:.2f} → {star_score}⭐"
-        })
+        # Log the calculation details (only when the full trace is recorded)
+        trace = getattr(decision, 'ballot_tree_log', None)
+        if trace is not None and trace.wants(FULL):
+            sources_str = ", ".join([
+                f"{item['source']}({item['stars']}⭐,order:{item['order']})" 
+                for item in stars_with_sources
+            ])
+            trace.full(
+                "Choice '{}': {} → avg={:.2f} → {}⭐", choice.title, sources_str, average, star_score,
+                indent=decision.ballot_tree_log_indent + 2,
+            )
         
         # TODO: Implement sophisticated tie-breaking if needed
         # For now, simple rounding handles most cases
@@ -401,83 +592,36 @@ class StageBallots(Service):
 
     def process(self):
         """
-        Gets any decisions not yet closed and builds a ballot tree to attach to the decision.
-        Enhanced to return delegation tree data for visualization.
-        """
-        delegation_trees = {}
-        
-        for community in Community.objects.all():
-            for decision in community.decisions.filter(dt_close__gt=timezone.now()):
+        Stage ballots for every decision not yet closed.
 
-                # Reset delegation tree data for this decision
-                self.delegation_tree_data = {
-                    'nodes': [],
-                    'edges': [],
-                    'inheritance_chains': []
-                }
-
-                # Stick a log on to the decision, to print out at the end
-                decision.ballot_tree_log = []
-                decision.ballot_tree_log_indent = 0
-                decision.ballot_tree_log.append(
-                    {
-                        "indent": decision.ballot_tree_log_indent,
-                        "log": f"Ballot Tree for {decision}: {decision.title} (Community: {community})",
-                    }
-                )
-                decision.ballot_tree_log.append(
-                    {
-                        "indent": decision.ballot_tree_log_indent,
-                        "log": "-" * 100,
-                    }
-                )
-
-                ballots = []
-                for membership in community.memberships.all():
-                    ballots.append(
-                        self.get_or_calculate_ballot(
-                            decision=decision, voter=membership.member
-                        )
-                    )
-
-                decision.ballot_tree_log.append(
-                    {
-                        "indent": decision.ballot_tree_log_indent,
-                        "log": "Begin final tally!",
-                    }
-                )
-                decision.ballot_tree_log.append(
-                    {
-                        "indent": decision.ballot_tree_log_indent,
-                        "log": "-" * 200,
-                    }
-                )
+        Each decision is staged with the batched stage_decision mode, so the
+        query count per decision is constant in community size.
 
-                ballot_tree = ""
-                for log in decision.ballot_tree_log:
-                    ballot_tree += (
-                        f"{log['indent'] * '----------------'}{log['log']}<br/>"
-                    )
+        Returns:
+            dict: decision_id -> stage_decision statistics
+        """
+        staged = {}
 
-                decision.ballot_tree = ballot_tree
-                decision.save()
-                
-                # Store delegation tree data for this decision
-                delegation_trees[str(decision.id)] = self.delegation_tree_data.copy()
+        for decision in Decision.objects.filter(dt_close__gt=timezone.now()):
+            staged[str(decision.id)] = self.stage_decision(decision)
 
-        return delegation_trees
+        return staged
 
 
 class Tally(Service):
-    def __init__(self, snapshot_id=None):
+    def __init__(self, snapshot_id=None, trace_level=None):
         """
         Initialize Tally service.
         
         Args:
             snapshot_id: Optional UUID of DecisionSnapshot to tally from (Plan #9)
+            trace_level: Report and tally log detail ('off', 'summary' or
+                'full'); defaults to TALLY_TRACE_LEVEL. Pass 'full' only where
+                a command or page shows the per-tag and per-choice lines.
         """
         super().__init__()
         self.snapshot_id = snapshot_id
+        self.trace_level = settings.TALLY_TRACE_LEVEL if trace_level is None else trace_level
         self.logger = logging.getLogger(__name__)
     
     def process(self):
@@ -502,107 +646,51 @@ class Tally(Service):
         for community in Community.objects.all():
             for decision in community.decisions.filter(dt_close__gt=timezone.now()):
 
-                # Initialize logging
-                decision.tally_log = []
-                decision.tally_log_indent = 0
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": f"=== STAR VOTING TALLY FOR {decision.title} ===",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": f"Community: {community.name}",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": "-" * 80,
-                })
+                # Structured trace, formatted only when the report is rendered
+                trace = Trace(self.trace_level)
+                trace.summary("=== STAR VOTING TALLY FOR {} ===", decision.title)
+                trace.summary("Community: {}", community.name)
+                trace.summary("-" * 80)
 
-                # Get voting member ballots only (exclude lobbyists)
-                voting_ballots = decision.ballots.filter(
-                    voter__memberships__community=community,
-                    voter__memberships__is_voting_community_member=True
+                # Participation counts, voting members' ballots and tag histogram
+                # (lobbyists excluded) from a fixed number of set-based queries
+                participation, ballot_list, choices, tag_counts = self._live_ballot_data(
+                    decision, community
                 )
+                voting_ballot_count = participation['voting_ballots']
                 
-                # Log participation statistics
-                total_ballots = decision.ballots.count()
-                lobbyist_ballots = total_ballots - voting_ballots.count()
-                manual_ballots = voting_ballots.filter(is_calculated=False).count()
-                calculated_ballots = voting_ballots.filter(is_calculated=True).count()
-                
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": "PARTICIPATION SUMMARY:",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent + 1,
-                    "log": f"Voting members: {voting_ballots.count()} ballots",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent + 1,
-                    "log": f"  - Manual votes: {manual_ballots}",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent + 1,
-                    "log": f"  - Calculated votes: {calculated_ballots}",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent + 1,
-                    "log": f"Lobbyists: {lobbyist_ballots} ballots (not counted)",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": "",
-                })
-
-                # Convert ballots to format expected by STARVotingTally (Plan #7)
-                # Format: List[Dict[choice_id, Decimal]]
-                ballot_list = []
-                choice_id_to_obj = {}  # Map choice IDs back to Choice objects for display
-                
-                for ballot in voting_ballots:
-                    ballot_dict = {}
-                    for vote in ballot.votes.select_related('choice'):
-                        # Store choice ID as key, stars (already Decimal) as value
-                        ballot_dict[str(vote.choice.id)] = vote.stars
-                        choice_id_to_obj[str(vote.choice.id)] = vote.choice
-                    
-                    if ballot_dict:  # Only add non-empty ballots
-                        ballot_list.append(ballot_dict)
+                trace.summary("PARTICIPATION SUMMARY:")
+                trace.summary("Voting members: {} ballots", voting_ballot_count, indent=1)
+                trace.summary("  - Manual votes: {}", participation['manual_ballots'], indent=1)
+                trace.summary("  - Calculated votes: {}", participation['calculated_ballots'], indent=1)
+                trace.summary("Lobbyists: {} ballots (not counted)", participation['lobbyist_ballots'], indent=1)
+                trace.summary("")
                 
                 # Run STAR voting tally using Plan #7 implementation
+                result = None
+                unresolved_tie = None
+                tally_error = None
+                star_tally = STARVotingTally(
+                    arithmetic=get_star_arithmetic(),
+                    vectorized=settings.STAR_TALLY_VECTORIZED,
+                    trace_level=self.trace_level,
+                    exact_scores=False,
+                )
                 try:
-                    star_tally = STARVotingTally()
                     result = star_tally.run(ballot_list)
                     
-                    # Add STAR tally log to decision log
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": "",
-                    })
-                    for log_line in result['tally_log']:
-                        decision.tally_log.append({
-                            "indent": decision.tally_log_indent,
-                            "log": log_line,
-                        })
+                    # Add STAR tally events to the decision trace
+                    trace.summary("")
+                    trace.extend(star_tally.trace)
                     
                     # Format winner information
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": "",
-                    })
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": "🏆 FINAL RESULT:",
-                    })
+                    trace.summary("")
+                    trace.summary("🏆 FINAL RESULT:")
                     
                     if result['winner']:
-                        winner_choice = choice_id_to_obj.get(result['winner'])
-                        if winner_choice:
-                            decision.tally_log.append({
-                                "indent": decision.tally_log_indent + 1,
-                                "log": f"WINNER: {winner_choice.title}",
-                            })
+                        winner_title = choices.title(result['winner'])
+                        if winner_title:
+                            trace.summary("WINNER: {}", winner_title, indent=1)
                             
                             # Calculate margin if runoff occurred
                             if result.get('runoff_details'):
@@ -612,100 +700,162 @@ class Tally(Service):
                                     winner_prefs = runoff['choice_a_preferences'] if finalists[0] == result['winner'] else runoff['choice_b_preferences']
                                     runner_prefs = runoff['choice_b_preferences'] if finalists[0] == result['winner'] else runoff['choice_a_preferences']
                                     margin = abs(winner_prefs - runner_prefs)
-                                    margin_pct = (margin / voting_ballots.count()) * 100 if voting_ballots.count() > 0 else 0
+                                    margin_pct = (margin / voting_ballot_count) * 100 if voting_ballot_count > 0 else 0
                                     
-                                    decision.tally_log.append({
-                                        "indent": decision.tally_log_indent + 1,
-                                        "log": f"Margin: {margin} votes ({margin_pct:.1f}%)",
-                                    })
+                                    trace.summary("Margin: {} votes ({:.1f}%)", margin, margin_pct, indent=1)
                                     
                                     # Runner-up
                                     runner_up_id = finalists[1] if finalists[0] == result['winner'] else finalists[0]
-                                    runner_up_choice = choice_id_to_obj.get(runner_up_id)
-                                    if runner_up_choice:
-                                        decision.tally_log.append({
-                                            "indent": decision.tally_log_indent + 1,
-                                            "log": f"Runner-up: {runner_up_choice.title}",
-                                        })
+                                    runner_up_title = choices.title(runner_up_id)
+                                    if runner_up_title:
+                                        trace.summary("Runner-up: {}", runner_up_title, indent=1)
                     else:
-                        decision.tally_log.append({
-                            "indent": decision.tally_log_indent + 1,
-                            "log": "No winner determined (no valid choices)",
-                        })
+                        trace.summary("No winner determined (no valid choices)", indent=1)
                     
                 except UnresolvedTieError as e:
                     # Handle unresolved ties
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": "",
-                    })
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": "⚠️ UNRESOLVED TIE:",
-                    })
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent + 1,
-                        "log": "Tie could not be resolved by automatic tiebreakers.",
-                    })
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent + 1,
-                        "log": f"Tied candidates: {', '.join([choice_id_to_obj.get(c, c).title if choice_id_to_obj.get(c) else c for c in e.tied_candidates])}",
-                    })
+                    unresolved_tie = e
+                    trace.summary("")
+                    trace.summary("⚠️ UNRESOLVED TIE:")
+                    trace.summary("Tie could not be resolved by automatic tiebreakers.", indent=1)
+                    trace.summary("Tied candidates: {}", ', '.join(choices.labels(e.tied_candidates)), indent=1)
                     for log_line in e.tiebreaker_log:
-                        decision.tally_log.append({
-                            "indent": decision.tally_log_indent + 2,
-                            "log": log_line,
-                        })
+                        trace.summary(log_line, indent=2)
                 except ValueError as e:
                     # Handle empty ballot errors
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": "",
-                    })
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent,
-                        "log": f"❌ TALLY ERROR: {str(e)}",
-                    })
+                    tally_error = str(e)
+                    trace.summary("")
+                    trace.summary("❌ TALLY ERROR: {}", tally_error)
 
                 # TAG ANALYSIS
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": "",
-                })
-                decision.tally_log.append({
-                    "indent": decision.tally_log_indent,
-                    "log": "TAG INFLUENCE ANALYSIS:",
-                })
-                
-                tag_counts = defaultdict(int)
-                for ballot in voting_ballots:
-                    if ballot.tags:
-                        for tag in ballot.tags.split(','):
-                            tag_counts[tag.strip()] += 1
+                trace.summary("")
+                trace.summary("TAG INFLUENCE ANALYSIS:")
                 
                 if tag_counts:
-                    for tag, count in sorted(tag_counts.items(), key=lambda x: x[1], reverse=True):
-                        percentage = (count / voting_ballots.count()) * 100 if voting_ballots.count() > 0 else 0
-                        decision.tally_log.append({
-                            "indent": decision.tally_log_indent + 1,
-                            "log": f"'{tag}': {count} ballots ({percentage:.1f}%)",
-                        })
+                    if trace.wants(FULL):
+                        for tag, count in sorted(tag_counts.items(), key=lambda x: x[1], reverse=True):
+                            percentage = (count / voting_ballot_count) * 100 if voting_ballot_count > 0 else 0
+                            trace.full("'{}': {} ballots ({:.1f}%)", tag, count, percentage, indent=1)
                 else:
-                    decision.tally_log.append({
-                        "indent": decision.tally_log_indent + 1,
-                        "log": "No tags applied to ballots",
-                    })
+                    trace.summary("No tags applied to ballots", indent=1)
 
-                # Build final report
-                tally_report = ""
-                for log in decision.tally_log:
-                    indent = "  " * log['indent']
-                    tally_report += f"{indent}{log['log']}<br/>"
+                # Render the report (empty when tracing is off)
+                tally_report = trace.render_html()
+                
+                # Structured results for the results page
+                Result.objects.create(
+                    decision=decision,
+                    report=tally_report,
+                    stats=self._result_stats(
+                        participation, result, unresolved_tie, tally_error, choices, tag_counts
+                    ),
+                )
                 
                 all_tally_reports.append(tally_report)
 
         return "<br/>".join(all_tally_reports)
     
+    def _live_ballot_data(self, decision, community):
+        """
+        Gather live tally inputs with a fixed number of set-based queries.
+        
+        One aggregate query for participation counts, one for every voting
+        member's votes, one grouped query for tag strings and one for the
+        decision's choices, regardless of the number of ballots or tags.
+        
+        Args:
+            decision: Decision being tallied
+            community: Community the decision belongs to
+            
+        Returns:
+            tuple: (participation counts dict, ballot list for STARVotingTally,
+                    ChoiceIndex, tag -> number of voting ballots)
+        """
+        is_voting_member = Exists(Membership.objects.filter(
+            community=community, member=OuterRef('voter'), is_voting_community_member=True
+        ))
+        ballots = decision.ballots.annotate(is_voting_member=is_voting_member)
+        voting = Q(is_voting_member=True)
+        
+        participation = ballots.aggregate(
+            total_ballots=Count('id'),
+            voting_ballots=Count('id', filter=voting),
+            manual_ballots=Count('id', filter=voting & Q(is_calculated=False)),
+            calculated_ballots=Count('id', filter=voting & Q(is_calculated=True)),
+        )
+        participation['lobbyist_ballots'] = participation['total_ballots'] - participation['voting_ballots']
+        
+        # Format: List[Dict[choice_id, Decimal]]; ballots without votes are skipped
+        voting_ballots = ballots.filter(voting)
+        ballot_votes = defaultdict(dict)
+        votes = Vote.objects.filter(ballot__in=voting_ballots.values('id')).order_by('ballot_id')
+        for ballot_id, choice_id, stars in votes.values_list('ballot_id', 'choice_id', 'stars'):
+            ballot_votes[ballot_id][str(choice_id)] = stars
+        ballot_list = list(ballot_votes.values())
+        
+        choices = decision.choice_index
+        
+        # Group identical tag strings in SQL, split each distinct string once
+        tag_counts = defaultdict(int)
+        tag_groups = voting_ballots.filter(tags__gt='').order_by().values_list('tags').annotate(count=Count('id'))
+        for tags, count in tag_groups:
+            for tag in tags.split(','):
+                tag_counts[tag.strip()] += count
+        
+        return participation, ballot_list, choices, tag_counts
+    
+    @staticmethod
+    def _result_stats(participation, result, unresolved_tie, tally_error, choices, tag_counts):
+        """
+        Structured statistics for Result.stats.
+        
+        Args:
+            participation (dict): Counts from _live_ballot_data
+            result (dict or None): STARVotingTally result
+            unresolved_tie (UnresolvedTieError or None): Tie the tally could not break
+            tally_error (str or None): Tally error message (e.g. no ballots)
+            choices (ChoiceIndex): The decision's choice index
+            tag_counts (dict): Tag -> number of voting ballots
+            
+        Returns:
+            dict: JSON-serializable stats read by the Result accessors
+        """
+        def choice_info(choice_id):
+            return {'choice_id': choice_id, 'choice': choices.label(choice_id)}
+        
+        stats = {
+            'participation': dict(participation),
+            'tag_frequency': dict(sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)),
+            'score_phase': [],
+            'runoff_phase': [],
+            'winner': None,
+        }
+        if unresolved_tie is not None:
+            stats['tied_candidates'] = [choice_info(c) for c in unresolved_tie.tied_candidates]
+        if tally_error is not None:
+            stats['error'] = tally_error
+        if result is None:
+            return stats
+        
+        stats['score_phase'] = [
+            {**choice_info(choice_id), 'average_score': float(score)}
+            for choice_id, score in sorted(result['scores'].items(), key=lambda x: x[1], reverse=True)
+        ]
+        runoff = result['runoff_details']
+        if runoff:
+            preferences = [runoff['choice_a_preferences'], runoff['choice_b_preferences']]
+            stats['runoff_phase'] = [
+                {**choice_info(choice_id), 'preferences': count}
+                for choice_id, count in zip(runoff['finalists'], preferences)
+            ]
+            stats['runoff_ties'] = runoff['ties']
+        if result['winner']:
+            stats['winner'] = choice_info(result['winner'])
+            if runoff:
+                stats['winner']['margin'] = abs(preferences[0] - preferences[1])
+        stats['preference_matrix'] = result['preference_matrix']
+        return stats
+    
     def _tally_snapshot(self, snapshot):
         """
         Tally a specific snapshot using frozen data (Plan #9).
@@ -716,51 +866,49 @@ class Tally(Service):
         Returns:
             str: HTML-formatted tally report
         """
-        from decimal import Decimal
-        
         decision = snapshot.decision
         snapshot_data = snapshot.snapshot_data
         
         self.logger.info(f"Tallying snapshot {snapshot.id} for decision '{decision.title}'")
         
-        # Extract ballot data from snapshot
-        delegation_tree = snapshot_data.get('delegation_tree', {})
-        nodes = delegation_tree.get('nodes', [])
-        
-        # Convert nodes to ballot format for STARVotingTally
-        ballot_list = []
-        choice_id_to_obj = {}
-        
-        for node in nodes:
-            if node.get('vote_type') in ['manual', 'calculated'] and node.get('votes'):
-                ballot_dict = {}
-                for choice_id, vote_data in node['votes'].items():
-                    # Convert stars back to Decimal
-                    ballot_dict[str(choice_id)] = Decimal(str(vote_data.get('stars', 0)))
-                    # Keep track of choice for display
-                    if choice_id not in choice_id_to_obj:
-                        try:
-                            from democracy.models import Choice
-                            choice_id_to_obj[str(choice_id)] = Choice.objects.get(id=choice_id)
-                        except Choice.DoesNotExist:
-                            pass
-                
-                if ballot_dict:
-                    ballot_list.append(ballot_dict)
+        tally_state = snapshot_data.get('tally_state')
+        incremental = IncrementalSTARTally.from_state(tally_state) if tally_state is not None else None
+        if incremental is not None and (incremental.exact or 'tally_ballots' not in snapshot_data):
+            # Counts maintained by staging (incrementally when possible): no ballot rescan.
+            # Only exact while the sequential 12-digit sums are (whole or few-decimal stars).
+            ballot_list = None
+        elif 'tally_ballots' in snapshot_data:
+            # Exact effective ballots of voting members
+            ballot_list = list(decode_ballots(snapshot_data['tally_ballots']).values())
+        else:
+            # Snapshots staged before the ballot section existed: rebuild from tree nodes
+            nodes = snapshot_data.get('delegation_tree', {}).get('nodes', [])
+            ballot_list = [ballot for ballot in map(tally_ballot, nodes) if ballot]
         
-        self.logger.info(f"Extracted {len(ballot_list)} ballots from snapshot for tallying")
+        if ballot_list is not None:
+            self.logger.info(f"Extracted {len(ballot_list)} ballots from snapshot for tallying")
         
         # Run STAR voting tally
         try:
-            star_tally = STARVotingTally()
-            result = star_tally.run(ballot_list)
+            if ballot_list is None:
+                result = incremental.run(trace_level=self.trace_level)
+            else:
+                star_tally = STARVotingTally(
+                    arithmetic=get_star_arithmetic(),
+                    vectorized=settings.STAR_TALLY_VECTORIZED,
+                    trace_level=self.trace_level,
+                    exact_scores=False,
+                )
+                result = star_tally.run(ballot_list)
             
-            # Update snapshot with results
+            # Update snapshot with results (one query for the winning Choice)
             if result.get('winner'):
-                winner_choice = choice_id_to_obj.get(result['winner'])
-                snapshot.winner = winner_choice
+                winners = Choice.objects.in_bulk([result['winner']])
+                snapshot.winner = next(iter(winners.values()), None)
             
             snapshot.tally_log = result.get('tally_log', [])
+            # Pairwise wins and five-star counts for the results page
+            snapshot.snapshot_data['preference_matrix'] = result['preference_matrix']
             
             # Only mark as final if decision is closed (model validation prevents final=True for open decisions)
             if not decision.is_open:
@@ -801,41 +949,64 @@ class CreateCalculationSnapshot(Service):
     ensuring that calculations are not affected by concurrent user activity.
     """
     
-    def __init__(self, decision_id, *args, **kwargs):
+    def __init__(self, decision_id, *args, community_state=None, reuse_unchanged=False, **kwargs):
         """
         Initialize snapshot creation for a specific decision.
         
         Args:
             decision_id: UUID of the decision to create snapshot for
+            community_state (dict, optional): Memberships and followings from
+                capture_community_state(), shared by all decisions of a batch
+            reuse_unchanged (bool): Return the decision's latest completed
+                snapshot instead of a new one when the captured inputs hash
+                matches it (sets self.unchanged)
         """
         super().__init__(*args, **kwargs)
         self.decision_id = decision_id
+        self.community_state = community_state
+        self.reuse_unchanged = reuse_unchanged
+        self.unchanged = False
         self.logger = logging.getLogger(__name__)
     
     def process(self):
         """
         Create a complete snapshot of the decision state.
         
+        With reuse_unchanged, a capture whose inputs hash matches the latest
+        completed snapshot returns that snapshot without creating a row, so
+        callers can skip staging and tallying (self.unchanged is True).
+        
         Returns:
-            DecisionSnapshot: The created snapshot with all calculation data
+            DecisionSnapshot: The created (or reused) snapshot with all calculation data
         """
         try:
             decision = Decision.objects.get(id=self.decision_id)
-            
-            # Create snapshot with initial status
-            snapshot = DecisionSnapshot.objects.create(
-                decision=decision,
-                calculation_status='creating',
-                is_final=not decision.is_open
-            )
+            is_final = not decision.is_open
             
             self.logger.info(f"Creating snapshot for decision: {decision.title}")
             
-            # Snapshot creation process
-            
             # Capture all data in a single transaction for consistency
             with transaction.atomic():
                 snapshot_data = self._capture_system_state(decision)
+                digest = inputs_hash(snapshot_data)
+                
+                previous = self._unchanged_snapshot(decision, digest, is_final) if self.reuse_unchanged else None
+                if previous is not None:
+                    self.unchanged = True
+                    self.logger.info(f"Inputs unchanged, reusing snapshot: {previous.id}")
+                    return previous
+                
+                snapshot = DecisionSnapshot.objects.create(
+                    decision=decision,
+                    calculation_status='creating',
+                    is_final=is_final,
+                    inputs_hash=digest,
+                )
+                
+                # Store as a delta of the previous snapshot unless a keyframe is due
+                snapshot.parent = self._delta_parent(snapshot)
+                if snapshot.parent is not None:
+                    snapshot.delta_depth = snapshot.parent.delta_depth + 1
                 
                 # Update snapshot with captured data
                 snapshot.snapshot_data = snapshot_data
@@ -849,17 +1020,135 @@ class CreateCalculationSnapshot(Service):
             
         except Exception as e:
             self.logger.error(f"Failed to create snapshot for decision {self.decision_id}: {str(e)}")
-            if 'snapshot' in locals():
-                snapshot.calculation_status = 'failed_snapshot'
-                snapshot.error_log = str(e)
-                snapshot.last_error = timezone.now()
-                snapshot.save()
+            if 'decision' in locals():
+                # The capture transaction rolled back; record the failure on a new row
+                DecisionSnapshot.objects.create(
+                    decision=decision,
+                    calculation_status='failed_snapshot',
+                    is_final=not decision.is_open,
+                    error_log=str(e),
+                    last_error=timezone.now(),
+                )
             raise
     
+    @staticmethod
+    def _unchanged_snapshot(decision, digest, is_final):
+        """
+        The decision's latest snapshot, if its results can be reused.
+        
+        Only the latest snapshot qualifies: persisted calculated ballots
+        reflect it, so an older snapshot with the same hash is stale.
+        Staging also marks snapshots 'completed', so the tally must have run
+        (preference matrix or tie/error log stored).
+        
+        Args:
+            decision: Decision being recalculated
+            digest (str): inputs_hash() of the new capture
+            is_final (bool): Whether the new snapshot would be final
+            
+        Returns:
+            DecisionSnapshot or None: Latest snapshot if it was staged and
+                tallied with the same inputs hash and the same final status
+        """
+        latest = DecisionSnapshot.objects.filter(decision=decision).first()
+        if (
+            latest is None
+            or latest.calculation_status != 'completed'
+            or latest.inputs_hash != digest
+            or latest.is_final != is_final
+        ):
+            return None
+        if 'preference_matrix' not in latest.snapshot_data and not latest.tally_log:
+            return None
+        return latest
+    
+    @staticmethod
+    def _delta_parent(snapshot):
+        """
+        Parent to encode a new snapshot's data against, or None for a keyframe.
+        
+        The parent is the decision's latest completed snapshot (its data no
+        longer changes), as long as the chain stays shorter than
+        SNAPSHOT_KEYFRAME_INTERVAL.
+        
+        Args:
+            snapshot: New snapshot
+            
+        Returns:
+            DecisionSnapshot or None
+        """
+        interval = settings.SNAPSHOT_KEYFRAME_INTERVAL
+        if interval <= 1:
+            return None
+        latest = DecisionSnapshot.objects.filter(
+            decision_id=snapshot.decision_id, calculation_status='completed', data_blob__isnull=False
+        ).exclude(pk=snapshot.pk).first()
+        if latest is None or latest.delta_depth + 1 >= interval:
+            return None
+        return latest
+    
+    @staticmethod
+    def capture_community_state(community):
+        """
+        Capture community memberships and following relationships.
+        
+        Two values_list queries (memberships, followings with follower and
+        followee member ids) joined in memory, regardless of community size.
+        Both are ordered by member id (followings by follower, order, then
+        followee), so equal inputs always capture, and hash, identically.
+        
+        Args:
+            community: Community to capture
+            
+        Returns:
+            dict: {'community_memberships': voting member ids,
+                   'non_voting_memberships': non-voting member ids (lobbyists),
+                   'followings': follower id -> list of following dicts,
+                   'anonymity': member id -> is_anonymous}
+        """
+        # Query 1: memberships (voting flag and membership-level anonymity, Plan #6)
+        memberships = []
+        non_voting = []
+        anonymity = {}
+        for member_id, is_voting, is_anonymous in community.memberships.order_by('member_id').values_list(
+            'member_id', 'is_voting_community_member', 'is_anonymous'
+        ):
+            member_id = str(member_id)
+            anonymity[member_id] = is_anonymous
+            if is_voting:
+                memberships.append(member_id)
+            else:
+                non_voting.append(member_id)
+        
+        # Query 2: following relationships
+        # Following relationships are between Membership objects, but we store by User ID.
+        # Explicit member-id order keeps the captured lists (and inputs_hash) stable.
+        followings = defaultdict(list)
+        for follower_id, followee_id, tags, order in Following.objects.filter(
+            follower__community=community
+        ).order_by('follower__member_id', 'order', 'followee__member_id').values_list(
+            'follower__member_id', 'followee__member_id', 'tags', 'order'
+        ):
+            followings[str(follower_id)].append({
+                'followee_id': str(followee_id),
+                'tags': tags or '',
+                'order': order
+            })
+        
+        return {
+            'community_memberships': memberships,
+            'non_voting_memberships': non_voting,
+            'followings': dict(followings),
+            'anonymity': anonymity,
+        }
+    
     def _capture_system_state(self, decision):
         """
         Capture complete system state at current moment.
         
+        Uses a fixed number of queries (community state, ballots, votes,
+        choices) however many members, followings and ballots there are.
+        
         Args:
             decision: Decision object to capture state for
             
@@ -868,50 +1157,38 @@ class CreateCalculationSnapshot(Service):
         """
         community = decision.community
         
-        # Capture community memberships
-        memberships = list(community.memberships.filter(
-            is_voting_community_member=True
-        ).values_list('member_id', flat=True))
-        
-        # Capture following relationships
-        # Following relationships are between Membership objects, but we store by User ID
-        followings = {}
-        all_memberships = community.memberships.all()
-        for membership in all_memberships:
-            membership_followings = []
-            # Get all Following relationships where this membership is the follower
-            for follow in Following.objects.filter(follower=membership):
-                membership_followings.append({
-                    'followee_id': str(follow.followee.member.id),  # Store User ID, not Membership ID
-                    'tags': follow.tags or '',
-                    'order': follow.order
-                })
-            if membership_followings:
-                followings[str(membership.member.id)] = membership_followings
+        # Memberships and followings are the same for every decision of the community
+        community_state = self.community_state or self.capture_community_state(community)
+        memberships = community_state['community_memberships']
+        followings = community_state['followings']
+        anonymity = community_state.get('anonymity')
+        if anonymity is None:
+            anonymity = {
+                str(member_id): is_anonymous
+                for member_id, is_anonymous in community.memberships.values_list('member_id', 'is_anonymous')
+            }
         
-        # Capture existing ballots
+        # Capture existing ballots, then their votes
         existing_ballots = {}
-        for ballot in decision.ballots.select_related('voter').prefetch_related('votes__choice'):
-            # Get anonymity status from membership (Plan #6: membership-level anonymity)
-            try:
-                membership = ballot.voter.memberships.get(community=community)
-                is_anonymous = membership.is_anonymous
-            except:
-                is_anonymous = False  # Fallback if membership not found
-            
-            ballot_data = {
-                'voter_id': str(ballot.voter.id),
-                'is_calculated': ballot.is_calculated,
-                'is_anonymous': is_anonymous,
-                'tags': ballot.tags or '',
+        ballot_votes = {}
+        for ballot_id, voter_id, is_calculated, tags in decision.ballots.values_list(
+            'id', 'voter_id', 'is_calculated', 'tags'
+        ):
+            voter_id = str(voter_id)
+            existing_ballots[voter_id] = {
+                'voter_id': voter_id,
+                'is_calculated': is_calculated,
+                'is_anonymous': anonymity.get(voter_id, False),  # False if membership not found
+                'tags': tags or '',
                 'votes': {}
             }
-            
-            for vote in ballot.votes.all():
-                # Convert Decimal to str for JSON serialization (will be converted back to Decimal during processing)
-                ballot_data['votes'][str(vote.choice.id)] = str(vote.stars)
-            
-            existing_ballots[str(ballot.voter.id)] = ballot_data
+            ballot_votes[ballot_id] = existing_ballots[voter_id]['votes']
+        
+        for ballot_id, choice_id, stars in Vote.objects.filter(ballot__decision=decision).values_list(
+            'ballot_id', 'choice_id', 'stars'
+        ):
+            # Convert Decimal to str for JSON serialization (will be converted back to Decimal during processing)
+            ballot_votes[ballot_id][str(choice_id)] = str(stars)
         
         # Capture decision and choice data
         decision_data = {
@@ -922,13 +1199,7 @@ class CreateCalculationSnapshot(Service):
             'is_open': decision.is_open
         }
         
-        choices_data = []
-        for choice in decision.choices.all():
-            choices_data.append({
-                'id': str(choice.id),
-                'title': choice.title,
-                'description': choice.description
-            })
+        choices_data = decision.choice_index.as_data()
         
         return {
             'metadata': {
@@ -937,6 +1208,7 @@ class CreateCalculationSnapshot(Service):
                 'snapshot_version': '1.0.0'
             },
             'community_memberships': memberships,
+            'non_voting_memberships': community_state.get('non_voting_memberships', []),
             'followings': followings,
             'existing_ballots': existing_ballots,
             'decision_data': decision_data,
@@ -952,15 +1224,30 @@ class SnapshotBasedStageBallots(Service):
     ensuring calculations are not affected by concurrent changes to the system.
     """
     
-    def __init__(self, snapshot_id, *args, **kwargs):
+    def __init__(self, snapshot_id, *args, persist_ballots=False, incremental=False,
+                 changed_voter_ids=None, condensation=None, **kwargs):
         """
         Initialize service with a specific snapshot.
         
         Args:
             snapshot_id: UUID of the DecisionSnapshot to process
+            persist_ballots (bool): Also write the resolved calculated ballots
+                back to the Ballot/Vote tables (single-pass pipeline)
+            incremental (bool): Start from the previous completed snapshot of the
+                decision and only recompute members affected by the change set
+            changed_voter_ids (iterable, optional): Voters whose inputs changed since
+                the previous completed snapshot. Derived by diffing the two
+                snapshots' inputs when omitted.
+            condensation (SharedCondensation, optional): Follow graph and SCCs
+                shared by a community batch; ignored if the snapshot captured
+                different memberships or followings
         """
         super().__init__(*args, **kwargs)
         self.snapshot_id = snapshot_id
+        self.persist_ballots = persist_ballots
+        self.incremental = incremental
+        self.changed_voter_ids = changed_voter_ids
+        self.condensation = condensation
         self.logger = logging.getLogger(__name__)
     
     def process(self):
@@ -977,20 +1264,17 @@ class SnapshotBasedStageBallots(Service):
             
             self.logger.info(f"Starting snapshot-based ballot staging for: {snapshot.decision.title}")
             
-            # Process using snapshot data only
+            # Process using snapshot data only (marks the snapshot completed)
             results = self._process_snapshot_ballots(snapshot)
             
-            # Update snapshot with results
-            snapshot.calculation_status = 'completed'
-            snapshot.total_calculated_votes = results.get('calculated_ballots', 0)
-            snapshot.save()
-            
             self.logger.info(f"Snapshot-based staging completed: {results}")
             return results
             
         except Exception as e:
             self.logger.error(f"Snapshot-based staging failed: {str(e)}")
             if 'snapshot' in locals():
+                # Drop unsaved results (and 'persisted' statistics of a rolled back write)
+                snapshot.refresh_from_db()
                 snapshot.calculation_status = 'failed_staging'
                 snapshot.error_log = str(e)
                 snapshot.last_error = timezone.now()
@@ -1002,8 +1286,13 @@ class SnapshotBasedStageBallots(Service):
         """
         Process ballots using only snapshot data (frozen state).
         
-        This is the COMPLETE IMPLEMENTATION that calculates ballots recursively
-        WITHOUT querying the live database, using only the data captured in the snapshot.
+        Ballots are resolved by the iterative DelegationEngine (SCC-condensed,
+        one reverse-topological pass, no recursion) WITHOUT querying the live
+        database, using only the data captured in the snapshot.
+        
+        Persisted ballots and the completed snapshot are saved in one
+        transaction, so a snapshot records 'persisted' statistics exactly when
+        its ballots were written.
         
         Args:
             snapshot: DecisionSnapshot with captured system state
@@ -1025,241 +1314,263 @@ class SnapshotBasedStageBallots(Service):
             'max_delegation_depth': 0
         }
         
-        # Build delegation tree
-        self.delegation_tree = {
-            'nodes': [],
-            'edges': [],
-            'inheritance_chains': [],
-            'circular_prevented': []
-        }
-        
-        # Cache for calculated ballots (voter_id -> ballot_dict)
-        self.calculated_ballots_cache = {}
+        # Build delegation tree (indexed by voter id and follower/followee pair)
+        self.tree = DelegationTreeBuilder(
+            sections=('nodes', 'edges', 'inheritance_chains', 'circular_prevented'),
+            choices=snapshot_data['choices_data']
+        )
+        self.delegation_tree = self.tree.data
+        
+        # Resolve every member's ballot in one pass (incrementally when possible)
+        condensation = self.condensation
+        if condensation is not None and not condensation.matches(snapshot_data):
+            condensation = None
+        engine = DelegationEngine(
+            snapshot_data, arithmetic=get_star_arithmetic(), condensation=condensation,
+            vectorized=settings.DELEGATION_VECTORIZED
+        )
+        previous = self._previous_snapshot(snapshot) if self.incremental else None
+        if previous is not None:
+            changed = self.changed_voter_ids
+            if changed is None:
+                changed = changed_voters(previous.snapshot_data, snapshot_data)
+            changed = {str(voter_id) for voter_id in changed}
+            self.resolved_ballots = engine.resolve(
+                previous=previous.snapshot_data['resolved_ballots'], changed=changed
+            )
+            self.logger.info(
+                f"Incremental staging from snapshot {previous.id}: {len(changed)} changed voters, "
+                f"{len(engine.reevaluated)} of {len(engine.nodes)} members recomputed"
+            )
+        else:
+            self.resolved_ballots = engine.resolve()
+        self.stats['recomputed_members'] = len(engine.reevaluated)
         
-        # Get user lookup for display names
+        # Get user lookup for display names (members and followees outside the community)
         from security.models import CustomUser
-        user_ids = [member_id for member_id in snapshot_data['community_memberships']]
-        users = CustomUser.objects.filter(id__in=user_ids)
-        self.user_lookup = {str(user.id): user.username for user in users}
+        self.user_lookup = {
+            str(user_id): username
+            for user_id, username in CustomUser.objects.filter(id__in=engine.nodes).values_list('id', 'username')
+        }
         
-        # Process each member to calculate their ballot
         for member_id in snapshot_data['community_memberships']:
-            member_id_str = str(member_id)
-            
-            # Calculate or retrieve ballot for this member
-            ballot_result = self._calculate_ballot_from_snapshot(
-                member_id_str, 
-                snapshot_data, 
-                follow_path=[], 
-                delegation_depth=0
-            )
-            
-            # ballot_result is dict with 'ballot', 'tags', 'type' keys or None
-            if ballot_result is not None:
-                if ballot_result['type'] == 'manual':
-                    self.stats['manual_ballots'] += 1
-                elif ballot_result['type'] == 'calculated':
-                    self.stats['calculated_ballots'] += 1
+            ballot_type = self.resolved_ballots[str(member_id)]['type']
+            if ballot_type == 'manual':
+                self.stats['manual_ballots'] += 1
+            elif ballot_type == 'calculated':
+                self.stats['calculated_ballots'] += 1
             else:
                 self.stats['no_ballot'] += 1
         
-        # Store delegation tree in snapshot for visualization
+        self._build_delegation_tree(engine, snapshot_data)
+        
+        # Exact effective ballots counted by the tally (voting members only)
+        voting_members = {str(member_id) for member_id in snapshot_data['community_memberships']}
+        self.tally_ballots = {}
+        for voter_id in engine.nodes:
+            result = self.resolved_ballots[voter_id]
+            if voter_id in voting_members and result['type'] in ('manual', 'calculated') and result['ballot']:
+                self.tally_ballots[voter_id] = result['ballot']
+        
+        # Store delegation tree and exact results (for incremental runs) in snapshot
+        snapshot.snapshot_data['resolved_ballots'] = engine.export_resolutions()
         snapshot.snapshot_data['delegation_tree'] = self.delegation_tree
-        snapshot.snapshot_data['statistics'] = self.stats
-        snapshot.save()
+        snapshot.snapshot_data['tally_ballots'] = encode_ballots(
+            self.tally_ballots, [choice['id'] for choice in snapshot_data['choices_data']]
+        )
+        snapshot.snapshot_data['tally_state'] = self._tally_state(engine, previous).as_state()
+        
+        with transaction.atomic():
+            # Single-pass pipeline: persist calculated ballots from this same result
+            if self.persist_ballots:
+                if previous is not None:
+                    # Only recomputed members (and members no longer in the graph) can change
+                    voter_ids = [engine.graph.voter_ids[index] for index in engine.reevaluated]
+                    voter_ids += sorted(set(previous.snapshot_data['resolved_ballots']) - set(engine.nodes))
+                    persisted = StageBallots().write_calculated_ballots(
+                        snapshot.decision, self.resolved_ballots, voter_ids, partial=True
+                    )
+                else:
+                    # Every member (lobbyists included) gets a calculated ballot, as before
+                    persisted = StageBallots().write_calculated_ballots(
+                        snapshot.decision, self.resolved_ballots, engine.nodes
+                    )
+                # Calculated ballots modified after this were written by someone else
+                persisted['written_at'] = timezone.now().isoformat()
+                self.stats['persisted'] = persisted
+            
+            snapshot.snapshot_data['statistics'] = self.stats
+            snapshot.calculation_status = 'completed'
+            snapshot.total_calculated_votes = self.stats['calculated_ballots']
+            snapshot.save()
         
         self.logger.info(f"Snapshot processing complete: {self.stats}")
         
         return self.stats
     
-    def _calculate_ballot_from_snapshot(self, voter_id, snapshot_data, follow_path, delegation_depth):
+    def _previous_snapshot(self, snapshot):
         """
-        Recursively calculate ballot for a voter using only snapshot data.
+        Find the latest completed snapshot of the same decision with exported results.
         
-        This is the core recursive calculation engine that:
-        - Works entirely from frozen snapshot data (no DB queries)
-        - Builds delegation tree as it goes
-        - Handles circular reference prevention
-        - Performs tag matching and inheritance
-        - Averages ballots from multiple sources
+        When persisting, incremental writes only replace recomputed members'
+        ballots, so the base must be the snapshot the stored calculated
+        ballots came from (see persisted_ballots_current). Otherwise the run
+        falls back to a full recomputation and write.
         
         Args:
-            voter_id (str): UUID string of voter
-            snapshot_data (dict): Frozen system state
-            follow_path (list): List of voter IDs in current chain (circular prevention)
-            delegation_depth (int): Current depth in delegation tree
+            snapshot: DecisionSnapshot being processed
             
         Returns:
-            dict: {'ballot': {choice_id: stars}, 'tags': [str], 'type': 'manual|calculated'} or None
+            DecisionSnapshot or None: Base for incremental recomputation
         """
-        # Update max delegation depth
-        self.stats['max_delegation_depth'] = max(self.stats['max_delegation_depth'], delegation_depth)
-        
-        # 1. CIRCULAR REFERENCE DETECTION
-        if voter_id in follow_path:
-            self.stats['circular_prevented'] += 1
-            path_str = ' → '.join([self.user_lookup.get(vid, vid) for vid in follow_path + [voter_id]])
-            self.delegation_tree['circular_prevented'].append({
-                'voter': self.user_lookup.get(voter_id, voter_id),
-                'voter_id': voter_id,
-                'attempted_path': path_str
-            })
-            self.logger.info(f"Circular reference prevented: {path_str}")
+        previous = DecisionSnapshot.objects.filter(
+            decision_id=snapshot.decision_id,
+            calculation_status='completed',
+            created_at__lte=snapshot.created_at,
+        ).exclude(id=snapshot.id).order_by('-created_at').first()
+        if previous is None or 'resolved_ballots' not in previous.snapshot_data:
             return None
-        
-        # 2. CHECK CACHE
-        if voter_id in self.calculated_ballots_cache:
-            return self.calculated_ballots_cache[voter_id]
-        
-        # 3. CHECK FOR EXISTING MANUAL BALLOT
-        if voter_id in snapshot_data['existing_ballots']:
-            ballot_data = snapshot_data['existing_ballots'][voter_id]
-            if not ballot_data['is_calculated']:
-                # Manual ballot found
-                ballot_result = {
-                    'ballot': {choice_id: Decimal(stars_str) for choice_id, stars_str in ballot_data['votes'].items()},
-                    'tags': ballot_data['tags'].split(',') if ballot_data['tags'] else [],
-                    'type': 'manual',
-                    'is_anonymous': ballot_data['is_anonymous']
-                }
-                
-                # Add to delegation tree nodes
-                self._add_node_to_tree(voter_id, ballot_result, delegation_depth, sources=[])
-                
-                # Cache and return
-                self.calculated_ballots_cache[voter_id] = ballot_result
-                return ballot_result
-        
-        # 4. GET FOLLOWING RELATIONSHIPS
-        followings = snapshot_data['followings'].get(voter_id, [])
-        if not followings:
-            # Can't calculate - not following anyone
-            self._add_node_to_tree(voter_id, None, delegation_depth, sources=[], reason="Not following anyone")
+        if self.persist_ballots and not self.persisted_ballots_current(previous):
             return None
+        return previous
+    
+    @staticmethod
+    def persisted_ballots_current(previous):
+        """
+        Whether the decision's calculated ballots are still those `previous` wrote.
         
-        # 5. COLLECT BALLOTS TO AVERAGE
-        ballots_to_average = []
-        inherited_tags = set()
-        sources_info = []
+        The snapshot must record that it persisted its ballots, and no
+        calculated ballot of the decision may have been written since (by
+        stage_decision, get_or_calculate_ballot or a run that failed to
+        complete).
         
-        for following in followings:
-            followee_id = following['followee_id']
-            follow_tags = following['tags'].split(',') if following['tags'] else []
-            follow_order = following['order']
+        Args:
+            previous: Completed DecisionSnapshot
             
-            # RECURSE to get followee's ballot
-            followee_result = self._calculate_ballot_from_snapshot(
-                followee_id,
-                snapshot_data,
-                follow_path + [voter_id],
-                delegation_depth + 1
-            )
+        Returns:
+            bool: True if an incremental write on top of `previous` is safe
+        """
+        persisted = (previous.snapshot_data.get('statistics') or {}).get('persisted') or {}
+        written_at = parse_datetime(persisted.get('written_at') or '')
+        if written_at is None:
+            return False
+        return not Ballot.objects.filter(
+            decision_id=previous.decision_id, is_calculated=True, modified__gt=written_at
+        ).exists()
+    
+    def _tally_state(self, engine, previous):
+        """
+        STAR tally counts for this snapshot's ballots (self.tally_ballots).
+        
+        When the previous snapshot stored its counts and ballot section, only
+        the ballots of recomputed members and members who joined or left the
+        voting set are replaced; every other member's ballot was restored
+        unchanged by the engine.
+        
+        Args:
+            engine: DelegationEngine that has already resolved all ballots
+            previous: Base snapshot of an incremental run, or None
             
-            if followee_result is None:
-                # Followee has no ballot
-                continue
+        Returns:
+            IncrementalSTARTally: Counts for Tally._tally_snapshot
+        """
+        previous_data = previous.snapshot_data if previous is not None else {}
+        if (
+            'tally_ballots' not in previous_data
+            # States stored before decimal places were counted cannot report exactness
+            or (previous_data.get('tally_state') or {}).get('places') is None
+        ):
+            return IncrementalSTARTally.from_ballots(self.tally_ballots.values())
+        
+        previous_voters = set(previous_data['tally_ballots']['voters'])
+        voter_ids = {engine.graph.voter_ids[index] for index in engine.reevaluated}
+        voter_ids |= previous_voters.symmetric_difference(self.tally_ballots)
+        previous_ballots = decode_ballots(previous_data['tally_ballots'], voter_ids)
+        tally = IncrementalSTARTally.from_state(previous_data['tally_state'])
+        for voter_id in sorted(voter_ids):
+            tally.replace_ballot(previous_ballots.get(voter_id), self.tally_ballots.get(voter_id))
+        self.stats['tally_updates'] = len(voter_ids)
+        return tally
+    
+    def _build_delegation_tree(self, engine, snapshot_data):
+        """
+        Convert the engine's resolutions into the delegation tree structure.
+        
+        Args:
+            engine: DelegationEngine that has already resolved all ballots
+            snapshot_data (dict): Frozen system state (for choice titles)
+        """
+        choice_order = {c['id']: index for index, c in enumerate(snapshot_data['choices_data'])}
+        
+        for voter_id in engine.nodes:
+            result = self.resolved_ballots[voter_id]
+            depth = result['delegation_depth']
+            self.stats['max_delegation_depth'] = max(self.stats['max_delegation_depth'], depth)
             
-            followee_ballot = followee_result['ballot']
-            followee_tags = followee_result['tags']
+            for edge in result['edges']:
+                self._add_edge_to_tree(
+                    voter_id, edge['followee_id'], edge['tags'], edge['order'], edge['active_for_decision']
+                )
             
-            # 6. TAG MATCHING
-            should_inherit = False
-            matching_tags = []
+            if result['type'] == 'no_ballot':
+                self._add_node_to_tree(voter_id, None, depth, sources=[], reason=result['reason'])
+                continue
             
-            if not follow_tags or (len(follow_tags) == 1 and not follow_tags[0]):
-                # Following on ALL tags
-                should_inherit = True
-                matching_tags = followee_tags
-            else:
-                # Check intersection
-                followee_tag_set = set(followee_tags)
-                follow_tag_set = set(follow_tags)
-                matching_tag_set = followee_tag_set.intersection(follow_tag_set)
-                if matching_tag_set:
-                    should_inherit = True
-                    matching_tags = list(matching_tag_set)
+            sources_info = [
+                {
+                    'from_voter': self.user_lookup.get(source['followee_id'], source['followee_id']),
+                    'from_voter_id': source['followee_id'],
+                    'tags': source['tags'],
+                    'order': source['order'],
+                    'is_anonymous': source['is_anonymous']
+                }
+                for source in result['sources']
+            ]
+            self._add_node_to_tree(voter_id, result, depth, sources=sources_info)
             
-            # Add edge to delegation tree
-            self._add_edge_to_tree(voter_id, followee_id, follow_tags, follow_order, should_inherit)
+            if result['type'] != 'calculated':
+                continue
             
-            if should_inherit:
-                # Add ballot to averaging list
-                ballots_to_average.append(followee_ballot)
-                inherited_tags.update(matching_tags)
+            # Add inheritance chains for each choice
+            source_ballots = [self.resolved_ballots[s['followee_id']]['ballot'] for s in result['sources']]
+            for choice_id in sorted(result['ballot'], key=lambda cid: (choice_order.get(cid, len(choice_order)), cid)):
+                choice_title = self.tree.choice_title(choice_id, choice_id)
+                calculation_path = []
+                for source_ballot, source_info in zip(source_ballots, sources_info):
+                    calculation_path.append({
+                        'voter': source_info['from_voter'],
+                        'voter_id': source_info['from_voter_id'],
+                        'stars': float(source_ballot.get(choice_id, Decimal('0'))),
+                        'weight': 1.0 / len(source_ballots),
+                        'tags': source_info['tags'],
+                        'is_anonymous': source_info['is_anonymous']
+                    })
                 
-                # Track source info
-                sources_info.append({
-                    'from_voter': self.user_lookup.get(followee_id, followee_id),
-                    'from_voter_id': followee_id,
-                    'tags': matching_tags,
-                    'order': follow_order,
-                    'is_anonymous': followee_result.get('is_anonymous', False)
+                self.tree.add('inheritance_chains', {
+                    'final_voter': self.user_lookup.get(voter_id, voter_id),
+                    'final_voter_id': voter_id,
+                    'choice': choice_id,
+                    'choice_title': choice_title,
+                    'final_stars': float(result['ballot'][choice_id]),
+                    'calculation_path': calculation_path
                 })
         
-        # 7. AVERAGE BALLOTS (simple averaging, not STAR voting)
-        if not ballots_to_average:
-            # Following others but no tag matches
-            self._add_node_to_tree(voter_id, None, delegation_depth, sources=[], 
-                                  reason="Following others but no tag matches")
-            return None
-        
-        # Average all inherited ballots
-        calculated_ballot = {}
-        all_choice_ids = set()
-        for ballot in ballots_to_average:
-            all_choice_ids.update(ballot.keys())
-        
-        for choice_id in all_choice_ids:
-            total_stars = sum(ballot.get(choice_id, Decimal('0')) for ballot in ballots_to_average)
-            avg_stars = total_stars / Decimal(len(ballots_to_average))
-            calculated_ballot[choice_id] = avg_stars
-        
-        # 8. BUILD RESULT
-        ballot_result = {
-            'ballot': calculated_ballot,
-            'tags': list(inherited_tags),
-            'type': 'calculated',
-            'is_anonymous': snapshot_data['existing_ballots'].get(voter_id, {}).get('is_anonymous', False)
-        }
-        
-        # Add to delegation tree nodes
-        self._add_node_to_tree(voter_id, ballot_result, delegation_depth, sources=sources_info)
-        
-        # Add inheritance chains for each choice
-        for choice_id, final_stars in calculated_ballot.items():
-            choice_title = next(
-                (c['title'] for c in snapshot_data['choices_data'] if c['id'] == choice_id),
-                choice_id
-            )
-            calculation_path = []
-            for source_ballot, source_info in zip(ballots_to_average, sources_info):
-                calculation_path.append({
-                    'voter': source_info['from_voter'],
-                    'voter_id': source_info['from_voter_id'],
-                    'stars': float(source_ballot.get(choice_id, Decimal('0'))),
-                    'weight': 1.0 / len(ballots_to_average),
-                    'tags': source_info['tags'],
-                    'is_anonymous': source_info['is_anonymous']
-                })
-            
-            self.delegation_tree['inheritance_chains'].append({
-                'final_voter': self.user_lookup.get(voter_id, voter_id),
-                'final_voter_id': voter_id,
-                'choice': choice_id,
-                'choice_title': choice_title,
-                'final_stars': float(final_stars),
-                'calculation_path': calculation_path
+        # Record followings that were cut to break delegation cycles
+        for follower_id, followee_id in engine.circular_prevented:
+            path_str = ' → '.join([self.user_lookup.get(vid, vid) for vid in (follower_id, followee_id)])
+            self.tree.add('circular_prevented', {
+                'voter': self.user_lookup.get(followee_id, followee_id),
+                'voter_id': followee_id,
+                'attempted_path': path_str
             })
-        
-        # Cache and return
-        self.calculated_ballots_cache[voter_id] = ballot_result
-        return ballot_result
+            self.logger.info(f"Circular reference prevented: {path_str}")
+        self.stats['circular_prevented'] = len(engine.circular_prevented)
     
     def _add_node_to_tree(self, voter_id, ballot_result, delegation_depth, sources, reason=None):
         """Add a node to the delegation tree structure."""
         if ballot_result is None:
             # No ballot
-            self.delegation_tree['nodes'].append({
+            self.tree.set_node({
                 'voter_id': voter_id,
                 'username': self.user_lookup.get(voter_id, voter_id),
                 'vote_type': 'no_ballot',
@@ -1273,7 +1584,10 @@ class SnapshotBasedStageBallots(Service):
                 'username': self.user_lookup.get(voter_id, voter_id),
                 'is_anonymous': ballot_result.get('is_anonymous', False),
                 'vote_type': ballot_result['type'],
-                'votes': {cid: {'stars': float(stars), 'choice_name': 'Choice'} for cid, stars in ballot_result['ballot'].items()},
+                'votes': {
+                    cid: {'stars': float(stars), 'choice_name': self.tree.choice_title(cid, cid)}
+                    for cid, stars in ballot_result['ballot'].items()
+                },
                 'tags': ballot_result['tags'],
                 'delegation_depth': delegation_depth
             }
@@ -1282,22 +1596,166 @@ class SnapshotBasedStageBallots(Service):
                 node['sources'] = sources
                 node['inherited_tags'] = ballot_result['tags']
             
-            self.delegation_tree['nodes'].append(node)
+            self.tree.set_node(node)
     
     def _add_edge_to_tree(self, follower_id, followee_id, tags, order, active_for_decision):
         """Add an edge to the delegation tree structure."""
-        # Check if edge already exists
-        existing_edge = next(
-            (e for e in self.delegation_tree['edges'] 
-             if e['follower'] == follower_id and e['followee'] == followee_id),
-            None
+        # Keeps the first edge for a (follower, followee) pair
+        self.tree.add_edge({
+            'follower': follower_id,
+            'followee': followee_id,
+            'tags': tags,
+            'order': order,
+            'active_for_decision': active_for_decision
+        })
+
+
+class PruneSnapshots(Service):
+    """
+    Apply a snapshot retention policy to every decision (or one decision).
+    
+    Snapshots not retained by the policy (see democracy/snapshot_retention.py)
+    are deleted, or compacted to their results. Each decision is handled in
+    batches of short transactions, newest first so deltas go before their
+    parents. Retained deltas of a pruned snapshot are made keyframes first.
+    """
+    
+    def __init__(self, *args, decision_id=None, policy=None, compact=False, dry_run=False,
+                 batch_size=100, now=None, **kwargs):
+        """
+        Initialize pruning.
+        
+        Args:
+            decision_id: UUID of a single decision to prune (default: all decisions)
+            policy (RetentionPolicy, optional): Defaults to the SNAPSHOT_RETENTION_* settings
+            compact (bool): Compact pruned snapshots instead of deleting them
+            dry_run (bool): Only report what would be pruned
+            batch_size (int): Snapshots deleted per transaction
+            now (datetime, optional): Reference time for the policy windows
+        """
+        super().__init__(*args, **kwargs)
+        self.decision_id = decision_id
+        self.policy = policy or RetentionPolicy.from_settings()
+        self.compact = compact
+        self.dry_run = dry_run
+        self.batch_size = max(batch_size, 1)
+        self.now = now
+        self.logger = logging.getLogger(__name__)
+    
+    def process(self):
+        """
+        Prune snapshots.
+        
+        Returns:
+            dict: Totals ('decisions', 'examined', 'kept', 'deleted', 'compacted',
+                'skipped', 'reclaimed_bytes') and 'per_decision' stats by decision id.
+                'reclaimed_bytes' is net of retained deltas rewritten as keyframes,
+                so compacting snapshots of short delta chains can reclaim little.
+                A dry run reports the snapshots and bytes it would prune under
+                'deleted'/'compacted' and 'reclaimed_bytes'.
+        """
+        now = self.now or timezone.now()
+        snapshots = DecisionSnapshot.objects.all()
+        if self.decision_id is not None:
+            snapshots = snapshots.filter(decision_id=self.decision_id)
+        decision_ids = snapshots.order_by().values_list('decision_id', flat=True).distinct()
+        
+        self.stats = {
+            'decisions': 0, 'examined': 0, 'kept': 0, 'deleted': 0,
+            'compacted': 0, 'skipped': 0, 'reclaimed_bytes': 0, 'per_decision': {},
+        }
+        for decision_id in list(decision_ids):
+            stats = self._prune_decision(decision_id, now)
+            self.stats['decisions'] += 1
+            for key, value in stats.items():
+                self.stats[key] += value
+            self.stats['per_decision'][str(decision_id)] = stats
+        
+        self.logger.info(
+            f"[SNAPSHOT_RETENTION] {'Dry run: ' if self.dry_run else ''}"
+            f"{self.stats['deleted']} deleted, {self.stats['compacted']} compacted, "
+            f"{self.stats['kept']} kept, {self.stats['reclaimed_bytes']} bytes reclaimed"
         )
+        return self.stats
+    
+    def _prune_decision(self, decision_id, now):
+        """
+        Apply the policy to one decision's snapshots.
         
-        if not existing_edge:
-            self.delegation_tree['edges'].append({
-                'follower': follower_id,
-                'followee': followee_id,
-                'tags': tags,
-                'order': order,
-                'active_for_decision': active_for_decision
-            })
+        Args:
+            decision_id: UUID of the decision
+            now (datetime): Reference time for the policy windows
+            
+        Returns:
+            dict: examined, kept, deleted, compacted, skipped and reclaimed_bytes
+        """
+        rows = list(
+            DecisionSnapshot.objects.filter(decision_id=decision_id)
+            .order_by('-created_at')
+            .values('id', 'created_at', 'calculation_status', 'is_final')
+        )
+        kept = self.policy.retained(rows, now)
+        pruned = [row['id'] for row in rows if row['id'] not in kept]
+        stats = {
+            'examined': len(rows), 'kept': len(kept), 'deleted': 0,
+            'compacted': 0, 'skipped': 0, 'reclaimed_bytes': 0,
+        }
+        if not pruned:
+            return stats
+        
+        if self.dry_run:
+            stats['compacted' if self.compact else 'deleted'] = len(pruned)
+            stats['reclaimed_bytes'] = self._stored_bytes(pruned)
+            return stats
+        
+        if self.compact:
+            for snapshot_id in pruned:
+                rebased = self._rebased_ids([snapshot_id])
+                before = self._stored_bytes([snapshot_id, *rebased])
+                with transaction.atomic():
+                    snapshot = DecisionSnapshot.objects.filter(id=snapshot_id).first()
+                    if snapshot is None or not compact_snapshot(snapshot, now):
+                        stats['skipped'] += 1
+                        continue
+                stats['compacted'] += 1
+                stats['reclaimed_bytes'] += before - self._stored_bytes([snapshot_id, *rebased])
+            return stats
+        
+        # Kept deltas of pruned snapshots must not depend on them any more
+        rebased = self._rebased_ids(pruned)
+        before = self._stored_bytes(rebased)
+        for snapshot in DecisionSnapshot.objects.filter(id__in=rebased).order_by('created_at'):
+            snapshot.make_keyframe()
+        stats['reclaimed_bytes'] -= self._stored_bytes(rebased) - before
+        
+        for start in range(0, len(pruned), self.batch_size):
+            batch = pruned[start:start + self.batch_size]
+            try:
+                with transaction.atomic():
+                    size = self._stored_bytes(batch)
+                    _, deleted = DecisionSnapshot.objects.filter(id__in=batch).delete()
+            except RestrictedError:
+                # A new delta of one of these snapshots appeared since selection
+                self.logger.warning(f"[SNAPSHOT_RETENTION] Skipped {len(batch)} snapshots still referenced by deltas")
+                stats['skipped'] += len(batch)
+                continue
+            stats['deleted'] += deleted.get(DecisionSnapshot._meta.label, 0)
+            stats['reclaimed_bytes'] += size
+        return stats
+    
+    @staticmethod
+    def _rebased_ids(pruned):
+        """Ids of deltas of the pruned snapshots that are not pruned themselves."""
+        return list(
+            DecisionSnapshot.objects.filter(parent_id__in=pruned)
+            .exclude(id__in=pruned).values_list('id', flat=True)
+        )
+    
+    @staticmethod
+    def _stored_bytes(snapshot_ids):
+        """Stored data size of the given snapshots in bytes."""
+        if not snapshot_ids:
+            return 0
+        return DecisionSnapshot.objects.filter(id__in=snapshot_ids).aggregate(
+            size=Sum(stored_bytes())
+        )['size'] or 0
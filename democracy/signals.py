@@ -23,11 +23,13 @@ Integration with Plan #21 Snapshot System:
 import logging
 import threading
 import traceback
+from django.conf import settings
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 
 from democracy.models import Following, Ballot, Decision, Membership
+from democracy.delegation import SharedCondensation
 from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots, Tally
 
 logger = logging.getLogger(__name__)
@@ -94,8 +96,11 @@ def recalculate_community_decisions_async(community_id, trigger_event="unknown",
         user_id (UUID, optional): User who triggered the event
         
     This function:
-    1. Creates calculation snapshots for all open decisions
-    2. Runs SnapshotBasedStageBallots service for each decision
+    1. Captures memberships/followings once and creates calculation snapshots
+       for all open decisions (skipping decisions whose inputs hash matches
+       their latest completed snapshot, see SNAPSHOT_REUSE_UNCHANGED)
+    2. Runs SnapshotBasedStageBallots service for each decision against one
+       shared follow graph and SCC condensation
     3. Runs Tally service to calculate STAR voting results
     4. Logs comprehensive event information for transparency
     5. Closes database connections to prevent pool exhaustion
@@ -125,13 +130,16 @@ def recalculate_community_decisions_async(community_id, trigger_event="unknown",
             
         logger.info(f"[RECALC_PROCESSING] [system] - Processing {open_decisions.count()} open decisions in {community.name}")
         
-        # Process each decision with snapshot isolation
+        # Memberships and followings are shared by every open decision: capture them once
+        from democracy.models import DecisionSnapshot
+        from django.db import transaction
+        community_state = CreateCalculationSnapshot.capture_community_state(community)
+        
+        # STEP 1: Create one snapshot per decision with snapshot isolation
+        snapshots = []
         for decision in open_decisions:
             try:
                 # Atomic check and create to prevent race conditions
-                from democracy.models import DecisionSnapshot
-                from django.db import transaction
-                
                 with transaction.atomic():
                     # Use select_for_update to lock the decision row
                     locked_decision = Decision.objects.select_for_update().get(id=decision.id)
@@ -146,29 +154,44 @@ def recalculate_community_decisions_async(community_id, trigger_event="unknown",
                         logger.info(f"[SNAPSHOT_SKIP] [system] - Skipping '{locked_decision.title}' - already has active calculation: {active_snapshot.id}")
                         continue
                     
-                    # STEP 1: Calculate ballots in database (Plan #9: needed before snapshot)
-                    logger.info(f"[STAGE_BALLOTS_START] [system] - Calculating ballots in database for '{locked_decision.title}'")
-                    from democracy.services import StageBallots
-                    stage_ballots_service = StageBallots()
-                    # Process only this decision's ballots
-                    for membership in locked_decision.community.memberships.all():
-                        stage_ballots_service.get_or_calculate_ballot(
-                            locked_decision, 
-                            membership.member
-                        )
-                    logger.info(f"[STAGE_BALLOTS_COMPLETE] [system] - Database ballots calculated")
-                    
-                    # STEP 2: Create calculation snapshot (Plan #8 integration) - now captures the ballots we just created
+                    # Capture raw state once (Plan #9 ORM staging step no longer needed)
                     logger.info(f"[SNAPSHOT_CREATE_START] [system] - Creating snapshot for decision '{locked_decision.title}'")
-                    snapshot_service = CreateCalculationSnapshot(locked_decision.id)
+                    snapshot_service = CreateCalculationSnapshot(
+                        locked_decision.id, community_state=community_state,
+                        reuse_unchanged=settings.SNAPSHOT_REUSE_UNCHANGED,
+                    )
                     snapshot = snapshot_service.process()
+                    
+                    if snapshot_service.unchanged:
+                        # Same inputs as the latest completed snapshot: its results still hold
+                        logger.info(f"[SNAPSHOT_UNCHANGED] [system] - Inputs unchanged for '{locked_decision.title}', reusing snapshot {snapshot.id}")
+                        locked_decision.results_need_updating = False
+                        locked_decision.save(update_fields=['results_need_updating'])
+                        continue
                 logger.info(f"[SNAPSHOT_CREATE_COMPLETE] [system] - Snapshot created successfully: {snapshot.id}")
+                snapshots.append((decision, snapshot))
                 
-                # STEP 3: Process snapshot ballots (Plan #9: builds delegation tree from frozen state)
+            except Exception as e:
+                logger.error(f"[RECALC_ERROR] [system] - Failed to recalculate decision '{decision.title}': {str(e)}")
+                logger.error(f"[RECALC_ERROR] [system] - Traceback: {traceback.format_exc()}")
+                continue
+        
+        # Follow graph and its SCC condensation are computed once for the whole batch
+        condensation = None
+        for decision, snapshot in snapshots:
+            try:
+                if condensation is None:
+                    condensation = SharedCondensation.from_snapshot(snapshot.snapshot_data)
+                
+                # STEP 2: Resolve delegation once from the frozen state; builds the delegation
+                # tree and persists calculated Ballot/Vote rows from the same result. Incremental:
+                # only members who transitively follow a changed member are recomputed.
                 logger.info(f"[SNAPSHOT_PROCESS_START] [system] - Processing snapshot-based calculation for decision '{decision.title}'")
                 stage_start_time = timezone.now()
                 
-                stage_service = SnapshotBasedStageBallots(snapshot.id)
+                stage_service = SnapshotBasedStageBallots(
+                    snapshot.id, persist_ballots=True, incremental=True, condensation=condensation
+                )
                 stage_service.process()
                 
                 stage_duration = (timezone.now() - stage_start_time).total_seconds()
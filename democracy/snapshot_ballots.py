@@ -0,0 +1,111 @@
+"""
+Compact, exact ballot section for calculation snapshots.
+
+The delegation tree stores stars as floats for display, so tallying from it
+means float-rounded values and a Decimal(str(float)) round trip per vote.
+Staging instead stores the effective ballots the tally counts as:
+
+    {
+        'choices': [choice_id, ...],        # column index
+        'places': 11,                       # stars are scaled by 10^places
+        'voters': [voter_id, ...],          # one per row
+        'ballots': [[415, null, 0], ...],   # scaled ints, null = not listed
+    }
+
+Scaled integers are exact for any Decimal, so decode_ballots() returns the
+same values the delegation engine produced.
+"""
+
+from decimal import Decimal
+
+
+def decimal_places(value):
+    """
+    Decimal places needed to represent a Decimal exactly.
+
+    Args:
+        value (Decimal): Star rating
+
+    Returns:
+        int or None: Number of places, or None for negative or non-finite values
+    """
+    if not value.is_finite() or value < 0:
+        return None
+    return max(0, -value.as_tuple().exponent)
+
+
+def encode_ballots(ballots, choices=()):
+    """
+    Encode effective ballots as a compact snapshot section.
+
+    Args:
+        ballots (dict): voter_id -> {choice_id: Decimal stars}
+        choices (iterable): Choice ids for the leading columns (e.g. the
+            decision's choices); choices only found on ballots follow
+
+    Returns:
+        dict: Section with 'choices', 'places', 'voters' and 'ballots'
+
+    Raises:
+        ValueError: If a star value is negative or not finite
+    """
+    column_of = {choice_id: column for column, choice_id in enumerate(choices)}
+    places = 0
+    for ballot in ballots.values():
+        for choice_id, stars in ballot.items():
+            if choice_id not in column_of:
+                column_of[choice_id] = len(column_of)
+            value_places = decimal_places(stars)
+            if value_places is None:
+                raise ValueError(f"Cannot encode star value {stars}")
+            places = max(places, value_places)
+
+    rows = []
+    for ballot in ballots.values():
+        row = [None] * len(column_of)
+        for choice_id, stars in ballot.items():
+            sign, digits, exponent = stars.as_tuple()
+            row[column_of[choice_id]] = int(''.join(map(str, digits))) * 10 ** (exponent + places)
+        rows.append(row)
+
+    return {
+        'choices': list(column_of),
+        'places': places,
+        'voters': list(ballots),
+        'ballots': rows,
+    }
+
+
+def decode_ballots(section, voter_ids=None):
+    """
+    Decode a ballot section back to exact Decimal ballots.
+
+    Args:
+        section (dict): Output of encode_ballots()
+        voter_ids (iterable, optional): Only decode these voters (voters
+            without a row are skipped)
+
+    Returns:
+        dict: voter_id -> {choice_id: Decimal stars}
+    """
+    choices = section['choices']
+    exponent = f"E-{section['places']}"
+    values = {}
+
+    def decode(row):
+        ballot = {}
+        for choice_id, scaled in zip(choices, row):
+            if scaled is not None:
+                if scaled not in values:
+                    values[scaled] = Decimal(f"{scaled}{exponent}")
+                ballot[choice_id] = values[scaled]
+        return ballot
+
+    if voter_ids is None:
+        return {voter_id: decode(row) for voter_id, row in zip(section['voters'], section['ballots'])}
+
+    row_of = {voter_id: row for row, voter_id in enumerate(section['voters'])}
+    return {
+        voter_id: decode(section['ballots'][row_of[voter_id]])
+        for voter_id in voter_ids if voter_id in row_of
+    }
@@ -0,0 +1,177 @@
+"""
+Retention policy for DecisionSnapshot rows.
+
+Every recalculation of an open decision stores a new snapshot, and nothing
+removed old ones. A RetentionPolicy decides, per decision, which snapshots
+to keep; PruneSnapshots (democracy/services.py) deletes or compacts the rest.
+
+A snapshot is kept when any rule applies:
+
+    active      still being created, staged or tallied
+    final       the decision's final results
+    latest      the newest snapshot, and the newest completed one (reuse,
+                incremental staging and delta encoding build on them)
+    keep_last   one of the last N completed snapshots
+    hourly      the newest completed snapshot of its hour, within the last
+                `hourly_hours` hours (None: the whole history)
+    failed      a failed or corrupted snapshot younger than `failed_days`
+
+Compacting a snapshot keeps its row, decision data, choices, statistics and
+preference matrix (what the history list and results need) and drops the
+captured inputs, ballots and delegation tree.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import IntegerField, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Length
+
+from .snapshot_store import encode_snapshot
+
+
+ACTIVE_STATUSES = ('creating', 'ready', 'staging', 'tallying')
+FAILED_STATUSES = ('failed_snapshot', 'failed_staging', 'failed_tallying', 'failed_timeout', 'corrupted')
+
+# Top-level snapshot_data keys dropped by compaction
+COMPACTED_KEYS = (
+    'community_memberships', 'non_voting_memberships', 'followings', 'existing_ballots',
+    'resolved_ballots', 'tally_ballots', 'tally_state', 'delegation_tree',
+)
+
+
+def stored_bytes():
+    """
+    Database expression for a snapshot's stored data size in bytes.
+
+    Counts the binary container and any legacy JSON document.
+    """
+    return (
+        Coalesce(Length('data_blob'), Value(0), output_field=IntegerField())
+        + Coalesce(Length(Cast('legacy_data', TextField())), Value(0), output_field=IntegerField())
+    )
+
+
+def compacted_data(snapshot_data, compacted_at):
+    """
+    Snapshot data without the bulky calculation inputs and results.
+
+    Args:
+        snapshot_data (Mapping): Snapshot data to compact
+        compacted_at (datetime): Recorded in metadata['compacted_at']
+
+    Returns:
+        dict or None: Compacted data, or None if nothing would be dropped
+    """
+    if not any(key in snapshot_data for key in COMPACTED_KEYS):
+        return None
+    data = {key: snapshot_data[key] for key in snapshot_data if key not in COMPACTED_KEYS}
+    data['metadata'] = {**data.get('metadata', {}), 'compacted_at': compacted_at.isoformat()}
+    return data
+
+
+def compact_snapshot(snapshot, compacted_at):
+    """
+    Replace a snapshot's data with compacted_data(), stored as a keyframe.
+
+    Deltas of the snapshot are made keyframes first, so their data is
+    unchanged.
+
+    Args:
+        snapshot: DecisionSnapshot to compact
+        compacted_at (datetime): Compaction time
+
+    Returns:
+        bool: False if the snapshot was already compact
+    """
+    data = compacted_data(snapshot.snapshot_data, compacted_at)
+    if data is None:
+        return False
+    for delta in snapshot.deltas.all():
+        delta.make_keyframe()
+    blob = encode_snapshot(data)
+    type(snapshot).objects.filter(pk=snapshot.pk).update(
+        data_blob=blob, legacy_data={}, parent=None, delta_depth=0
+    )
+    snapshot.refresh_from_db()
+    return True
+
+
+class RetentionPolicy:
+    """
+    Which snapshots of a decision to keep (see the module docstring).
+
+    Example:
+        >>> policy = RetentionPolicy.from_settings(keep_last=5)
+        >>> kept = policy.retained(snapshots, now=timezone.now())
+    """
+
+    def __init__(self, keep_last=10, hourly_hours=168, failed_days=7):
+        """
+        Args:
+            keep_last (int): Completed snapshots kept unconditionally
+            hourly_hours (int or None): Hours of history in which one completed
+                snapshot per hour is kept (0 disables, None keeps every hour)
+            failed_days (int): Days failed snapshots are kept for
+        """
+        self.keep_last = keep_last
+        self.hourly_hours = hourly_hours
+        self.failed_days = failed_days
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        """
+        Policy from the SNAPSHOT_RETENTION_* settings.
+
+        Args:
+            **overrides: keep_last, hourly_hours or failed_days; None values
+                fall back to the settings
+        """
+        options = {
+            'keep_last': settings.SNAPSHOT_RETENTION_KEEP_LAST,
+            'hourly_hours': settings.SNAPSHOT_RETENTION_HOURLY_HOURS,
+            'failed_days': settings.SNAPSHOT_RETENTION_FAILED_DAYS,
+        }
+        options.update((key, value) for key, value in overrides.items() if value is not None)
+        return cls(**options)
+
+    def retained(self, snapshots, now):
+        """
+        Ids of the snapshots to keep.
+
+        Args:
+            snapshots (list): One decision's snapshots, newest first, as dicts
+                with 'id', 'created_at', 'calculation_status' and 'is_final'
+            now (datetime): Reference time for the hourly and failed windows
+
+        Returns:
+            set: Ids of the retained snapshots
+        """
+        kept = set()
+        if snapshots:
+            kept.add(snapshots[0]['id'])
+
+        hourly_since = None
+        if self.hourly_hours is None:
+            hourly_since = snapshots[-1]['created_at'] if snapshots else now
+        elif self.hourly_hours > 0:
+            hourly_since = now - timedelta(hours=self.hourly_hours)
+        failed_since = now - timedelta(days=self.failed_days)
+
+        completed = 0
+        hours = set()
+        for snapshot in snapshots:
+            status = snapshot['calculation_status']
+            if status in ACTIVE_STATUSES or snapshot['is_final']:
+                kept.add(snapshot['id'])
+            elif status == 'completed':
+                hour = snapshot['created_at'].replace(minute=0, second=0, microsecond=0)
+                if completed < max(self.keep_last, 1):
+                    kept.add(snapshot['id'])
+                elif hourly_since is not None and snapshot['created_at'] >= hourly_since and hour not in hours:
+                    kept.add(snapshot['id'])
+                hours.add(hour)
+                completed += 1
+            elif status in FAILED_STATUSES and snapshot['created_at'] >= failed_since:
+                kept.add(snapshot['id'])
+        return kept
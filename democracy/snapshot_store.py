@@ -0,0 +1,452 @@
+"""
+Compact binary container for DecisionSnapshot data.
+
+A snapshot used to be one JSON document: captured inputs, resolved ballots,
+the full delegation tree and statistics. Every save rewrote all of it and
+every read parsed all of it. The container splits the top-level keys into
+sections and compresses each section separately:
+
+    inputs      metadata, community_memberships, non_voting_memberships,
+                followings, existing_ballots, decision_data, choices_data
+    ballots     resolved_ballots, tally_ballots, tally_state
+    tree        delegation_tree
+    statistics  statistics, preference_matrix
+    extra       any other key
+
+Layout (version 1):
+
+    b'CVSNAP' | version (1 byte) | header length (4 bytes, big-endian)
+    | header JSON: {"sections": [[name, [keys...], compressed length], ...],
+                    "delta": true (delta containers only)}
+    | zlib-compressed section payloads, in header order
+
+Section payloads are compact JSON in which lists of dicts are stored
+column-wise: each distinct key tuple ("shape") is listed once and every dict
+becomes a row of values. Decoding restores the original dicts, key order
+included.
+
+SnapshotData is a lazy mapping over a container: keys are known from the
+header, a section is decompressed the first time one of its keys is read,
+and encode() recompresses only sections that were changed.
+
+Delta containers ("delta": true in the header) store, per section, only
+patches against a parent snapshot's values (see diff()): changed ballots,
+followings and tree nodes rather than full copies. Keys without a patch are
+unchanged from the parent. Reading a section of a delta materializes it from
+the parent's section, so a chain of deltas ends at a full container (a
+keyframe).
+"""
+
+import json
+import struct
+import zlib
+from collections.abc import MutableMapping
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+MAGIC = b'CVSNAP'
+VERSION = 1
+COMPRESSION_LEVEL = 6
+
+SECTIONS = {
+    'inputs': (
+        'metadata', 'community_memberships', 'non_voting_memberships', 'followings', 'existing_ballots',
+        'decision_data', 'choices_data',
+    ),
+    'ballots': ('resolved_ballots', 'tally_ballots', 'tally_state'),
+    'tree': ('delegation_tree',),
+    'statistics': ('statistics', 'preference_matrix'),
+}
+EXTRA_SECTION = 'extra'
+SECTION_OF = {key: section for section, keys in SECTIONS.items() for key in keys}
+
+# Markers of a column-wise list of dicts
+SHAPES = '__shapes__'
+ROWS = '__rows__'
+
+_HEADER = struct.Struct('>6sBI')
+
+# Patch operations (see diff())
+REPLACE = '='
+DICT = 'd'
+REMOVED = 'r'
+ORDER = 'k'
+LIST = 'l'
+
+
+def section_of(key):
+    """Section a top-level snapshot key is stored in."""
+    return SECTION_OF.get(key, EXTRA_SECTION)
+
+
+def pack(value):
+    """
+    Convert lists of dicts to column-wise form, recursively.
+
+    Raises:
+        ValueError: If a dict uses exactly the column-wise marker keys
+    """
+    if isinstance(value, dict):
+        if set(value) == {SHAPES, ROWS}:
+            raise ValueError(f"Snapshot dicts cannot use the keys {SHAPES!r} and {ROWS!r}")
+        return {key: pack(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [pack(item) for item in value]
+        if len(items) < 2 or not all(isinstance(item, dict) for item in items):
+            return items
+        shapes, shape_index, rows = [], {}, []
+        for item in items:
+            keys = tuple(item)
+            if keys not in shape_index:
+                shape_index[keys] = len(shapes)
+                shapes.append(list(keys))
+            rows.append([shape_index[keys], *item.values()])
+        return {SHAPES: shapes, ROWS: rows}
+    return value
+
+
+def unpack(value):
+    """Inverse of pack()."""
+    if isinstance(value, dict):
+        if len(value) == 2 and SHAPES in value and ROWS in value:
+            shapes = value[SHAPES]
+            return [
+                {key: unpack(item) for key, item in zip(shapes[row[0]], row[1:])}
+                for row in value[ROWS]
+            ]
+        return {key: unpack(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [unpack(item) for item in value]
+    return value
+
+
+def compress_section(values):
+    """Compress one section (dict of top-level keys) to bytes."""
+    payload = json.dumps(pack(values), cls=DjangoJSONEncoder, separators=(',', ':'))
+    return zlib.compress(payload.encode(), COMPRESSION_LEVEL)
+
+
+def decompress_section(raw):
+    """Decompress bytes from compress_section() to a dict."""
+    return unpack(json.loads(zlib.decompress(raw)))
+
+
+def diff(old, new):
+    """
+    Patch that turns `old` into `new`, or None when they are identical.
+
+    Dicts are patched per key (changed keys, removed keys, and the key order
+    when it differs), lists of equal length per index; anything else is
+    replaced. Scalars must match in type as well as value (1 is not 1.0).
+
+    Args:
+        old: JSON-compatible value
+        new: JSON-compatible value
+
+    Returns:
+        dict or None: Patch for apply_patch()
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changed = {}
+        for key, value in new.items():
+            if key in old:
+                patch = diff(old[key], value)
+                if patch is not None:
+                    changed[key] = patch
+            else:
+                changed[key] = {REPLACE: value}
+        removed = [key for key in old if key not in new]
+        patched_order = [key for key in old if key in new] + [key for key in new if key not in old]
+        if not changed and not removed and patched_order == list(new):
+            return None
+        patch = {DICT: changed}
+        if removed:
+            patch[REMOVED] = removed
+        if patched_order != list(new):
+            patch[ORDER] = list(new)
+        return patch
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        changed = {}
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            patch = diff(old_item, new_item)
+            if patch is not None:
+                changed[str(index)] = patch
+        return {LIST: changed} if changed else None
+    if type(old) is type(new) and old == new:
+        return None
+    return {REPLACE: new}
+
+
+def apply_patch(old, patch):
+    """
+    Apply a patch from diff().
+
+    Unchanged parts of `old` are shared with the result, not copied.
+
+    Args:
+        old: Value the patch was computed against
+        patch (dict): Patch from diff()
+
+    Returns:
+        The patched value
+    """
+    if REPLACE in patch:
+        return patch[REPLACE]
+    if LIST in patch:
+        new = list(old)
+        for index, item_patch in patch[LIST].items():
+            new[int(index)] = apply_patch(old[int(index)], item_patch)
+        return new
+    removed = set(patch.get(REMOVED, ()))
+    new = {key: value for key, value in old.items() if key not in removed}
+    for key, item_patch in patch[DICT].items():
+        new[key] = apply_patch(old.get(key), item_patch)
+    if ORDER in patch:
+        new = {key: new[key] for key in patch[ORDER]}
+    return new
+
+
+def _split(blob):
+    """Parse a container into (header dict, {section: (keys, compressed bytes)})."""
+    blob = bytes(blob)
+    if len(blob) < _HEADER.size:
+        raise ValueError("Snapshot container is truncated")
+    magic, version, header_length = _HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot container")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot container version {version}")
+
+    offset = _HEADER.size + header_length
+    header = json.loads(blob[_HEADER.size:offset])
+    sections = {}
+    for name, keys, length in header['sections']:
+        sections[name] = (keys, blob[offset:offset + length])
+        offset += length
+    return header, sections
+
+
+def read_container(blob):
+    """
+    Split a container into its sections without decompressing them.
+
+    Args:
+        blob (bytes or memoryview): Encoded container
+
+    Returns:
+        dict: section name -> (keys, compressed bytes)
+
+    Raises:
+        ValueError: If the blob is not a container of a supported version
+    """
+    return _split(blob)[1]
+
+
+def is_delta(blob):
+    """True if the container stores patches against a parent snapshot."""
+    return _split(blob)[0].get('delta', False)
+
+
+def write_container(sections, delta=False):
+    """
+    Assemble a container.
+
+    Args:
+        sections (dict): section name -> (keys, compressed bytes)
+        delta (bool): Sections hold patches against a parent snapshot
+
+    Returns:
+        bytes: Encoded container
+    """
+    header = {'sections': [[name, list(keys), len(raw)] for name, (keys, raw) in sections.items()]}
+    if delta:
+        header['delta'] = True
+    header = json.dumps(header, separators=(',', ':')).encode()
+    return b''.join([_HEADER.pack(MAGIC, VERSION, len(header)), header, *(raw for _, raw in sections.values())])
+
+
+def encode_snapshot(data):
+    """
+    Encode snapshot data as a container.
+
+    Args:
+        data (dict): Snapshot data (top-level keys as in snapshot_data)
+
+    Returns:
+        bytes: Encoded container
+    """
+    return SnapshotData(data).encode()
+
+
+class SnapshotData(MutableMapping):
+    """
+    Snapshot data backed by a container, decoded one section at a time.
+
+    Reading a key decompresses only its section. Assigning or deleting a
+    top-level key marks its section changed; encode() recompresses changed
+    sections and reuses the stored bytes of the others. Changes made inside
+    a value (e.g. appending to a list) are not tracked: assign the key again.
+
+    Sections of a delta container are materialized from the parent's data,
+    sharing unchanged values with it. The parent must not change while
+    deltas depend on it.
+
+    Example:
+        >>> data = SnapshotData.from_container(snapshot.data_blob)
+        >>> data['statistics']          # decompresses only 'statistics'
+        >>> data['preference_matrix'] = matrix
+        >>> snapshot.data_blob = data.encode()
+        >>> child.data_blob = child_data.encode(parent=data)   # delta
+    """
+
+    def __init__(self, data=None):
+        """
+        Build from a plain dict (every section loaded and changed).
+
+        Args:
+            data (dict, optional): Snapshot data
+        """
+        self._raw = {}
+        self._keys = {}
+        self._loaded = {}
+        self._changed = set()
+        self._delta = False
+        self._parent = None
+        for key, value in (data or {}).items():
+            self[key] = value
+
+    @classmethod
+    def from_container(cls, blob, parent=None):
+        """
+        Wrap an encoded container; nothing is decompressed yet.
+
+        Args:
+            blob (bytes or memoryview): Encoded container
+            parent (callable, optional): Returns the parent's snapshot data
+                (called the first time a delta section is read)
+
+        Raises:
+            ValueError: If the blob is invalid, or a delta without a parent
+        """
+        data = cls()
+        header, sections = _split(blob)
+        data._delta = header.get('delta', False)
+        if data._delta and parent is None:
+            raise ValueError("Delta snapshot container needs its parent snapshot")
+        data._parent = parent
+        for name, (keys, raw) in sections.items():
+            data._raw[name] = raw
+            data._keys.update((key, name) for key in keys)
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        """Wrap a legacy JSON snapshot dict (loaded, but unchanged)."""
+        wrapped = cls(data)
+        wrapped._changed.clear()
+        return wrapped
+
+    @property
+    def changed(self):
+        """True if encode() would produce a different container."""
+        return bool(self._changed)
+
+    def section(self, name):
+        """
+        Decode one section.
+
+        Args:
+            name (str): Section name (see SECTIONS)
+
+        Returns:
+            dict: The section's top-level keys and values
+        """
+        if name not in self._loaded:
+            values = decompress_section(self._raw[name]) if name in self._raw else {}
+            if self._delta and name in self._raw:
+                parent = self._parent()
+                values = {
+                    key: apply_patch(parent.get(key), values[key]) if key in values else parent[key]
+                    for key in self.keys_of(name)
+                }
+            self._loaded[name] = values
+        return self._loaded[name]
+
+    def keys_of(self, name):
+        """Top-level keys stored in a section."""
+        return [key for key, section in self._keys.items() if section == name]
+
+    def sections(self):
+        """Names of the sections holding at least one key."""
+        return sorted(set(self._keys.values()))
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return self.section(self._keys[key])[key]
+
+    def __setitem__(self, key, value):
+        name = section_of(key)
+        self.section(name)[key] = value
+        self._keys[key] = name
+        self._changed.add(name)
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        name = self._keys.pop(key)
+        del self.section(name)[key]
+        self._changed.add(name)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"<SnapshotData keys={list(self._keys)}>"
+
+    def to_dict(self):
+        """Decode every section into a plain dict."""
+        return {key: self[key] for key in self}
+
+    def encode(self, parent=None):
+        """
+        Encode as a container, recompressing only changed or unstored sections.
+
+        Args:
+            parent (Mapping, optional): Parent snapshot data; encodes a delta
+                holding only patches against it (default: a full container)
+
+        Returns:
+            bytes: Encoded container
+        """
+        delta = parent is not None
+        sections = {}
+        for name in self.sections():
+            keys = self.keys_of(name)
+            if name in self._changed or name not in self._raw or delta != self._delta:
+                values = self.section(name)
+                if delta:
+                    patches = {}
+                    for key in keys:
+                        patch = diff(parent[key], values[key]) if key in parent else {REPLACE: values[key]}
+                        if patch is not None:
+                            patches[key] = patch
+                    values = patches
+                self._raw[name] = compress_section(values)
+            sections[name] = (keys, self._raw[name])
+        for name in set(self._raw) - set(sections):
+            del self._raw[name]
+        self._changed.clear()
+        if self._delta and not delta:
+            self._parent = None
+        self._delta = delta
+        if delta:
+            self._parent = lambda: parent
+        return write_container(sections, delta=delta)
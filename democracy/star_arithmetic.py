@@ -0,0 +1,265 @@
+"""
+Star arithmetic backends for delegation averaging and STAR tallying.
+
+CrowdVote computes star ratings with `Decimal` at 12 significant digits
+(`getcontext().prec = 12`). Every Decimal addition and division is correctly
+rounded: the result is the exact result rounded (ROUND_HALF_EVEN) to 12
+significant digits. This module provides two interchangeable backends:
+
+- DecimalStars (default): the existing Decimal arithmetic.
+- FixedPointStars (opt-in): stars as plain Python ints scaled by 10^20. Each
+  addition and division is performed exactly in integer arithmetic and then
+  rounded to 12 significant digits with ROUND_HALF_EVEN, i.e. the same rounding
+  the Decimal context applies. Values are converted to `Decimal` only at the
+  persistence/reporting boundary.
+
+Decimal arithmetic runs in STAR_CONTEXT (star_context()), not the ambient
+context: `getcontext().prec = 12` in star_voting only configures the thread
+that imports it, and recalculation threads start from decimal.DefaultContext
+(28 digits).
+
+Equivalence guarantee: FixedPointStars produces exactly the same values (and
+therefore the same winners, tiebreaks and quantized scores) as DecimalStars as
+long as every non-zero intermediate star value is at least 1e-8, so that its
+12 significant digits fit the 10^-20 grid. Star ratings are in 0-5 and votes
+are entered with 2 decimals, so only pathological dilution (a 0.01 star vote
+averaged with ~10^6 zeros) leaves that regime. See
+tests/test_services/test_star_arithmetic.py for the equivalence harness.
+"""
+
+from decimal import Context, Decimal, localcontext
+
+
+# Significant digits of every star addition and division
+STAR_PRECISION = 12
+STAR_CONTEXT = Context(prec=STAR_PRECISION)
+
+# Same quantum as star_voting.quantize_stars (8 decimal places)
+STAR_QUANTUM = Decimal('0.00000001')
+
+
+def star_context():
+    """
+    Decimal context for star arithmetic, whatever the calling thread's context.
+
+    Example:
+        >>> with star_context():
+        ...     Decimal(2) / Decimal(3)
+        Decimal('0.666666666667')
+    """
+    return localcontext(STAR_CONTEXT)
+
+
+def _divide_half_even(numerator, denominator):
+    """Divide non-negative ints, rounding the quotient ROUND_HALF_EVEN."""
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+class DecimalStars:
+    """
+    Decimal star arithmetic (the reference implementation).
+
+    Example:
+        >>> arithmetic = DecimalStars()
+        >>> arithmetic.average([Decimal('4.00'), Decimal('3.00')], 2)
+        Decimal('3.50')
+    """
+
+    name = 'decimal'
+    zero = Decimal('0')
+    five = Decimal('5')
+
+    def parse(self, value):
+        """Convert a stored star value (str, int or Decimal) to this backend."""
+        return value if isinstance(value, Decimal) else Decimal(value)
+
+    def to_decimal(self, value):
+        """Convert a backend value to Decimal."""
+        return value
+
+    def average(self, values, count):
+        """
+        Delegation averaging: sum of values over `count` inherited ballots.
+
+        Args:
+            values (iterable): Star values present on the ballots (missing = 0 stars)
+            count (int): Number of ballots being averaged
+
+        Returns:
+            Decimal: Unquantized average
+        """
+        with localcontext(STAR_CONTEXT):
+            return sum(values) / Decimal(count)
+
+    def score(self, values, count):
+        """
+        Tally score: sum of values over `count` ballots, quantized to 8 places.
+
+        Args:
+            values (iterable): Star values present on ballots (missing = 0 stars)
+            count (int): Number of ballots
+
+        Returns:
+            Decimal: Average stars quantized to 8 decimal places
+        """
+        with localcontext(STAR_CONTEXT):
+            total_stars = Decimal('0')
+            for stars in values:
+                total_stars += stars
+            return (total_stars / Decimal(count)).quantize(STAR_QUANTUM)
+
+
+class FixedPointStars:
+    """
+    Integer star arithmetic emulating Decimal's 12-significant-digit rounding.
+
+    Values are ints holding stars x 10^20.
+
+    Example:
+        >>> arithmetic = FixedPointStars()
+        >>> arithmetic.to_decimal(arithmetic.average([arithmetic.parse('1')], 3))
+        Decimal('0.333333333333')
+    """
+
+    name = 'fixed'
+    PRECISION = STAR_PRECISION
+    SCALE_DIGITS = 20
+    SCALE = 10 ** SCALE_DIGITS
+    QUANTUM = 10 ** (SCALE_DIGITS - 8)
+    zero = 0
+    five = 5 * SCALE
+
+    _POWERS = [10 ** exponent for exponent in range(80)]
+
+    _divide_half_even = staticmethod(_divide_half_even)
+
+    def _digits(self, value):
+        """Number of decimal digits of a positive int."""
+        digits = (value.bit_length() * 1233) >> 12  # floor(bits * log10(2))
+        if value >= self._POWERS[digits]:
+            digits += 1
+        return digits
+
+    def _round_significant(self, numerator, denominator=1):
+        """
+        Round the exact quotient numerator / denominator (in scaled units) to
+        PRECISION significant digits, like a Decimal operation would.
+        """
+        if numerator == 0:
+            return 0
+        excess = self._digits(numerator // denominator or 1) - self.PRECISION
+        if excess <= 0:
+            # Fewer than PRECISION digits above the 10^-20 grid: round on the grid
+            return self._divide_half_even(numerator, denominator)
+        unit = self._POWERS[excess]
+        return self._divide_half_even(numerator, denominator * unit) * unit
+
+    def parse(self, value):
+        """Convert a stored star value (str, int or Decimal) to scaled int."""
+        if not isinstance(value, Decimal):
+            value = Decimal(value)
+        sign, digits, exponent = value.as_tuple()
+        coefficient = int(''.join(map(str, digits)))
+        shift = exponent + self.SCALE_DIGITS
+        if shift >= 0:
+            scaled = coefficient * self._POWERS[shift]
+        else:
+            scaled = self._divide_half_even(coefficient, self._POWERS[-shift])
+        return -scaled if sign else scaled
+
+    def to_decimal(self, value):
+        """Convert a scaled int to an exact Decimal (trailing zeros stripped)."""
+        if value == 0:
+            return Decimal('0')
+        exponent = -self.SCALE_DIGITS
+        while exponent < 0 and value % 10 == 0:
+            value //= 10
+            exponent += 1
+        return Decimal(f"{value}E{exponent}")
+
+    def average(self, values, count):
+        """Delegation averaging with Decimal-identical rounding of sum and quotient."""
+        total = 0
+        for stars in values:
+            total = self._round_significant(total + stars)
+        return self._round_significant(total, count)
+
+    def score(self, values, count):
+        """Tally score with Decimal-identical rounding, quantized to 8 places."""
+        total = 0
+        for stars in values:
+            total = self._round_significant(total + stars)
+        average = self._round_significant(total, count)
+        return Decimal(self._divide_half_even(average, self.QUANTUM)).scaleb(-8)
+
+
+def quantized_mean(total, count, places, precision=STAR_PRECISION):
+    """
+    Decimal-identical `quantize_stars(total_stars / Decimal(count))`.
+
+    Emulates the Decimal division (rounded to `precision` significant digits)
+    followed by quantization to 8 places, both ROUND_HALF_EVEN, for any
+    magnitude. The total must be exact, i.e. the Decimal running sum must not
+    have been rounded.
+
+    Args:
+        total (int): Non-negative sum of stars scaled by 10^places
+        count (int): Number of ballots
+        places (int): Decimal places of the scaled total
+
+    Returns:
+        Decimal: Average stars with exactly 8 decimal places
+    """
+    if total == 0:
+        return Decimal(0).scaleb(-8)
+    numerator, denominator = total, count * 10 ** places
+    # Pick the exponent that leaves `precision` digits before the decimal point
+    exponent = len(str(numerator)) - len(str(denominator)) - precision
+    while True:
+        if exponent < 0:
+            truncated = numerator * 10 ** -exponent // denominator
+        else:
+            truncated = numerator // (denominator * 10 ** exponent)
+        if truncated >= 10 ** precision:
+            exponent += 1
+        elif truncated < 10 ** (precision - 1):
+            exponent -= 1
+        else:
+            break
+    if exponent < 0:
+        coefficient = _divide_half_even(numerator * 10 ** -exponent, denominator)
+    else:
+        coefficient = _divide_half_even(numerator, denominator * 10 ** exponent)
+
+    if exponent >= -8:
+        quantized = coefficient * 10 ** (exponent + 8)
+    else:
+        quantized = _divide_half_even(coefficient, 10 ** (-8 - exponent))
+    return Decimal(f"{quantized}E-8")
+
+
+BACKENDS = {
+    DecimalStars.name: DecimalStars,
+    FixedPointStars.name: FixedPointStars,
+}
+
+
+def get_star_arithmetic(name=None):
+    """
+    Return a star arithmetic backend by name.
+
+    Args:
+        name (str, optional): 'decimal' (default) or 'fixed'; defaults to the
+            STAR_ARITHMETIC setting
+
+    Returns:
+        DecimalStars or FixedPointStars instance
+    """
+    if name is None:
+        from django.conf import settings
+        name = getattr(settings, 'STAR_ARITHMETIC', DecimalStars.name)
+    return BACKENDS[name]()
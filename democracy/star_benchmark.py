@@ -0,0 +1,291 @@
+"""
+STAR tally benchmarks with synthetic elections.
+
+Generates reproducible STAR elections and times STARVotingTally.run() per
+phase, so regressions in democracy/star_voting.py show up as numbers that can
+be compared across commits (see the benchmark_star_tally management command).
+
+Random elections draw every ballot from a score distribution:
+
+- uniform: whole stars 0-5, equally likely
+- polarized: mostly 0 or 5 stars
+- consensus: whole stars around a per-choice mean (most choices score alike,
+  so the top two are close)
+- fractional: 2-decimal stars, like calculated (delegated) ballots
+
+Tie scenarios are small engineered ballot sets, repeated to the requested
+size (repetition preserves every tie), that force each tiebreaker step:
+
+- score_tie_first: three-way tie for first, Step 1 eliminates the choice
+  losing the most head-to-head matchups
+- score_tie_second: tie for second, broken head-to-head (Step 1)
+- score_tie_cycle: three-way tie with a head-to-head cycle (Step 1
+  inconclusive)
+- runoff_score: equal runoff preferences, higher score wins (Step 2)
+- runoff_five_star: equal preferences and scores, more five-star ratings
+  wins (Step 3)
+- unresolved: every automatic step ties (Step 4, UnresolvedTieError)
+"""
+
+import random
+import statistics
+import tracemalloc
+from decimal import Decimal
+from time import perf_counter
+
+from .exceptions import UnresolvedTieError
+from .star_voting import STARVotingTally
+
+
+DISTRIBUTIONS = ('uniform', 'polarized', 'consensus', 'fractional')
+
+PHASES = ('setup', 'scores', 'top_two', 'runoff', 'tiebreakers')
+
+# Base ballots (choice -> whole stars) for each tie scenario
+TIE_SCENARIOS = {
+    'score_tie_first': [
+        {'a': 2, 'b': 1, 'c': 0},
+        {'a': 2, 'b': 1, 'c': 0},
+        {'a': 0, 'b': 2, 'c': 4},
+    ],
+    'score_tie_second': [
+        {'a': 5, 'b': 2, 'c': 1},
+        {'a': 5, 'b': 2, 'c': 1},
+        {'a': 5, 'b': 0, 'c': 2},
+    ],
+    'score_tie_cycle': [
+        {'a': 5, 'b': 3, 'c': 4},
+        {'a': 4, 'b': 5, 'c': 3},
+        {'a': 3, 'b': 4, 'c': 5},
+    ],
+    'runoff_score': [
+        {'a': 5, 'b': 0, 'c': 0},
+        {'a': 0, 'b': 1, 'c': 0},
+    ],
+    'runoff_five_star': [
+        {'a': 5, 'b': 1},
+        {'a': 0, 'b': 4},
+    ],
+    'unresolved': [
+        {'a': 5, 'b': 3},
+        {'a': 3, 'b': 5},
+    ],
+}
+
+
+def generate_election(ballots, choices, distribution='uniform', seed=0, coverage=1.0):
+    """
+    Generate a random STAR election.
+
+    Args:
+        ballots (int): Number of ballots
+        choices (int): Number of choices (ids 'choice-00', 'choice-01', ...)
+        distribution (str): One of DISTRIBUTIONS
+        seed (int): Random seed; the same arguments give the same ballots
+        coverage (float): Probability that a ballot lists each choice (a
+            ballot always lists at least one)
+
+    Returns:
+        list: Ballot dicts mapping choice ids to Decimal stars
+
+    Raises:
+        ValueError: If the distribution is unknown or sizes are not positive
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution!r} (expected one of {', '.join(DISTRIBUTIONS)})")
+    if ballots < 1 or choices < 1:
+        raise ValueError("An election needs at least one ballot and one choice")
+
+    rng = random.Random(seed)
+    choice_ids = [f"choice-{index:02d}" for index in range(choices)]
+    means = {choice: rng.uniform(2, 3.5) for choice in choice_ids}
+    whole = [Decimal(stars) for stars in range(6)]
+
+    def stars(choice):
+        if distribution == 'uniform':
+            return whole[rng.randint(0, 5)]
+        if distribution == 'polarized':
+            return whole[rng.choice((0, 0, 0, 5, 5, 5, rng.randint(1, 4)))]
+        if distribution == 'consensus':
+            return whole[min(5, max(0, round(rng.gauss(means[choice], 1))))]
+        return Decimal(rng.randint(0, 500)).scaleb(-2)
+
+    election = []
+    for _ in range(ballots):
+        listed = [choice for choice in choice_ids if rng.random() < coverage] or [rng.choice(choice_ids)]
+        election.append({choice: stars(choice) for choice in listed})
+    return election
+
+
+def tie_election(scenario, ballots):
+    """
+    Build an engineered tie scenario with about the requested number of ballots.
+
+    Args:
+        scenario (str): Key of TIE_SCENARIOS
+        ballots (int): Target ballot count (rounded down to whole repetitions
+            of the base ballots, at least one)
+
+    Returns:
+        list: Ballot dicts mapping choice ids to Decimal stars
+    """
+    base = [
+        {choice: Decimal(stars) for choice, stars in ballot.items()}
+        for ballot in TIE_SCENARIOS[scenario]
+    ]
+    return base * max(1, ballots // len(base))
+
+
+class TimedSTARVotingTally(STARVotingTally):
+    """
+    STARVotingTally that records the wall time of each phase.
+
+    After run(), timings maps 'scores', 'top_two', 'runoff' and 'tiebreakers'
+    to seconds. Times are exclusive: tiebreakers called during top_two or
+    runoff are only counted under 'tiebreakers'.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = {}
+        self._nested = []
+
+    def run(self, ballots):
+        self.timings = {}
+        return super().run(ballots)
+
+    def _timed(self, phase, method, *args, **kwargs):
+        """Call a phase method, adding its exclusive time to timings[phase]."""
+        self._nested.append(0.0)
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            inner = self._nested.pop()
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed - inner
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def _calculate_scores(self, *args, **kwargs):
+        return self._timed('scores', super()._calculate_scores, *args, **kwargs)
+
+    def _get_top_two_with_tiebreak(self, *args, **kwargs):
+        return self._timed('top_two', super()._get_top_two_with_tiebreak, *args, **kwargs)
+
+    def _break_score_tie_multi(self, *args, **kwargs):
+        return self._timed('tiebreakers', super()._break_score_tie_multi, *args, **kwargs)
+
+    def _run_automatic_runoff(self, *args, **kwargs):
+        return self._timed('runoff', super()._run_automatic_runoff, *args, **kwargs)
+
+    def _break_runoff_tie(self, *args, **kwargs):
+        return self._timed('tiebreakers', super()._break_runoff_tie, *args, **kwargs)
+
+
+def time_tally(ballots, repeat=5, **tally_options):
+    """
+    Time STARVotingTally.run() on one election.
+
+    Args:
+        ballots (list): Ballot dicts
+        repeat (int): Number of timed runs; medians are reported
+        **tally_options: STARVotingTally arguments (arithmetic, vectorized,
+            trace_level)
+
+    Returns:
+        dict: 'outcome' ('winner' or 'unresolved'), 'winner', 'seconds'
+            (median total and per-phase seconds, plus the fastest total as
+            'min'), 'ballots_per_second' and 'peak_memory_bytes' (from a
+            separate run under tracemalloc)
+    """
+    totals = []
+    phases = {phase: [] for phase in PHASES}
+    winner = None
+    outcome = 'winner'
+
+    for _ in range(max(1, repeat)):
+        tally = TimedSTARVotingTally(**tally_options)
+        start = perf_counter()
+        try:
+            winner = tally.run(ballots)['winner']
+        except UnresolvedTieError:
+            winner, outcome = None, 'unresolved'
+        total = perf_counter() - start
+        totals.append(total)
+        for phase in PHASES[1:]:
+            phases[phase].append(tally.timings.get(phase, 0.0))
+        # Choice index, conversions and the preference matrix
+        phases['setup'].append(total - sum(tally.timings.values()))
+
+    median_total = statistics.median(totals)
+    return {
+        'outcome': outcome,
+        'winner': winner,
+        'seconds': {
+            'total': median_total,
+            'min': min(totals),
+            **{phase: statistics.median(times) for phase, times in phases.items()},
+        },
+        'ballots_per_second': len(ballots) / median_total if median_total > 0 else None,
+        'peak_memory_bytes': peak_memory(ballots, **tally_options),
+    }
+
+
+def peak_memory(ballots, **tally_options):
+    """Peak bytes allocated by one STARVotingTally.run() (tracemalloc)."""
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        STARVotingTally(**tally_options).run(ballots)
+    except UnresolvedTieError:
+        pass
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    if not already_tracing:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(sizes, choices=5, distributions=DISTRIBUTIONS, ties=True, repeat=5, seed=0,
+                   coverage=1.0, **tally_options):
+    """
+    Benchmark random elections and tie scenarios.
+
+    Args:
+        sizes (iterable): Ballot counts to benchmark
+        choices (int): Choices per random election
+        distributions (iterable): Score distributions for random elections
+        ties (bool): Also benchmark every tie scenario at each size
+        repeat (int): Timed runs per election
+        seed (int): Random seed for generated elections
+        coverage (float): Probability that a random ballot lists each choice
+        **tally_options: STARVotingTally arguments
+
+    Returns:
+        list: One dict per election with 'name', 'distribution', 'ballots',
+            'choices' and the time_tally() results
+    """
+    results = []
+    for size in sizes:
+        elections = [
+            (f"{distribution}-{size}x{choices}", distribution,
+             generate_election(size, choices, distribution, seed=seed, coverage=coverage))
+            for distribution in distributions
+        ]
+        if ties:
+            elections += [
+                (f"{scenario}-{size}", 'tie', tie_election(scenario, size))
+                for scenario in TIE_SCENARIOS
+            ]
+        for name, distribution, ballots in elections:
+            results.append({
+                'name': name,
+                'distribution': distribution,
+                'ballots': len(ballots),
+                'choices': len({choice for ballot in ballots for choice in ballot}),
+                **time_tally(ballots, repeat=repeat, **tally_options),
+            })
+    return results
@@ -0,0 +1,346 @@
+"""
+Differential fuzzer for the STAR tally implementations.
+
+Every optimization of STARVotingTally (fixed-point arithmetic, the NumPy
+ballot matrix, incremental counts, batch variants) must leave election
+outcomes exactly unchanged. This module runs the Decimal reference tally side
+by side with each alternative backend on generated ballot sets and reports
+any disagreement in winners, scores, runoff details, preference matrices,
+tally logs, UnresolvedTieError payloads or ValueError messages.
+
+Ballot sets come from random and adversarial strategies:
+
+- random: partial ballots with whole or 2-decimal stars
+- heavy_ties: few distinct star values and duplicated ballots
+- mirrored: ballots paired with their mirror image (symmetric, unresolvable ties)
+- all_zero: every listed choice gets 0 stars
+- single_choice: one choice only
+- near_equal: 8-place fractional stars from quantize_stars() that differ by
+  a few quanta
+- empty: blank ballots mixed in (all blank raises ValueError)
+- delegated: 12-significant-digit means of 2-7 whole-star ballots, as
+  calculated ballots inherit them from followed members
+
+Besides the scalar, fixed-point, vectorized and batch backends, the incremental
+tally is checked the way Tally uses it (incremental counts only while their
+sums are exact, the ballots otherwise, after updating a partial state), and the
+Decimal and fixed-point tallies are rerun in a worker thread, whose default
+Decimal context is not the module's.
+
+A failing case is shrunk greedily (dropping ballots, choices and single
+ratings, then simplifying star values) to a minimal reproduction.
+
+Example:
+    >>> failures = fuzz(iterations=200, seed=1)
+    >>> failures
+    []
+"""
+
+import random
+import threading
+from decimal import Decimal
+
+from .exceptions import UnresolvedTieError
+from .star_arithmetic import FixedPointStars, star_context
+from .star_incremental import IncrementalSTARTally
+from .star_voting import STARVotingTally, quantize_stars
+
+
+REFERENCE = 'reference'
+
+# Result fields that must be identical across backends
+COMPARED_FIELDS = ('winner', 'scores', 'runoff_details', 'preference_matrix', 'tally_log')
+
+
+
+def incremental_tally(ballots):
+    """
+    Tally through IncrementalSTARTally as Tally does.
+
+    The state is built from the first half of the ballots and updated with the
+    rest (plus one ballot added and removed again); its counts are used only
+    while exact, otherwise the ballots are tallied.
+    """
+    half = len(ballots) // 2
+    incremental = IncrementalSTARTally.from_ballots(ballots[:half])
+    for ballot in ballots[half:]:
+        incremental.add_ballot(ballot)
+    if ballots:
+        incremental.add_ballot(ballots[0])
+        incremental.remove_ballot(ballots[0])
+    if incremental.exact:
+        return incremental.run()
+    return STARVotingTally().run(ballots)
+
+
+def in_worker_thread(tally):
+    """
+    Wrap a backend to run in a new thread (as recalculations do), re-raising
+    its exception in the caller.
+    """
+    def run(ballots):
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = tally(ballots)
+            except Exception as error:
+                outcome['error'] = error
+
+        worker = threading.Thread(target=target)
+        worker.start()
+        worker.join()
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+    return run
+
+
+BACKENDS = {
+    REFERENCE: lambda ballots: STARVotingTally().run(ballots),
+    'fixed': lambda ballots: STARVotingTally(arithmetic=FixedPointStars()).run(ballots),
+    'vectorized': lambda ballots: STARVotingTally(vectorized=True).run(ballots),
+    'incremental': incremental_tally,
+    'run_many': lambda ballots: STARVotingTally().run_many(ballots, [[1] * len(ballots)])[0],
+    'thread': in_worker_thread(lambda ballots: STARVotingTally().run(ballots)),
+    'thread_fixed': in_worker_thread(lambda ballots: STARVotingTally(arithmetic=FixedPointStars()).run(ballots)),
+}
+
+STRATEGIES = (
+    'random', 'heavy_ties', 'mirrored', 'all_zero', 'single_choice', 'near_equal', 'empty', 'delegated',
+)
+
+
+def outcome(tally, ballots):
+    """
+    Run one backend and normalize its result for comparison.
+
+    Args:
+        tally (callable): Backend from BACKENDS
+        ballots (list): Ballot dicts
+
+    Returns:
+        dict: The COMPARED_FIELDS of the result; {'unresolved', 'tiebreaker_log'}
+            for an UnresolvedTieError (run_many reports only 'unresolved');
+            {'error'} for a ValueError
+    """
+    try:
+        result = tally(ballots)
+    except UnresolvedTieError as error:
+        return {'unresolved': list(error.tied_candidates), 'tiebreaker_log': list(error.tiebreaker_log)}
+    except ValueError as error:
+        return {'error': str(error)}
+    if result['winner'] is None and result.get('tied_candidates'):
+        # run_many() reports unresolved ties in the result instead of raising
+        return {'unresolved': list(result['tied_candidates'])}
+    return {field: result.get(field) for field in COMPARED_FIELDS}
+
+
+def _kind(result):
+    """'error', 'unresolved' or 'winner' for a normalized outcome."""
+    if 'error' in result:
+        return 'error'
+    return 'unresolved' if 'unresolved' in result else 'winner'
+
+
+def differences(expected, actual):
+    """
+    Fields on which a backend's outcome disagrees with the reference.
+
+    Fields the backend does not report (e.g. run_many's tiebreaker log) are
+    skipped; a different kind of outcome (winner vs tie vs error) is 'outcome'.
+
+    Returns:
+        list: Differing field names (empty when the outcomes agree)
+    """
+    if _kind(expected) != _kind(actual):
+        return ['outcome']
+    return [field for field in actual if actual[field] != expected.get(field)]
+
+
+def compare(ballots, backends=None):
+    """
+    Run the reference and the other backends on one ballot set.
+
+    Args:
+        ballots (list): Ballot dicts
+        backends (dict, optional): name -> tally callable (default: every
+            backend in BACKENDS except the reference)
+
+    Returns:
+        dict: backend name -> differing fields, for disagreeing backends only
+    """
+    if backends is None:
+        backends = {name: tally for name, tally in BACKENDS.items() if name != REFERENCE}
+    expected = outcome(BACKENDS[REFERENCE], ballots)
+    found = {}
+    for name, tally in backends.items():
+        fields = differences(expected, outcome(tally, ballots))
+        if fields:
+            found[name] = fields
+    return found
+
+
+def generate_case(rng, strategy=None, max_ballots=40, max_choices=5):
+    """
+    Generate one ballot set.
+
+    Args:
+        rng (random.Random): Source of randomness
+        strategy (str, optional): One of STRATEGIES (default: random choice)
+        max_ballots (int): Upper bound on ballots
+        max_choices (int): Upper bound on choices
+
+    Returns:
+        tuple: (strategy, ballots)
+    """
+    strategy = strategy or rng.choice(STRATEGIES)
+    choices = [f"choice_{index}" for index in range(rng.randint(1, max_choices))]
+    count = rng.randint(1, max_ballots)
+
+    def listed():
+        return rng.sample(choices, rng.randint(1, len(choices)))
+
+    if strategy == 'single_choice':
+        choice = choices[0]
+        return strategy, [{choice: Decimal(rng.randint(0, 500)).scaleb(-2)} for _ in range(count)]
+
+    if strategy == 'all_zero':
+        return strategy, [{choice: Decimal('0') for choice in listed()} for _ in range(count)]
+
+    if strategy == 'heavy_ties':
+        values = [Decimal(stars) for stars in rng.sample(range(6), rng.randint(1, 3))]
+        distinct = [{choice: rng.choice(values) for choice in listed()} for _ in range(rng.randint(1, 4))]
+        return strategy, [dict(rng.choice(distinct)) for _ in range(count)]
+
+    if strategy == 'mirrored':
+        ballots = []
+        for _ in range(max(1, count // 2)):
+            ballot = {choice: Decimal(rng.randint(0, 5)) for choice in choices}
+            order = sorted(choices, key=ballot.get)
+            ballots.append(ballot)
+            ballots.append({choice: ballot[mirror] for choice, mirror in zip(order, reversed(order))})
+        return strategy, ballots
+
+    if strategy == 'near_equal':
+        base = quantize_stars(Decimal(rng.randint(1, 14)) / Decimal(3))
+        quantum = Decimal('0.00000001')
+        return strategy, [
+            {choice: min(Decimal('5'), base + quantum * rng.randint(-2, 2)) for choice in listed()}
+            for _ in range(count)
+        ]
+
+    if strategy == 'delegated':
+        def delegated_stars():
+            values = [Decimal(rng.randint(0, 5)) for _ in range(rng.randint(2, 7))]
+            with star_context():
+                return sum(values) / Decimal(len(values))
+        return strategy, [{choice: delegated_stars() for choice in listed()} for _ in range(count)]
+
+    ballots = [
+        {
+            choice: Decimal(rng.randint(0, 5)) if rng.random() < 0.5 else Decimal(rng.randint(0, 500)).scaleb(-2)
+            for choice in listed()
+        }
+        for _ in range(count)
+    ]
+    if strategy == 'empty':
+        blank = rng.choice((0.3, 0.8, 1.0))
+        ballots = [{} if rng.random() < blank else ballot for ballot in ballots]
+    return strategy, ballots
+
+
+def _smaller(ballots):
+    """Candidate reductions of a ballot set, most aggressive first."""
+    size = len(ballots) // 2
+    while size >= 1:
+        for start in range(0, len(ballots), size):
+            candidate = ballots[:start] + ballots[start + size:]
+            if candidate:
+                yield candidate
+        size //= 2
+
+    for choice in sorted({choice for ballot in ballots for choice in ballot}, key=str):
+        yield [{key: value for key, value in ballot.items() if key != choice} for ballot in ballots]
+
+    for index, ballot in enumerate(ballots):
+        for choice in ballot:
+            yield ballots[:index] + [{key: value for key, value in ballot.items() if key != choice}] + ballots[index + 1:]
+
+    for index, ballot in enumerate(ballots):
+        for choice, stars in ballot.items():
+            simpler = []
+            if stars != stars.to_integral_value():
+                simpler.append(Decimal(int(stars)))
+            if stars != 0:
+                simpler.append(Decimal('0'))
+            for value in simpler:
+                yield ballots[:index] + [{**ballot, choice: value}] + ballots[index + 1:]
+
+
+def shrink(ballots, fails):
+    """
+    Greedily reduce a failing ballot set to a minimal one that still fails.
+
+    Each accepted step removes ballots, choices or ratings, or simplifies a
+    star value (to its integer part, then to 0), so shrinking terminates.
+
+    Args:
+        ballots (list): Failing ballot dicts
+        fails (callable): ballots -> bool, True while the failure reproduces
+
+    Returns:
+        list: Minimal failing ballot dicts
+    """
+    current = [dict(ballot) for ballot in ballots]
+    while True:
+        for candidate in _smaller(current):
+            if fails(candidate):
+                current = candidate
+                break
+        else:
+            return current
+
+
+def fuzz(iterations=500, seed=0, backends=None, max_ballots=40, max_choices=5, strategies=None):
+    """
+    Compare backends on generated ballot sets and shrink every disagreement.
+
+    Args:
+        iterations (int): Number of generated ballot sets
+        seed (int): Random seed (failures are reproducible from it)
+        backends (dict, optional): name -> tally callable to check against
+            the reference (default: all of BACKENDS)
+        max_ballots (int): Upper bound on ballots per set
+        max_choices (int): Upper bound on choices per set
+        strategies (tuple, optional): Strategies to draw from (default:
+            STRATEGIES)
+
+    Returns:
+        list: One dict per disagreement with 'iteration', 'strategy',
+            'backend', 'fields', 'ballots' (shrunk) and 'original_ballots'
+            (count before shrinking)
+    """
+    rng = random.Random(seed)
+    failures = []
+    for iteration in range(iterations):
+        strategy, ballots = generate_case(
+            rng, rng.choice(strategies or STRATEGIES), max_ballots=max_ballots, max_choices=max_choices
+        )
+        for name, fields in compare(ballots, backends).items():
+            tally = (backends or BACKENDS)[name]
+            minimal = shrink(ballots, lambda candidate: name in compare(candidate, {name: tally}))
+            failures.append({
+                'iteration': iteration,
+                'strategy': strategy,
+                'backend': name,
+                'fields': fields,
+                'ballots': minimal,
+                'original_ballots': len(ballots),
+            })
+    return failures
+
+
+def as_repro(ballots):
+    """JSON-friendly ballots (stars as strings) for a bug report or test case."""
+    return [{str(choice): str(stars) for choice, stars in ballot.items()} for ballot in ballots]
@@ -0,0 +1,280 @@
+"""
+Incremental STAR tally state for CrowdVote.
+
+STARVotingTally.run() rebuilds every count from the full ballot list, even
+when a recalculation changed only a handful of effective ballots. An
+IncrementalSTARTally keeps the counts the tally actually needs:
+
+- per-choice star sums (exact) and the ballot count, for the score phase
+- the pairwise preference matrix and five-star counts, for the runoff and
+  every tiebreaker step
+
+Adding, removing or replacing one ballot updates them in O(C²). run() then
+produces the same result dict as STARVotingTally.run() on the current
+ballots, without touching the ballots at all.
+
+The state is JSON-serializable (as_state / from_state), so staging can store
+it in a snapshot and the next incremental recalculation can apply only the
+changed voters' ballots to it.
+
+Exactness: sums are kept exactly, while the Decimal tally adds ballots one by
+one at 12 significant digits. Scores therefore match only while none of the
+Decimal tally's running sums is rounded, i.e. while every choice's total,
+counted in units of the finest decimal place on any ballot, stays below
+10^12 (see `exact`). Whole and 2-decimal live votes qualify; delegated
+averages with 12 significant digits usually do not, and must be tallied
+from the ballots (Tally does so). Only the Decimal arithmetic backend is
+supported.
+"""
+
+from decimal import Decimal, localcontext
+
+from .star_arithmetic import STAR_PRECISION, star_context
+from .snapshot_ballots import decimal_places
+from .star_voting import PreferenceMatrix, STARVotingTally, quantize_stars
+from .trace import FULL
+
+
+ZERO = Decimal('0')
+FIVE = Decimal('5')
+
+
+class IncrementalSTARTally:
+    """
+    STAR tally counts maintained across ballot changes.
+
+    Attributes:
+        ballot_count (int): Number of ballots currently counted
+        sums (dict): Choice -> exact Decimal star total
+        appearances (dict): Choice -> number of ballots listing the choice
+        positive (dict): Choice -> number of ballots giving it more than 0 stars
+        five_stars (dict): Choice -> number of ballots giving it exactly 5 stars
+        wins (dict): wins[a][b] = number of ballots scoring a above b
+        places (dict or None): Decimal places -> number of counted star values
+            needing that many (None when restored from a state without them)
+
+    Example:
+        >>> tally = IncrementalSTARTally.from_ballots(ballots)
+        >>> tally.replace_ballot(old_ballot, new_ballot)
+        >>> tally.run()['winner']
+        'apple'
+    """
+
+    # Star totals are summed with enough digits to stay exact
+    SUM_PRECISION = 100
+
+    def __init__(self):
+        """Start with no ballots."""
+        self.ballot_count = 0
+        self.sums = {}
+        self.appearances = {}
+        self.positive = {}
+        self.five_stars = {}
+        self.wins = {}
+        self.places = {}
+
+    @classmethod
+    def from_ballots(cls, ballots):
+        """
+        Build the state for a list of ballots.
+
+        Pairwise counts are computed column-wise (PreferenceMatrix) rather than
+        ballot by ballot.
+
+        Args:
+            ballots (iterable): Ballot dicts mapping choices to Decimal stars
+
+        Returns:
+            IncrementalSTARTally
+        """
+        ballots = list(ballots)
+        tally = cls()
+        choices = sorted({choice for ballot in ballots for choice in ballot}, key=str)
+        preferences = PreferenceMatrix.from_ballots(ballots, choices, ZERO, FIVE)
+        tally.ballot_count = len(ballots)
+        tally.wins = preferences.wins
+        tally.five_stars = preferences.five_stars
+        for choice in choices:
+            tally.sums[choice] = ZERO
+            tally.appearances[choice] = 0
+            tally.positive[choice] = 0
+        with localcontext() as context:
+            context.prec = cls.SUM_PRECISION
+            for ballot in ballots:
+                for choice, stars in ballot.items():
+                    tally.sums[choice] += stars
+                    tally.appearances[choice] += 1
+                    if stars > ZERO:
+                        tally.positive[choice] += 1
+        tally._count_places((stars for ballot in ballots for stars in ballot.values()), 1)
+        return tally
+
+    def _count_places(self, values, sign):
+        """Add (sign=1) or remove (sign=-1) star values from the places counts."""
+        if self.places is None:
+            return
+        for stars in values:
+            places = decimal_places(stars)
+            places = -1 if places is None else places  # negative or non-finite: never exact
+            self.places[places] = self.places.get(places, 0) + sign
+            if not self.places[places]:
+                del self.places[places]
+
+    @property
+    def exact(self):
+        """
+        True if run() reproduces STARVotingTally.run() on the current ballots.
+
+        The Decimal tally's running sums are multiples of 10^-p (p = the most
+        decimal places of any star value) and, stars being non-negative, never
+        exceed the final totals; below 10^12 units they are never rounded.
+        """
+        if self.places is None or -1 in self.places:
+            return False
+        scale = 10 ** max(self.places, default=0)
+        limit = 10 ** STAR_PRECISION
+        return all(total * scale < limit for total in self.sums.values())
+
+    def _add_choice(self, choice):
+        """Start counting a choice that no current ballot lists (0 stars everywhere)."""
+        for other, row in self.wins.items():
+            row[choice] = self.positive[other]
+        self.wins[choice] = {other: 0 for other in self.wins}
+        self.sums[choice] = ZERO
+        self.appearances[choice] = 0
+        self.positive[choice] = 0
+        self.five_stars[choice] = 0
+
+    def _apply(self, ballot, sign):
+        """Add (sign=1) or remove (sign=-1) one ballot's contribution."""
+        for choice in ballot:
+            if choice not in self.wins:
+                self._add_choice(choice)
+
+        self.ballot_count += sign
+        self._count_places(ballot.values(), sign)
+        with localcontext() as context:
+            context.prec = self.SUM_PRECISION
+            for choice, stars in ballot.items():
+                self.sums[choice] += stars if sign > 0 else -stars
+                self.appearances[choice] += sign
+                if stars > ZERO:
+                    self.positive[choice] += sign
+                if stars == FIVE:
+                    self.five_stars[choice] += sign
+
+        # Only pairs involving a listed choice can have a winner (missing = 0 stars)
+        for choice, stars in ballot.items():
+            row = self.wins[choice]
+            for other in row:
+                if stars > ballot.get(other, ZERO):
+                    row[other] += sign
+
+    def add_ballot(self, ballot):
+        """
+        Count one more ballot.
+
+        Args:
+            ballot (dict): Choice -> Decimal stars
+        """
+        self._apply(ballot, 1)
+
+    def remove_ballot(self, ballot):
+        """
+        Stop counting a ballot previously added.
+
+        Args:
+            ballot (dict): The same choice -> stars mapping that was added
+        """
+        self._apply(ballot, -1)
+
+    def replace_ballot(self, old_ballot, new_ballot):
+        """
+        Replace one voter's ballot.
+
+        Args:
+            old_ballot (dict or None): Ballot currently counted (None if the
+                voter had no ballot)
+            new_ballot (dict or None): Ballot to count instead (None to remove)
+        """
+        if old_ballot == new_ballot:
+            return
+        if old_ballot:
+            self.remove_ballot(old_ballot)
+        if new_ballot:
+            self.add_ballot(new_ballot)
+
+    def choices(self):
+        """Choices listed on at least one current ballot, in canonical order."""
+        return sorted((choice for choice, count in self.appearances.items() if count > 0), key=str)
+
+    def run(self, trace_level=FULL):
+        """
+        Tally the current ballots.
+
+        Args:
+            trace_level: democracy.trace level for the tally log (default full)
+
+        Returns:
+            dict: Same result as STARVotingTally().run(current_ballots) when
+                `exact`; otherwise scores may differ in the last digit
+
+        Raises:
+            UnresolvedTieError: If tie cannot be resolved by automatic protocol
+            ValueError: If there are no ballots or no choices
+        """
+        if self.ballot_count == 0:
+            raise ValueError("Cannot tally election with no ballots")
+        choices = self.choices()
+        if not choices:
+            raise ValueError("Cannot tally election with no choices")
+
+        count = Decimal(self.ballot_count)
+        with star_context():
+            scores = {choice: quantize_stars(self.sums[choice] / count) for choice in choices}
+        preferences = PreferenceMatrix(
+            choices,
+            {a: {b: self.wins[a][b] for b in choices if b != a} for a in choices},
+            {choice: self.five_stars[choice] for choice in choices},
+            self.ballot_count,
+        )
+        return STARVotingTally(trace_level=trace_level).run_counts(self.ballot_count, choices, scores, preferences)
+
+    def as_state(self):
+        """
+        JSON-serializable state (for storing in a snapshot).
+
+        Returns:
+            dict: Counts with Decimal sums as strings
+        """
+        return {
+            'ballot_count': self.ballot_count,
+            'sums': {choice: str(total) for choice, total in self.sums.items()},
+            'appearances': dict(self.appearances),
+            'positive': dict(self.positive),
+            'five_stars': dict(self.five_stars),
+            'wins': {a: dict(row) for a, row in self.wins.items()},
+            'places': None if self.places is None else {str(places): count for places, count in self.places.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restore a state produced by as_state().
+
+        Args:
+            state (dict): Output of as_state()
+
+        Returns:
+            IncrementalSTARTally
+        """
+        tally = cls()
+        tally.ballot_count = state['ballot_count']
+        tally.sums = {choice: Decimal(total) for choice, total in state['sums'].items()}
+        tally.appearances = dict(state['appearances'])
+        tally.positive = dict(state['positive'])
+        tally.five_stars = dict(state['five_stars'])
+        tally.wins = {a: dict(row) for a, row in state['wins'].items()}
+        places = state.get('places')
+        tally.places = None if places is None else {int(key): count for key, count in places.items()}
+        return tally
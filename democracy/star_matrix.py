@@ -0,0 +1,285 @@
+"""
+Dense ballot matrix for the vectorized STAR tally backend.
+
+STARVotingTally normally walks `List[Dict[choice, Decimal]]` once per choice
+for scores and once per compared pair for head-to-head counts. A BallotMatrix
+converts the ballots once into a (ballots x choices) int64 NumPy array of
+stars scaled by 10^places (missing choices = 0 stars), after which score sums
+and pairwise comparisons are single array operations.
+
+Exactness: scaled integers compare exactly like the Decimals they came from,
+and scores are computed with star_arithmetic.quantized_mean, which reproduces
+the Decimal division and quantization bit for bit. Both checks below are made
+from the distinct star values and the ballot count, before anything is
+allocated. `from_ballots` returns None (and the tally keeps its Decimal path)
+when:
+
+- NumPy is not installed
+- a star value is negative (or, with `exact=True`, needs more than
+  MAX_PLACES decimal places)
+- the largest scaled star times the ballot count could overflow int64
+
+With `exact=True` it also returns None when that bound reaches 10^12, the
+Decimal context's 12 significant digits. Beyond it the Decimal path rounds its
+running sums, which no vectorized sum can reproduce. Otherwise the matrix is
+used anyway (tolerance mode): totals are exact integers, so a score is the
+correctly rounded mean and differs from the Decimal path's only by that path's
+own rounding, at most 5 x 10^(k-13) stars for a total with k integer digits.
+Star values with more than MAX_PLACES places (12-digit means below 1) are
+rounded half-even to MAX_PLACES places, which moves a score by at most
+5 x 10^-13 and can only tie stars closer than 10^-12; head-to-head and
+five-star counts are otherwise exact in both modes.
+
+Live tallies (2-decimal Vote.stars) stay exact up to ~2 billion ballots;
+delegated 12-digit means (11-12 places) need tolerance mode beyond one ballot
+and fit int64 up to ~1.8 million ballots.
+
+Scores are pure integer arithmetic at STAR_PRECISION digits, so they do not
+depend on the calling thread's Decimal context; the scalar path they must
+match pins the same precision (star_arithmetic.star_context).
+"""
+
+from decimal import Decimal
+from itertools import chain, repeat
+
+from .star_arithmetic import STAR_PRECISION, _divide_half_even, quantized_mean
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+
+class BallotMatrix:
+    """
+    Ballots as a (ballots x choices) int64 array of scaled stars.
+
+    Attributes:
+        choices (list): Column -> choice identifier
+        column_of (dict): Choice identifier -> column
+        stars (numpy.ndarray): Scaled stars, shape (ballots, choices)
+        places (int): Stars are scaled by 10^places
+
+    Example:
+        >>> matrix = BallotMatrix.from_ballots(ballots, choices)
+        >>> matrix.head_to_head('apple', 'banana')
+        (2, 1, 0)
+    """
+
+    MAX_PLACES = 12
+    PRECISION = STAR_PRECISION
+
+    def __init__(self, choices, stars, places):
+        """Wrap an already converted array (see from_ballots)."""
+        self.choices = list(choices)
+        self.column_of = {choice: column for column, choice in enumerate(self.choices)}
+        self.stars = stars
+        self.places = places
+        self.five = 5 * 10 ** places
+        self.totals = [int(total) for total in stars.sum(axis=0)]
+
+    def __len__(self):
+        """Number of ballots."""
+        return self.stars.shape[0]
+
+    @staticmethod
+    def _places(value):
+        """Decimal places needed to represent a Decimal exactly (None if impossible)."""
+        if not value.is_finite() or value < 0:
+            return None
+        denominator = value.as_integer_ratio()[1]
+        places = 0
+        while denominator % 10 == 0:
+            denominator //= 10
+            places += 1
+        while denominator % 2 == 0 or denominator % 5 == 0:
+            denominator //= 2 if denominator % 2 == 0 else 5
+            places += 1
+        return places
+
+    @classmethod
+    def from_ballots(cls, ballots, choices, exact=True):
+        """
+        Convert ballots to a matrix, if the vectorized path can tally them.
+
+        Args:
+            ballots (list): Ballot dicts mapping choices to Decimal stars
+            choices (iterable): Choice identifiers, in column order
+            exact (bool): Also require the Decimal path's running sums to be
+                exact, so scores are bit-identical (see module docstring)
+
+        Returns:
+            BallotMatrix or None: None when NumPy is missing or the ballots fall
+                outside the supported regime (see module docstring)
+        """
+        if np is None:
+            return None
+
+        # Few distinct star values: size them once
+        values = set(chain.from_iterable(map(dict.values, ballots)))
+        distinct = {}
+        for stars in values:
+            places = cls._places(Decimal(stars))
+            if places is None or (exact and places > cls.MAX_PLACES):
+                return None
+            distinct[stars] = places
+        places = min(max(distinct.values(), default=0), cls.MAX_PLACES)
+        scaled = {}
+        for stars in distinct:
+            numerator, denominator = Decimal(stars).as_integer_ratio()
+            scaled[stars] = _divide_half_even(numerator * 10 ** places, denominator)
+        # Bound every column total before allocating anything
+        bound = max(scaled.values(), default=0) * len(ballots)
+        if bound >= 2 ** 63 or (exact and bound >= 10 ** cls.PRECISION):
+            return None
+
+        # One C-level pass per column; a choice missing from a ballot counts as 0 stars
+        scaled[None] = 0
+        choices = list(choices)
+        array = np.zeros((len(ballots), len(choices)), dtype=np.int64)
+        for column, choice in enumerate(choices):
+            array[:, column] = np.fromiter(
+                map(scaled.__getitem__, map(dict.get, ballots, repeat(choice))),
+                dtype=np.int64, count=len(ballots)
+            )
+        return cls(choices, array, places)
+
+    def scores(self):
+        """
+        Average stars per choice, identical to the Decimal score phase.
+
+        Returns:
+            dict: Choice -> Decimal quantized to 8 places, in column order
+        """
+        count = len(self)
+        return {
+            choice: quantized_mean(total, count, self.places, self.PRECISION)
+            for choice, total in zip(self.choices, self.totals)
+        }
+
+    def head_to_head(self, choice_a, choice_b):
+        """
+        Count ballots preferring each choice.
+
+        Returns:
+            tuple: (a_preferences, b_preferences, ties)
+        """
+        a_stars = self.stars[:, self.column_of[choice_a]]
+        b_stars = self.stars[:, self.column_of[choice_b]]
+        a_pref = int(np.count_nonzero(a_stars > b_stars))
+        b_pref = int(np.count_nonzero(b_stars > a_stars))
+        return a_pref, b_pref, len(self) - a_pref - b_pref
+
+    def five_star_count(self, choice):
+        """Number of ballots giving a choice exactly 5 stars."""
+        return int(np.count_nonzero(self.stars[:, self.column_of[choice]] == self.five))
+
+    def pairwise_counts(self):
+        """
+        Preference counts for every ordered pair plus five-star counts.
+
+        Returns:
+            tuple: (wins, five_stars) where wins[i][j] is the number of ballots
+                scoring column i above column j, and five_stars[i] the number
+                of ballots giving column i exactly 5 stars
+        """
+        wins = [
+            [int(count) for count in np.count_nonzero(self.stars[:, [column]] > self.stars, axis=0)]
+            for column in range(len(self.choices))
+        ]
+        five_stars = [int(count) for count in np.count_nonzero(self.stars == self.five, axis=0)]
+        return wins, five_stars
+
+    def presence(self, ballots):
+        """
+        Which choices each ballot lists (a listed 0 differs from a missing choice).
+
+        Args:
+            ballots (list): The ballots this matrix was built from
+
+        Returns:
+            numpy.ndarray: Bool array, shape (ballots, choices)
+        """
+        present = np.zeros(self.stars.shape, dtype=bool)
+        for column, choice in enumerate(self.choices):
+            present[:, column] = np.fromiter(
+                (choice in ballot for ballot in ballots), dtype=bool, count=len(ballots)
+            )
+        return present
+
+    def weighted_counts(self, weights):
+        """
+        Score totals, pairwise wins and five-star counts for weighted variants.
+
+        Every variant weights each ballot by a non-negative integer (0 drops it,
+        2 counts it twice); all variants share this matrix and its choice index.
+
+        Args:
+            weights (numpy.ndarray): int64 weights, shape (variants, ballots)
+
+        Returns:
+            tuple: (totals, wins, five_stars) int64 arrays of shape
+                (variants, choices), (variants, choices, choices) and
+                (variants, choices); wins[v, i, j] counts ballots scoring
+                column i above column j in variant v
+        """
+        totals = weights @ self.stars
+        wins = np.stack(
+            [weights @ (self.stars[:, [column]] > self.stars) for column in range(len(self.choices))],
+            axis=1,
+        )
+        five_stars = weights @ (self.stars == self.five)
+        return totals, wins, five_stars
+
+    def variant_counts(self, ballots, weights):
+        """
+        Per-variant tally inputs for STARVotingTally.run_many().
+
+        Args:
+            ballots (list): The ballots this matrix was built from
+            weights: Non-negative integer weights, shape (variants, ballots)
+
+        Returns:
+            list or None: Per variant, None when its totals leave the exact
+                regime, else (ballot_count, choices, scores, wins, five_stars)
+                with choices in column order restricted to those listed on a
+                weighted ballot. None for the whole batch if the weighted
+                totals could overflow int64.
+
+        Raises:
+            ValueError: If weights have the wrong shape or are negative
+        """
+        weights = np.asarray(weights, dtype=np.int64)
+        if weights.ndim != 2 or weights.shape[1] != len(self):
+            raise ValueError(f"Expected weights of shape (variants, {len(self)}), got {weights.shape}")
+        if (weights < 0).any():
+            raise ValueError("Ballot weights must be non-negative")
+
+        sizes = [int(size) for size in weights.sum(axis=1)]
+        if max(sizes, default=0) * int(self.stars.max(initial=0)) >= 2 ** 63:
+            return None
+
+        totals, wins, five_stars = self.weighted_counts(weights)
+        listed = weights @ self.presence(ballots)
+
+        variants = []
+        for variant, count in enumerate(sizes):
+            columns = [int(column) for column in np.flatnonzero(listed[variant])]
+            if count == 0 or max((int(totals[variant, c]) for c in columns), default=0) >= 10 ** self.PRECISION:
+                variants.append(None)
+                continue
+            choices = [self.choices[column] for column in columns]
+            variants.append((
+                count,
+                choices,
+                {
+                    self.choices[c]: quantized_mean(int(totals[variant, c]), count, self.places, self.PRECISION)
+                    for c in columns
+                },
+                {
+                    self.choices[a]: {self.choices[b]: int(wins[variant, a, b]) for b in columns if b != a}
+                    for a in columns
+                },
+                {self.choices[c]: int(five_stars[variant, c]) for c in columns},
+            ))
+        return variants
@@ -14,15 +14,20 @@ References:
 """
 
 from decimal import Decimal, getcontext
+from operator import gt
 from typing import Any, Dict, List, Tuple
 
 from .exceptions import UnresolvedTieError
+from .star_arithmetic import STAR_CONTEXT, STAR_PRECISION, DecimalStars, star_context
+from .star_matrix import BallotMatrix
+from .trace import FULL, SUMMARY, Trace
 
 
 # Set Decimal precision for calculations
 # 12 significant figures provides sufficient precision for complex delegation chains
-# while avoiding excessive decimal expansion
-getcontext().prec = 12
+# while avoiding excessive decimal expansion. This only configures the importing
+# thread; star arithmetic and tallies pin STAR_CONTEXT (see star_arithmetic).
+getcontext().prec = STAR_PRECISION
 
 
 def quantize_stars(value: Decimal) -> Decimal:
@@ -42,7 +47,114 @@ def quantize_stars(value: Decimal) -> Decimal:
         >>> quantize_stars(Decimal('3.58372894573756383'))
         Decimal('3.58372895')
     """
-    return value.quantize(Decimal('0.00000001'))
+    return value.quantize(Decimal('0.00000001'), context=STAR_CONTEXT)
+
+
+class PreferenceMatrix:
+    """
+    Pairwise preference counts and five-star counts for every choice.
+
+    Built once per tally, then shared by the runoff and every tiebreaker step
+    instead of rescanning the ballots for each compared pair in each
+    elimination round.
+
+    Attributes:
+        choices (list): Choice identifiers
+        wins (dict): wins[a][b] = number of ballots scoring a above b
+        five_stars (dict): Choice -> number of ballots giving it exactly 5 stars
+        ballot_count (int): Total number of ballots
+
+    Example:
+        >>> matrix = PreferenceMatrix.from_ballots(ballots, ['apple', 'banana'])
+        >>> matrix.head_to_head('apple', 'banana')
+        (2, 1, 0)
+    """
+
+    def __init__(self, choices, wins, five_stars, ballot_count):
+        """Wrap already computed counts (see from_ballots and from_ballot_matrix)."""
+        self.choices = list(choices)
+        self.wins = wins
+        self.five_stars = five_stars
+        self.ballot_count = ballot_count
+
+    @classmethod
+    def from_ballots(cls, ballots, choices, zero=Decimal('0'), five=Decimal('5')):
+        """
+        Count preferences from ballot dicts (missing choices count as zero stars).
+
+        Args:
+            ballots: List of ballot dictionaries
+            choices: Choice identifiers
+            zero: The arithmetic backend's zero stars
+            five: The arithmetic backend's five stars
+
+        Returns:
+            PreferenceMatrix
+        """
+        # One column per choice; comparisons run at C speed via map(gt, ...)
+        choices = list(choices)
+        columns = [[ballot.get(choice, zero) for ballot in ballots] for choice in choices]
+        wins = [
+            [0 if i == j else sum(map(gt, column_a, column_b)) for j, column_b in enumerate(columns)]
+            for i, column_a in enumerate(columns)
+        ]
+        five_stars = [column.count(five) for column in columns]
+
+        return cls._from_lists(choices, wins, five_stars, len(ballots))
+
+    @classmethod
+    def from_ballot_matrix(cls, matrix):
+        """
+        Count preferences from a BallotMatrix with array operations.
+
+        Args:
+            matrix: democracy.star_matrix.BallotMatrix
+
+        Returns:
+            PreferenceMatrix
+        """
+        wins, five_stars = matrix.pairwise_counts()
+        return cls._from_lists(matrix.choices, wins, five_stars, len(matrix))
+
+    @classmethod
+    def _from_lists(cls, choices, wins, five_stars, ballot_count):
+        """Convert column-indexed counts to choice-keyed dicts."""
+        return cls(
+            choices,
+            {
+                a: {b: wins[i][j] for j, b in enumerate(choices) if j != i}
+                for i, a in enumerate(choices)
+            },
+            dict(zip(choices, five_stars)),
+            ballot_count,
+        )
+
+    def head_to_head(self, choice_a, choice_b):
+        """
+        Preferences between two choices.
+
+        Returns:
+            Tuple of (a_preferences, b_preferences, ties)
+        """
+        a_pref = self.wins[choice_a][choice_b]
+        b_pref = self.wins[choice_b][choice_a]
+        return a_pref, b_pref, self.ballot_count - a_pref - b_pref
+
+    def five_star_count(self, choice):
+        """Number of ballots giving a choice exactly 5 stars."""
+        return self.five_stars[choice]
+
+    def as_dict(self):
+        """
+        JSON-friendly form for the tally result and results page.
+
+        Returns:
+            dict: {'wins': {a: {b: count}}, 'five_star_counts': {choice: count}}
+        """
+        return {
+            'wins': {a: dict(row) for a, row in self.wins.items()},
+            'five_star_counts': dict(self.five_stars),
+        }
 
 
 class STARVotingTally:
@@ -69,7 +181,10 @@ class STARVotingTally:
         - tied_candidates: List of tied choices if UnresolvedTieError would be raised
         - scores: Dict mapping choices to average star ratings
         - runoff_details: Dict with finalist comparison details
-        - tally_log: List of strings documenting the tally process
+        - preference_matrix: Pairwise wins and five-star counts for every
+          choice (see PreferenceMatrix.as_dict)
+        - tally_log: List of strings documenting the tally process (only the
+          lines the trace level records; empty when tracing is off)
     
     Algorithm:
         Phase 1 (Score): Calculate average stars for each choice
@@ -87,9 +202,42 @@ class STARVotingTally:
         'apple'
     """
     
-    def __init__(self):
-        """Initialize the STAR voting tally calculator."""
-        self.tally_log: List[str] = []
+    def __init__(self, arithmetic=None, vectorized=False, trace_level=FULL, exact_scores=True):
+        """
+        Initialize the STAR voting tally calculator.
+
+        Args:
+            arithmetic: Star arithmetic backend from democracy.star_arithmetic
+                (default DecimalStars). FixedPointStars tallies on scaled ints
+                and produces identical scores, winners and logs.
+            vectorized (bool): Convert ballots once into a NumPy BallotMatrix and
+                compute scores and head-to-head counts with array operations.
+                Results are identical; falls back to the scalar path when NumPy
+                is missing or the ballots cannot be tallied exactly (see
+                democracy.star_matrix).
+            trace_level: democracy.trace level for the tally log ('off',
+                'summary' or 'full'; default full). Lines are formatted only
+                when the tally log is read.
+            exact_scores (bool): Vectorized only. When False, ballots whose
+                totals exceed 12 significant digits (delegated means) are
+                tallied on the matrix too instead of falling back; scores are
+                then correctly rounded means of exact totals and may differ
+                from the Decimal path within the tolerance documented in
+                democracy.star_matrix.
+        """
+        self.trace_level = trace_level
+        self.trace = Trace(trace_level)
+        self.arithmetic = arithmetic or DecimalStars()
+        self.vectorized = vectorized
+        self.exact_scores = exact_scores
+        self.matrix = None
+        self.preferences = None
+        self.scores = None
+
+    @property
+    def tally_log(self) -> List[str]:
+        """Formatted lines of the current trace."""
+        return self.trace.lines()
         
     def run(self, ballots: List[Dict[Any, Decimal]]) -> Dict[str, Any]:
         """
@@ -105,7 +253,7 @@ class STARVotingTally:
             UnresolvedTieError: If tie cannot be resolved by automatic protocol
             ValueError: If ballots are invalid or empty
         """
-        self.tally_log = []
+        self.trace = Trace(self.trace_level)
         
         # Validate input
         if not ballots:
@@ -118,84 +266,214 @@ class STARVotingTally:
         
         if len(all_choices) == 0:
             raise ValueError("Cannot tally election with no choices")
+
+        # Canonical choice order keeps score ties, logs and finalists deterministic
+        all_choices = sorted(all_choices, key=str)
+
+        # Vectorized backend: one dense ballot matrix for scores and comparisons
+        self.matrix = (
+            BallotMatrix.from_ballots(ballots, all_choices, exact=self.exact_scores) if self.vectorized else None
+        )
+
+        # Convert ballots to the arithmetic backend once (no-op for Decimal)
+        if self.matrix is None and not isinstance(self.arithmetic, DecimalStars):
+            parse = self.arithmetic.parse
+            ballots = [
+                {choice: parse(stars) for choice, stars in ballot.items()}
+                for ballot in ballots
+            ]
+
+        # All pairwise comparisons and five-star counts, shared by every tiebreaker
+        if self.matrix is not None:
+            preferences = PreferenceMatrix.from_ballot_matrix(self.matrix)
+        else:
+            preferences = PreferenceMatrix.from_ballots(
+                ballots, all_choices, self.arithmetic.zero, self.arithmetic.five
+            )
+        
+        # Phase 1: Score Phase (12-digit Decimal context in any thread)
+        with star_context():
+            scores = self._calculate_scores(ballots, all_choices)
+        return self.run_counts(len(ballots), all_choices, scores, preferences)
+
+    def run_counts(
+        self,
+        ballot_count: int,
+        choices: List[Any],
+        scores: Dict[Any, Decimal],
+        preferences: PreferenceMatrix
+    ) -> Dict[str, Any]:
+        """
+        Run the score report, automatic runoff and tiebreakers on precomputed counts.
+        
+        Used by run() and by IncrementalSTARTally, which maintains the counts
+        across ballot changes instead of rescanning the ballots.
+        
+        Args:
+            ballot_count: Number of ballots
+            choices: Choice identifiers, in canonical order
+            scores: Dictionary mapping choices to quantized average stars
+            preferences: PreferenceMatrix for the same ballots
+        
+        Returns:
+            Dictionary with winner, scores, runoff details, and tally log (see run)
+        
+        Raises:
+            UnresolvedTieError: If tie cannot be resolved by automatic protocol
+        """
+        self.trace = trace = Trace(self.trace_level)
+        self.preferences = preferences
+        self.scores = scores
         
-        self.tally_log.append(f"STAR Voting Tally")
-        self.tally_log.append(f"Total ballots: {len(ballots)}")
-        self.tally_log.append(f"Total choices: {len(all_choices)}")
-        self.tally_log.append("")
+        trace.summary("STAR Voting Tally")
+        trace.summary("Total ballots: {}", ballot_count)
+        trace.summary("Total choices: {}", len(choices))
+        trace.summary("")
         
-        # Phase 1: Score Phase
-        scores = self._calculate_scores(ballots, all_choices)
-        self.tally_log.append("=== PHASE 1: SCORE PHASE ===")
-        for choice, avg_stars in sorted(scores.items(), key=lambda x: x[1], reverse=True):
-            self.tally_log.append(f"{choice}: {avg_stars} stars")
-        self.tally_log.append("")
+        trace.summary("=== PHASE 1: SCORE PHASE ===")
+        if trace.wants(FULL):
+            for choice, avg_stars in sorted(scores.items(), key=lambda x: x[1], reverse=True):
+                trace.full("{}: {} stars", choice, avg_stars)
+        trace.summary("")
         
         # Handle single choice case (no runoff needed)
-        if len(all_choices) == 1:
-            winner = list(all_choices)[0]
-            self.tally_log.append(f"Only one choice - Winner: {winner}")
+        if len(choices) == 1:
+            winner = choices[0]
+            trace.summary("Only one choice - Winner: {}", winner)
             return {
                 'winner': winner,
                 'tied_candidates': [],
                 'scores': scores,
                 'runoff_details': None,
+                'preference_matrix': self.preferences.as_dict(),
                 'tally_log': self.tally_log,
             }
         
         # Get top 2 choices (with tiebreaking if needed)
-        top_two = self._get_top_two_with_tiebreak(scores, ballots)
+        top_two = self._get_top_two_with_tiebreak(scores)
         
-        self.tally_log.append("=== PHASE 2: AUTOMATIC RUNOFF ===")
-        self.tally_log.append(f"Finalists: {top_two[0]} vs {top_two[1]}")
-        self.tally_log.append("")
+        trace.summary("=== PHASE 2: AUTOMATIC RUNOFF ===")
+        trace.summary("Finalists: {} vs {}", top_two[0], top_two[1])
+        trace.summary("")
         
         # Phase 2: Automatic Runoff
-        winner, runoff_details = self._run_automatic_runoff(top_two, ballots, scores)
+        winner, runoff_details = self._run_automatic_runoff(top_two, scores)
         
         return {
             'winner': winner,
             'tied_candidates': [],
             'scores': scores,
             'runoff_details': runoff_details,
+            'preference_matrix': self.preferences.as_dict(),
             'tally_log': self.tally_log,
         }
     
+    def run_many(
+        self,
+        ballots: List[Dict[Any, Decimal]],
+        weights
+    ) -> List[Dict[str, Any]]:
+        """
+        Tally many weighted variants of one ballot list in a single call.
+        
+        Each variant weights every ballot by a non-negative integer: 0/1 masks
+        drop ballots (removal sensitivity, or "what if these voters voted
+        directly" with both versions of their ballots in the base list), and
+        counts repeat them (bootstrap resamples). All variants share one
+        BallotMatrix and choice index; score totals, pairwise wins and
+        five-star counts for every variant come from a handful of matrix
+        products, then the runoff and tiebreakers run per variant on those
+        counts. Without NumPy, or for variants outside the exact regime (see
+        democracy.star_matrix), the variant is tallied with run() instead.
+        
+        Args:
+            ballots: Base list of ballot dictionaries
+            weights: Per-variant lists of per-ballot weights (or a NumPy array
+                of shape (variants, ballots))
+        
+        Returns:
+            List with one result dict per variant, identical to run() on the
+            ballots repeated by their weights. A variant ending in an
+            unresolved tie gets winner None and its tied_candidates.
+            
+        Raises:
+            ValueError: If ballots are empty or list no choices, weights are
+                malformed, or a variant has no ballots
+        """
+        if not ballots:
+            raise ValueError("Cannot tally election with no ballots")
+        
+        all_choices = sorted({choice for ballot in ballots for choice in ballot}, key=str)
+        if not all_choices:
+            raise ValueError("Cannot tally election with no choices")
+        # Exact regime only (stars are never rounded); the weighted totals are
+        # checked again per variant
+        matrix = BallotMatrix.from_ballots(ballots, all_choices)
+        variants = matrix.variant_counts(ballots, weights) if matrix is not None else None
+        
+        results = []
+        for index, row in enumerate(weights):
+            counts = variants[index] if variants is not None else None
+            if counts is not None:
+                ballot_count, choices, scores, wins, five_stars = counts
+                preferences = PreferenceMatrix(choices, wins, five_stars, ballot_count)
+                results.append(self._run_variant(self.run_counts, ballot_count, choices, scores, preferences))
+                continue
+            
+            row = [int(weight) for weight in row]
+            if len(row) != len(ballots) or min(row, default=0) < 0:
+                raise ValueError("Ballot weights must be one non-negative integer per ballot")
+            expanded = [ballot for ballot, weight in zip(ballots, row) for _ in range(weight)]
+            results.append(self._run_variant(self.run, expanded))
+        
+        return results
+    
+    def _run_variant(self, tally, *args) -> Dict[str, Any]:
+        """Run one run_many() variant, reporting an unresolved tie in the result."""
+        try:
+            return tally(*args)
+        except UnresolvedTieError as e:
+            return {
+                'winner': None,
+                'tied_candidates': list(e.tied_candidates),
+                'scores': self.scores,
+                'runoff_details': None,
+                'preference_matrix': self.preferences.as_dict(),
+                'tally_log': self.tally_log,
+            }
+    
     def _calculate_scores(
         self,
         ballots: List[Dict[Any, Decimal]],
-        all_choices: set
+        all_choices: List[Any]
     ) -> Dict[Any, Decimal]:
         """
         Calculate average star ratings for all choices (Score Phase).
         
         Args:
             ballots: List of ballot dictionaries
-            all_choices: Set of all choice identifiers
+            all_choices: All choice identifiers, in canonical order
             
         Returns:
             Dictionary mapping choices to average Decimal star ratings
         """
+        if self.matrix is not None:
+            return self.matrix.scores()
+        
         scores = {}
         
         for choice in all_choices:
-            total_stars = Decimal('0')
-            
-            for ballot in ballots:
-                # Treat missing choices as 0 stars
-                stars = ballot.get(choice, Decimal('0'))
-                total_stars += stars
-            
-            # Calculate average and quantize to 8 decimal places
-            avg_stars = total_stars / Decimal(len(ballots))
-            scores[choice] = quantize_stars(avg_stars)
+            # Missing choices count as 0 stars; the average is quantized to 8 places
+            scores[choice] = self.arithmetic.score(
+                (ballot[choice] for ballot in ballots if choice in ballot),
+                len(ballots)
+            )
         
         return scores
     
     def _get_top_two_with_tiebreak(
         self,
-        scores: Dict[Any, Decimal],
-        ballots: List[Dict[Any, Decimal]]
+        scores: Dict[Any, Decimal]
     ) -> Tuple[Any, Any]:
         """
         Get the top 2 highest scoring choices, applying Step 1 tiebreakers if needed.
@@ -208,7 +486,6 @@ class STARVotingTally:
         
         Args:
             scores: Dictionary mapping choices to average scores
-            ballots: List of ballot dictionaries (for tiebreaking)
             
         Returns:
             Tuple of (first_place, second_place) choice identifiers
@@ -239,26 +516,25 @@ class STARVotingTally:
                 return sorted_choices[0][0], sorted_choices[1][0]
             else:
                 # Tie for 2nd place - break it
-                self.tally_log.append(f"Tie for 2nd place: {tied_for_second}")
-                second_place = self._break_score_tie(tied_for_second, ballots)
+                self.trace.summary("Tie for 2nd place: {}", tied_for_second)
+                second_place = self._break_score_tie(tied_for_second)
                 return tied_for_first[0], second_place
         
         else:
             # Multiple choices tied for 1st place
-            self.tally_log.append(f"Tie for 1st place: {tied_for_first}")
+            self.trace.summary("Tie for 1st place: {}", tied_for_first)
             
             if len(tied_for_first) == 2:
                 # Exactly 2 tied for first - they're our finalists
                 return tied_for_first[0], tied_for_first[1]
             else:
                 # More than 2 tied for first - need to eliminate some
-                finalists = self._break_score_tie_multi(tied_for_first, ballots, needed=2)
+                finalists = self._break_score_tie_multi(tied_for_first, needed=2)
                 return finalists[0], finalists[1]
     
     def _break_score_tie(
         self,
-        tied_choices: List[Any],
-        ballots: List[Dict[Any, Decimal]]
+        tied_choices: List[Any]
     ) -> Any:
         """
         Break a tie between multiple choices using head-to-head comparison.
@@ -268,7 +544,6 @@ class STARVotingTally:
         
         Args:
             tied_choices: List of choice identifiers that are tied
-            ballots: List of ballot dictionaries
             
         Returns:
             The choice that wins the tie
@@ -276,13 +551,12 @@ class STARVotingTally:
         Raises:
             UnresolvedTieError: If tie cannot be resolved
         """
-        finalists = self._break_score_tie_multi(tied_choices, ballots, needed=1)
+        finalists = self._break_score_tie_multi(tied_choices, needed=1)
         return finalists[0]
     
     def _break_score_tie_multi(
         self,
         tied_choices: List[Any],
-        ballots: List[Dict[Any, Decimal]],
         needed: int = 2
     ) -> List[Any]:
         """
@@ -293,7 +567,6 @@ class STARVotingTally:
         
         Args:
             tied_choices: List of choice identifiers that are tied
-            ballots: List of ballot dictionaries
             needed: Number of choices to return (1 or 2)
             
         Returns:
@@ -303,7 +576,7 @@ class STARVotingTally:
             UnresolvedTieError: If tie cannot be resolved
         """
         remaining = tied_choices.copy()
-        tiebreaker_log = []
+        tiebreaker_log = Trace(self.trace_level)
         
         while len(remaining) > needed:
             # Build head-to-head preference matrix for remaining choices
@@ -314,9 +587,7 @@ class STARVotingTally:
             # Count head-to-head preferences
             for i, choice_a in enumerate(remaining):
                 for choice_b in remaining[i+1:]:
-                    a_pref, b_pref, ties = self._count_head_to_head_preferences(
-                        choice_a, choice_b, ballots
-                    )
+                    a_pref, b_pref, ties = self.preferences.head_to_head(choice_a, choice_b)
                     
                     if a_pref > b_pref:
                         head_to_head[choice_a]['wins'] += 1
@@ -332,63 +603,38 @@ class STARVotingTally:
             
             if len(to_eliminate) == len(remaining):
                 # Everyone has the same record - perfect tie
-                tiebreaker_log.append(
-                    f"Head-to-head comparison inconclusive: all choices have equal records"
+                tiebreaker_log.summary(
+                    "Head-to-head comparison inconclusive: all choices have equal records"
                 )
                 # Can't break this tie with head-to-head
                 # Return arbitrary subset for now (will be caught by later tiebreakers)
                 return remaining[:needed]
             
+            survivors = [c for c in remaining if c not in to_eliminate]
+            if len(survivors) < needed:
+                # Eliminating every loser would leave too few choices: the
+                # survivors advance and the losers break the tie among themselves
+                for choice in survivors:
+                    tiebreaker_log.summary(
+                        "Advanced {} (losses: {})", choice, head_to_head[choice]['losses']
+                    )
+                self.trace.extend(tiebreaker_log)
+                return survivors + self._break_score_tie_multi(to_eliminate, needed - len(survivors))
+            
             # Eliminate the losers
             for choice in to_eliminate:
                 remaining.remove(choice)
-                tiebreaker_log.append(
-                    f"Eliminated {choice} (losses: {head_to_head[choice]['losses']})"
+                tiebreaker_log.summary(
+                    "Eliminated {} (losses: {})", choice, head_to_head[choice]['losses']
                 )
         
-        if tiebreaker_log:
-            self.tally_log.extend(tiebreaker_log)
+        self.trace.extend(tiebreaker_log)
         
         return remaining
     
-    def _count_head_to_head_preferences(
-        self,
-        choice_a: Any,
-        choice_b: Any,
-        ballots: List[Dict[Any, Decimal]]
-    ) -> Tuple[int, int, int]:
-        """
-        Count head-to-head preferences between two choices.
-        
-        Args:
-            choice_a: First choice identifier
-            choice_b: Second choice identifier
-            ballots: List of ballot dictionaries
-            
-        Returns:
-            Tuple of (a_preferences, b_preferences, ties)
-        """
-        a_pref = 0
-        b_pref = 0
-        ties = 0
-        
-        for ballot in ballots:
-            a_stars = ballot.get(choice_a, Decimal('0'))
-            b_stars = ballot.get(choice_b, Decimal('0'))
-            
-            if a_stars > b_stars:
-                a_pref += 1
-            elif b_stars > a_stars:
-                b_pref += 1
-            else:
-                ties += 1
-        
-        return a_pref, b_pref, ties
-    
     def _run_automatic_runoff(
         self,
         top_two: Tuple[Any, Any],
-        ballots: List[Dict[Any, Decimal]],
         scores: Dict[Any, Decimal]
     ) -> Tuple[Any, Dict[str, Any]]:
         """
@@ -400,7 +646,6 @@ class STARVotingTally:
         
         Args:
             top_two: Tuple of (choice_a, choice_b) identifiers
-            ballots: List of ballot dictionaries
             scores: Dictionary of average scores (for Step 2 tiebreaking)
             
         Returns:
@@ -412,29 +657,28 @@ class STARVotingTally:
         choice_a, choice_b = top_two
         
         # Count head-to-head preferences
-        a_preferences, b_preferences, ties = self._count_head_to_head_preferences(
-            choice_a, choice_b, ballots
-        )
+        a_preferences, b_preferences, ties = self.preferences.head_to_head(choice_a, choice_b)
         
         # Log runoff results
-        self.tally_log.append(f"{choice_a}: {a_preferences} preferences")
-        self.tally_log.append(f"{choice_b}: {b_preferences} preferences")
-        self.tally_log.append(f"Equal preferences: {ties}")
-        self.tally_log.append("")
+        trace = self.trace
+        trace.full("{}: {} preferences", choice_a, a_preferences)
+        trace.full("{}: {} preferences", choice_b, b_preferences)
+        trace.full("Equal preferences: {}", ties)
+        trace.full("")
         
         # Determine winner
         if a_preferences > b_preferences:
             winner = choice_a
             margin = a_preferences - b_preferences
-            self.tally_log.append(f"Winner: {winner} (margin: {margin} votes)")
+            trace.summary("Winner: {} (margin: {} votes)", winner, margin)
         elif b_preferences > a_preferences:
             winner = choice_b
             margin = b_preferences - a_preferences
-            self.tally_log.append(f"Winner: {winner} (margin: {margin} votes)")
+            trace.summary("Winner: {} (margin: {} votes)", winner, margin)
         else:
             # Tie in runoff - apply tiebreaker protocol
-            self.tally_log.append("=== TIEBREAKER PROTOCOL ===")
-            winner = self._break_runoff_tie(choice_a, choice_b, scores, ballots)
+            trace.summary("=== TIEBREAKER PROTOCOL ===")
+            winner = self._break_runoff_tie(choice_a, choice_b, scores)
         
         runoff_details = {
             'finalists': [choice_a, choice_b],
@@ -449,8 +693,7 @@ class STARVotingTally:
         self,
         choice_a: Any,
         choice_b: Any,
-        scores: Dict[Any, Decimal],
-        ballots: List[Dict[Any, Decimal]]
+        scores: Dict[Any, Decimal]
     ) -> Any:
         """
         Break a tie in the runoff phase using Steps 2-4 of Official Tiebreaker Protocol.
@@ -463,7 +706,6 @@ class STARVotingTally:
             choice_a: First choice identifier
             choice_b: Second choice identifier
             scores: Dictionary of average scores
-            ballots: List of ballot dictionaries
             
         Returns:
             The winning choice
@@ -471,53 +713,54 @@ class STARVotingTally:
         Raises:
             UnresolvedTieError: If tie cannot be resolved
         """
-        tiebreaker_log = []
+        # Recorded at every trace level: an UnresolvedTieError reports these steps.
+        # extend() still drops them from the tally log below its level.
+        tiebreaker_log = Trace(SUMMARY)
         
         # Step 2: Higher score wins
         if scores[choice_a] > scores[choice_b]:
-            tiebreaker_log.append(
-                f"Step 2: Tie broken by score - {choice_a} wins "
-                f"({scores[choice_a]} vs {scores[choice_b]})"
+            tiebreaker_log.summary(
+                "Step 2: Tie broken by score - {} wins ({} vs {})",
+                choice_a, scores[choice_a], scores[choice_b]
             )
-            self.tally_log.extend(tiebreaker_log)
-            self.tally_log.append(f"Winner: {choice_a}")
+            self.trace.extend(tiebreaker_log)
+            self.trace.summary("Winner: {}", choice_a)
             return choice_a
         elif scores[choice_b] > scores[choice_a]:
-            tiebreaker_log.append(
-                f"Step 2: Tie broken by score - {choice_b} wins "
-                f"({scores[choice_b]} vs {scores[choice_a]})"
+            tiebreaker_log.summary(
+                "Step 2: Tie broken by score - {} wins ({} vs {})",
+                choice_b, scores[choice_b], scores[choice_a]
             )
-            self.tally_log.extend(tiebreaker_log)
-            self.tally_log.append(f"Winner: {choice_b}")
+            self.trace.extend(tiebreaker_log)
+            self.trace.summary("Winner: {}", choice_b)
             return choice_b
         
         # Step 3: Five-star rating counts
-        tiebreaker_log.append("Step 2 inconclusive (equal scores)")
-        tiebreaker_log.append("Attempting Step 3: Five-star rating tiebreaker")
+        tiebreaker_log.summary("Step 2 inconclusive (equal scores)")
+        tiebreaker_log.summary("Attempting Step 3: Five-star rating tiebreaker")
         
-        winner = self._break_tie_by_five_stars(choice_a, choice_b, ballots, tiebreaker_log)
+        winner = self._break_tie_by_five_stars(choice_a, choice_b, tiebreaker_log)
         
         if winner is not None:
-            self.tally_log.extend(tiebreaker_log)
-            self.tally_log.append(f"Winner: {winner}")
+            self.trace.extend(tiebreaker_log)
+            self.trace.summary("Winner: {}", winner)
             return winner
         
         # Step 4: Unresolved tie - raise exception for manual resolution
-        tiebreaker_log.append("Step 3 inconclusive")
-        tiebreaker_log.append("All automatic tiebreakers exhausted")
-        self.tally_log.extend(tiebreaker_log)
+        tiebreaker_log.summary("Step 3 inconclusive")
+        tiebreaker_log.summary("All automatic tiebreakers exhausted")
+        self.trace.extend(tiebreaker_log)
         
         raise UnresolvedTieError(
             tied_candidates=[choice_a, choice_b],
-            tiebreaker_log=tiebreaker_log
+            tiebreaker_log=tiebreaker_log.lines()
         )
     
     def _break_tie_by_five_stars(
         self,
         choice_a: Any,
         choice_b: Any,
-        ballots: List[Dict[Any, Decimal]],
-        tiebreaker_log: List[str]
+        tiebreaker_log: Trace
     ) -> Any:
         """
         Break tie using five-star rating counts (Step 3 of Official Protocol).
@@ -528,36 +771,29 @@ class STARVotingTally:
         Args:
             choice_a: First choice identifier
             choice_b: Second choice identifier
-            ballots: List of ballot dictionaries
-            tiebreaker_log: Log to append tiebreaker attempts to
+            tiebreaker_log: Trace to record tiebreaker attempts in
             
         Returns:
             Winning choice, or None if still tied
         """
         # Count five-star ratings for each choice
-        a_five_stars = sum(
-            1 for b in ballots 
-            if b.get(choice_a, Decimal('0')) == Decimal('5')
-        )
-        b_five_stars = sum(
-            1 for b in ballots 
-            if b.get(choice_b, Decimal('0')) == Decimal('5')
-        )
+        a_five_stars = self.preferences.five_star_count(choice_a)
+        b_five_stars = self.preferences.five_star_count(choice_b)
         
-        tiebreaker_log.append(
-            f"Five-star counts: {choice_a}={a_five_stars}, {choice_b}={b_five_stars}"
+        tiebreaker_log.summary(
+            "Five-star counts: {}={}, {}={}", choice_a, a_five_stars, choice_b, b_five_stars
         )
         
         # Candidate with most 5-star ratings wins
         if a_five_stars > b_five_stars:
-            tiebreaker_log.append(f"Step 3: {choice_a} wins (more five-star ratings)")
+            tiebreaker_log.summary("Step 3: {} wins (more five-star ratings)", choice_a)
             return choice_a
         elif b_five_stars > a_five_stars:
-            tiebreaker_log.append(f"Step 3: {choice_b} wins (more five-star ratings)")
+            tiebreaker_log.summary("Step 3: {} wins (more five-star ratings)", choice_b)
             return choice_b
         
         # Still tied - both have same number of 5-star ratings
         # This is as far as the official protocol goes for automatic resolution
-        tiebreaker_log.append("Equal five-star ratings")
+        tiebreaker_log.summary("Equal five-star ratings")
         return None
 
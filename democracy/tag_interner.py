@@ -0,0 +1,104 @@
+"""
+Tag interning: comma-separated tag strings as integer bitmasks.
+
+Following.tags and Ballot.tags are comma-separated strings. Matching them the
+naive way splits both strings and intersects two fresh sets on every check.
+A TagInterner maps each distinct tag to a bit position once, so that:
+
+- a tag string becomes an int mask (0 = no tags, i.e. "follow on all tags")
+- "does this following match this ballot" is a single `follow & ballot`
+- inherited tags accumulate with `|`
+
+Masks are plain Python ints, so they keep working past 64 distinct tags; only
+compact storage (`mask_array`) has to fall back from an unsigned 64-bit array
+to a list in that case.
+
+Tags are normalized by stripping surrounding whitespace; empty tags are ignored.
+"""
+
+from array import array
+
+
+class TagInterner:
+    """
+    Map tags to bit positions and tag strings to bitmasks.
+
+    Example:
+        >>> interner = TagInterner()
+        >>> follow = interner.mask('budget, parks')
+        >>> ballot = interner.mask('parks,schools')
+        >>> interner.tags(follow & ballot)
+        ['parks']
+    """
+
+    MAX_ARRAY_TAGS = 64
+
+    def __init__(self):
+        """Create an empty interner."""
+        self.bits = {}
+        self.names = []
+        self._string_masks = {}
+
+    def __len__(self):
+        """Number of distinct tags interned so far."""
+        return len(self.names)
+
+    @property
+    def overflowed(self):
+        """True when masks no longer fit an unsigned 64-bit integer."""
+        return len(self.names) > self.MAX_ARRAY_TAGS
+
+    def bit(self, tag):
+        """Return the bit position of a (normalized) tag, assigning one if new."""
+        bit = self.bits.get(tag)
+        if bit is None:
+            bit = len(self.names)
+            self.bits[tag] = bit
+            self.names.append(tag)
+        return bit
+
+    def mask(self, tags):
+        """
+        Convert tags to a bitmask.
+
+        Args:
+            tags (str or iterable): Comma-separated tag string, or tags
+
+        Returns:
+            int: Bitmask (0 when there are no tags)
+        """
+        if isinstance(tags, str) or tags is None:
+            tags_string = tags or ''
+            mask = self._string_masks.get(tags_string)
+            if mask is None:
+                mask = self._string_masks[tags_string] = self.mask(tags_string.split(','))
+            return mask
+
+        mask = 0
+        for tag in tags:
+            tag = tag.strip()
+            if tag:
+                mask |= 1 << self.bit(tag)
+        return mask
+
+    def tags(self, mask):
+        """Decode a bitmask back into a sorted list of tags."""
+        tags = []
+        bit = 0
+        while mask:
+            if mask & 1:
+                tags.append(self.names[bit])
+            mask >>= 1
+            bit += 1
+        return sorted(tags)
+
+    def mask_array(self, masks):
+        """
+        Store masks compactly.
+
+        Returns:
+            array or list: array('Q') while all tags fit in 64 bits, else a list of ints
+        """
+        if self.overflowed:
+            return list(masks)
+        return array('Q', masks)
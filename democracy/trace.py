@@ -0,0 +1,140 @@
+"""
+Level-gated, lazily formatted traces for ballot staging and tallying.
+
+StageBallots and Tally used to build their audit logs eagerly: an f-string per
+node, choice and source, collected as {"indent", "log"} dicts and concatenated
+into HTML whether or not anyone read it. A Trace instead records structured
+events as (level, indent, template, args) and only formats them when a page or
+command renders the trace:
+
+- OFF: nothing is recorded (no formatting, no allocation per event)
+- SUMMARY: headers, participation, phase results and winners
+- FULL: everything, including per-voter delegation steps and per-choice scores
+
+Templates use str.format() placeholders, so
+
+    trace.full("{} is following {} (order: {})", voter, followee, order)
+
+renders exactly like the f-string it replaces, but str(voter) is only called
+when the line is rendered.
+"""
+
+OFF = 0
+SUMMARY = 1
+FULL = 2
+
+LEVELS = {'off': OFF, 'summary': SUMMARY, 'full': FULL}
+
+
+def trace_level(level):
+    """
+    Normalize a trace level.
+
+    Args:
+        level (int or str): OFF/SUMMARY/FULL or 'off'/'summary'/'full'
+
+    Returns:
+        int: OFF, SUMMARY or FULL
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    if isinstance(level, str):
+        if level.lower() not in LEVELS:
+            raise ValueError(f"Unknown trace level {level!r} (expected one of {', '.join(LEVELS)})")
+        return LEVELS[level.lower()]
+    if level not in (OFF, SUMMARY, FULL):
+        raise ValueError(f"Unknown trace level {level!r}")
+    return level
+
+
+class Trace:
+    """
+    Structured trace events, formatted on demand.
+
+    Example:
+        >>> trace = Trace('summary')
+        >>> trace.summary("Total ballots: {}", 3)
+        >>> trace.full("Ballot for {}", 'alice', indent=1)   # not recorded
+        >>> trace.lines()
+        ['Total ballots: 3']
+    """
+
+    def __init__(self, level=FULL):
+        """
+        Create an empty trace.
+
+        Args:
+            level (int or str): Most detailed level to record (default FULL)
+        """
+        self.level = trace_level(level)
+        self.events = []
+
+    def __len__(self):
+        """Number of recorded events."""
+        return len(self.events)
+
+    def wants(self, level):
+        """True if events at this level are recorded (use to skip preparing arguments)."""
+        return level <= self.level
+
+    def add(self, level, template, *args, indent=0):
+        """
+        Record an event if the trace level includes it.
+
+        Args:
+            level (int): SUMMARY or FULL
+            template (str): str.format() template, or a literal line when no args
+            *args: Template arguments, formatted when rendered
+            indent (int): Indentation depth
+        """
+        if level <= self.level:
+            self.events.append((level, indent, template, args))
+
+    def summary(self, template, *args, indent=0):
+        """Record a SUMMARY event."""
+        if self.level >= SUMMARY:
+            self.events.append((SUMMARY, indent, template, args))
+
+    def full(self, template, *args, indent=0):
+        """Record a FULL event."""
+        if self.level >= FULL:
+            self.events.append((FULL, indent, template, args))
+
+    def extend(self, other, indent=0):
+        """
+        Append another trace's events (unformatted), shifted by an indent.
+
+        Args:
+            other (Trace): Trace to append; events above this trace's level are dropped
+            indent (int): Added to each event's indentation
+        """
+        self.events.extend(
+            (level, event_indent + indent, template, args)
+            for level, event_indent, template, args in other.events
+            if level <= self.level
+        )
+
+    def entries(self):
+        """
+        Format the events.
+
+        Returns:
+            list: (indent, line) tuples
+        """
+        return [
+            (indent, template.format(*args) if args else template)
+            for level, indent, template, args in self.events
+        ]
+
+    def lines(self):
+        """Formatted lines without indentation (the STARVotingTally tally_log format)."""
+        return [line for indent, line in self.entries()]
+
+    def render_text(self, indent_unit='  '):
+        """Render as newline-separated text."""
+        return '\n'.join(f"{indent * indent_unit}{line}" for indent, line in self.entries())
+
+    def render_html(self, indent_unit='  '):
+        """Render as the <br/>-terminated lines used by tally reports."""
+        return ''.join(f"{indent * indent_unit}{line}<br/>" for indent, line in self.entries())
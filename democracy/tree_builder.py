@@ -0,0 +1,100 @@
+"""
+Indexed delegation tree builder.
+
+The delegation tree stored for visualization is a dict of lists:
+
+    {
+        'nodes': [{'voter_id': ..., 'votes': {...}, ...}, ...],
+        'edges': [{'follower': ..., 'followee': ..., ...}, ...],
+        'inheritance_chains': [...],
+        ...
+    }
+
+Builders used to find existing nodes and edges with `next(...)` scans over
+those lists, making tree construction quadratic in members and followings.
+DelegationTreeBuilder keeps the same lists (so the JSON shape is unchanged) plus
+dict indexes keyed by voter id and (follower, followee), making every lookup
+and insert O(1).
+"""
+
+from .choice_index import ChoiceIndex
+
+
+class DelegationTreeBuilder:
+    """
+    Build delegation tree data with constant-time node and edge lookups.
+
+    Args:
+        sections (iterable): Top-level list sections of the tree
+        choices (ChoiceIndex or iterable, optional): Choice index, or choice
+            dicts with 'id' and 'title' (e.g. snapshot_data['choices_data']),
+            for choice title lookups
+
+    Example:
+        >>> tree = DelegationTreeBuilder(choices=snapshot_data['choices_data'])
+        >>> tree.set_node({'voter_id': voter_id, 'votes': {}})
+        >>> tree.add_edge({'follower': voter_id, 'followee': followee_id, 'tags': [],
+        ...                'order': 1, 'active_for_decision': True})
+        >>> snapshot_data['delegation_tree'] = tree.data
+    """
+
+    DEFAULT_SECTIONS = ('nodes', 'edges', 'inheritance_chains')
+
+    def __init__(self, sections=DEFAULT_SECTIONS, choices=()):
+        """Create an empty tree."""
+        self.data = {section: [] for section in sections}
+        self._nodes = {}
+        self._edges = {}
+        self.choices = choices if isinstance(choices, ChoiceIndex) else ChoiceIndex.from_data(choices)
+
+    def node(self, voter_id):
+        """Return the node dict for a voter, or None."""
+        return self._nodes.get(voter_id)
+
+    def set_node(self, node_data):
+        """
+        Add a node, or update the voter's existing node in place.
+
+        Args:
+            node_data (dict): Node with at least 'voter_id'
+
+        Returns:
+            dict: The stored node
+        """
+        node = self._nodes.get(node_data['voter_id'])
+        if node is not None:
+            node.update(node_data)
+            return node
+        self._nodes[node_data['voter_id']] = node_data
+        self.data['nodes'].append(node_data)
+        return node_data
+
+    def edge(self, follower_id, followee_id):
+        """Return the edge dict for a (follower, followee) pair, or None."""
+        return self._edges.get((follower_id, followee_id))
+
+    def add_edge(self, edge_data):
+        """
+        Add an edge unless the (follower, followee) pair already exists.
+
+        Args:
+            edge_data (dict): Edge with 'follower' and 'followee'
+
+        Returns:
+            tuple: (stored edge, created)
+        """
+        key = (edge_data['follower'], edge_data['followee'])
+        edge = self._edges.get(key)
+        if edge is not None:
+            return edge, False
+        self._edges[key] = edge_data
+        self.data['edges'].append(edge_data)
+        return edge_data, True
+
+    def add(self, section, entry):
+        """Append an entry to an unindexed section (e.g. 'inheritance_chains')."""
+        self.data[section].append(entry)
+
+    def choice_title(self, choice_id, default=None):
+        """Title of a choice by id (falls back to `default`)."""
+        return self.choices.title(choice_id, default)
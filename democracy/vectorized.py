@@ -0,0 +1,138 @@
+"""
+Optional NumPy-vectorized ballot averaging for the delegation engine.
+
+The scalar engine averages each calculated member's inherited ballots with
+Decimal arithmetic, one choice at a time. In vectorized mode the engine first
+resolves the structure (who inherits from whom, tags, depth) and leaves the
+numbers for later; this module then computes every calculated ballot at once:
+
+- ballots are rows of a (members x choices) int64 fixed-point matrix holding
+  stars x 10**12, plus a boolean matrix recording which choices each ballot
+  contains
+- members are grouped by delegation depth. A member's sources always have a
+  smaller depth, so each depth level is one batch: its source rows are
+  gathered in CSR order, summed with `np.add.reduceat` and divided by the
+  source count with round-half-even integer division.
+
+Precision (a deliberate deviation from the Decimal path, which rounds each
+mean to 12 significant digits): every mean is rounded to 12 decimal places,
+and output ballots are exactly those fixed-point values, as Decimals with 12
+decimal places. Manual ballots (2 decimal places)
+are loaded exactly, so both paths agree to 1e-11 per delegation level and at
+most depth x 1e-11 overall. Persisted 2-decimal Vote stars only differ when a
+mean lies within that distance of a rounding boundary. Sums stay below 2**63
+for up to 1.8 million sources per member (stars are at most 5).
+
+NumPy is optional. Without it `numpy_available()` is False and the engine falls
+back to the Decimal path.
+"""
+
+from decimal import Context, Decimal, ROUND_HALF_EVEN
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None
+
+
+# Fixed-point scale: stars are stored as integer multiples of 10**-PLACES
+PLACES = 12
+
+# Wide enough that scaling a star value by 10**PLACES is never rounded
+FIXED_CONTEXT = Context(prec=40, rounding=ROUND_HALF_EVEN)
+
+
+def numpy_available():
+    """True when NumPy can be imported."""
+    return np is not None
+
+
+def to_fixed(stars):
+    """Decimal stars -> int multiple of 10**-PLACES (round half even)."""
+    return int(stars.scaleb(PLACES, FIXED_CONTEXT).to_integral_value(context=FIXED_CONTEXT))
+
+
+def from_fixed(value):
+    """Int multiple of 10**-PLACES -> Decimal stars with PLACES decimal places (exact)."""
+    return Decimal(int(value)).scaleb(-PLACES, FIXED_CONTEXT)
+
+
+def divide_half_even(sums, counts):
+    """
+    Integer division of each row of `sums` by `counts`, rounding half to even.
+
+    Args:
+        sums (ndarray): (rows x choices) int64 sums (non-negative)
+        counts (ndarray): (rows,) positive int64 divisors
+
+    Returns:
+        ndarray: (rows x choices) int64 rounded quotients
+    """
+    divisors = counts[:, None]
+    quotients, remainders = np.divmod(sums, divisors)
+    twice = 2 * remainders
+    round_up = (twice > divisors) | ((twice == divisors) & (quotients % 2 == 1))
+    return quotients + round_up
+
+
+def average_by_level(ballots, pending_sources, depth):
+    """
+    Average inherited ballots level by level.
+
+    Args:
+        ballots (list): Dense id -> ballot dict (choice_id -> Decimal) or None
+            for members whose ballot is not known yet
+        pending_sources (dict): Dense id -> dense ids of the ballots it averages
+        depth (array): Dense id -> delegation depth
+
+    Returns:
+        dict: Dense id -> calculated ballot dict (choice_id -> Decimal with
+            PLACES decimal places)
+    """
+    choice_ids = sorted({
+        choice_id
+        for ballot in ballots if ballot
+        for choice_id in ballot
+    })
+    choice_index = {choice_id: column for column, choice_id in enumerate(choice_ids)}
+
+    # Star values repeat a lot (whole stars, shared sources): convert each once
+    fixed = {}
+    decimals = {}
+
+    size = len(ballots)
+    values = np.zeros((size, len(choice_ids)), dtype=np.int64)
+    present = np.zeros((size, len(choice_ids)), dtype=bool)
+    for index, ballot in enumerate(ballots):
+        if ballot:
+            for choice_id, stars in ballot.items():
+                value = fixed.get(stars)
+                if value is None:
+                    value = fixed[stars] = to_fixed(stars)
+                values[index, choice_index[choice_id]] = value
+                present[index, choice_index[choice_id]] = True
+
+    levels = {}
+    for index in pending_sources:
+        levels.setdefault(depth[index], []).append(index)
+
+    for level in sorted(levels):
+        members = levels[level]
+        sources = [source for index in members for source in pending_sources[index]]
+        counts = np.array([len(pending_sources[index]) for index in members], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        rows = np.array(members, dtype=np.intp)
+        gathered = np.array(sources, dtype=np.intp)
+        values[rows] = divide_half_even(np.add.reduceat(values[gathered], starts, axis=0), counts)
+        present[rows] = np.logical_or.reduceat(present[gathered], starts, axis=0)
+
+    calculated = {}
+    for index in pending_sources:
+        ballot = calculated[index] = {}
+        columns = np.flatnonzero(present[index])
+        for column, value in zip(columns.tolist(), values[index, columns].tolist()):
+            stars = decimals.get(value)
+            if stars is None:
+                stars = decimals[value] = from_fixed(value)
+            ballot[choice_ids[column]] = stars
+    return calculated
@@ -49,6 +49,7 @@ def build_network_data(community):
     """
     import json
     from collections import defaultdict
+    from .follow_graph import FollowGraph
     
     # Get all memberships for this community
     all_memberships = Membership.objects.filter(
@@ -88,59 +89,20 @@ def build_network_data(community):
         })
     
     # Calculate transitive influence for each membership
-    # This counts not just direct followers, but everyone who inherits through chains
-    follower_counts = defaultdict(int)
-    
-    # Build adjacency list for traversal (follower -> followees)
+    # This counts not just direct followers, but everyone who inherits through chains.
+    # The links are compiled into an integer-indexed FollowGraph once, then each
+    # count is a single traversal of the reverse (followee -> followers) graph.
     adjacency = defaultdict(list)
-    for link in links:
-        adjacency[link['source']].append(link['target'])
+    for order, link in enumerate(links):
+        adjacency[link['source']].append({'followee_id': link['target'], 'tags': '', 'order': order})
     
-    # For each potential influencer, count everyone who could inherit from them
     all_node_ids = [node['id'] for node in nodes]
+    graph = FollowGraph.from_adjacency(all_node_ids, adjacency)
     
-    def count_influenced_by(influencer_id, visited=None):
-        """Recursively count all people who inherit from this influencer"""
-        if visited is None:
-            visited = set()
-        
-        count = 0
-        for follower_id in all_node_ids:
-            if follower_id == influencer_id or follower_id in visited:
-                continue
-            
-            # Check if this follower inherits from influencer (directly or transitively)
-            if can_reach(follower_id, influencer_id, visited.copy()):
-                count += 1
-        
-        return count
-    
-    def can_reach(from_id, to_id, visited=None):
-        """Check if from_id can reach to_id by following chains"""
-        if visited is None:
-            visited = set()
-        
-        if from_id == to_id:
-            return True
-        
-        if from_id in visited:
-            return False
-        
-        visited.add(from_id)
-        
-        # Check all people this person follows
-        for followee_id in adjacency.get(from_id, []):
-            if can_reach(followee_id, to_id, visited):
-                return True
-        
-        return False
-    
-    # Calculate influence for each node
-    for node_id in all_node_ids:
-        follower_counts[node_id] = count_influenced_by(node_id)
-    
-    # Convert defaultdict to regular dict for JSON serialization
-    follower_counts = dict(follower_counts)
+    follower_counts = {
+        node_id: graph.reverse_reachable_count(graph.index_of[node_id])
+        for node_id in all_node_ids
+    }
     
     # Convert to JSON for safe template rendering
     return {
@@ -1538,23 +1500,25 @@ def get_member_tags_in_community(membership):
     """
     Get all unique tags a member has used in their community.
     
-    Queries Ballot tags where this membership has voted.
+    Queries the distinct Ballot tag strings where this membership has voted
+    and unions them as interned bitmasks (each distinct string is split once).
     Returns list of unique tag names.
     """
-    # Get all ballots this user has cast in this community's decisions
-    ballots = Ballot.objects.filter(
+    from .tag_interner import TagInterner
+    
+    # Get all distinct tag strings this user has applied in this community's decisions
+    tag_strings = Ballot.objects.filter(
         voter=membership.member,
         decision__community=membership.community
-    ).exclude(tags='').exclude(tags__isnull=True).values_list('tags', flat=True)
+    ).exclude(tags='').exclude(tags__isnull=True).values_list('tags', flat=True).order_by().distinct()
     
     # Collect all unique tags from ballots
-    tag_names = set()
-    for tags_string in ballots:
-        if tags_string:
-            for tag in tags_string.split(','):
-                tag_names.add(tag.strip())
+    interner = TagInterner()
+    used_mask = 0
+    for tags_string in tag_strings:
+        used_mask |= interner.mask(tags_string)
     
-    return sorted(list(tag_names))
+    return interner.tags(used_mask)
 
 
 @login_required
@@ -10,10 +10,13 @@ from django.contrib.auth import get_user_model
 from django.test import Client
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
 
 from democracy.models import Community, Decision, Choice, Ballot, Vote, Membership, Following
 from security.models import CommunityApplication
 from crowdvote.models import BaseModel
+from tests.factories import ChoiceFactory, CommunityFactory, DecisionFactory, UserFactory
 
 User = get_user_model()
 
@@ -79,6 +82,40 @@ def decision_factory():
     return create_decision
 
 
+@pytest.fixture
+def chain_community_factory():
+    """Factory function for a follow chain: member i follows member i-1, member 0 votes manually."""
+    def create_chain_community(size):
+        community = CommunityFactory()
+        decision = DecisionFactory(community=community, with_choices=False)
+        choices = [ChoiceFactory(decision=decision, title=f"Option {i}") for i in range(2)]
+
+        memberships = [
+            Membership.objects.create(
+                community=community, member=UserFactory(), is_anonymous=False, is_voting_community_member=True
+            )
+            for _ in range(size)
+        ]
+        for follower, followee in zip(memberships[1:], memberships):
+            Following.objects.create(follower=follower, followee=followee, tags='', order=1)
+
+        ballot = Ballot.objects.create(
+            decision=decision, voter=memberships[0].member, is_calculated=False,
+            hashed_username='manual', tags='budget',
+        )
+        Vote.objects.create(ballot=ballot, choice=choices[0], stars=Decimal('4.00'))
+        Vote.objects.create(ballot=ballot, choice=choices[1], stars=Decimal('1.00'))
+        return decision, memberships, choices
+    return create_chain_community
+
+
+@pytest.fixture
+def no_background_recalculation():
+    """Keep signal-spawned recalculation threads from racing the code under test."""
+    with patch('democracy.signals.threading.Thread'):
+        yield
+
+
 @pytest.fixture
 def test_user(user_factory):
     """Create a standard test user."""
@@ -0,0 +1,20 @@
+"""
+Helper functions shared by CrowdVote test modules.
+
+Test modules import these instead of importing each other.
+"""
+
+from .delegation import make_snapshot_data, mutate, random_cyclic_snapshot
+from .services import add_voter, calculate
+from .star_tally import in_worker_thread, random_stars, run_tally
+
+__all__ = [
+    'make_snapshot_data',
+    'mutate',
+    'random_cyclic_snapshot',
+    'add_voter',
+    'calculate',
+    'in_worker_thread',
+    'random_stars',
+    'run_tally',
+]
@@ -0,0 +1,74 @@
+"""
+Synthetic snapshot data for delegation engine tests.
+
+Members, followings and manual ballots are plain ids and tuples, converted by
+make_snapshot_data() into the snapshot_data shape CreateCalculationSnapshot
+produces.
+"""
+
+from decimal import Decimal
+
+
+def make_snapshot_data(members, followings, manual_ballots, choices=('c1', 'c2', 'c3')):
+    """Build minimal snapshot_data in the shape CreateCalculationSnapshot produces."""
+    return {
+        'community_memberships': list(members),
+        'followings': {
+            follower: [
+                {'followee_id': followee, 'tags': tags, 'order': order}
+                for order, (followee, tags) in enumerate(targets, start=1)
+            ]
+            for follower, targets in followings.items()
+        },
+        'existing_ballots': {
+            voter_id: {
+                'voter_id': voter_id,
+                'is_calculated': False,
+                'is_anonymous': False,
+                'tags': tags,
+                'votes': votes,
+            }
+            for voter_id, (tags, votes) in manual_ballots.items()
+        },
+        'choices_data': [{'id': c, 'title': c.upper()} for c in choices],
+    }
+
+
+def random_cyclic_snapshot(rng, size=40):
+    """Generate a random follow graph that may contain delegation cycles."""
+    members = [f'v{i:03d}' for i in range(size)]
+    tags = ['budget', 'parks', 'schools', '']
+    manual = {}
+    followings = {}
+    for voter_id in members:
+        if rng.random() < 0.25:
+            manual[voter_id] = (
+                ','.join(rng.sample(tags[:3], rng.randint(0, 2))),
+                {c: str(Decimal(rng.randint(0, 500)) / 100) for c in rng.sample(['c1', 'c2', 'c3'], rng.randint(1, 3))},
+            )
+        if rng.random() < 0.8:
+            targets = rng.sample([m for m in members if m != voter_id], rng.randint(1, 3))
+            followings[voter_id] = [(t, rng.choice(tags)) for t in targets]
+    return members, followings, manual
+
+
+def mutate(rng, members, followings, manual):
+    """Apply one random change: manual ballot edit, follow/unfollow, or new member."""
+    members, followings, manual = list(members), {k: list(v) for k, v in followings.items()}, dict(manual)
+    change = rng.choice(['ballot', 'unvote', 'follow', 'unfollow', 'join'])
+    voter_id = rng.choice(members)
+    if change == 'ballot':
+        manual[voter_id] = ('budget', {'c1': str(Decimal(rng.randint(0, 500)) / 100)})
+    elif change == 'unvote':
+        manual.pop(voter_id, None)
+    elif change == 'follow':
+        followee = rng.choice([m for m in members if m != voter_id])
+        if followee not in [t for t, _ in followings.get(voter_id, [])]:
+            followings.setdefault(voter_id, []).append((followee, rng.choice(['', 'parks'])))
+    elif change == 'unfollow' and followings.get(voter_id):
+        followings[voter_id].pop(rng.randrange(len(followings[voter_id])))
+    else:
+        new_id = f'n{len(members):03d}'
+        members.append(new_id)
+        followings[new_id] = [(voter_id, '')]
+    return members, followings, manual
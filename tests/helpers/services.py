@@ -0,0 +1,33 @@
+"""
+Database helpers for snapshot pipeline and live tally tests.
+"""
+
+from decimal import Decimal
+
+from democracy.models import Ballot, Membership, Vote
+from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots, Tally
+from tests.factories import UserFactory
+
+
+def calculate(decision, reuse_unchanged=True):
+    """Run the snapshot pipeline; returns (snapshot, service)."""
+    service = CreateCalculationSnapshot(decision.id, reuse_unchanged=reuse_unchanged)
+    snapshot = service.process()
+    if not service.unchanged:
+        SnapshotBasedStageBallots(snapshot.id, persist_ballots=True).process()
+        Tally(snapshot_id=snapshot.id).process()
+    return snapshot, service
+
+
+def add_voter(decision, choices, stars, tags='', is_voting=True):
+    """Add a member with a manual ballot."""
+    membership = Membership.objects.create(
+        community=decision.community, member=UserFactory(), is_anonymous=False,
+        is_voting_community_member=is_voting,
+    )
+    ballot = Ballot.objects.create(
+        decision=decision, voter=membership.member, hashed_username=str(membership.id), tags=tags
+    )
+    for choice, value in zip(choices, stars):
+        Vote.objects.create(ballot=ballot, choice=choice, stars=Decimal(value))
+    return membership
@@ -0,0 +1,33 @@
+"""
+Ballot and tally helpers for STAR tally backend tests.
+"""
+
+import threading
+from decimal import Decimal, getcontext
+
+from democracy.exceptions import UnresolvedTieError
+from democracy.star_voting import STARVotingTally
+
+
+def random_stars(rng):
+    """A star rating as entered by a voter (0-5, 2 decimal places)."""
+    return Decimal(rng.randint(0, 500)) / 100
+
+
+def run_tally(ballots, arithmetic=None):
+    """Run a STAR tally, returning the result or the unresolved tie details."""
+    try:
+        return STARVotingTally(arithmetic=arithmetic).run(ballots)
+    except UnresolvedTieError as error:
+        return {'unresolved': sorted(map(str, error.tied_candidates)), 'log': error.tiebreaker_log}
+
+
+def in_worker_thread(function):
+    """Call a function in a new thread, which starts from decimal.DefaultContext."""
+    results = []
+    thread = threading.Thread(target=lambda: results.append((getcontext().prec, function())))
+    thread.start()
+    thread.join()
+    precision, result = results[0]
+    assert precision != 12
+    return result
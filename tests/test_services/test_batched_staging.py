@@ -0,0 +1,365 @@
+"""
+Tests for the batched StageBallots staging mode.
+
+This test suite validates StageBallots.stage_decision, including:
+- Inheritance through follow chains with tag filtering
+- Constant query count regardless of community size
+- Re-staging replaces previously calculated votes
+- Manual ballots cast while staging runs are never overwritten
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from democracy.models import Ballot, Following, Membership, Vote
+from democracy.services import StageBallots
+from democracy.snapshot_ballots import decode_ballots
+from tests.factories import ChoiceFactory, DecisionFactory, UserFactory
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestBatchedStaging:
+    """stage_decision must calculate ballots with bulk reads and writes."""
+
+    def test_chain_inherits_manual_ballot(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(4)
+
+        stats = StageBallots().stage_decision(decision)
+
+        assert stats['manual_ballots'] == 1
+        assert stats['calculated_ballots'] == 3
+        last_ballot = Ballot.objects.get(decision=decision, voter=memberships[-1].member)
+        assert last_ballot.is_calculated is True
+        assert last_ballot.tags == 'budget'
+        assert {v.choice_id: v.stars for v in last_ballot.votes.all()} == {
+            choices[0].id: Decimal('4.00'), choices[1].id: Decimal('1.00')
+        }
+
+    def test_tag_filtered_following_without_match_gets_no_votes(self, chain_community_factory):
+        decision, memberships, _ = chain_community_factory(2)
+        Following.objects.filter(follower=memberships[1]).update(tags='parks')
+
+        stats = StageBallots().stage_decision(decision)
+
+        assert stats['no_ballot'] == 1
+        ballot = Ballot.objects.get(decision=decision, voter=memberships[1].member)
+        assert ballot.is_calculated is True
+        assert ballot.votes.count() == 0
+
+    def test_query_count_does_not_grow_with_community_size(self, chain_community_factory):
+        small_decision, _, _ = chain_community_factory(3)
+        large_decision, _, _ = chain_community_factory(30)
+
+        with CaptureQueriesContext(connection) as small:
+            StageBallots().stage_decision(small_decision)
+        with CaptureQueriesContext(connection) as large:
+            StageBallots().stage_decision(large_decision)
+
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_restaging_replaces_calculated_votes(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(3)
+        service = StageBallots()
+        service.stage_decision(decision)
+
+        Vote.objects.filter(ballot__voter=memberships[0].member).update(stars=Decimal('2.00'))
+        stats = service.stage_decision(decision)
+
+        assert stats['ballots_created'] == 0
+        follower_votes = Vote.objects.filter(ballot__voter=memberships[2].member, choice=choices[0])
+        assert [vote.stars for vote in follower_votes] == [Decimal('2.00')]
+
+    def test_process_stages_every_open_decision_in_batched_mode(self, chain_community_factory):
+        decision, memberships, _ = chain_community_factory(4)
+
+        with patch.object(StageBallots, 'get_or_calculate_ballot') as recursive:
+            staged = StageBallots().process()
+
+        recursive.assert_not_called()
+        assert staged[str(decision.id)]['calculated_ballots'] == 3
+        assert Ballot.objects.filter(decision=decision, is_calculated=True).count() == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestSinglePassPipeline:
+    """Snapshot staging must persist calculated ballots from its single engine run."""
+
+    def test_snapshot_staging_persists_calculated_ballots(self, chain_community_factory):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+
+        decision, memberships, choices = chain_community_factory(3)
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+
+        stats = SnapshotBasedStageBallots(snapshot.id, persist_ballots=True).process()
+
+        assert stats['persisted']['ballots_created'] == 2
+        nodes = {node['voter_id']: node for node in stats_nodes(snapshot)}
+        for membership in memberships[1:]:
+            ballot = Ballot.objects.get(decision=decision, voter=membership.member)
+            node = nodes[str(membership.member.id)]
+            assert ballot.is_calculated is True
+            assert node['vote_type'] == 'calculated'
+            assert {str(v.choice_id): float(v.stars) for v in ballot.votes.all()} == {
+                choice_id: vote['stars'] for choice_id, vote in node['votes'].items()
+            }
+
+    def test_snapshot_staging_persists_lobbyist_ballots(self, chain_community_factory):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+
+        decision, memberships, _ = chain_community_factory(2)
+        lobbyist = Membership.objects.create(
+            community=decision.community, member=UserFactory(), is_anonymous=False,
+            is_voting_community_member=False,
+        )
+        Following.objects.create(follower=lobbyist, followee=memberships[0], tags='', order=1)
+        bystander = Membership.objects.create(
+            community=decision.community, member=UserFactory(), is_anonymous=False,
+            is_voting_community_member=False,
+        )
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+
+        stats = SnapshotBasedStageBallots(snapshot.id, persist_ballots=True).process()
+
+        assert stats['calculated_ballots'] == 1
+        lobbyist_ballot = Ballot.objects.get(decision=decision, voter=lobbyist.member)
+        assert lobbyist_ballot.is_calculated is True
+        assert [v.stars for v in lobbyist_ballot.votes.order_by('choice__title')] == [
+            Decimal('4.00'), Decimal('1.00')
+        ]
+        # Like the previous per-membership staging, members without sources get an empty ballot
+        bystander_ballot = Ballot.objects.get(decision=decision, voter=bystander.member)
+        assert bystander_ballot.is_calculated is True
+        assert not bystander_ballot.votes.exists()
+        # Lobbyists are staged but never counted
+        snapshot.refresh_from_db()
+        assert sorted(decode_ballots(snapshot.snapshot_data['tally_ballots'])) == sorted(
+            str(membership.member_id) for membership in memberships
+        )
+
+    def test_snapshot_staging_without_persist_leaves_ballots_alone(self, chain_community_factory):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+
+        decision, _, _ = chain_community_factory(3)
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+
+        SnapshotBasedStageBallots(snapshot.id).process()
+
+        assert Ballot.objects.filter(decision=decision).count() == 1
+
+
+def cast_manual_ballot_on_write(decision, membership, stars):
+    """
+    Patch transaction.atomic so the voter casts a manual ballot just before
+    the next transaction starts.
+    """
+    atomic = transaction.atomic
+    pending = [True]
+
+    def cast_then_atomic(*args, **kwargs):
+        if not pending:
+            return atomic(*args, **kwargs)
+        pending.clear()
+        ballot, _ = Ballot.objects.update_or_create(
+            decision=decision, voter=membership.member,
+            defaults={'is_calculated': False, 'hashed_username': 'manual-late', 'tags': ''},
+        )
+        Vote.objects.filter(ballot=ballot).delete()
+        for choice in decision.choices.all():
+            Vote.objects.create(ballot=ballot, choice=choice, stars=stars)
+        return atomic(*args, **kwargs)
+
+    return patch('democracy.services.transaction.atomic', side_effect=cast_then_atomic)
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestConcurrentManualBallots:
+    """write_calculated_ballots must re-check ballots under lock at write time."""
+
+    def assert_manual(self, decision, membership, stars):
+        ballot = Ballot.objects.get(decision=decision, voter=membership.member)
+        assert ballot.is_calculated is False
+        assert {vote.stars for vote in ballot.votes.all()} == {stars}
+
+    def test_manual_ballot_cast_before_the_write_is_kept(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(3)
+        StageBallots().stage_decision(decision)
+        voter_id = str(memberships[2].member_id)
+        results = {voter_id: {'type': 'calculated', 'tags': ['budget'], 'ballot': {str(choices[0].id): Decimal('4')}}}
+
+        with cast_manual_ballot_on_write(decision, memberships[2], Decimal('1.00')):
+            stats = StageBallots().write_calculated_ballots(decision, results, [voter_id])
+
+        assert stats == {'ballots_created': 0, 'ballots_updated': 0, 'votes_written': 0}
+        self.assert_manual(decision, memberships[2], Decimal('1.00'))
+
+
+    def test_staging_rechecks_ballots_read_before_resolution(self, chain_community_factory):
+        decision, memberships, _ = chain_community_factory(4)
+        StageBallots().stage_decision(decision)
+
+        # Calculated when staging read the ballots, manual when it writes
+        with cast_manual_ballot_on_write(decision, memberships[2], Decimal('2.00')):
+            stats = StageBallots().stage_decision(decision)
+
+        assert stats['ballots_updated'] == 2
+        self.assert_manual(decision, memberships[2], Decimal('2.00'))
+
+    def test_staging_skips_voters_who_cast_a_first_ballot(self, chain_community_factory):
+        decision, memberships, _ = chain_community_factory(3)
+
+        with cast_manual_ballot_on_write(decision, memberships[2], Decimal('3.00')):
+            stats = StageBallots().stage_decision(decision)
+
+        assert stats['ballots_created'] == 1
+        self.assert_manual(decision, memberships[2], Decimal('3.00'))
+
+
+def stats_nodes(snapshot):
+    snapshot.refresh_from_db()
+    return snapshot.snapshot_data['delegation_tree']['nodes']
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestIncrementalSnapshotStaging:
+    """Incremental snapshot staging must match a full recomputation."""
+
+    def run_pipeline(self, decision, **kwargs):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+        stats = SnapshotBasedStageBallots(snapshot.id, persist_ballots=True, **kwargs).process()
+        snapshot.refresh_from_db()
+        return snapshot, stats
+
+    def test_incremental_matches_full_recomputation(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(5)
+        # An unrelated member with their own manual ballot
+        bystander = Membership.objects.create(
+            community=decision.community, member=UserFactory(), is_anonymous=False, is_voting_community_member=True
+        )
+        ballot = Ballot.objects.create(decision=decision, voter=bystander.member, hashed_username='x', tags='')
+        Vote.objects.create(ballot=ballot, choice=choices[0], stars=Decimal('3.00'))
+        self.run_pipeline(decision)
+
+        Vote.objects.filter(ballot__voter=memberships[0].member, choice=choices[0]).update(stars=Decimal('1.00'))
+        incremental, stats = self.run_pipeline(decision, incremental=True)
+        full, _ = self.run_pipeline(decision)
+
+        # Changed manual voter, its 4 followers and the (always re-read) bystander
+        assert stats['recomputed_members'] == 6
+        assert incremental.snapshot_data['resolved_ballots'] == full.snapshot_data['resolved_ballots']
+        assert incremental.snapshot_data['delegation_tree'] == full.snapshot_data['delegation_tree']
+        last_votes = Vote.objects.filter(ballot__voter=memberships[-1].member).order_by('choice__title')
+        assert [vote.stars for vote in last_votes] == [Decimal('1.00'), Decimal('1.00')]
+
+    def test_incremental_tally_state_matches_full_recount(self, chain_community_factory):
+        from democracy.services import tally_ballot
+        from democracy.star_incremental import IncrementalSTARTally
+        from democracy.star_voting import STARVotingTally
+
+        decision, memberships, choices = chain_community_factory(5)
+        self.run_pipeline(decision)
+
+        Vote.objects.filter(ballot__voter=memberships[0].member, choice=choices[1]).update(stars=Decimal('4.50'))
+        incremental, stats = self.run_pipeline(decision, incremental=True)
+        full, _ = self.run_pipeline(decision)
+
+        assert stats['tally_updates'] == 5
+        ballots = [ballot for ballot in map(tally_ballot, full.snapshot_data['delegation_tree']['nodes']) if ballot]
+        expected = STARVotingTally().run(ballots)
+        assert IncrementalSTARTally.from_state(incremental.snapshot_data['tally_state']).run() == expected
+        assert IncrementalSTARTally.from_state(full.snapshot_data['tally_state']).run() == expected
+        assert expected['winner'] == str(choices[1].id)
+
+    def test_failed_snapshot_save_rolls_back_persisted_ballots(self, chain_community_factory):
+        from democracy.models import DecisionSnapshot
+
+        decision, memberships, choices = chain_community_factory(3)
+        self.run_pipeline(decision)
+        Vote.objects.filter(ballot__voter=memberships[0].member, choice=choices[0]).update(stars=Decimal('1.00'))
+
+        save = DecisionSnapshot.save
+
+        def fail_on_completion(snapshot, *args, **kwargs):
+            if snapshot.calculation_status == 'completed':
+                raise RuntimeError('disk full')
+            return save(snapshot, *args, **kwargs)
+
+        with patch.object(DecisionSnapshot, 'save', autospec=True, side_effect=fail_on_completion):
+            with pytest.raises(RuntimeError):
+                self.run_pipeline(decision, incremental=True)
+
+        failed = DecisionSnapshot.objects.filter(decision=decision).first()
+        assert failed.calculation_status == 'failed_staging'
+        assert 'persisted' not in (failed.snapshot_data.get('statistics') or {})
+        last_votes = Vote.objects.filter(ballot__voter=memberships[-1].member, choice=choices[0])
+        assert [vote.stars for vote in last_votes] == [Decimal('4.00')]
+
+    def test_ballots_written_outside_the_pipeline_force_a_full_write(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(4)
+        self.run_pipeline(decision)
+        manual_vote = Vote.objects.filter(ballot__voter=memberships[0].member, choice=choices[0])
+        manual_vote.update(stars=Decimal('1.00'))
+        StageBallots().stage_decision(decision)
+        manual_vote.update(stars=Decimal('4.00'))
+
+        # Inputs equal the previous snapshot's, but the stored ballots do not
+        _, stats = self.run_pipeline(decision, incremental=True)
+
+        assert stats['recomputed_members'] == 4
+        follower_votes = Vote.objects.filter(ballot__decision=decision, ballot__is_calculated=True, choice=choices[0])
+        assert sorted(vote.stars for vote in follower_votes) == [Decimal('4.00')] * 3
+
+    def test_unchanged_inputs_recompute_only_manual_voters(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(5)
+        self.run_pipeline(decision)
+
+        _, stats = self.run_pipeline(decision, incremental=True)
+
+        assert stats['recomputed_members'] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestCommunityBatchRecalculation:
+    """All open decisions of a community are recalculated against one shared graph."""
+
+    def test_every_open_decision_gets_its_own_snapshot_and_ballots(self, chain_community_factory):
+        from democracy.delegation import SharedCondensation
+        from democracy.models import DecisionSnapshot
+        from democracy.signals import recalculate_community_decisions_async
+
+        decision, memberships, choices = chain_community_factory(4)
+        other = DecisionFactory(community=decision.community, with_choices=False)
+        other_choice = ChoiceFactory(decision=other, title='Other option')
+        ballot = Ballot.objects.create(
+            decision=other, voter=memberships[1].member, is_calculated=False, hashed_username='other', tags=''
+        )
+        Vote.objects.create(ballot=ballot, choice=other_choice, stars=Decimal('2.00'))
+
+        # The background function closes its connection when done; keep the test's open
+        with patch('django.db.connection.close'), patch.object(
+            SharedCondensation, 'from_snapshot', wraps=SharedCondensation.from_snapshot
+        ) as built:
+            recalculate_community_decisions_async(decision.community.id, 'test')
+
+        assert built.call_count == 1
+        for each in (decision, other):
+            assert DecisionSnapshot.objects.get(decision=each).calculation_status == 'completed'
+        last = Ballot.objects.get(decision=decision, voter=memberships[-1].member)
+        assert [v.stars for v in last.votes.order_by('choice__title')] == [Decimal('4.00'), Decimal('1.00')]
+        # In the other decision the chain starts at member 1, so member 0 has no ballot votes
+        last_other = Ballot.objects.get(decision=other, voter=memberships[-1].member)
+        assert [v.stars for v in last_other.votes.all()] == [Decimal('2.00')]
+        assert not Vote.objects.filter(ballot__decision=other, ballot__voter=memberships[0].member).exists()
@@ -0,0 +1,81 @@
+"""
+Tests for the per-decision choice index.
+
+This test suite validates democracy.choice_index.ChoiceIndex and its use,
+including:
+- Id/title lookups with the id as fallback label
+- Decision.choice_index is loaded once per instance
+- Snapshot delegation tree nodes carry real choice titles
+- Live tally reports and stats label choices (and unresolved ties) by title
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from democracy.choice_index import ChoiceIndex
+from democracy.models import Ballot, Result, Vote
+from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots, Tally
+from tests.helpers import add_voter
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+class TestChoiceIndex:
+    """Lookups from frozen choices_data."""
+
+    def test_lookups(self):
+        index = ChoiceIndex.from_data([{'id': 'c1', 'title': 'Parks'}, {'id': 'c2', 'title': 'Roads'}])
+
+        assert list(index) == ['c1', 'c2'] and len(index) == 2
+        assert 'c1' in index and 'c3' not in index
+        assert index.title('c2') == 'Roads'
+        assert index.title('c3') is None
+        assert index.labels(['c2', 'c3']) == ['Roads', 'c3']
+        assert index.choice('c1') is None
+        assert index.as_data() == [
+            {'id': 'c1', 'title': 'Parks', 'description': ''},
+            {'id': 'c2', 'title': 'Roads', 'description': ''},
+        ]
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestDecisionChoiceIndex:
+    """Decision.choice_index and its consumers."""
+
+    def test_loaded_once(self, chain_community_factory):
+        decision, _, choices = chain_community_factory(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            index = decision.choice_index
+            assert decision.choice_index is index
+            assert index.label(choices[0].id) == 'Option 0'
+            assert index.choice(str(choices[1].id)) == choices[1]
+        assert len(queries.captured_queries) == 1
+
+    def test_snapshot_tree_nodes_have_choice_titles(self, chain_community_factory):
+        decision, _, choices = chain_community_factory(3)
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+
+        SnapshotBasedStageBallots(snapshot.id).process()
+
+        snapshot.refresh_from_db()
+        titles = {str(choice.id): choice.title for choice in choices}
+        for node in snapshot.snapshot_data['delegation_tree']['nodes']:
+            assert {cid: vote['choice_name'] for cid, vote in node['votes'].items()} == titles
+
+    def test_live_tally_labels_unresolved_tie(self, chain_community_factory):
+        decision, _, choices = chain_community_factory(1)
+        Vote.objects.filter(ballot__decision=decision).delete()
+        Ballot.objects.filter(decision=decision).delete()
+        add_voter(decision, choices, ['5', '3'])
+        add_voter(decision, choices, ['3', '5'])
+
+        Tally().process()
+
+        result = Result.objects.get(decision=decision)
+        tied = [entry['choice'] for entry in result.stats['tied_candidates']]
+        assert sorted(tied) == ['Option 0', 'Option 1']
+        assert f"Tied candidates: {', '.join(tied)}" in result.report
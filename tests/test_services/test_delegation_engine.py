@@ -0,0 +1,292 @@
+"""
+Tests for the iterative, SCC-condensed delegation engine.
+
+This test suite validates democracy.delegation.DelegationEngine, including:
+- Identical ballots and tags to the previous recursive engine on acyclic graphs
+- Deterministic, visit-order independent handling of delegation cycles
+- Deep delegation chains far beyond Python's recursion limit
+"""
+
+import random
+import sys
+from decimal import Decimal
+
+from democracy.delegation import DelegationEngine
+from democracy.star_arithmetic import star_context
+from tests.helpers import make_snapshot_data, mutate, random_cyclic_snapshot
+
+
+def recursive_reference(snapshot_data):
+    """Port of the previous recursive `_calculate_ballot_from_snapshot` (ballots and tags only)."""
+    cache = {}
+
+    def calculate(voter_id, follow_path):
+        if voter_id in follow_path:
+            return None
+        if voter_id in cache:
+            return cache[voter_id]
+        ballot_data = snapshot_data['existing_ballots'].get(voter_id)
+        if ballot_data and not ballot_data['is_calculated']:
+            result = {
+                'ballot': {c: Decimal(s) for c, s in ballot_data['votes'].items()},
+                'tags': ballot_data['tags'].split(',') if ballot_data['tags'] else [],
+            }
+            cache[voter_id] = result
+            return result
+        followings = snapshot_data['followings'].get(voter_id, [])
+        ballots_to_average = []
+        inherited_tags = set()
+        for following in followings:
+            follow_tags = following['tags'].split(',') if following['tags'] else []
+            followee_result = calculate(following['followee_id'], follow_path + [voter_id])
+            if followee_result is None:
+                continue
+            if not follow_tags:
+                ballots_to_average.append(followee_result['ballot'])
+                inherited_tags.update(followee_result['tags'])
+            else:
+                matching = set(followee_result['tags']).intersection(follow_tags)
+                if matching:
+                    ballots_to_average.append(followee_result['ballot'])
+                    inherited_tags.update(matching)
+        if not ballots_to_average:
+            return None
+        choice_ids = set()
+        for ballot in ballots_to_average:
+            choice_ids.update(ballot)
+        result = {
+            'ballot': {
+                c: sum(b.get(c, Decimal('0')) for b in ballots_to_average) / Decimal(len(ballots_to_average))
+                for c in choice_ids
+            },
+            'tags': inherited_tags,
+        }
+        cache[voter_id] = result
+        return result
+
+    # The recursive engine averaged at the 12-digit star precision
+    with star_context():
+        return {str(m): calculate(str(m), []) for m in snapshot_data['community_memberships']}
+
+
+def random_acyclic_snapshot(rng, size=40):
+    """Generate a random acyclic follow graph with tag-filtered followings."""
+    members = [f'v{i:03d}' for i in range(size)]
+    tags = ['budget', 'parks', 'schools', '']
+    manual = {}
+    followings = {}
+    for index, voter_id in enumerate(members):
+        if rng.random() < 0.3:
+            manual[voter_id] = (
+                ','.join(rng.sample(tags[:3], rng.randint(0, 2))),
+                {c: str(Decimal(rng.randint(0, 500)) / 100) for c in rng.sample(['c1', 'c2', 'c3'], rng.randint(1, 3))},
+            )
+        elif index:
+            # Only follow lower-numbered members: guarantees an acyclic graph
+            targets = rng.sample(members[:index], min(index, rng.randint(1, 3)))
+            followings[voter_id] = [(t, rng.choice(tags)) for t in targets]
+    return make_snapshot_data(members, followings, manual)
+
+
+class TestAcyclicEquivalence:
+    """The engine must reproduce the recursive engine exactly on acyclic graphs."""
+
+    def test_random_acyclic_graphs_match_recursive_engine(self):
+        rng = random.Random(20251016)
+        for _ in range(50):
+            snapshot_data = random_acyclic_snapshot(rng)
+            expected = recursive_reference(snapshot_data)
+            results = DelegationEngine(snapshot_data).resolve()
+
+            for voter_id, reference in expected.items():
+                result = results[voter_id]
+                if reference is None:
+                    assert result['type'] == 'no_ballot'
+                else:
+                    assert result['ballot'] == reference['ballot']
+                    assert set(result['tags']) == set(reference['tags'])
+
+    def test_simple_chain_averaging(self):
+        snapshot_data = make_snapshot_data(
+            members=['a', 'b', 'c', 'd'],
+            followings={'c': [('a', ''), ('b', '')], 'd': [('c', 'budget')]},
+            manual_ballots={
+                'a': ('budget', {'c1': '5.00', 'c2': '1.00'}),
+                'b': ('parks', {'c1': '2.00'}),
+            },
+        )
+        results = DelegationEngine(snapshot_data).resolve()
+
+        assert results['c']['type'] == 'calculated'
+        assert results['c']['ballot'] == {'c1': Decimal('3.5'), 'c2': Decimal('0.5')}
+        assert results['c']['tags'] == ['budget', 'parks']
+        assert results['c']['delegation_depth'] == 1
+        assert results['d']['ballot'] == results['c']['ballot']
+        assert results['d']['tags'] == ['budget']
+        assert results['d']['delegation_depth'] == 2
+
+
+class TestCycleHandling:
+    """Delegation cycles must resolve deterministically, regardless of visit order."""
+
+    def cycle_snapshot(self, members):
+        return make_snapshot_data(
+            members=members,
+            followings={
+                'a': [('b', ''), ('m', '')],
+                'b': [('c', '')],
+                'c': [('a', '')],
+                'x': [('y', '')],
+                'y': [('x', '')],
+            },
+            manual_ballots={'m': ('', {'c1': '4.00'})},
+        )
+
+    def test_cycle_results_do_not_depend_on_member_order(self):
+        members = ['a', 'b', 'c', 'm', 'x', 'y']
+        baseline = DelegationEngine(self.cycle_snapshot(members)).resolve()
+
+        rng = random.Random(7)
+        for _ in range(20):
+            shuffled = members[:]
+            rng.shuffle(shuffled)
+            results = DelegationEngine(self.cycle_snapshot(shuffled)).resolve()
+            for voter_id in members:
+                assert results[voter_id]['type'] == baseline[voter_id]['type']
+                assert results[voter_id]['ballot'] == baseline[voter_id]['ballot']
+
+    def test_cycle_members_inherit_through_resolved_entry_point(self):
+        engine = DelegationEngine(self.cycle_snapshot(['a', 'b', 'c', 'm', 'x', 'y']))
+        results = engine.resolve()
+
+        # 'a' has an external source; 'c' and then 'b' inherit through it
+        assert results['a']['ballot'] == {'c1': Decimal('4.00')}
+        assert results['c']['ballot'] == {'c1': Decimal('4.00')}
+        assert results['b']['ballot'] == {'c1': Decimal('4.00')}
+        assert results['b']['delegation_depth'] == 3
+
+        # A closed cycle with no outside ballot resolves to nothing
+        assert results['x']['type'] == 'no_ballot'
+        assert results['y']['type'] == 'no_ballot'
+        assert results['x']['reason'] == 'Circular delegation'
+        assert ('x', 'y') in engine.circular_prevented
+
+    def test_manual_voter_breaks_cycle(self):
+        snapshot_data = make_snapshot_data(
+            members=['a', 'b'],
+            followings={'a': [('b', '')], 'b': [('a', '')]},
+            manual_ballots={'b': ('', {'c1': '2.00'})},
+        )
+        engine = DelegationEngine(snapshot_data)
+        results = engine.resolve()
+
+        assert results['a']['ballot'] == {'c1': Decimal('2.00')}
+        assert engine.circular_prevented == []
+
+
+class TestDeepChains:
+    """Deep chains must not hit the recursion limit."""
+
+    def test_chain_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 3
+        members = [f'v{i}' for i in range(depth)]
+        followings = {members[i]: [(members[i - 1], '')] for i in range(1, depth)}
+        snapshot_data = make_snapshot_data(members, followings, {'v0': ('', {'c1': '3.00'})})
+
+        results = DelegationEngine(snapshot_data).resolve()
+
+        assert results[members[-1]]['ballot'] == {'c1': Decimal('3.00')}
+        assert results[members[-1]]['delegation_depth'] == depth - 1
+
+
+class TestIncrementalRecomputation:
+    """Incremental results must equal a full recomputation."""
+
+    def test_random_changes_match_full_recomputation(self):
+        from democracy.delegation import changed_voters
+
+        rng = random.Random(1016)
+        for _ in range(40):
+            members, followings, manual = random_cyclic_snapshot(rng)
+            previous_data = make_snapshot_data(members, followings, manual)
+            previous_engine = DelegationEngine(previous_data)
+            previous_engine.resolve()
+            exported = previous_engine.export_resolutions()
+
+            for _ in range(3):
+                members, followings, manual = mutate(rng, members, followings, manual)
+            snapshot_data = make_snapshot_data(members, followings, manual)
+
+            full_engine = DelegationEngine(snapshot_data)
+            full = full_engine.resolve()
+            incremental_engine = DelegationEngine(snapshot_data)
+            incremental = incremental_engine.resolve(
+                previous=exported, changed=changed_voters(previous_data, snapshot_data)
+            )
+
+            assert list(incremental) == list(full)
+            for voter_id in full:
+                assert incremental[voter_id] == full[voter_id]
+            assert incremental_engine.circular_prevented == full_engine.circular_prevented
+            assert incremental_engine.export_resolutions() == full_engine.export_resolutions()
+
+    def test_only_reverse_reachable_members_are_reevaluated(self):
+        members = [f'v{i}' for i in range(6)]
+        # Two independent chains: v1 -> v0 -> m0 and v3 -> v2 -> m1
+        followings = {'v0': [('m0', '')], 'v1': [('v0', '')], 'v2': [('m1', '')], 'v3': [('v2', '')]}
+        manual = {'m0': ('', {'c1': '1.00'}), 'm1': ('', {'c1': '2.00'})}
+        previous_data = make_snapshot_data(members + ['m0', 'm1'], followings, manual)
+        previous_engine = DelegationEngine(previous_data)
+        previous_engine.resolve()
+
+        manual['m0'] = ('', {'c1': '5.00'})
+        snapshot_data = make_snapshot_data(members + ['m0', 'm1'], followings, manual)
+        engine = DelegationEngine(snapshot_data)
+        results = engine.resolve(previous=previous_engine.export_resolutions(), changed={'m0'})
+
+        # m0 plus its followers v0, v1 and the always-reread manual m1
+        assert len(engine.reevaluated) == 4
+        assert results['v1']['ballot'] == {'c1': Decimal('5.00')}
+        assert results['v3']['ballot'] == {'c1': Decimal('2.00')}
+
+
+class TestSharedCondensation:
+    """Decisions sharing one condensed follow graph must match per-decision engines."""
+
+    def test_decisions_with_different_ballots_match_standalone_engines(self):
+        from democracy.delegation import SharedCondensation
+
+        rng = random.Random(2026)
+        for _ in range(20):
+            members, followings, _ = random_cyclic_snapshot(rng, size=50)
+            condensation = SharedCondensation.from_snapshot(make_snapshot_data(members, followings, {}))
+            for _ in range(5):
+                # Same memberships and followings, different manual voters per decision
+                _, _, manual = random_cyclic_snapshot(rng, size=50)
+                snapshot_data = make_snapshot_data(members, followings, manual)
+                assert condensation.matches(snapshot_data)
+
+                standalone = DelegationEngine(snapshot_data)
+                expected = standalone.resolve()
+                shared = DelegationEngine(snapshot_data, condensation=condensation)
+                actual = shared.resolve()
+
+                assert list(actual) == list(expected)
+                for voter_id in expected:
+                    assert actual[voter_id] == expected[voter_id]
+                assert sorted(shared.circular_prevented) == sorted(standalone.circular_prevented)
+
+    def test_manual_voter_splits_shared_cycle(self):
+        from democracy.delegation import SharedCondensation
+
+        members = ['a', 'b', 'c']
+        followings = {'a': [('b', '')], 'b': [('c', '')], 'c': [('a', '')]}
+        condensation = SharedCondensation.from_snapshot(make_snapshot_data(members, followings, {}))
+        assert len(condensation.components) == 1
+
+        snapshot_data = make_snapshot_data(members, followings, {'c': ('', {'c1': '3.00'})})
+        results = DelegationEngine(snapshot_data, condensation=condensation).resolve()
+
+        assert results['b']['ballot'] == {'c1': Decimal('3.00')}
+        assert results['a']['ballot'] == {'c1': Decimal('3.00')}
+        assert results['a']['delegation_depth'] == 2
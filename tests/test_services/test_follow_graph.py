@@ -0,0 +1,76 @@
+"""
+Tests for the integer-indexed CSR follow graph.
+
+This test suite validates democracy.follow_graph.FollowGraph, including:
+- Dense id assignment (members first, then outside followees)
+- CSR edge layout with parallel order and tag mask arrays
+- Tag interning and the list fallback past 64 tags
+- Reverse graph traversal used for influence counts
+"""
+
+from array import array
+
+from democracy.follow_graph import FollowGraph
+
+
+def following(followee_id, tags='', order=1):
+    return {'followee_id': followee_id, 'tags': tags, 'order': order}
+
+
+class TestLayout:
+    """Members, edges and tags must be compiled into compact parallel arrays."""
+
+    def test_members_get_first_dense_ids(self):
+        graph = FollowGraph.from_snapshot({
+            'community_memberships': ['a', 'b'],
+            'followings': {'b': [following('lobbyist'), following('a', order=2)]},
+        })
+
+        assert graph.voter_ids == ['a', 'b', 'lobbyist']
+        assert graph.index_of == {'a': 0, 'b': 1, 'lobbyist': 2}
+        assert len(graph) == 3
+        assert graph.edge_count == 2
+
+    def test_csr_slices_keep_priority_order(self):
+        graph = FollowGraph.from_adjacency(
+            ['a', 'b', 'c'],
+            {'c': [following('a', 'budget', 1), following('b', 'parks,budget', 2)], 'b': [following('a')]},
+        )
+
+        assert isinstance(graph.offsets, array) and isinstance(graph.targets, array)
+        assert list(graph.offsets) == [0, 0, 1, 3]
+        assert list(graph.followees(2)) == [0, 1]
+        assert [graph.orders[e] for e in graph.edge_range(2)] == [1, 2]
+        assert graph.tag_masks[0] == 0
+        assert graph.tags.tags(graph.tag_masks[1]) == ['budget']
+        assert graph.tags.tags(graph.tag_masks[2]) == ['budget', 'parks']
+
+    def test_more_than_64_tags_fall_back_to_python_ints(self):
+        tags = ','.join(f'tag{i}' for i in range(70))
+        graph = FollowGraph.from_adjacency(['a', 'b'], {'b': [following('a', tags)]})
+
+        assert isinstance(graph.tag_masks, list)
+        assert graph.tag_masks[0] == (1 << 70) - 1
+        assert len(graph.tags.tags(graph.tag_masks[0])) == 70
+
+
+class TestReverseTraversal:
+    """Reverse CSR must count direct and transitive followers, including cycles."""
+
+    def test_reverse_reachable_count(self):
+        graph = FollowGraph.from_adjacency(
+            ['a', 'b', 'c', 'd', 'e'],
+            {'b': [following('a')], 'c': [following('b')], 'd': [following('c'), following('a', order=2)],
+             'e': [following('d')], 'a': [following('e')]},
+        )
+
+        assert sorted(graph.followers(graph.index_of['a'])) == [graph.index_of['b'], graph.index_of['d']]
+        # Everyone follows 'a' through the cycle a -> e -> d -> a
+        assert graph.reverse_reachable_count(graph.index_of['a']) == 4
+        assert graph.reverse_reachable_count(graph.index_of['c']) == 4
+
+    def test_unfollowed_member_has_no_influence(self):
+        graph = FollowGraph.from_adjacency(['a', 'b'], {'b': [following('a')]})
+
+        assert graph.reverse_reachable_count(graph.index_of['b']) == 0
+        assert graph.reverse_reachable_count(graph.index_of['a']) == 1
@@ -0,0 +1,198 @@
+"""
+Tests for the incremental STAR tally state.
+
+This test suite validates democracy.star_incremental.IncrementalSTARTally, including:
+- run() matches STARVotingTally.run() after any sequence of add/remove/replace
+- Choices appearing for the first time and disappearing again
+- JSON state round trip
+- Exactness: delegated 12-digit averages are tallied from the ballots, never
+  from counts whose exact sums differ from the sequential 12-digit Decimal sums
+- Snapshot tallies read the state stored by staging
+"""
+
+import json
+import random
+from decimal import Decimal
+
+import pytest
+
+from democracy.exceptions import UnresolvedTieError
+from democracy.snapshot_ballots import encode_ballots
+from democracy.star_arithmetic import star_context
+from democracy.star_incremental import IncrementalSTARTally
+from tests.helpers import random_stars, run_tally
+
+
+def run_incremental(tally):
+    """run_tally() for an IncrementalSTARTally."""
+    try:
+        return tally.run()
+    except UnresolvedTieError as error:
+        return {'unresolved': sorted(map(str, error.tied_candidates)), 'log': error.tiebreaker_log}
+
+
+def random_ballot(rng, choices):
+    """A partial ballot with whole or 2-decimal stars."""
+    return {
+        choice: Decimal(rng.randint(0, 5)) if rng.random() < 0.5 else random_stars(rng)
+        for choice in rng.sample(choices, rng.randint(1, len(choices)))
+    }
+
+
+def delegated_ballot(rng, choices):
+    """A calculated ballot: the 12-digit mean of 2-7 whole-star ballots."""
+    count = rng.randint(2, 7)
+    with star_context():
+        return {
+            choice: sum(Decimal(rng.randint(0, 5)) for _ in range(count)) / Decimal(count)
+            for choice in choices
+        }
+
+
+class TestIncrementalSTARTally:
+    """Incremental updates give the same result as a full tally."""
+
+    def test_from_ballots_matches_full_tally(self):
+        ballots = [
+            {'apple': Decimal('5'), 'banana': Decimal('3')},
+            {'apple': Decimal('4'), 'banana': Decimal('5')},
+            {'banana': Decimal('2.5'), 'cherry': Decimal('1')},
+        ]
+        assert IncrementalSTARTally.from_ballots(ballots).run() == run_tally(ballots)
+
+    @pytest.mark.parametrize('seed', range(4))
+    def test_random_changes_match_full_tally(self, seed):
+        rng = random.Random(seed)
+        choices = ['a', 'b', 'c', 'd', 'e']
+        ballots = {voter: random_ballot(rng, choices[:3]) for voter in range(rng.randint(1, 30))}
+        tally = IncrementalSTARTally.from_ballots(ballots.values())
+
+        for step in range(200):
+            voter = rng.randint(0, 40)
+            action = rng.random()
+            old = ballots.get(voter)
+            if action < 0.2 and old is not None:
+                tally.remove_ballot(ballots.pop(voter))
+            elif old is None:
+                ballots[voter] = random_ballot(rng, choices)
+                tally.add_ballot(ballots[voter])
+            else:
+                ballots[voter] = random_ballot(rng, choices)
+                tally.replace_ballot(old, ballots[voter])
+
+            if ballots:
+                assert run_incremental(tally) == run_tally(list(ballots.values()))
+
+    def test_choice_disappears_when_no_ballot_lists_it(self):
+        tally = IncrementalSTARTally()
+        tally.add_ballot({'a': Decimal('3')})
+        tally.add_ballot({'b': Decimal('4')})
+        tally.replace_ballot({'b': Decimal('4')}, {'a': Decimal('1')})
+        assert tally.choices() == ['a']
+        assert tally.run() == run_tally([{'a': Decimal('3')}, {'a': Decimal('1')}])
+
+    def test_delegated_averages_use_exact_counts_only(self):
+        rng = random.Random(13)
+        choices = ['a', 'b', 'c']
+        differing = 0
+        for _ in range(300):
+            ballots = [delegated_ballot(rng, choices) for _ in range(rng.randint(100, 400))]
+            tally = IncrementalSTARTally.from_ballots(ballots)
+            expected = run_tally(ballots)
+            if tally.exact:
+                assert run_incremental(tally) == expected
+            elif run_incremental(tally) != expected:
+                differing += 1
+        # Exact sums do diverge from the 12-digit sequential sums on such ballots
+        assert differing
+
+    def test_exactness_follows_decimal_places(self):
+        tally = IncrementalSTARTally.from_ballots([{'a': Decimal('5')}] * 3)
+        assert tally.exact
+        tally.add_ballot({'a': Decimal('0.333333333333')})
+        assert not tally.exact
+        tally.remove_ballot({'a': Decimal('0.333333333333')})
+        assert tally.exact
+        assert IncrementalSTARTally.from_state({**tally.as_state(), 'places': None}).exact is False
+
+    def test_empty_tally_raises(self):
+        tally = IncrementalSTARTally()
+        with pytest.raises(ValueError):
+            tally.run()
+        tally.add_ballot({'a': Decimal('2')})
+        tally.remove_ballot({'a': Decimal('2')})
+        with pytest.raises(ValueError):
+            tally.run()
+
+
+class TestState:
+    """The state survives a JSON round trip."""
+
+    def test_state_round_trip(self):
+        rng = random.Random(7)
+        ballots = [random_ballot(rng, ['x', 'y', 'z']) for _ in range(25)]
+        tally = IncrementalSTARTally.from_ballots(ballots)
+
+        restored = IncrementalSTARTally.from_state(json.loads(json.dumps(tally.as_state())))
+        new_ballot = {'x': Decimal('5'), 'w': Decimal('2.25')}
+        restored.replace_ballot(ballots[0], new_ballot)
+
+        assert run_incremental(restored) == run_tally([new_ballot] + ballots[1:])
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+@pytest.mark.usefixtures('no_background_recalculation')
+class TestSnapshotTally:
+    """Tally._tally_snapshot uses the counts stored during staging."""
+
+    def test_state_and_ballot_rescan_agree(self, chain_community_factory):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots, Tally
+
+        decision, _, choices = chain_community_factory(4)
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+        SnapshotBasedStageBallots(snapshot.id).process()
+        snapshot.refresh_from_db()
+        assert 'tally_state' in snapshot.snapshot_data
+
+        Tally(snapshot_id=snapshot.id).process()
+        snapshot.refresh_from_db()
+        from_state = (snapshot.winner, snapshot.tally_log, snapshot.snapshot_data['preference_matrix'])
+
+        # Without the stored counts the tally decodes the ballot section
+        del snapshot.snapshot_data['tally_state']
+        snapshot.save()
+        Tally(snapshot_id=snapshot.id).process()
+        snapshot.refresh_from_db()
+
+        assert from_state == (snapshot.winner, snapshot.tally_log, snapshot.snapshot_data['preference_matrix'])
+        assert snapshot.winner == choices[0]
+
+    def test_inexact_state_tallies_the_ballots(self, chain_community_factory):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots, Tally
+
+        decision, _, choices = chain_community_factory(4)
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+        SnapshotBasedStageBallots(snapshot.id).process()
+        snapshot.refresh_from_db()
+
+        # Delegated averages: the exact sum gives 2.81330649, the sequential 12-digit sum 2.81330650
+        choice_ids = [str(choice.id) for choice in choices]
+        stars = ['4.24414726156', '0.58713360659', '0.71847338858', '3.7713158092', '4.74546240903']
+        ballots = {
+            f'v{index}': {choice_ids[0]: Decimal(value), choice_ids[1]: Decimal('1')}
+            for index, value in enumerate(stars)
+        }
+        state = IncrementalSTARTally.from_ballots(ballots.values())
+        assert run_incremental(state)['scores'] != run_tally(list(ballots.values()))['scores']
+        assert not state.exact
+
+        snapshot.snapshot_data['tally_ballots'] = encode_ballots(ballots, choice_ids)
+        snapshot.snapshot_data['tally_state'] = state.as_state()
+        snapshot.save()
+        Tally(snapshot_id=snapshot.id, trace_level='full').process()
+        snapshot.refresh_from_db()
+
+        expected = run_tally(list(ballots.values()))
+        assert snapshot.tally_log == expected['tally_log']
+        assert snapshot.snapshot_data['preference_matrix'] == expected['preference_matrix']
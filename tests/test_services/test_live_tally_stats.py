@@ -0,0 +1,81 @@
+"""
+Tests for the live Tally.process statistics.
+
+This test suite validates the set-based live tally path, including:
+- Participation counts exclude non-voting members (lobbyists)
+- Tag histograms count each voting ballot's tags
+- Structured stats are stored on Result.stats
+- The number of queries does not grow with ballots or tags
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from democracy.models import Ballot, Result, Vote
+from democracy.services import Tally
+from tests.helpers import add_voter
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestLiveTallyStats:
+    """Tally.process stores structured statistics."""
+
+    def test_result_stats(self, chain_community_factory):
+        decision, _, choices = chain_community_factory(1)
+        add_voter(decision, choices, ['1', '5'], tags='parks, budget')
+        add_voter(decision, choices, ['2', '4'], tags='parks')
+        add_voter(decision, choices, ['5', '0'], tags='lobby', is_voting=False)
+
+        report = Tally(trace_level='full').process()
+
+        result = Result.objects.get(decision=decision)
+        assert result.report in report
+        assert result.get_participation_stats() == {
+            'total_ballots': 4,
+            'voting_ballots': 3,
+            'manual_ballots': 3,
+            'calculated_ballots': 0,
+            'lobbyist_ballots': 1,
+        }
+        assert result.stats['tag_frequency'] == {'parks': 2, 'budget': 2}
+        assert result.get_winner()['choice'] == choices[1].title
+        assert result.get_winner()['margin'] == 1
+        assert [entry['choice'] for entry in result.get_score_phase_results()] == [
+            choices[1].title, choices[0].title
+        ]
+        assert result.get_score_phase_results()[0]['average_score'] == pytest.approx(10 / 3)
+        assert [entry['preferences'] for entry in result.get_runoff_results()] == [2, 1]
+        assert "Lobbyists: 1 ballots (not counted)" in result.report
+        assert "'parks': 2 ballots (66.7%)" in result.report
+
+    def test_no_ballots_records_error(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(1)
+        Vote.objects.filter(ballot__decision=decision).delete()
+        Ballot.objects.filter(decision=decision).delete()
+
+        Tally().process()
+
+        stats = Result.objects.get(decision=decision).stats
+        assert stats['winner'] is None
+        assert 'error' in stats
+
+    def test_query_count_does_not_grow_with_ballots(self, chain_community_factory):
+        decision, _, choices = chain_community_factory(1)
+        add_voter(decision, choices, ['1', '2'], tags='a')
+
+        with CaptureQueriesContext(connection) as small:
+            Tally().process()
+
+        for index in range(20):
+            add_voter(decision, choices, [str(index % 6), '3'], tags=f'tag{index},shared')
+            add_voter(decision, choices, ['4', '4'], is_voting=False)
+
+        with CaptureQueriesContext(connection) as large:
+            Tally().process()
+
+        assert len(large.captured_queries) == len(small.captured_queries)
@@ -0,0 +1,104 @@
+"""
+Tests for the shared pairwise preference matrix.
+
+This test suite validates democracy.star_voting.PreferenceMatrix, including:
+- Pairwise wins, ties and five-star counts match a ballot-by-ballot count
+- The NumPy BallotMatrix produces the same counts
+- The matrix is included in the tally result
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from democracy.star_arithmetic import FixedPointStars
+from democracy.star_matrix import BallotMatrix
+from democracy.star_voting import PreferenceMatrix, STARVotingTally
+from tests.helpers import random_stars
+
+
+def count_pair(ballots, choice_a, choice_b):
+    """Reference head-to-head count, scanning every ballot."""
+    a_pref = sum(1 for b in ballots if b.get(choice_a, Decimal('0')) > b.get(choice_b, Decimal('0')))
+    b_pref = sum(1 for b in ballots if b.get(choice_b, Decimal('0')) > b.get(choice_a, Decimal('0')))
+    return a_pref, b_pref, len(ballots) - a_pref - b_pref
+
+
+def random_ballots(rng, choices):
+    """Random partial ballots mixing whole and fractional stars."""
+    return [
+        {
+            choice: Decimal(rng.randint(0, 5)) if rng.random() < 0.5 else random_stars(rng)
+            for choice in rng.sample(choices, rng.randint(1, len(choices)))
+        }
+        for _ in range(rng.randint(1, 60))
+    ]
+
+
+class TestPreferenceMatrix:
+    """Counts built once match per-pair ballot scans."""
+
+    def test_known_counts(self):
+        ballots = [
+            {'a': Decimal('5'), 'b': Decimal('3')},
+            {'a': Decimal('2'), 'b': Decimal('5.00'), 'c': Decimal('1')},
+            {'c': Decimal('4')},
+        ]
+        matrix = PreferenceMatrix.from_ballots(ballots, ['a', 'b', 'c'])
+        assert matrix.head_to_head('a', 'b') == (1, 1, 1)
+        assert matrix.head_to_head('c', 'a') == (1, 2, 0)
+        assert matrix.five_star_count('b') == 1
+        assert matrix.as_dict() == {
+            'wins': {'a': {'b': 1, 'c': 2}, 'b': {'a': 1, 'c': 2}, 'c': {'a': 1, 'b': 1}},
+            'five_star_counts': {'a': 1, 'b': 1, 'c': 0},
+        }
+
+    def test_random_ballots_match_reference(self):
+        rng = random.Random(3)
+        choices = ['a', 'b', 'c', 'd']
+        for _ in range(50):
+            ballots = random_ballots(rng, choices)
+            matrix = PreferenceMatrix.from_ballots(ballots, choices)
+            for choice_a in choices:
+                assert matrix.five_star_count(choice_a) == sum(1 for b in ballots if b.get(choice_a) == 5)
+                for choice_b in choices:
+                    if choice_a != choice_b:
+                        assert matrix.head_to_head(choice_a, choice_b) == count_pair(ballots, choice_a, choice_b)
+
+    def test_ballot_matrix_counts_match(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(8)
+        choices = ['a', 'b', 'c', 'd', 'e']
+        for _ in range(50):
+            ballots = random_ballots(rng, choices)
+            expected = PreferenceMatrix.from_ballots(ballots, choices)
+            actual = PreferenceMatrix.from_ballot_matrix(BallotMatrix.from_ballots(ballots, choices))
+            assert actual.as_dict() == expected.as_dict()
+
+    def test_fixed_point_backend_counts_match(self):
+        rng = random.Random(21)
+        fixed = FixedPointStars()
+        choices = ['a', 'b', 'c']
+        for _ in range(20):
+            ballots = random_ballots(rng, choices)
+            parsed = [{c: fixed.parse(stars) for c, stars in b.items()} for b in ballots]
+            expected = PreferenceMatrix.from_ballots(ballots, choices)
+            actual = PreferenceMatrix.from_ballots(parsed, choices, fixed.zero, fixed.five)
+            assert actual.as_dict() == expected.as_dict()
+
+
+class TestTallyResult:
+    """The tally exposes the matrix it used."""
+
+    def test_result_includes_matrix(self):
+        ballots = [
+            {'apple': Decimal('5'), 'banana': Decimal('3')},
+            {'apple': Decimal('4'), 'banana': Decimal('5')},
+            {'apple': Decimal('5'), 'banana': Decimal('1')},
+        ]
+        result = STARVotingTally().run(ballots)
+        assert result['preference_matrix']['wins'] == {'apple': {'banana': 2}, 'banana': {'apple': 1}}
+        assert result['preference_matrix']['five_star_counts'] == {'apple': 2, 'banana': 1}
+        runoff = result['runoff_details']
+        assert (runoff['choice_a_preferences'], runoff['choice_b_preferences']) == (2, 1)
@@ -0,0 +1,129 @@
+"""
+Tests for the batch STAR tally API.
+
+This test suite validates STARVotingTally.run_many, including:
+- Every variant matches run() on the ballots repeated by their weights,
+  also for stars with more than 12 decimal places
+- Masks, bootstrap resamples and "voted directly" substitutions
+- Unresolved ties are reported per variant
+- Fallback to run() without NumPy
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from democracy import star_matrix
+from democracy.exceptions import UnresolvedTieError
+from democracy.star_voting import STARVotingTally
+from tests.helpers import random_stars
+
+
+def expected_result(ballots, weights):
+    """run() on the expanded ballot list, with ties reported like run_many()."""
+    expanded = [ballot for ballot, weight in zip(ballots, weights) for _ in range(weight)]
+    tally = STARVotingTally()
+    try:
+        return tally.run(expanded)
+    except UnresolvedTieError as error:
+        return {
+            'winner': None,
+            'tied_candidates': list(error.tied_candidates),
+            'scores': tally.scores,
+            'runoff_details': None,
+            'preference_matrix': tally.preferences.as_dict(),
+            'tally_log': tally.tally_log,
+        }
+
+
+def random_ballots(rng, choices, count):
+    """Partial ballots with whole or 2-decimal stars."""
+    return [
+        {
+            choice: Decimal(rng.randint(0, 5)) if rng.random() < 0.5 else random_stars(rng)
+            for choice in rng.sample(choices, rng.randint(1, len(choices)))
+        }
+        for _ in range(count)
+    ]
+
+
+class TestRunMany:
+    """Batch results are identical to individual tallies."""
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_random_variants_match_run(self, seed):
+        rng = random.Random(seed)
+        ballots = random_ballots(rng, ['a', 'b', 'c', 'd'], 40)
+        weights = [[rng.choice([0, 1, 1, 2]) for _ in ballots] for _ in range(30)]
+        weights = [row for row in weights if any(row)]
+
+        results = STARVotingTally().run_many(ballots, weights)
+
+        assert len(results) == len(weights)
+        for row, result in zip(weights, results):
+            assert result == expected_result(ballots, row)
+
+    def test_bootstrap_and_removal_variants(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(11)
+        ballots = random_ballots(rng, ['x', 'y', 'z'], 25)
+        bootstrap = [[0] * len(ballots) for _ in range(20)]
+        for row in bootstrap:
+            for _ in ballots:
+                row[rng.randrange(len(ballots))] += 1
+        removals = [[0 if i == removed else 1 for i in range(len(ballots))] for removed in range(len(ballots))]
+
+        results = STARVotingTally().run_many(ballots, bootstrap + removals)
+
+        for row, result in zip(bootstrap + removals, results):
+            assert result == expected_result(ballots, row)
+
+    def test_delegators_voting_directly(self):
+        calculated = [{'a': Decimal('4'), 'b': Decimal('2')}] * 3
+        direct = [{'a': Decimal('1'), 'b': Decimal('5')}] * 3
+        others = [{'a': Decimal('3'), 'b': Decimal('3.5')}] * 2
+        ballots = calculated + direct + others
+
+        as_delegated, as_direct = STARVotingTally().run_many(ballots, [
+            [1, 1, 1, 0, 0, 0, 1, 1],
+            [0, 0, 0, 1, 1, 1, 1, 1],
+        ])
+
+        assert as_delegated['winner'] == 'a'
+        assert as_direct['winner'] == 'b'
+        assert as_direct['runoff_details']['finalists'] == ['b', 'a']
+        assert as_direct['runoff_details']['choice_a_preferences'] == 5
+
+    def test_unresolved_tie_is_reported(self):
+        ballots = [{'a': Decimal('5'), 'b': Decimal('3')}, {'a': Decimal('3'), 'b': Decimal('5')}]
+        tied, decided = STARVotingTally().run_many(ballots, [[1, 1], [1, 0]])
+        assert tied['winner'] is None
+        assert sorted(tied['tied_candidates']) == ['a', 'b']
+        assert decided['winner'] == 'a'
+
+    def test_stars_beyond_twelve_places_match_run(self):
+        # Rounding these stars to 12 places would tie x and y in the runoff
+        ballots = [
+            {'x': Decimal('0.10000000000004'), 'y': Decimal('0.10000000000001')},
+            {'x': Decimal('0.1'), 'y': Decimal('0.1')},
+        ]
+        [result] = STARVotingTally().run_many(ballots, [[1, 1]])
+        assert result == expected_result(ballots, [1, 1])
+        assert result['winner'] == 'x'
+
+    def test_invalid_weights(self):
+        ballots = [{'a': Decimal('5')}]
+        with pytest.raises(ValueError):
+            STARVotingTally().run_many(ballots, [[-1]])
+        with pytest.raises(ValueError):
+            STARVotingTally().run_many(ballots, [[0]])
+
+    def test_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(star_matrix, 'np', None)
+        rng = random.Random(2)
+        ballots = random_ballots(rng, ['a', 'b', 'c'], 15)
+        weights = [[rng.randint(0, 2) for _ in ballots] for _ in range(5)]
+        weights = [row for row in weights if any(row)]
+        for row, result in zip(weights, STARVotingTally().run_many(ballots, weights)):
+            assert result == expected_result(ballots, row)
@@ -0,0 +1,115 @@
+"""
+Tests for the compact snapshot ballot section.
+
+This test suite validates democracy.snapshot_ballots and its use by staging and
+Tally._tally_snapshot, including:
+- Exact encode/decode round trip of Decimal ballots
+- Only voting members' ballots are counted
+- Tallying a snapshot issues a constant number of queries
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from democracy.models import Ballot, Following, Membership, Vote
+from democracy.snapshot_ballots import decode_ballots, encode_ballots
+from tests.factories import UserFactory
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+class TestBallotSection:
+    """Encoding keeps every Decimal exactly."""
+
+    def test_round_trip_is_exact(self):
+        rng = random.Random(1)
+        ballots = {}
+        for voter in range(50):
+            ballots[f'voter-{voter}'] = {
+                choice: +Decimal(rng.randint(0, 5 * 10 ** 11)).scaleb(-rng.randint(0, 13))
+                for choice in rng.sample(['a', 'b', 'c'], rng.randint(1, 3))
+            }
+
+        section = encode_ballots(ballots, ['c'])
+
+        assert section['choices'][0] == 'c'
+        assert decode_ballots(section) == ballots
+        decoded = decode_ballots(section, ['voter-3', 'missing'])
+        assert decoded == {'voter-3': ballots['voter-3']}
+
+    def test_missing_choice_differs_from_zero(self):
+        section = encode_ballots({'x': {'a': Decimal('0')}, 'y': {'b': Decimal('2.5')}})
+        assert section['ballots'] == [[0, None], [None, 25]]
+        assert decode_ballots(section) == {'x': {'a': Decimal('0')}, 'y': {'b': Decimal('2.5')}}
+
+    def test_negative_stars_rejected(self):
+        with pytest.raises(ValueError):
+            encode_ballots({'x': {'a': Decimal('-1')}})
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestSnapshotTallyBallots:
+    """Staging writes the section and the tally reads it."""
+
+    def stage(self, decision):
+        from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+        SnapshotBasedStageBallots(snapshot.id).process()
+        snapshot.refresh_from_db()
+        return snapshot
+
+    def test_only_voting_members_are_counted(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(2)
+        observer = Membership.objects.create(
+            community=decision.community, member=UserFactory(), is_anonymous=False,
+            is_voting_community_member=False,
+        )
+        ballot = Ballot.objects.create(decision=decision, voter=observer.member, hashed_username='o', tags='')
+        Vote.objects.create(ballot=ballot, choice=choices[1], stars=Decimal('5.00'))
+        Following.objects.create(follower=memberships[1], followee=observer, tags='', order=0)
+
+        snapshot = self.stage(decision)
+
+        section = snapshot.snapshot_data['tally_ballots']
+        assert sorted(section['voters']) == sorted(str(m.member.id) for m in memberships)
+        follower = decode_ballots(section, [str(memberships[1].member.id)])[str(memberships[1].member.id)]
+        assert follower[str(choices[1].id)] == Decimal('3')
+
+    def test_tally_query_count_is_constant(self, chain_community_factory):
+        from democracy.services import Tally
+
+        small = self.stage(chain_community_factory(3)[0])
+        large = self.stage(chain_community_factory(30)[0])
+
+        with CaptureQueriesContext(connection) as small_queries:
+            Tally(snapshot_id=small.id).process()
+        with CaptureQueriesContext(connection) as large_queries:
+            Tally(snapshot_id=large.id).process()
+
+        assert len(large_queries.captured_queries) == len(small_queries.captured_queries)
+        large.refresh_from_db()
+        assert large.winner is not None
+
+    def test_ballot_section_tally_matches_tree_nodes(self, chain_community_factory):
+        from democracy.services import Tally
+
+        snapshot = self.stage(chain_community_factory(4)[0])
+        del snapshot.snapshot_data['tally_state']
+        snapshot.save()
+        Tally(snapshot_id=snapshot.id).process()
+        snapshot.refresh_from_db()
+        from_section = (snapshot.winner, snapshot.tally_log)
+
+        del snapshot.snapshot_data['tally_ballots']
+        snapshot.save()
+        Tally(snapshot_id=snapshot.id).process()
+        snapshot.refresh_from_db()
+
+        assert from_section == (snapshot.winner, snapshot.tally_log)
@@ -0,0 +1,104 @@
+"""
+Tests for constant-query snapshot state capture.
+
+This test suite validates CreateCalculationSnapshot._capture_system_state and
+capture_community_state, including:
+- Followings are stored by follower and followee member ids, in order
+- Memberships and followings are captured in member-id order
+- Ballot anonymity comes from the voter's membership
+- Votes are captured as strings per ballot
+- The number of queries does not grow with members, followings or ballots
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from democracy.models import Ballot, Following, Membership, Vote
+from democracy.services import CreateCalculationSnapshot
+from tests.factories import UserFactory
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+def add_manual_ballots(decision, memberships, choices):
+    """Give every membership after the first a manual ballot."""
+    for index, membership in enumerate(memberships[1:]):
+        ballot = Ballot.objects.create(
+            decision=decision, voter=membership.member, is_calculated=False, hashed_username=str(index)
+        )
+        for choice in choices:
+            Vote.objects.create(ballot=ballot, choice=choice, stars=Decimal(index % 6))
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestCaptureSystemState:
+    """Snapshot capture joins values_list rows in memory."""
+
+    def test_captured_state(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(3)
+        lobbyist = Membership.objects.create(
+            community=decision.community, member=UserFactory(), is_anonymous=False,
+            is_voting_community_member=False,
+        )
+        Following.objects.create(follower=lobbyist, followee=memberships[0], tags='parks', order=2)
+        Following.objects.create(follower=lobbyist, followee=memberships[1], tags='', order=1)
+        Membership.objects.filter(pk=memberships[0].pk).update(is_anonymous=True)
+
+        data = CreateCalculationSnapshot(decision.id)._capture_system_state(decision)
+
+        member_ids = [str(membership.member_id) for membership in memberships]
+        assert sorted(data['community_memberships']) == sorted(member_ids)
+        assert data['non_voting_memberships'] == [str(lobbyist.member_id)]
+        assert data['followings'][member_ids[2]] == [{'followee_id': member_ids[1], 'tags': '', 'order': 1}]
+        assert data['followings'][str(lobbyist.member_id)] == [
+            {'followee_id': member_ids[1], 'tags': '', 'order': 1},
+            {'followee_id': member_ids[0], 'tags': 'parks', 'order': 2},
+        ]
+        assert member_ids[0] not in data['followings']
+        assert data['existing_ballots'] == {
+            member_ids[0]: {
+                'voter_id': member_ids[0],
+                'is_calculated': False,
+                'is_anonymous': True,
+                'tags': 'budget',
+                'votes': {str(choices[0].id): '4.00', str(choices[1].id): '1.00'},
+            }
+        }
+        assert 'anonymity' not in data
+
+    def test_capture_order_is_explicit(self, chain_community_factory):
+        decision, memberships, _ = chain_community_factory(6)
+        follower = memberships[0]
+        for membership in reversed(memberships[1:]):
+            Following.objects.create(follower=follower, followee=membership, tags='', order=1)
+
+        with CaptureQueriesContext(connection) as queries:
+            state = CreateCalculationSnapshot.capture_community_state(decision.community)
+
+        member_ids = sorted(str(membership.member_id) for membership in memberships)
+        assert state['community_memberships'] == member_ids
+        assert [following['followee_id'] for following in state['followings'][str(follower.member_id)]] == [
+            member_id for member_id in member_ids if member_id != str(follower.member_id)
+        ]
+        assert all('ORDER BY' in query['sql'] for query in queries.captured_queries)
+
+    def test_query_count_does_not_grow_with_community_size(self, chain_community_factory):
+        small_decision, small_members, small_choices = chain_community_factory(3)
+        large_decision, large_members, large_choices = chain_community_factory(40)
+        add_manual_ballots(small_decision, small_members, small_choices)
+        add_manual_ballots(large_decision, large_members, large_choices)
+
+        with CaptureQueriesContext(connection) as small:
+            small_data = CreateCalculationSnapshot(small_decision.id)._capture_system_state(small_decision)
+        with CaptureQueriesContext(connection) as large:
+            large_data = CreateCalculationSnapshot(large_decision.id)._capture_system_state(large_decision)
+
+        assert len(large_data['existing_ballots']) == 40
+        assert len(large_data['followings']) == 39
+        assert len(small_data['existing_ballots']) == 3
+        assert len(large.captured_queries) == len(small.captured_queries)
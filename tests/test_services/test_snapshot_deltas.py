@@ -0,0 +1,140 @@
+"""
+Tests for keyframe + delta snapshot chains.
+
+This test suite validates diff()/apply_patch() in democracy.snapshot_store and
+delta-encoded DecisionSnapshot chains, including:
+- Patches reproduce values exactly (types and dict key order included)
+- Every SNAPSHOT_KEYFRAME_INTERVAL-th snapshot is a keyframe
+- Materialized deltas equal the data that was saved, after the chain grows
+- Changing or deleting a parent never corrupts its deltas
+"""
+
+import json
+import random
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import RestrictedError
+from django.test import override_settings
+
+from democracy.models import DecisionSnapshot, Following, Vote
+from democracy.snapshot_store import apply_patch, diff, is_delta
+from tests.helpers import calculate
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+def random_value(rng, depth=0):
+    """Random JSON-compatible value."""
+    kind = rng.randint(0, 6 if depth < 3 else 3)
+    if kind == 0:
+        return rng.randint(0, 3)
+    if kind == 1:
+        return rng.choice([0.5, 1.0, 'a', 'b', None, True, False])
+    if kind == 2:
+        return str(rng.randint(0, 3))
+    if kind == 3:
+        return float(rng.randint(0, 3))
+    if kind in (4, 5):
+        return {rng.choice('abcde'): random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def normalized(data):
+    """Snapshot data as stored in a full container (JSON types)."""
+    return json.loads(json.dumps(dict(data), cls=DjangoJSONEncoder))
+
+
+class TestPatches:
+    """diff() and apply_patch()."""
+
+    def test_random_round_trips(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            old, new = random_value(rng), random_value(rng)
+            patch_ = diff(old, new)
+            result = old if patch_ is None else apply_patch(old, json.loads(json.dumps(patch_)))
+            assert json.dumps(result) == json.dumps(new)
+
+    def test_patches_are_minimal(self):
+        old = {'nodes': [{'voter_id': 'a', 'stars': 1.0}, {'voter_id': 'b', 'stars': 2.0}], 'order': 1}
+
+        assert diff(old, json.loads(json.dumps(old))) is None
+        assert diff(old, {**old, 'nodes': [old['nodes'][0], {'voter_id': 'b', 'stars': 3.0}]}) == {
+            'd': {'nodes': {'l': {'1': {'d': {'stars': {'=': 3.0}}}}}}
+        }
+        assert diff({'a': 1}, {'a': 1.0}) == {'d': {'a': {'=': 1.0}}}
+        assert list(apply_patch({'a': 1, 'b': 2}, diff({'a': 1, 'b': 2}, {'b': 2, 'a': 1}))) == ['b', 'a']
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestDeltaChains:
+    """DecisionSnapshot keyframes and deltas."""
+
+    def record_saves(self):
+        """Patch DecisionSnapshot.save to record the data of every save by id."""
+        saved = {}
+        original = DecisionSnapshot.save
+
+        def save(snapshot, *args, **kwargs):
+            original(snapshot, *args, **kwargs)
+            saved[snapshot.id] = normalized(snapshot.snapshot_data)
+
+        return saved, patch.object(DecisionSnapshot, 'save', save)
+
+    @override_settings(SNAPSHOT_KEYFRAME_INTERVAL=3)
+    def test_chain_materializes_saved_data(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(6)
+        saved, recording = self.record_saves()
+
+        with recording:
+            for step in range(7):
+                Vote.objects.filter(ballot__voter=memberships[0].member, choice=choices[0]).update(
+                    stars=Decimal(step % 5)
+                )
+                if step == 4:
+                    Following.objects.filter(follower=memberships[3]).update(tags='parks')
+                calculate(decision, reuse_unchanged=False)
+
+        snapshots = list(DecisionSnapshot.objects.filter(decision=decision).order_by('created_at'))
+        assert [snapshot.delta_depth for snapshot in snapshots] == [0, 1, 2, 0, 1, 2, 0]
+        for previous, snapshot in zip(snapshots, snapshots[1:]):
+            assert snapshot.parent_id == (previous.id if snapshot.delta_depth else None)
+            assert is_delta(snapshot.data_blob) == bool(snapshot.delta_depth)
+        for snapshot in snapshots:
+            fresh = DecisionSnapshot.objects.get(id=snapshot.id)
+            assert normalized(fresh.snapshot_data) == saved[snapshot.id]
+        assert len(bytes(snapshots[1].data_blob)) < len(bytes(snapshots[0].data_blob)) / 2
+
+    @override_settings(SNAPSHOT_KEYFRAME_INTERVAL=1)
+    def test_interval_one_stores_keyframes(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+        calculate(decision, reuse_unchanged=False)
+        calculate(decision, reuse_unchanged=False)
+
+        assert not DecisionSnapshot.objects.filter(decision=decision, parent__isnull=False).exists()
+
+    def test_parent_changes_and_deletes_keep_deltas_intact(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+        parent, _ = calculate(decision, reuse_unchanged=False)
+        child, _ = calculate(decision, reuse_unchanged=False)
+        child = DecisionSnapshot.objects.get(id=child.id)
+        expected = normalized(child.snapshot_data)
+        assert child.parent_id == parent.id
+
+        with pytest.raises(RestrictedError):
+            DecisionSnapshot.objects.get(id=parent.id).delete()
+
+        parent = DecisionSnapshot.objects.get(id=parent.id)
+        parent.snapshot_data['statistics'] = {}
+        parent.save()
+
+        child = DecisionSnapshot.objects.get(id=child.id)
+        assert child.parent_id is None and child.delta_depth == 0
+        assert not is_delta(child.data_blob)
+        assert normalized(child.snapshot_data) == expected
+        parent.delete()
@@ -0,0 +1,146 @@
+"""
+Tests for snapshot retention.
+
+This test suite validates democracy.snapshot_retention and PruneSnapshots,
+including:
+- The policy keeps final, active, latest, last N, hourly and recent failed snapshots
+- Pruning deletes the rest in batches and reports reclaimed bytes
+- Retained deltas of deleted or compacted snapshots keep their data
+- Compaction keeps rows and results but drops inputs, ballots and the tree
+- Dry runs and the prune_snapshots command
+"""
+
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import override_settings
+from django.utils import timezone
+
+from democracy.models import DecisionSnapshot
+from democracy.services import PruneSnapshots
+from democracy.snapshot_retention import COMPACTED_KEYS, RetentionPolicy
+from tests.helpers import calculate
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+NOW = datetime(2026, 10, 16, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def row(snapshot_id, minutes_ago, status='completed', is_final=False):
+    return {
+        'id': snapshot_id,
+        'created_at': NOW - timedelta(minutes=minutes_ago),
+        'calculation_status': status,
+        'is_final': is_final,
+    }
+
+
+def normalized(data):
+    """Snapshot data as stored in a full container (JSON types)."""
+    return json.loads(json.dumps(dict(data), cls=DjangoJSONEncoder))
+
+
+class TestRetentionPolicy:
+    """RetentionPolicy.retained()."""
+
+    def test_keeps_last_hourly_and_recent_failed(self):
+        rows = [
+            row('failed-new', 5, 'failed_staging'),
+            row('c1', 10),
+            row('c2', 20),
+            row('c3', 30),           # same hour as c1 and c2
+            row('c4', 90),           # newest of its hour
+            row('c5', 100),
+            row('c6', 60 * 30),      # outside the hourly window
+            row('staging', 60 * 40, 'staging'),
+            row('failed-old', 60 * 24 * 10, 'failed_timeout'),
+        ]
+        policy = RetentionPolicy(keep_last=2, hourly_hours=24, failed_days=7)
+
+        assert policy.retained(rows, NOW) == {'failed-new', 'c1', 'c2', 'c4', 'staging'}
+
+    def test_final_and_latest_are_always_kept(self):
+        rows = [row('failed-latest', 60 * 24 * 30, 'failed_tallying'), row('final', 60 * 24 * 40, is_final=True)]
+        policy = RetentionPolicy(keep_last=0, hourly_hours=0, failed_days=1)
+
+        assert policy.retained(rows, NOW) == {'failed-latest', 'final'}
+        assert policy.retained([], NOW) == set()
+
+    def test_hourly_window_can_cover_whole_history(self):
+        rows = [row('c1', 0), row('c2', 60 * 24 * 100 + 1), row('c3', 60 * 24 * 100 + 2)]
+
+        assert RetentionPolicy(keep_last=1, hourly_hours=None).retained(rows, NOW) == {'c1', 'c2'}
+        assert RetentionPolicy(keep_last=1, hourly_hours=0).retained(rows, NOW) == {'c1'}
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestPruneSnapshots:
+    """PruneSnapshots and prune_snapshots."""
+
+    def build_history(self, chain_community_factory, count, members=4):
+        """Completed snapshots one hour apart (newest last), as a delta chain."""
+        decision, _, _ = chain_community_factory(members)
+        snapshots = [calculate(decision, reuse_unchanged=False)[0] for _ in range(count)]
+        for hours_ago, snapshot in enumerate(reversed(snapshots)):
+            DecisionSnapshot.objects.filter(id=snapshot.id).update(
+                created_at=timezone.now() - timedelta(hours=hours_ago, minutes=1)
+            )
+        return decision, [DecisionSnapshot.objects.get(id=snapshot.id) for snapshot in snapshots]
+
+    def test_deletes_unretained_snapshots_and_keeps_deltas_intact(self, chain_community_factory):
+        decision, snapshots = self.build_history(chain_community_factory, 5)
+        assert [snapshot.delta_depth for snapshot in snapshots] == [0, 1, 2, 3, 4]
+        expected = {snapshot.id: normalized(snapshot.snapshot_data) for snapshot in snapshots}
+        failed = DecisionSnapshot.objects.create(decision=decision, calculation_status='failed_staging')
+        DecisionSnapshot.objects.filter(id=failed.id).update(created_at=timezone.now() - timedelta(days=30))
+
+        stats = PruneSnapshots(
+            decision_id=decision.id, policy=RetentionPolicy(keep_last=2, hourly_hours=0), batch_size=1
+        ).process()
+
+        remaining = list(DecisionSnapshot.objects.filter(decision=decision))
+        assert [snapshot.id for snapshot in remaining] == [snapshots[4].id, snapshots[3].id]
+        assert stats['deleted'] == 4 and stats['kept'] == 2 and stats['examined'] == 6
+        assert stats['reclaimed_bytes'] > 0
+        oldest_kept = DecisionSnapshot.objects.get(id=snapshots[3].id)
+        assert oldest_kept.parent_id is None
+        for snapshot in remaining:
+            assert normalized(DecisionSnapshot.objects.get(id=snapshot.id).snapshot_data) == expected[snapshot.id]
+
+    @override_settings(SNAPSHOT_KEYFRAME_INTERVAL=1)
+    def test_compaction_keeps_rows_and_results(self, chain_community_factory):
+        decision, snapshots = self.build_history(chain_community_factory, 3, members=20)
+        expected = normalized(snapshots[2].snapshot_data)
+
+        stats = PruneSnapshots(policy=RetentionPolicy(keep_last=1, hourly_hours=0), compact=True).process()
+
+        assert stats['compacted'] == 2 and stats['deleted'] == 0
+        assert stats['reclaimed_bytes'] > 0
+        assert DecisionSnapshot.objects.filter(decision=decision).count() == 3
+        compacted = DecisionSnapshot.objects.get(id=snapshots[0].id)
+        assert not any(key in compacted.snapshot_data for key in COMPACTED_KEYS)
+        assert compacted.snapshot_data['statistics'] == snapshots[0].snapshot_data['statistics']
+        assert 'compacted_at' in compacted.snapshot_data['metadata']
+        assert normalized(DecisionSnapshot.objects.get(id=snapshots[2].id).snapshot_data) == expected
+
+        again = PruneSnapshots(policy=RetentionPolicy(keep_last=1, hourly_hours=0), compact=True).process()
+        assert again['compacted'] == 0 and again['skipped'] == 2
+
+    def test_dry_run_and_command(self, chain_community_factory):
+        decision, snapshots = self.build_history(chain_community_factory, 3)
+
+        stats = PruneSnapshots(policy=RetentionPolicy(keep_last=1, hourly_hours=0), dry_run=True).process()
+        assert stats['deleted'] == 2 and stats['reclaimed_bytes'] > 0
+        assert DecisionSnapshot.objects.filter(decision=decision).count() == 3
+
+        out = StringIO()
+        call_command('prune_snapshots', '--keep-last', '1', '--hourly-hours', '0', stdout=out)
+        assert 'Deleted: 2' in out.getvalue() and 'Reclaimed:' in out.getvalue()
+        assert list(DecisionSnapshot.objects.filter(decision=decision)) == [snapshots[2]]
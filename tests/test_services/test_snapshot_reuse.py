@@ -0,0 +1,158 @@
+"""
+Tests for content-addressed snapshot reuse.
+
+This test suite validates democracy.delegation.inputs_hash and
+CreateCalculationSnapshot(reuse_unchanged=True), including:
+- The hash covers memberships, followings, manual ballots, anonymity and choices
+- Calculated ballots captured in a snapshot do not change the hash
+- Unchanged inputs reuse the latest staged and tallied snapshot without
+  writing a snapshot row
+- Changed inputs, untallied or older snapshots are never reused
+- The background recalculation skips staging and tallying for unchanged inputs
+  when SNAPSHOT_REUSE_UNCHANGED is on (off by default)
+"""
+
+import copy
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from democracy.delegation import inputs_hash
+from democracy.models import DecisionSnapshot, Following, Vote
+from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+from democracy.signals import recalculate_community_decisions_async
+from tests.helpers import calculate
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+class TestInputsHash:
+    """Canonical hash of calculation inputs."""
+
+    DATA = {
+        'community_memberships': ['u2', 'u1'],
+        'followings': {'u2': [{'followee_id': 'u1', 'tags': '', 'order': 1}]},
+        'existing_ballots': {
+            'u1': {'voter_id': 'u1', 'is_calculated': False, 'is_anonymous': False, 'tags': 'a', 'votes': {'c1': '4.00'}},
+            'u2': {'voter_id': 'u2', 'is_calculated': True, 'is_anonymous': False, 'tags': 'a', 'votes': {'c1': '4.00'}},
+        },
+        'choices_data': [{'id': 'c1', 'title': 'Parks', 'description': ''}],
+        'metadata': {'calculation_timestamp': '2026-01-01T00:00:00'},
+    }
+
+    def changed(self, change):
+        data = copy.deepcopy(self.DATA)
+        change(data)
+        return inputs_hash(data) != inputs_hash(self.DATA)
+
+    def test_ignores_order_timestamps_and_calculated_votes(self):
+        assert not self.changed(lambda data: data['community_memberships'].reverse())
+        assert not self.changed(lambda data: data['metadata'].update(calculation_timestamp='later'))
+        assert not self.changed(lambda data: data['existing_ballots']['u2']['votes'].update(c1='1.00'))
+
+    def test_covers_inputs(self):
+        assert self.changed(lambda data: data['community_memberships'].append('u3'))
+        assert self.changed(lambda data: data.update(non_voting_memberships=['u3']))
+        assert self.changed(lambda data: data['followings']['u2'][0].update(tags='a'))
+        assert self.changed(lambda data: data['existing_ballots']['u1']['votes'].update(c1='3.00'))
+        assert self.changed(lambda data: data['existing_ballots']['u1'].update(tags='b'))
+        assert self.changed(lambda data: data['existing_ballots']['u2'].update(is_anonymous=True))
+        assert self.changed(lambda data: data['choices_data'][0].update(title='Roads'))
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestSnapshotReuse:
+    """CreateCalculationSnapshot with reuse_unchanged."""
+
+    def test_unchanged_inputs_reuse_latest_snapshot(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+        first, _ = calculate(decision)
+
+        # Calculated ballots persisted by the first run are not inputs
+        reused, service = calculate(decision)
+
+        assert service.unchanged and reused == first
+        assert first.inputs_hash
+        assert DecisionSnapshot.objects.filter(decision=decision).count() == 1
+
+    def test_changed_inputs_create_new_snapshot(self, chain_community_factory):
+        decision, memberships, choices = chain_community_factory(3)
+        first, _ = calculate(decision)
+
+        Vote.objects.filter(ballot__voter=memberships[0].member, choice=choices[0]).update(stars=Decimal('2.00'))
+        second, service = calculate(decision)
+
+        assert not service.unchanged and second != first
+        assert second.inputs_hash != first.inputs_hash
+
+        Following.objects.filter(follower=memberships[2]).update(tags='parks')
+        third, service = calculate(decision)
+        assert not service.unchanged and third.inputs_hash != second.inputs_hash
+
+    def test_untallied_or_disabled_snapshots_are_not_reused(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+        calculate(decision)
+
+        staged = CreateCalculationSnapshot(decision.id).process()
+        assert staged.calculation_status == 'ready'
+        SnapshotBasedStageBallots(staged.id, persist_ballots=True).process()
+
+        after_staging, service = calculate(decision)
+        assert not service.unchanged and after_staging != staged
+
+        _, service = calculate(decision, reuse_unchanged=False)
+        assert not service.unchanged
+
+    def test_reuse_creates_no_snapshot_row(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+        first, _ = calculate(decision)
+
+        with CaptureQueriesContext(connection) as queries:
+            reused, service = calculate(decision)
+
+        assert service.unchanged and reused == first
+        writes = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(('INSERT', 'DELETE')) and 'decisionsnapshot' in query['sql']
+        ]
+        assert writes == []
+
+    def test_capture_failure_is_recorded(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+
+        with patch.object(CreateCalculationSnapshot, '_capture_system_state', side_effect=RuntimeError('boom')):
+            with pytest.raises(RuntimeError):
+                calculate(decision)
+
+        failed = DecisionSnapshot.objects.get(decision=decision)
+        assert failed.calculation_status == 'failed_snapshot' and failed.error_log == 'boom'
+
+    def test_background_recalculation_does_not_reuse_by_default(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+
+        with patch('django.db.connection.close'):
+            recalculate_community_decisions_async(decision.community.id, trigger_event='test')
+            recalculate_community_decisions_async(decision.community.id, trigger_event='test')
+
+        assert DecisionSnapshot.objects.filter(decision=decision).count() == 2
+
+    @override_settings(SNAPSHOT_REUSE_UNCHANGED=True)
+    def test_background_recalculation_skips_unchanged_decisions(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(3)
+
+        with patch('django.db.connection.close'):
+            recalculate_community_decisions_async(decision.community.id, trigger_event='test')
+            recalculate_community_decisions_async(decision.community.id, trigger_event='test')
+            count = DecisionSnapshot.objects.filter(decision=decision).count()
+            with patch('democracy.signals.SnapshotBasedStageBallots') as stage:
+                recalculate_community_decisions_async(decision.community.id, trigger_event='test')
+
+        stage.assert_not_called()
+        assert DecisionSnapshot.objects.filter(decision=decision).count() == count
+        assert DecisionSnapshot.objects.filter(decision=decision).first().calculation_status == 'completed'
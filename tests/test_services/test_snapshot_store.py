@@ -0,0 +1,136 @@
+"""
+Tests for the binary snapshot container.
+
+This test suite validates democracy.snapshot_store and DecisionSnapshot's
+snapshot_data property, including:
+- Column-wise lists of dicts round-trip exactly (key order included)
+- Sections are decompressed only when one of their keys is read
+- Unchanged sections are not recompressed
+- Legacy JSON snapshots stay readable and are converted on their first change
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from democracy import snapshot_store
+from democracy.models import DecisionSnapshot
+from democracy.services import CreateCalculationSnapshot, SnapshotBasedStageBallots
+from democracy.snapshot_store import SnapshotData, encode_snapshot, pack, read_container, unpack
+
+
+pytestmark = pytest.mark.usefixtures('no_background_recalculation')
+
+
+SAMPLE = {
+    'metadata': {'snapshot_version': '1.0.0'},
+    'community_memberships': ['u1', 'u2'],
+    'followings': {'u2': [{'followee_id': 'u1', 'tags': '', 'order': 1}]},
+    'delegation_tree': {
+        'nodes': [
+            {'voter_id': 'u1', 'vote_type': 'manual', 'votes': {'c1': {'stars': 4.0, 'choice_name': 'Parks'}}},
+            {'voter_id': 'u2', 'vote_type': 'no_ballot', 'reason': 'No followings'},
+            {'voter_id': 'u3', 'vote_type': 'manual', 'votes': {}},
+        ],
+        'edges': [],
+    },
+    'statistics': {'manual_ballots': 1},
+    'custom': [1, None, 'x'],
+}
+
+
+class TestPacking:
+    """Column-wise encoding of lists of dicts."""
+
+    def test_round_trip(self):
+        packed = pack(SAMPLE)
+        nodes = packed['delegation_tree']['nodes']
+
+        assert len(nodes['__shapes__']) == 2
+        assert [row[0] for row in nodes['__rows__']] == [0, 1, 0]
+        restored = unpack(json.loads(json.dumps(packed)))
+        assert restored == SAMPLE
+        assert list(restored['delegation_tree']['nodes'][1]) == ['voter_id', 'vote_type', 'reason']
+
+    def test_marker_keys_are_rejected(self):
+        with pytest.raises(ValueError):
+            pack({'bad': {'__shapes__': [], '__rows__': []}})
+
+
+class TestSnapshotData:
+    """Lazy section access."""
+
+    def test_container_round_trip(self):
+        data = SnapshotData.from_container(encode_snapshot(SAMPLE))
+
+        assert set(data) == set(SAMPLE) and len(data) == len(SAMPLE)
+        assert data.sections() == ['extra', 'inputs', 'statistics', 'tree']
+        assert data.to_dict() == SAMPLE
+
+    def test_reads_decode_only_their_section(self):
+        data = SnapshotData.from_container(encode_snapshot(SAMPLE))
+
+        with patch.object(snapshot_store, 'decompress_section', wraps=snapshot_store.decompress_section) as spy:
+            assert 'delegation_tree' in data
+            assert data['statistics'] == {'manual_ballots': 1}
+            assert data.get('tally_state') is None
+        assert spy.call_count == 1
+
+    def test_encode_recompresses_changed_sections_only(self):
+        blob = encode_snapshot(SAMPLE)
+        data = SnapshotData.from_container(blob)
+        data['preference_matrix'] = {'c1': {'c1': 0}}
+        del data['custom']
+
+        with patch.object(snapshot_store, 'compress_section', wraps=snapshot_store.compress_section) as spy:
+            updated = data.encode()
+        assert spy.call_count == 1
+        assert not data.changed
+
+        sections = read_container(updated)
+        assert 'extra' not in sections
+        assert sections['tree'] == read_container(blob)['tree']
+        assert SnapshotData.from_container(updated)['preference_matrix'] == {'c1': {'c1': 0}}
+
+    def test_invalid_containers(self):
+        blob = encode_snapshot(SAMPLE)
+        with pytest.raises(ValueError):
+            read_container(b'{"metadata": {}}')
+        with pytest.raises(ValueError):
+            read_container(blob[:6] + bytes([99]) + blob[7:])
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+class TestDecisionSnapshotStorage:
+    """DecisionSnapshot.snapshot_data over data_blob."""
+
+    def test_pipeline_stores_compressed_container(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(20)
+        snapshot = CreateCalculationSnapshot(decision.id).process()
+        SnapshotBasedStageBallots(snapshot.id).process()
+
+        snapshot = DecisionSnapshot.objects.get(id=snapshot.id)
+
+        assert snapshot.legacy_data == {}
+        assert set(read_container(snapshot.data_blob)) == {'inputs', 'ballots', 'tree', 'statistics'}
+        assert len(snapshot.snapshot_data['delegation_tree']['nodes']) == 20
+        assert len(bytes(snapshot.data_blob)) < len(json.dumps(snapshot.snapshot_data.to_dict()))
+
+    def test_legacy_json_snapshot(self, chain_community_factory):
+        decision, _, _ = chain_community_factory(1)
+        snapshot = DecisionSnapshot.objects.create(decision=decision, calculation_status='completed')
+        DecisionSnapshot.objects.filter(id=snapshot.id).update(legacy_data=SAMPLE, data_blob=None)
+
+        snapshot = DecisionSnapshot.objects.get(id=snapshot.id)
+        assert snapshot.snapshot_data == SAMPLE
+        snapshot.save()
+        snapshot.refresh_from_db()
+        assert snapshot.data_blob is None and snapshot.legacy_data == SAMPLE
+
+        snapshot.snapshot_data['preference_matrix'] = {}
+        snapshot.save()
+        snapshot.refresh_from_db()
+        assert snapshot.legacy_data == {}
+        assert snapshot.snapshot_data == {**SAMPLE, 'preference_matrix': {}}
@@ -0,0 +1,152 @@
+"""
+Equivalence harness for the fixed-point star arithmetic backend.
+
+This test suite validates democracy.star_arithmetic.FixedPointStars against the
+Decimal reference implementation, including:
+- Every rounded addition and division matches the 12-digit Decimal context
+- Delegation engine ballots are identical value-for-value
+- STAR tallies produce identical winners, scores, runoff details, logs and
+  unresolved ties on randomly generated elections
+- Both backends round to 12 digits in threads with the default Decimal context
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from democracy.delegation import DelegationEngine
+from democracy.exceptions import UnresolvedTieError
+from democracy.star_arithmetic import DecimalStars, FixedPointStars, get_star_arithmetic
+from democracy.star_voting import STARVotingTally
+from tests.helpers import (
+    in_worker_thread, make_snapshot_data, random_cyclic_snapshot, random_stars, run_tally,
+)
+
+
+class TestFixedPointOperations:
+    """Single operations must round exactly like the Decimal context."""
+
+    def test_parse_and_to_decimal_round_trip(self):
+        fixed = FixedPointStars()
+        for text in ['0', '5', '3.75', '0.333333333333', '4.99999999999', '0.00000001']:
+            assert fixed.to_decimal(fixed.parse(text)) == Decimal(text)
+        assert fixed.parse('5.00') == fixed.five
+
+    def test_random_averages_match_decimal(self):
+        rng = random.Random(7)
+        fixed = FixedPointStars()
+        reference = DecimalStars()
+        for _ in range(2000):
+            count = rng.randint(1, 40)
+            values = [random_stars(rng) / rng.randint(1, 9) for _ in range(rng.randint(1, count))]
+            expected = reference.average(values, count)
+            assert fixed.to_decimal(fixed.average([fixed.parse(v) for v in values], count)) == expected
+
+    def test_random_scores_match_decimal(self):
+        rng = random.Random(11)
+        fixed = FixedPointStars()
+        reference = DecimalStars()
+        for _ in range(2000):
+            count = rng.randint(1, 500)
+            values = [random_stars(rng) / rng.randint(1, 7) for _ in range(rng.randint(0, count))]
+            expected = reference.score(values, count)
+            actual = fixed.score([fixed.parse(v) for v in values], count)
+            assert actual == expected
+            assert str(actual) == str(expected)
+
+    def test_get_star_arithmetic_by_name(self, settings):
+        assert isinstance(get_star_arithmetic('fixed'), FixedPointStars)
+        settings.STAR_ARITHMETIC = 'fixed'
+        assert isinstance(get_star_arithmetic(), FixedPointStars)
+        settings.STAR_ARITHMETIC = 'decimal'
+        assert isinstance(get_star_arithmetic(), DecimalStars)
+
+
+class TestDelegationEquivalence:
+    """The engine resolves identical ballots with either backend."""
+
+    def test_random_snapshots_resolve_identically(self):
+        rng = random.Random(3)
+        for _ in range(40):
+            snapshot_data = make_snapshot_data(*random_cyclic_snapshot(rng, size=60))
+            expected = DelegationEngine(snapshot_data).resolve()
+            actual = DelegationEngine(snapshot_data, arithmetic=FixedPointStars()).resolve()
+            for voter_id in expected:
+                assert actual[voter_id]['type'] == expected[voter_id]['type']
+                assert actual[voter_id]['ballot'] == expected[voter_id]['ballot']
+                assert actual[voter_id]['tags'] == expected[voter_id]['tags']
+
+
+class TestTallyEquivalence:
+    """STAR tallies are identical with either backend."""
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_random_elections_match_decimal(self, seed):
+        rng = random.Random(seed)
+        for _ in range(60):
+            choices = [f'choice_{i}' for i in range(rng.randint(1, 5))]
+            ballots = []
+            for _ in range(rng.randint(1, 80)):
+                # Coarse ratings make score and runoff ties common
+                coarse = rng.random() < 0.5
+                ballots.append({
+                    choice: Decimal(rng.randint(0, 5)) if coarse else random_stars(rng)
+                    for choice in rng.sample(choices, rng.randint(1, len(choices)))
+                })
+            assert run_tally(ballots, FixedPointStars()) == run_tally(ballots)
+
+    def test_delegated_ballots_match_decimal(self):
+        rng = random.Random(99)
+        for _ in range(20):
+            snapshot_data = make_snapshot_data(*random_cyclic_snapshot(rng, size=80))
+            results = DelegationEngine(snapshot_data).resolve()
+            ballots = [result['ballot'] for result in results.values() if result['ballot']]
+            if ballots:
+                assert run_tally(ballots, FixedPointStars()) == run_tally(ballots)
+
+    def test_unresolved_tie_is_identical(self):
+        ballots = [
+            {'a': Decimal('5'), 'b': Decimal('0')},
+            {'a': Decimal('0'), 'b': Decimal('5')},
+        ]
+        with pytest.raises(UnresolvedTieError) as expected:
+            STARVotingTally().run(ballots)
+        with pytest.raises(UnresolvedTieError) as actual:
+            STARVotingTally(arithmetic=FixedPointStars()).run(ballots)
+        assert actual.value.tiebreaker_log == expected.value.tiebreaker_log
+
+
+class TestWorkerThreads:
+    """Recalculation threads do not inherit the importing thread's 12-digit context."""
+
+    def test_operations_use_twelve_digits(self):
+        fixed = FixedPointStars()
+        decimal_average, fixed_average, score = in_worker_thread(lambda: (
+            DecimalStars().average([Decimal('2')], 3),
+            fixed.to_decimal(fixed.average([fixed.parse('2')], 3)),
+            DecimalStars().score([Decimal('1'), Decimal('1')], 3),
+        ))
+
+        assert decimal_average == fixed_average == Decimal('0.666666666667')
+        assert score == fixed.score([fixed.parse('1'), fixed.parse('1')], 3)
+
+    def test_delegation_and_tally_match_main_thread(self):
+        rng = random.Random(5)
+        for _ in range(10):
+            snapshot_data = make_snapshot_data(*random_cyclic_snapshot(rng, size=60))
+            expected = DelegationEngine(snapshot_data).resolve()
+
+            def resolve_and_tally():
+                decimal_results = DelegationEngine(snapshot_data).resolve()
+                fixed_results = DelegationEngine(snapshot_data, arithmetic=FixedPointStars()).resolve()
+                ballots = [result['ballot'] for result in decimal_results.values() if result['ballot']]
+                tallies = (run_tally(ballots), run_tally(ballots, FixedPointStars())) if ballots else None
+                return decimal_results, fixed_results, ballots, tallies
+
+            decimal_results, fixed_results, ballots, tallies = in_worker_thread(resolve_and_tally)
+            for voter_id in expected:
+                assert decimal_results[voter_id]['ballot'] == expected[voter_id]['ballot']
+                assert fixed_results[voter_id]['ballot'] == expected[voter_id]['ballot']
+            if ballots:
+                assert tallies[0] == tallies[1] == run_tally(ballots)
@@ -0,0 +1,111 @@
+"""
+Tests for the STAR tally benchmark suite.
+
+This test suite validates democracy.star_benchmark and the
+benchmark_star_tally command, including:
+- Generated elections are reproducible and follow their distribution
+- Every tie scenario reaches the tiebreaker step it is built for
+- Phase timings do not change tally results
+- The command writes JSON results
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from democracy.exceptions import UnresolvedTieError
+from democracy.star_benchmark import (
+    DISTRIBUTIONS, PHASES, TIE_SCENARIOS, TimedSTARVotingTally, generate_election, run_benchmarks,
+    tie_election,
+)
+from democracy.star_voting import STARVotingTally
+
+
+# Log line each tie scenario must produce
+SCENARIO_STEPS = {
+    'score_tie_first': 'Eliminated c (losses: 2)',
+    'score_tie_second': 'Eliminated c (losses: 1)',
+    'score_tie_cycle': "Tie for 1st place: ['a', 'b', 'c']",
+    'runoff_score': 'Step 2: Tie broken by score - a wins (2.50000000 vs 0.50000000)',
+    'runoff_five_star': 'Step 3: a wins (more five-star ratings)',
+    'unresolved': 'All automatic tiebreakers exhausted',
+}
+
+
+class TestGenerators:
+    """Synthetic elections."""
+
+    @pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+    def test_reproducible_and_in_range(self, distribution):
+        election = generate_election(200, 4, distribution, seed=3, coverage=0.5)
+
+        assert election == generate_election(200, 4, distribution, seed=3, coverage=0.5)
+        assert len(election) == 200
+        assert all(ballot for ballot in election)
+        stars = [value for ballot in election for value in ballot.values()]
+        assert all(Decimal('0') <= value <= Decimal('5') for value in stars)
+        if distribution == 'fractional':
+            assert any(value != value.to_integral_value() for value in stars)
+        else:
+            assert all(value == value.to_integral_value() for value in stars)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            generate_election(10, 3, 'bimodal')
+        with pytest.raises(ValueError):
+            generate_election(0, 3)
+
+    @pytest.mark.parametrize('scenario', TIE_SCENARIOS)
+    def test_tie_scenarios_reach_their_step(self, scenario):
+        ballots = tie_election(scenario, 1000)
+        assert 900 < len(ballots) <= 1000
+
+        tally = STARVotingTally()
+        try:
+            tally.run(ballots)
+        except UnresolvedTieError:
+            assert scenario == 'unresolved'
+        assert SCENARIO_STEPS[scenario] in tally.tally_log
+
+
+class TestTimings:
+    """Phase timing."""
+
+    def test_timed_tally_matches_tally(self):
+        ballots = tie_election('score_tie_first', 30)
+        tally = TimedSTARVotingTally()
+
+        assert tally.run(ballots) == STARVotingTally().run(ballots)
+        assert set(tally.timings) == set(PHASES) - {'setup'}
+        assert all(seconds >= 0 for seconds in tally.timings.values())
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks([60], choices=3, distributions=['uniform'], repeat=2, trace_level='off')
+
+        assert [result['name'] for result in results] == ['uniform-60x3'] + [
+            f"{scenario}-60" for scenario in TIE_SCENARIOS
+        ]
+        unresolved = results[-1]
+        assert unresolved['outcome'] == 'unresolved' and unresolved['winner'] is None
+        for result in results:
+            assert set(PHASES) <= set(result['seconds'])
+            assert result['peak_memory_bytes'] > 0
+
+
+class TestCommand:
+    """benchmark_star_tally writes JSON."""
+
+    def test_writes_json(self, tmp_path, capsys):
+        output = tmp_path / 'star.json'
+
+        call_command(
+            'benchmark_star_tally', '--ballots', '40', '--choices', '3', '--distribution', 'polarized',
+            '--repeat', '1', '--output', str(output),
+        )
+
+        report = json.loads(output.read_text())
+        assert report['options']['choices'] == 3
+        assert len(report['results']) == 1 + len(TIE_SCENARIOS)
+        assert 'polarized-40x3' in capsys.readouterr().out
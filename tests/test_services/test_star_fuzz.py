@@ -0,0 +1,149 @@
+"""
+Tests for the differential STAR tally fuzzer.
+
+This test suite validates democracy.star_fuzz and the fuzz_star_tally command,
+including:
+- Every backend agrees with the reference on generated ballot sets
+- Each adversarial strategy produces the ballots it describes
+- Disagreements (including UnresolvedTieError payloads) are detected
+- Failing cases shrink to minimal reproductions
+- Delegated-average ballots catch inexact incremental sums
+- Thread backends run outside the module's Decimal context
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from democracy.star_fuzz import (
+    BACKENDS, STRATEGIES, as_repro, compare, differences, fuzz, generate_case, outcome, shrink,
+)
+from democracy.star_incremental import IncrementalSTARTally
+from democracy.star_voting import STARVotingTally
+
+
+def winner_flips_on_five_stars(ballots):
+    """A broken backend: any 5-star rating makes 'zzz' win."""
+    result = STARVotingTally().run(ballots)
+    if any(Decimal('5') in ballot.values() for ballot in ballots):
+        result = {**result, 'winner': 'zzz'}
+    return result
+
+
+class TestBackendsAgree:
+    """The fuzzer finds no disagreement in the current backends."""
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_fuzz(self, seed):
+        assert fuzz(iterations=150, seed=seed) == []
+
+    def test_blank_ballots_raise_the_same_error(self):
+        # Found by the fuzzer: run_many() raised a NumPy error instead
+        assert compare([{}, {}]) == {}
+        assert outcome(BACKENDS['run_many'], [{}]) == {'error': 'Cannot tally election with no choices'}
+
+
+class TestStrategies:
+    """Generated ballot sets."""
+
+    @pytest.mark.parametrize('strategy', STRATEGIES)
+    def test_strategy_ballots(self, strategy):
+        rng = random.Random(5)
+        for _ in range(20):
+            name, ballots = generate_case(rng, strategy)
+            assert name == strategy and ballots
+            stars = [value for ballot in ballots for value in ballot.values()]
+            assert all(Decimal('0') <= value <= Decimal('5') for value in stars)
+            if strategy == 'single_choice':
+                assert len({choice for ballot in ballots for choice in ballot}) == 1
+            if strategy == 'all_zero':
+                assert set(stars) == {Decimal('0')}
+            if strategy == 'near_equal':
+                assert max(stars) - min(stars) <= Decimal('0.00000004')
+            if strategy == 'delegated':
+                assert all(len(value.as_tuple().digits) <= 12 for value in stars)
+
+    def test_delegated_ballots_have_twelve_digit_stars(self):
+        rng = random.Random(5)
+        stars = [
+            value for _ in range(20) for ballot in generate_case(rng, 'delegated')[1] for value in ballot.values()
+        ]
+        assert any(len(value.as_tuple().digits) == 12 for value in stars)
+
+    def test_two_choice_mirrored_ballots_never_resolve(self):
+        rng = random.Random(2)
+        for _ in range(20):
+            _, ballots = generate_case(rng, 'mirrored', max_choices=2)
+            if len(ballots[0]) == 2:
+                assert 'unresolved' in outcome(BACKENDS['reference'], ballots)
+
+
+class TestDisagreements:
+    """Detection and shrinking."""
+
+    def test_detects_and_shrinks(self):
+        rng = random.Random(0)
+        ballots = [
+            {choice: Decimal(rng.randint(0, 499)).scaleb(-2) for choice in 'abc'}
+            for _ in range(30)
+        ] + [{'a': Decimal('1.25'), 'b': Decimal('5'), 'c': Decimal('4.5')}]
+        backend = {'broken': winner_flips_on_five_stars}
+
+        assert compare(ballots, backend) == {'broken': ['winner']}
+        minimal = shrink(ballots, lambda candidate: 'broken' in compare(candidate, backend))
+
+        assert as_repro(minimal) == [{'b': '5'}]
+
+    def test_unresolved_tie_payload_is_compared(self):
+        ballots = [{'a': Decimal('5'), 'b': Decimal('3')}, {'a': Decimal('3'), 'b': Decimal('5')}]
+        expected = outcome(BACKENDS['reference'], ballots)
+        assert sorted(expected['unresolved']) == ['a', 'b']
+
+        assert differences(expected, outcome(BACKENDS['run_many'], ballots)) == []
+        assert differences(expected, {**expected, 'tiebreaker_log': []}) == ['tiebreaker_log']
+        assert differences(expected, {'error': 'Cannot tally election with no ballots'}) == ['outcome']
+
+    def test_exact_incremental_sums_disagree_on_delegated_ballots(self):
+        # The incremental counts sum exactly; the reference rounds each sum to
+        # 12 digits. The 'incremental' backend only uses exact counts.
+        exact_sums = {'exact_sums': lambda ballots: IncrementalSTARTally.from_ballots(ballots).run()}
+
+        failures = fuzz(iterations=300, seed=3, backends=exact_sums, strategies=('delegated',))
+
+        assert failures and 'scores' in failures[0]['fields']
+        assert fuzz(iterations=300, seed=3, backends={'incremental': BACKENDS['incremental']},
+                    strategies=('delegated',)) == []
+
+    def test_thread_backends_use_a_fresh_context(self):
+        from decimal import getcontext
+        from democracy.star_fuzz import in_worker_thread
+
+        assert getcontext().prec == 12
+        assert in_worker_thread(lambda ballots: getcontext().prec)([]) != 12
+        with pytest.raises(ValueError):
+            BACKENDS['thread']([])
+
+    def test_fuzz_reports_shrunk_failures(self):
+        failures = fuzz(iterations=30, seed=4, backends={'broken': winner_flips_on_five_stars}, max_choices=3)
+
+        assert failures
+        for failure in failures:
+            assert failure['backend'] == 'broken'
+            assert [list(ballot.values()) for ballot in failure['ballots']] == [[Decimal('5')]]
+
+
+class TestCommand:
+    """fuzz_star_tally exits with an error only on disagreement."""
+
+    def test_clean_run(self, capsys):
+        call_command('fuzz_star_tally', '--iterations', '20', '--backend', 'fixed')
+        assert 'No disagreements in 20 elections' in capsys.readouterr().out
+
+    def test_disagreement_fails(self, monkeypatch, capsys):
+        monkeypatch.setitem(BACKENDS, 'fixed', winner_flips_on_five_stars)
+        with pytest.raises(CommandError):
+            call_command('fuzz_star_tally', '--iterations', '30', '--seed', '4', '--backend', 'fixed')
+        assert '": "5"}]' in capsys.readouterr().out
@@ -0,0 +1,173 @@
+"""
+Tests for the vectorized STAR tally backend.
+
+This test suite validates democracy.star_matrix.BallotMatrix and
+STARVotingTally(vectorized=True), including:
+- Identical winners, scores, runoff details, logs and unresolved ties
+- Fallback to the scalar path without NumPy or outside the exact regime
+- Tolerance mode for delegated 12-digit ballots, rejected up front on overflow
+- Identical results in threads with the default (28-digit) Decimal context
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from democracy import star_matrix
+from democracy.exceptions import UnresolvedTieError
+from democracy.star_arithmetic import quantized_mean, star_context
+from democracy.star_matrix import BallotMatrix
+from democracy.star_voting import STARVotingTally, quantize_stars
+from tests.helpers import in_worker_thread, random_stars, run_tally
+
+
+def run_tally_vectorized(ballots):
+    """run_tally() with the vectorized backend."""
+    try:
+        return STARVotingTally(vectorized=True).run(ballots)
+    except UnresolvedTieError as error:
+        return {'unresolved': sorted(map(str, error.tied_candidates)), 'log': error.tiebreaker_log}
+
+
+class TestQuantizedMean:
+    """quantized_mean reproduces the Decimal score computation."""
+
+    def test_random_totals_match_decimal(self):
+        rng = random.Random(4)
+        for _ in range(20000):
+            count = rng.randint(1, 10 ** rng.randint(1, 7))
+            places = rng.randint(0, 6)
+            total = rng.randint(0, min(10 ** 12 - 1, count * 5 * 10 ** places))
+            expected = quantize_stars(Decimal(total).scaleb(-places) / Decimal(count))
+            actual = quantized_mean(total, count, places)
+            assert actual == expected
+            assert str(actual) == str(expected)
+
+
+class TestVectorizedTally:
+    """The vectorized backend is a drop-in replacement for the scalar tally."""
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_random_elections_match_scalar_tally(self, seed):
+        pytest.importorskip('numpy')
+        rng = random.Random(seed)
+        for _ in range(60):
+            choices = [f'choice_{i}' for i in range(rng.randint(1, 5))]
+            ballots = []
+            for _ in range(rng.randint(1, 80)):
+                coarse = rng.random() < 0.5
+                ballots.append({
+                    choice: Decimal(rng.randint(0, 5)) if coarse else random_stars(rng)
+                    for choice in rng.sample(choices, rng.randint(1, len(choices)))
+                })
+            assert BallotMatrix.from_ballots(ballots, choices) is not None
+            assert run_tally_vectorized(ballots) == run_tally(ballots)
+
+    def test_worker_thread_matches_scalar_tally(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(12)
+        elections = []
+        for _ in range(40):
+            choices = [f'choice_{i}' for i in range(rng.randint(2, 4))]
+            elections.append([
+                {choice: random_stars(rng) / rng.randint(1, 7) for choice in choices}
+                for _ in range(rng.randint(1, 60))
+            ])
+        elections = [ballots for ballots in elections if BallotMatrix.from_ballots(ballots, sorted(ballots[0]))]
+
+        vectorized, scalar = in_worker_thread(lambda: (
+            [run_tally_vectorized(ballots) for ballots in elections],
+            [run_tally(ballots) for ballots in elections],
+        ))
+
+        assert elections
+        assert vectorized == scalar == [run_tally(ballots) for ballots in elections]
+
+    def test_matrix_head_to_head_and_five_stars(self):
+        pytest.importorskip('numpy')
+        ballots = [
+            {'a': Decimal('5'), 'b': Decimal('2.50')},
+            {'a': Decimal('1'), 'b': Decimal('5.00')},
+            {'b': Decimal('0')},
+        ]
+        matrix = BallotMatrix.from_ballots(ballots, ['a', 'b'])
+        assert matrix.places == 1  # 2.50 only needs one decimal place
+        assert matrix.head_to_head('a', 'b') == (1, 1, 1)
+        assert matrix.five_star_count('a') == 1
+        assert matrix.five_star_count('b') == 1
+
+
+class TestFallback:
+    """Without NumPy, or outside the exact regime, the scalar path is used."""
+
+    def test_no_numpy(self, monkeypatch):
+        monkeypatch.setattr(star_matrix, 'np', None)
+        ballots = [{'a': Decimal('5'), 'b': Decimal('1')}]
+        assert BallotMatrix.from_ballots(ballots, ['a', 'b']) is None
+        tally = STARVotingTally(vectorized=True)
+        assert tally.run(ballots)['winner'] == 'a'
+        assert tally.matrix is None
+
+    def test_too_many_decimal_places(self):
+        pytest.importorskip('numpy')
+        ballots = [{'a': Decimal('3.3333333333333335'), 'b': Decimal('1')}]
+        assert BallotMatrix.from_ballots(ballots, ['a', 'b']) is None
+        assert run_tally_vectorized(ballots) == run_tally(ballots)
+
+    def test_totals_beyond_decimal_precision(self):
+        pytest.importorskip('numpy')
+        ballots = [{'a': Decimal('0.333333333333')}, {'a': Decimal('4.99999999999')}] * 3
+        assert BallotMatrix.from_ballots(ballots, ['a']) is None
+
+    def test_int64_overflow_rejected_before_allocating(self, monkeypatch):
+        pytest.importorskip('numpy')
+        ballots = [{'a': Decimal('4.999999999999')}] * 2_000_000
+
+        def allocate(*args, **kwargs):
+            raise AssertionError("allocated a matrix that cannot be used")
+
+        monkeypatch.setattr(star_matrix.np, 'zeros', allocate)
+        assert BallotMatrix.from_ballots(ballots, ['a'], exact=False) is None
+
+
+class TestToleranceMode:
+    """Delegated 12-digit ballots stay on the matrix when exact scores are not required."""
+
+    def test_delegated_ballots_use_the_matrix(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(21)
+        choices = ['a', 'b', 'c']
+        with star_context():
+            # 12-significant-digit means, as calculated ballots inherit them
+            ballots = [
+                {choice: random_stars(rng) / rng.randint(1, 7) for choice in choices}
+                for _ in range(500)
+            ]
+        assert BallotMatrix.from_ballots(ballots, choices) is None
+        matrix = BallotMatrix.from_ballots(ballots, choices, exact=False)
+        assert matrix is not None
+
+        tally = STARVotingTally(vectorized=True, exact_scores=False)
+        result = tally.run(ballots)
+        expected = run_tally(ballots)
+        assert tally.matrix is not None
+        assert result['runoff_details'] == expected['runoff_details']
+        for choice in choices:
+            # Scores are exact means; the Decimal path rounds its running sums
+            exact = sum(ballot[choice] for ballot in ballots) / len(ballots)
+            assert abs(result['scores'][choice] - exact) <= Decimal('0.000000005')
+            assert abs(result['scores'][choice] - expected['scores'][choice]) <= Decimal('0.000005')
+
+    def test_exact_ballots_are_identical_in_tolerance_mode(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(22)
+        for _ in range(20):
+            choices = [f'choice_{i}' for i in range(rng.randint(1, 4))]
+            ballots = [
+                {choice: random_stars(rng) for choice in rng.sample(choices, rng.randint(1, len(choices)))}
+                for _ in range(rng.randint(1, 60))
+            ]
+            tally = STARVotingTally(vectorized=True, exact_scores=False)
+            assert tally.run(ballots) == run_tally(ballots)
+
@@ -9,9 +9,11 @@ import pytest
 from django.utils import timezone
 from datetime import timedelta
 from collections import OrderedDict
+from decimal import Decimal
 
 from democracy.services import StageBallots
 from democracy.models import Decision, Choice, Ballot, Vote
+from democracy.star_voting import STARVotingTally
 from tests.factories import (
     CommunityWithDelegationFactory, DecisionFactory, ChoiceFactory,
     BallotFactory, VoteFactory, UserFactory, MembershipFactory
@@ -644,3 +646,30 @@ class TestSTARVotingComplexScenarios:
         assert manual_count > 0
         # May or may not have calculated ballots depending on delegation setup
         assert len(all_ballots) >= manual_count
+
+
+@pytest.mark.services
+class TestScoreTiebreakerEliminations:
+    """Head-to-head eliminations in a multi-way score tie (Tiebreaker Step 1)."""
+
+    def test_three_way_tie_for_first_with_two_losers(self):
+        """Losers that tie each other break the tie among themselves; the survivor advances."""
+        # a, c and d tie for first; c beats both, a and d tie and lose once each
+        ballots = [
+            {'a': Decimal('2'), 'b': Decimal('0'), 'c': Decimal('3'), 'd': Decimal('3'), 'e': Decimal('3')},
+            {'a': Decimal('3'), 'b': Decimal('3'), 'c': Decimal('3'), 'd': Decimal('2'), 'e': Decimal('0')},
+            {'a': Decimal('5'), 'b': Decimal('3'), 'c': Decimal('1'), 'd': Decimal('0'), 'e': Decimal('3')},
+            {'a': Decimal('0'), 'b': Decimal('3'), 'c': Decimal('3'), 'd': Decimal('5'), 'e': Decimal('1')},
+        ]
+
+        result = STARVotingTally().run(ballots)
+
+        assert result['runoff_details']['finalists'] == ['c', 'a']
+        assert result['winner'] == 'c'
+        log = result['tally_log']
+        tie = log.index("Tie for 1st place: ['a', 'c', 'd']")
+        assert log[tie + 1:tie + 4] == [
+            "Advanced c (losses: 0)",
+            "=== PHASE 2: AUTOMATIC RUNOFF ===",
+            "Finalists: c vs a",
+        ]
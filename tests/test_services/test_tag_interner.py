@@ -0,0 +1,66 @@
+"""
+Tests for tag bitmask interning.
+
+This test suite validates democracy.tag_interner.TagInterner and its use in
+StageBallots.should_inherit_ballot, including:
+- Normalization (whitespace, empty tags) and memoized string masks
+- Bitwise matching equivalent to set intersection
+- Masks past 64 distinct tags
+"""
+
+import random
+from types import SimpleNamespace
+
+from democracy.services import StageBallots
+from democracy.tag_interner import TagInterner
+
+
+class TestTagInterner:
+    """Interned masks must behave exactly like tag sets."""
+
+    def test_normalizes_and_decodes(self):
+        interner = TagInterner()
+
+        assert interner.mask('') == 0
+        assert interner.mask(None) == 0
+        assert interner.mask(' budget , parks,,') == interner.mask('parks,budget')
+        assert interner.tags(interner.mask(' budget , parks,,')) == ['budget', 'parks']
+        assert len(interner) == 2
+
+    def test_bitwise_matching_equals_set_intersection(self):
+        rng = random.Random(6)
+        vocabulary = [f'tag{i}' for i in range(12)]
+        interner = TagInterner()
+        for _ in range(200):
+            a = set(rng.sample(vocabulary, rng.randint(0, 4)))
+            b = set(rng.sample(vocabulary, rng.randint(0, 4)))
+            assert interner.tags(interner.mask(','.join(a)) & interner.mask(','.join(b))) == sorted(a & b)
+            assert interner.tags(interner.mask(','.join(a)) | interner.mask(','.join(b))) == sorted(a | b)
+
+    def test_more_than_64_tags(self):
+        interner = TagInterner()
+        many = [f'tag{i}' for i in range(100)]
+        mask = interner.mask(many)
+
+        assert interner.overflowed
+        assert interner.mask('tag99') & mask
+        assert isinstance(interner.mask_array([mask]), list)
+        assert interner.tags(mask) == sorted(many)
+
+
+class TestShouldInheritBallot:
+    """StageBallots.should_inherit_ballot must match on interned masks."""
+
+    def check(self, following_tags, ballot_tags):
+        service = StageBallots()
+        return service.should_inherit_ballot(
+            SimpleNamespace(tags=following_tags), SimpleNamespace(tags=ballot_tags)
+        )
+
+    def test_following_all_tags_inherits_ballot_tags(self):
+        assert self.check('', 'budget, parks') == (True, ['budget', 'parks'])
+        assert self.check(None, None) == (True, [])
+
+    def test_tag_specific_following(self):
+        assert self.check('parks,schools', 'budget, parks') == (True, ['parks'])
+        assert self.check('schools', 'budget,parks') == (False, [])
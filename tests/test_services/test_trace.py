@@ -0,0 +1,187 @@
+"""
+Tests for the level-gated trace.
+
+This test suite validates democracy.trace and its use by STARVotingTally and
+the live Tally, including:
+- Events above the trace level are not recorded
+- Arguments are only formatted when the trace is rendered
+- The full level reproduces the previous STAR tally log
+- Tracing off records nothing but still stores structured results
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from democracy.exceptions import UnresolvedTieError
+from democracy.models import Result
+from democracy.star_voting import STARVotingTally
+from democracy.trace import FULL, OFF, SUMMARY, Trace, trace_level
+
+
+class Counted:
+    """Counts how often it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return 'counted'
+
+
+TIE_BALLOTS = [
+    {'a': Decimal('5'), 'b': Decimal('3'), 'c': Decimal('1')},
+    {'a': Decimal('3'), 'b': Decimal('5'), 'c': Decimal('1')},
+]
+
+
+class TestTrace:
+    """Level gating and lazy rendering."""
+
+    def test_levels(self):
+        assert trace_level('Summary') == SUMMARY
+        assert trace_level(FULL) == FULL
+        with pytest.raises(ValueError):
+            trace_level('verbose')
+        with pytest.raises(ValueError):
+            Trace(3)
+
+    def test_events_are_gated_and_formatted_lazily(self):
+        value = Counted()
+        trace = Trace('summary')
+        trace.summary("Voter {} ({:.1f}%)", value, Decimal('12.345'), indent=1)
+        trace.full("Detail for {}", value)
+
+        assert len(trace) == 1
+        assert value.formatted == 0
+        assert trace.render_html('--') == "--Voter counted (12.3%)<br/>"
+        assert value.formatted == 1
+
+    def test_off_records_nothing(self):
+        value = Counted()
+        trace = Trace(OFF)
+        trace.summary("{}", value)
+        trace.full("{}", value)
+        assert trace.render_text() == ''
+        assert value.formatted == 0
+
+    def test_extend_shifts_indent_and_filters(self):
+        inner = Trace(FULL)
+        inner.summary("kept")
+        inner.full("detail", indent=1)
+        outer = Trace(SUMMARY)
+        outer.summary("head")
+        outer.extend(inner, indent=2)
+        assert outer.render_text() == "head\n    kept"
+
+    def test_literal_lines_are_not_formatted(self):
+        trace = Trace()
+        trace.summary("{not a field}")
+        assert trace.lines() == ["{not a field}"]
+
+
+class TestSTARTallyTrace:
+    """STARVotingTally records its log through a Trace."""
+
+    def test_full_log_is_unchanged(self):
+        ballots = [
+            {'a': Decimal('5'), 'b': Decimal('3'), 'c': Decimal('1')},
+            {'a': Decimal('2'), 'b': Decimal('4'), 'c': Decimal('1.5')},
+            {'a': Decimal('4'), 'b': Decimal('1')},
+            {'b': Decimal('5'), 'c': Decimal('5')},
+        ]
+        assert STARVotingTally().run(ballots)['tally_log'] == [
+            'STAR Voting Tally',
+            'Total ballots: 4',
+            'Total choices: 3',
+            '',
+            '=== PHASE 1: SCORE PHASE ===',
+            'b: 3.25000000 stars',
+            'a: 2.75000000 stars',
+            'c: 1.87500000 stars',
+            '',
+            '=== PHASE 2: AUTOMATIC RUNOFF ===',
+            'Finalists: b vs a',
+            '',
+            'b: 2 preferences',
+            'a: 2 preferences',
+            'Equal preferences: 0',
+            '',
+            '=== TIEBREAKER PROTOCOL ===',
+            'Step 2: Tie broken by score - b wins (3.25000000 vs 2.75000000)',
+            'Winner: b',
+        ]
+
+    def test_summary_is_subset_of_full(self):
+        ballots = [
+            {'a': Decimal('5'), 'b': Decimal('3'), 'c': Decimal('1')},
+            {'a': Decimal('2'), 'b': Decimal('4'), 'c': Decimal('1.5')},
+            {'a': Decimal('4'), 'b': Decimal('1')},
+        ]
+        full = STARVotingTally().run(ballots)
+        summary = STARVotingTally(trace_level='summary').run(ballots)
+
+        assert summary['winner'] == full['winner']
+        assert 'a: 3.66666667 stars' in full['tally_log']
+        assert 'a: 3.66666667 stars' not in summary['tally_log']
+        remaining = iter(full['tally_log'])
+        assert all(line in remaining for line in summary['tally_log'])
+
+    def test_off_keeps_results(self):
+        tally = STARVotingTally(trace_level='off')
+        with pytest.raises(UnresolvedTieError) as error:
+            tally.run(TIE_BALLOTS)
+        assert len(tally.trace) == 0
+        # The exception keeps its tiebreaker diagnostics at every trace level
+        with pytest.raises(UnresolvedTieError) as full_error:
+            STARVotingTally().run(TIE_BALLOTS)
+        assert error.value.tiebreaker_log == full_error.value.tiebreaker_log
+        assert error.value.tiebreaker_log
+        assert tally.run([{'x': Decimal('1')}])['tally_log'] == []
+
+
+@pytest.mark.django_db
+@pytest.mark.services
+@pytest.mark.usefixtures('no_background_recalculation')
+class TestLiveTallyTrace:
+    """The live tally report follows TALLY_TRACE_LEVEL."""
+
+    def test_report_levels(self, settings, chain_community_factory):
+        from democracy.services import Tally
+
+        decision, _, _ = chain_community_factory(2)
+
+        # Full detail only when explicitly asked for; the default is summary
+        Tally(trace_level='full').process()
+        full = Result.objects.filter(decision=decision).latest('created')
+
+        Tally().process()
+        summary = Result.objects.filter(decision=decision).latest('created')
+
+        settings.TALLY_TRACE_LEVEL = 'off'
+        Tally().process()
+        off = Result.objects.filter(decision=decision).latest('created')
+
+        assert "'budget'" in full.report
+        assert "'budget'" not in summary.report
+        assert "TAG INFLUENCE ANALYSIS:" in summary.report
+        assert off.report == ''
+        assert full.stats == summary.stats == off.stats
+
+    def test_ballot_tree_trace(self, settings, chain_community_factory):
+        from democracy.models import Decision
+        from democracy.services import StageBallots
+
+        decision, memberships, _ = chain_community_factory(2)
+        traces = {}
+        for level in ('full', 'summary'):
+            settings.TALLY_TRACE_LEVEL = level
+            # get_or_calculate_ballot sticks the trace on the decision instance
+            decision = Decision.objects.get(id=decision.id)
+            StageBallots().get_or_calculate_ballot(decision, memberships[1].member)
+            traces[level] = decision.ballot_tree_log
+
+        assert len(traces['summary']) == 0
+        full = traces['full'].render_html('----------------')
+        assert f"----------------Getting or Creating ballot for voter {memberships[1].member}<br/>" in full
@@ -0,0 +1,56 @@
+"""
+Tests for the indexed delegation tree builder.
+
+This test suite validates democracy.tree_builder.DelegationTreeBuilder, including:
+- The tree data keeps the existing {'nodes', 'edges', ...} JSON shape
+- Nodes are updated in place by voter id
+- Edges are deduplicated by (follower, followee), keeping the first one
+- Choice titles are looked up by id
+"""
+
+from democracy.tree_builder import DelegationTreeBuilder
+
+
+class TestDelegationTreeBuilder:
+    """Indexed node/edge bookkeeping."""
+
+    def test_default_sections(self):
+        tree = DelegationTreeBuilder()
+        assert tree.data == {'nodes': [], 'edges': [], 'inheritance_chains': []}
+
+    def test_set_node_updates_existing_node_in_place(self):
+        tree = DelegationTreeBuilder()
+        first = tree.set_node({'voter_id': 'a', 'vote_type': 'calculated', 'votes': {}})
+        tree.set_node({'voter_id': 'a', 'vote_type': 'manual'})
+        assert tree.data['nodes'] == [{'voter_id': 'a', 'vote_type': 'manual', 'votes': {}}]
+        assert tree.node('a') is first
+        assert tree.node('missing') is None
+
+    def test_add_edge_keeps_first_edge_per_pair(self):
+        tree = DelegationTreeBuilder()
+        edge, created = tree.add_edge({'follower': 'a', 'followee': 'b', 'order': 1})
+        duplicate, duplicate_created = tree.add_edge({'follower': 'a', 'followee': 'b', 'order': 2})
+        tree.add_edge({'follower': 'b', 'followee': 'a', 'order': 1})
+        assert created and not duplicate_created
+        assert duplicate is edge
+        assert [e['order'] for e in tree.data['edges']] == [1, 1]
+        assert tree.edge('a', 'b') is edge
+
+    def test_sections_and_choice_titles(self):
+        tree = DelegationTreeBuilder(
+            sections=('nodes', 'edges', 'inheritance_chains', 'circular_prevented'),
+            choices=[{'id': 'c1', 'title': 'Parks'}]
+        )
+        tree.add('circular_prevented', {'voter_id': 'a'})
+        assert tree.data['circular_prevented'] == [{'voter_id': 'a'}]
+        assert tree.choice_title('c1') == 'Parks'
+        assert tree.choice_title('c2', 'c2') == 'c2'
+
+    def test_large_tree_builds_quickly(self):
+        tree = DelegationTreeBuilder()
+        for index in range(20000):
+            tree.set_node({'voter_id': str(index)})
+            tree.add_edge({'follower': str(index), 'followee': str(index // 2)})
+            tree.add_edge({'follower': str(index), 'followee': str(index // 2)})
+        assert len(tree.data['nodes']) == 20000
+        assert len(tree.data['edges']) == 20000
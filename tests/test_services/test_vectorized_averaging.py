@@ -0,0 +1,120 @@
+"""
+Tests for the optional NumPy-vectorized ballot averaging.
+
+This test suite validates democracy.vectorized and DelegationEngine(vectorized=True), including:
+- Clean fallback to the Decimal path when NumPy is not installed
+- Vectorized ballots agree with the Decimal path within the documented
+  fixed-point tolerance (depth x 1e-11), also on deep chains
+"""
+
+import random
+from decimal import Decimal
+
+import pytest
+
+from democracy import delegation
+from democracy.delegation import DelegationEngine
+from democracy.star_arithmetic import FixedPointStars
+from tests.helpers import make_snapshot_data, mutate, random_cyclic_snapshot
+
+
+def assert_ballots_close(actual, expected, depth):
+    """Same choices, stars within the fixed-point tolerance for this depth."""
+    assert actual.keys() == expected.keys()
+    tolerance = Decimal(max(depth, 1)) * Decimal('1e-11')
+    for choice_id, stars in expected.items():
+        assert abs(actual[choice_id] - stars) <= tolerance
+
+
+class TestFallback:
+    """Without NumPy the engine silently uses the Decimal path."""
+
+    def test_engine_falls_back_without_numpy(self, monkeypatch):
+        monkeypatch.setattr(delegation, 'numpy_available', lambda: False)
+        snapshot_data = make_snapshot_data(*random_cyclic_snapshot(random.Random(5)))
+
+        engine = DelegationEngine(snapshot_data, vectorized=True)
+
+        assert engine.vectorized is False
+        expected = DelegationEngine(snapshot_data).resolve()
+        actual = engine.resolve()
+        for voter_id in expected:
+            assert actual[voter_id] == expected[voter_id]
+
+    def test_fixed_point_arithmetic_is_never_vectorized(self):
+        snapshot_data = make_snapshot_data(*random_cyclic_snapshot(random.Random(6)))
+        engine = DelegationEngine(snapshot_data, arithmetic=FixedPointStars(), vectorized=True)
+        assert engine.vectorized is False
+
+
+class TestVectorizedAveraging:
+    """Vectorized ballots agree with the Decimal path."""
+
+    def test_random_snapshots_match_decimal_path(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(10)
+        for _ in range(30):
+            snapshot_data = make_snapshot_data(*random_cyclic_snapshot(rng, size=60))
+            expected = DelegationEngine(snapshot_data).resolve()
+            engine = DelegationEngine(snapshot_data, vectorized=True)
+            assert engine.vectorized is True
+            actual = engine.resolve()
+            for voter_id in expected:
+                assert actual[voter_id]['type'] == expected[voter_id]['type']
+                assert actual[voter_id]['tags'] == expected[voter_id]['tags']
+                assert actual[voter_id]['delegation_depth'] == expected[voter_id]['delegation_depth']
+                if expected[voter_id]['ballot'] is None:
+                    assert actual[voter_id]['ballot'] is None
+                    continue
+                assert_ballots_close(
+                    actual[voter_id]['ballot'], expected[voter_id]['ballot'], expected[voter_id]['delegation_depth']
+                )
+
+    def test_deep_chain_stays_within_tolerance(self):
+        pytest.importorskip('numpy')
+        rng = random.Random(14)
+        members = [f'v{i:03d}' for i in range(200)]
+        manual = {
+            voter_id: ('', {c: str(Decimal(rng.randint(0, 500)) / 100) for c in ('c1', 'c2', 'c3')})
+            for voter_id in members[:5]
+        }
+        # Every member averages up to three predecessors: 195 levels of 12-digit means
+        followings = {
+            voter_id: [(members[index - back], '') for back in (1, 2, 3) if index - back >= 0]
+            for index, voter_id in enumerate(members) if index >= 5
+        }
+        snapshot_data = make_snapshot_data(members, followings, manual)
+
+        expected = DelegationEngine(snapshot_data).resolve()
+        actual = DelegationEngine(snapshot_data, vectorized=True).resolve()
+
+        assert expected[members[-1]]['delegation_depth'] > 60
+        for voter_id in members:
+            assert_ballots_close(
+                actual[voter_id]['ballot'], expected[voter_id]['ballot'], expected[voter_id]['delegation_depth']
+            )
+            # Calculated ballots are fixed-point values with 12 decimal places
+            if voter_id not in manual:
+                assert all(
+                    stars.as_tuple().exponent == -12 for stars in actual[voter_id]['ballot'].values()
+                )
+
+    def test_incremental_resolution_restores_and_averages(self):
+        pytest.importorskip('numpy')
+        from democracy.delegation import changed_voters
+
+        rng = random.Random(12)
+        for _ in range(10):
+            members, followings, manual = random_cyclic_snapshot(rng)
+            previous_data = make_snapshot_data(members, followings, manual)
+            previous = DelegationEngine(previous_data, vectorized=True)
+            previous.resolve()
+            members, followings, manual = mutate(rng, members, followings, manual)
+            snapshot_data = make_snapshot_data(members, followings, manual)
+
+            expected = DelegationEngine(snapshot_data, vectorized=True).resolve()
+            actual = DelegationEngine(snapshot_data, vectorized=True).resolve(
+                previous=previous.export_resolutions(), changed=changed_voters(previous_data, snapshot_data)
+            )
+            for voter_id in expected:
+                assert actual[voter_id] == expected[voter_id]